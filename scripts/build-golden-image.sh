@@ -0,0 +1,143 @@
+#!/bin/bash
+#
+# Kapnode Golden Image Builder
+# Bakes packages and the k3s binary into the Ubuntu 24.04 cloud image offline,
+# so new VMs only configure networking, join Tailscale and join K3s on first boot
+#
+# Usage: ./build-golden-image.sh [options]
+#   --base-url URL        Ubuntu cloud image URL (default: 24.04 release)
+#   --packages LIST       Comma-separated packages to install
+#   --k3s-version VER     K3s release to preinstall (default: latest stable)
+#   --image-dir DIR       Image directory (default: /var/lib/vz/template/iso)
+#   --force               Rebuild even if the versioned image exists
+#
+# The image is named kapnode-golden-<hash>.img, where <hash> covers the base
+# image checksum, the package list, the k3s version and this script, so any
+# change to the recipe produces a new image. The last line of output is always
+# GOLDEN_IMAGE=<file name> for callers to pick up.
+#
+
+set -euo pipefail
+
+# Colors for output
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m' # No Color
+
+# Default values
+BASE_URL="https://cloud-images.ubuntu.com/releases/24.04/release/ubuntu-24.04-server-cloudimg-amd64.img"
+PACKAGES="curl,wget,git,vim,htop,net-tools,lvm2,parted,tailscale,open-iscsi,nfs-common,qemu-guest-agent"
+K3S_VERSION=""
+IMAGE_DIR="/var/lib/vz/template/iso"
+FORCE=false
+
+# Parse command line arguments
+while [[ $# -gt 0 ]]; do
+    case $1 in
+        --base-url)
+            BASE_URL="$2"
+            shift 2
+            ;;
+        --packages)
+            PACKAGES="$2"
+            shift 2
+            ;;
+        --k3s-version)
+            K3S_VERSION="$2"
+            shift 2
+            ;;
+        --image-dir)
+            IMAGE_DIR="$2"
+            shift 2
+            ;;
+        --force)
+            FORCE=true
+            shift
+            ;;
+        --help)
+            sed -n '2,18p' "$0" | sed 's/^# \{0,1\}//'
+            exit 0
+            ;;
+        *)
+            echo -e "${RED}Error: Unknown option $1${NC}" >&2
+            exit 1
+            ;;
+    esac
+done
+
+if ! command -v virt-customize &>/dev/null; then
+    echo -e "${RED}Error: virt-customize not found (apt install libguestfs-tools)${NC}" >&2
+    exit 1
+fi
+
+mkdir -p "$IMAGE_DIR"
+BASE_IMG="$IMAGE_DIR/$(basename "$BASE_URL")"
+
+# Download the base image if not already cached
+if [[ ! -f "$BASE_IMG" ]]; then
+    echo -e "${YELLOW}Downloading base cloud image...${NC}"
+    wget -q --show-progress -O "$BASE_IMG.part" "$BASE_URL"
+    mv "$BASE_IMG.part" "$BASE_IMG"
+else
+    echo -e "${GREEN}Using cached base image $(basename "$BASE_IMG")${NC}"
+fi
+
+# Resolve "latest stable" so the hash changes when k3s publishes a release
+if [[ -z "$K3S_VERSION" ]]; then
+    K3S_VERSION=$(curl -sfL https://update.k3s.io/v1-release/channels/stable -o /dev/null -w '%{redirect_url}' | sed 's|.*/||')
+fi
+
+if [[ -z "$K3S_VERSION" ]]; then
+    echo -e "${RED}Error: Could not determine k3s version${NC}" >&2
+    exit 1
+fi
+
+BASE_SUM=$(sha256sum "$BASE_IMG" | cut -d' ' -f1)
+SCRIPT_SUM=$(sha256sum "$0" | cut -d' ' -f1)
+IMAGE_HASH=$(printf '%s\n' "$BASE_SUM" "$PACKAGES" "$K3S_VERSION" "$SCRIPT_SUM" | sha256sum | cut -c1-12)
+IMAGE_NAME="kapnode-golden-$IMAGE_HASH.img"
+IMAGE_PATH="$IMAGE_DIR/$IMAGE_NAME"
+
+echo "Base image:      $(basename "$BASE_IMG") (${BASE_SUM:0:12})"
+echo "Packages:        $PACKAGES"
+echo "K3s version:     $K3S_VERSION"
+echo "Golden image:    $IMAGE_NAME"
+echo ""
+
+if [[ -f "$IMAGE_PATH" ]] && [[ "$FORCE" != true ]]; then
+    echo -e "${GREEN}Golden image is up to date${NC}"
+    echo "GOLDEN_IMAGE=$IMAGE_NAME"
+    exit 0
+fi
+
+WORK_IMG="$IMAGE_PATH.building"
+trap 'rm -f "$WORK_IMG"' EXIT
+cp "$BASE_IMG" "$WORK_IMG"
+
+# Fetch k3s artifacts on the host so the guest needs no network at build time
+echo -e "${YELLOW}Downloading k3s $K3S_VERSION...${NC}"
+K3S_TMP=$(mktemp -d)
+trap 'rm -f "$WORK_IMG"; rm -rf "$K3S_TMP"' EXIT
+curl -sfL -o "$K3S_TMP/k3s" "https://github.com/k3s-io/k3s/releases/download/${K3S_VERSION/+/%2B}/k3s"
+curl -sfL -o "$K3S_TMP/k3s-install.sh" https://get.k3s.io
+chmod 0755 "$K3S_TMP/k3s" "$K3S_TMP/k3s-install.sh"
+
+echo -e "${YELLOW}Customizing image (this takes a few minutes)...${NC}"
+virt-customize -a "$WORK_IMG" \
+    --run-command 'curl -fsSL https://pkgs.tailscale.com/stable/ubuntu/noble.noarmor.gpg -o /usr/share/keyrings/tailscale-archive-keyring.gpg' \
+    --run-command 'curl -fsSL https://pkgs.tailscale.com/stable/ubuntu/noble.tailscale-keyring.list -o /etc/apt/sources.list.d/tailscale.list' \
+    --update \
+    --install "$PACKAGES" \
+    --copy-in "$K3S_TMP/k3s:/usr/local/bin" \
+    --copy-in "$K3S_TMP/k3s-install.sh:/usr/local/bin" \
+    --run-command 'systemctl enable iscsid qemu-guest-agent tailscaled' \
+    --run-command 'apt-get clean' \
+    --write "/etc/kapnode-golden-image:$IMAGE_NAME k3s=$K3S_VERSION" \
+    --truncate /etc/machine-id \
+    --run-command 'cloud-init clean --logs'
+
+mv "$WORK_IMG" "$IMAGE_PATH"
+
+echo -e "${GREEN}Golden image built successfully!${NC}"
+echo "GOLDEN_IMAGE=$IMAGE_NAME"
@@ -21,6 +21,10 @@
 #   --backup-size GB      Backup storage size in GB (default: 0, disabled)
 #   --k3s-master URL      K3s master URL (optional, for auto-join)
 #   --k3s-token TOKEN     K3s join token (optional, for auto-join)
+#   --golden-image FILE   Pre-baked image from build-golden-image.sh (optional)
+#   --apt-proxy URL       Site-local APT caching proxy (optional)
+#   --k3s-mirror URL      Site-local k3s artifact mirror (optional)
+#   --snippets-uploaded   Cloud-init snippets were already uploaded by the TUI
 #   --yes                 Skip confirmation prompt
 #
 
@@ -51,6 +55,10 @@ NETWORK="192.168.86.0/24"
 DNS_SERVERS="192.168.86.1,8.8.8.8"
 K3S_MASTER=""
 K3S_TOKEN=""
+GOLDEN_IMAGE=""
+APT_PROXY=""
+K3S_MIRROR=""
+SNIPPETS_UPLOADED=false
 SKIP_CONFIRM=false
 
 # Parse command line arguments
@@ -124,6 +132,22 @@ while [[ $# -gt 0 ]]; do
             K3S_TOKEN="$2"
             shift 2
             ;;
+        --golden-image)
+            GOLDEN_IMAGE="$2"
+            shift 2
+            ;;
+        --apt-proxy)
+            APT_PROXY="$2"
+            shift 2
+            ;;
+        --k3s-mirror)
+            K3S_MIRROR="${2%/}"
+            shift 2
+            ;;
+        --snippets-uploaded)
+            SNIPPETS_UPLOADED=true
+            shift
+            ;;
         --yes)
             SKIP_CONFIRM=true
             shift
@@ -154,6 +178,13 @@ Optional:
   --backup-size GB         Backup storage size in GB (0 = disabled)
   --k3s-master URL         K3s master URL for auto-join (e.g., https://minikapserver:6443)
   --k3s-token TOKEN        K3s join token for auto-join
+  --golden-image FILE      Pre-baked image in /var/lib/vz/template/iso
+                           (packages and k3s preinstalled, no first-boot apt)
+  --apt-proxy URL          APT caching proxy (e.g., http://192.168.86.10:3142)
+  --k3s-mirror URL         k3s mirror from setup-cache-proxy.sh
+                           (e.g., http://192.168.86.10:8080/k3s)
+  --snippets-uploaded      Use the user-data/meta-data/network-config snippets
+                           already in /var/lib/vz/snippets for this VMID
   --yes                    Skip confirmation prompt
 
 Examples:
@@ -242,6 +273,10 @@ fi
 if [[ -n "$K3S_MASTER" ]]; then
     echo "K3s Auto-Join:   Enabled ($K3S_MASTER)"
 fi
+echo "Image:           ${GOLDEN_IMAGE:-Ubuntu 24.04 cloud image}"
+if [[ -n "$APT_PROXY" ]] || [[ -n "$K3S_MIRROR" ]]; then
+    echo "Cache Proxy:     ${APT_PROXY:-none} ${K3S_MIRROR:+(k3s: $K3S_MIRROR)}"
+fi
 echo ""
 
 if [[ "$SKIP_CONFIRM" != true ]]; then
@@ -253,6 +288,54 @@ if [[ "$SKIP_CONFIRM" != true ]]; then
     fi
 fi
 
+# Generate cloud-init documents, unless the TUI already rendered and uploaded
+# them (tui/lib/cloud_init.py renders the same documents; keep both in sync)
+if [[ "$SNIPPETS_UPLOADED" != true ]]; then
+
+# A golden image already has every package and the k3s binary installed
+if [[ -n "$GOLDEN_IMAGE" ]]; then
+    PACKAGE_CONFIG="# Packages and k3s are pre-baked into $GOLDEN_IMAGE
+package_update: false
+package_upgrade: false"
+    K3S_INSTALL="INSTALL_K3S_SKIP_DOWNLOAD=true K3S_URL=\"\$K3S_MASTER\" K3S_TOKEN=\"\$K3S_TOKEN\" /usr/local/bin/k3s-install.sh"
+else
+    PACKAGE_CONFIG="# Update system on first boot
+package_update: true
+package_upgrade: true
+
+# Install essential packages
+packages:
+  - curl
+  - wget
+  - git
+  - vim
+  - htop
+  - net-tools
+  - lvm2
+  - parted
+  - tailscale
+  - open-iscsi
+  - nfs-common"
+    K3S_INSTALL="curl -sfL https://get.k3s.io | K3S_URL=\"\$K3S_MASTER\" K3S_TOKEN=\"\$K3S_TOKEN\" sh -"
+
+    # Fetch installer, binary and airgap images from the site mirror instead
+    if [[ -n "$K3S_MIRROR" ]]; then
+        K3S_INSTALL="mkdir -p /var/lib/rancher/k3s/agent/images \
+&& curl -sfL -o /usr/local/bin/k3s-install.sh $K3S_MIRROR/install.sh \
+&& curl -sfL -o /usr/local/bin/k3s $K3S_MIRROR/k3s \
+&& curl -sfL -o /var/lib/rancher/k3s/agent/images/k3s-airgap-images-amd64.tar.zst $K3S_MIRROR/k3s-airgap-images-amd64.tar.zst \
+&& chmod 0755 /usr/local/bin/k3s /usr/local/bin/k3s-install.sh \
+&& INSTALL_K3S_SKIP_DOWNLOAD=true K3S_URL=\"\$K3S_MASTER\" K3S_TOKEN=\"\$K3S_TOKEN\" /usr/local/bin/k3s-install.sh"
+    fi
+fi
+
+# Route apt through the site-local caching proxy
+APT_CONFIG=""
+if [[ -n "$APT_PROXY" ]]; then
+    APT_CONFIG="apt:
+  http_proxy: $APT_PROXY"
+fi
+
 # Generate cloud-init user-data with proper variable handling
 USER_DATA=$(cat <<EOF
 #cloud-config
@@ -273,23 +356,9 @@ users:
 ssh_pwauth: false
 disable_root: true
 
-# Update system on first boot
-package_update: true
-package_upgrade: true
+$PACKAGE_CONFIG
 
-# Install essential packages
-packages:
-  - curl
-  - wget
-  - git
-  - vim
-  - htop
-  - net-tools
-  - lvm2
-  - parted
-  - tailscale
-  - open-iscsi
-  - nfs-common
+$APT_CONFIG
 
 # Write files
 write_files:
@@ -345,12 +414,7 @@ write_files:
 
       if [[ -n "\$K3S_MASTER" ]] && [[ -n "\$K3S_TOKEN" ]]; then
         echo "Joining K3s cluster at \$K3S_MASTER..."
-        curl -sfL https://get.k3s.io | K3S_URL="\$K3S_MASTER" K3S_TOKEN="\$K3S_TOKEN" sh -
-
-        # Label node with location
-        if [[ -n "$LOCATION_TAG" ]]; then
-          kubectl label node $VM_NAME topology.kubernetes.io/zone=$LOCATION_TAG --overwrite || true
-        fi
+        $K3S_INSTALL
       fi
     permissions: '0755'
   - path: /etc/systemd/system/configure-tailscale.service
@@ -417,13 +481,22 @@ ethernets:
 EOF
 )
 
+fi  # SNIPPETS_UPLOADED
+
 echo -e "${YELLOW}Creating VM $VMID...${NC}"
 
 # Download Ubuntu 24.04 cloud image if not already cached
 UBUNTU_IMG="ubuntu-24.04-server-cloudimg-amd64.img"
 UBUNTU_URL="https://cloud-images.ubuntu.com/releases/24.04/release/ubuntu-24.04-server-cloudimg-amd64.img"
 
-if [[ ! -f "/var/lib/vz/template/iso/$UBUNTU_IMG" ]]; then
+if [[ -n "$GOLDEN_IMAGE" ]]; then
+    UBUNTU_IMG="$GOLDEN_IMAGE"
+    if [[ ! -f "/var/lib/vz/template/iso/$UBUNTU_IMG" ]]; then
+        echo -e "${RED}Error: Golden image $UBUNTU_IMG not found (run build-golden-image.sh)${NC}" >&2
+        exit 1
+    fi
+    echo -e "${GREEN}Using golden image $UBUNTU_IMG${NC}"
+elif [[ ! -f "/var/lib/vz/template/iso/$UBUNTU_IMG" ]]; then
     echo -e "${YELLOW}Downloading Ubuntu 24.04 cloud image...${NC}"
     wget -q --show-progress -O "/var/lib/vz/template/iso/$UBUNTU_IMG" "$UBUNTU_URL" || {
         echo -e "${RED}Error: Failed to download Ubuntu image${NC}" >&2
@@ -456,22 +529,60 @@ qm create "$VMID" \
 # Create snippets directory if it doesn't exist
 mkdir -p /var/lib/vz/snippets
 
-# Write cloud-init files to snippets
+# Write cloud-init files to snippets (unless rendered and uploaded by the TUI)
 echo -e "${YELLOW}Configuring cloud-init...${NC}"
-echo "$USER_DATA" > "/var/lib/vz/snippets/user-data-$VMID.yaml"
-echo "$META_DATA" > "/var/lib/vz/snippets/meta-data-$VMID.yaml"
-echo "$NETWORK_CONFIG" > "/var/lib/vz/snippets/network-config-$VMID.yaml"
+if [[ "$SNIPPETS_UPLOADED" == true ]]; then
+    for doc in user-data meta-data network-config; do
+        if [[ ! -f "/var/lib/vz/snippets/$doc-$VMID.yaml" ]]; then
+            echo -e "${RED}Error: Missing snippet $doc-$VMID.yaml${NC}" >&2
+            exit 1
+        fi
+    done
+else
+    echo "$USER_DATA" > "/var/lib/vz/snippets/user-data-$VMID.yaml"
+    echo "$META_DATA" > "/var/lib/vz/snippets/meta-data-$VMID.yaml"
+    echo "$NETWORK_CONFIG" > "/var/lib/vz/snippets/network-config-$VMID.yaml"
+fi
 
 # Set cloud-init configuration
 qm set "$VMID" --cicustom "user=local:snippets/user-data-$VMID.yaml,meta=local:snippets/meta-data-$VMID.yaml,network=local:snippets/network-config-$VMID.yaml"
 
-# Import Ubuntu cloud image to unused disk
+# Import Ubuntu cloud image as the OS disk (scsi0). This runs as a Proxmox
+# task through the API so its log can be followed; the task ID is printed as
+# TASK_UPID=... and the script stays quiet until the import finishes.
 echo -e "${YELLOW}Importing Ubuntu cloud image...${NC}"
-qm disk import "$VMID" "/var/lib/vz/template/iso/$UBUNTU_IMG" "$STORAGE" --format raw
+PVE_NODE="$(hostname)"
+IMPORT_LOG="$(mktemp)"
+pvesh create "/nodes/$PVE_NODE/qemu/$VMID/config" \
+    --scsi0 "$STORAGE:0,import-from=/var/lib/vz/template/iso/$UBUNTU_IMG,format=raw" \
+    > "$IMPORT_LOG" 2>&1 &
+IMPORT_PID=$!
+
+IMPORT_UPID=""
+for _ in $(seq 1 25); do
+    IMPORT_UPID="$(pvesh get "/nodes/$PVE_NODE/tasks" --source active --vmid "$VMID" \
+        --typefilter qmconfig --output-format json 2>/dev/null | grep -o 'UPID:[^"]*' | head -n 1 || true)"
+    if [[ -n "$IMPORT_UPID" ]] || ! kill -0 "$IMPORT_PID" 2>/dev/null; then
+        break
+    fi
+    sleep 0.2
+done
 
-# Attach imported disk as scsi0
-echo -e "${YELLOW}Attaching OS disk...${NC}"
-qm set "$VMID" --scsi0 "$STORAGE:vm-$VMID-disk-0,size=${DISK_SIZE}G"
+if [[ -n "$IMPORT_UPID" ]]; then
+    echo "TASK_UPID=$IMPORT_UPID"
+fi
+
+if ! wait "$IMPORT_PID"; then
+    cat "$IMPORT_LOG" >&2
+    rm -f "$IMPORT_LOG"
+    echo -e "${RED}Error: Failed to import Ubuntu image${NC}" >&2
+    exit 1
+fi
+rm -f "$IMPORT_LOG"
+
+# The imported disk has the cloud image's size; grow it to the requested size
+echo -e "${YELLOW}Resizing OS disk to ${DISK_SIZE}GB...${NC}"
+qm resize "$VMID" scsi0 "${DISK_SIZE}G"
 
 # Add additional storage for Longhorn if specified
 if [[ $LONGHORN_SIZE -gt 0 ]]; then
@@ -501,5 +612,9 @@ if [[ -z "$K3S_MASTER" ]] && [[ "$NODE_TYPE" == "k3s-worker" ]]; then
     echo "6. Join K3s cluster manually:"
     echo "   curl -sfL https://get.k3s.io | K3S_URL=https://minikapserver:6443 K3S_TOKEN=<token> sh -"
 fi
+if [[ "$NODE_TYPE" != "k3s-master" ]]; then
+    echo "7. Label the node from the master once it has joined:"
+    echo "   python deploy_node.py join-nodes $VM_NAME"
+fi
 echo ""
 echo -e "${YELLOW}To start the VM now, run: qm start $VMID${NC}"
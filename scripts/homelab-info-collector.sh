@@ -3,6 +3,9 @@
 # Homelab Information Collector Script
 # Run this on each system to gather comprehensive documentation data
 # Usage: bash homelab-info-collector.sh > system-info-$(hostname).txt
+#
+# Superseded by `python deploy_node.py collect-info` (tui/), which collects
+# all hosts in parallel over SSH into structured, diffable JSON snapshots.
 
 echo "========================================="
 echo "HOMELAB SYSTEM INFORMATION COLLECTOR"
@@ -16,6 +16,11 @@ NC='\033[0m'
 
 LONGHORN_SIZE=0
 BACKUP_SIZE=0
+LONGHORN_DISK=""
+BACKUP_DISK=""
+
+LONGHORN_MOUNT=/var/lib/longhorn
+BACKUP_MOUNT=/var/lib/backups
 
 # Parse arguments
 while [[ $# -gt 0 ]]; do
@@ -28,14 +33,24 @@ while [[ $# -gt 0 ]]; do
             BACKUP_SIZE="$2"
             shift 2
             ;;
+        --longhorn-disk)
+            LONGHORN_DISK="$2"
+            shift 2
+            ;;
+        --backup-disk)
+            BACKUP_DISK="$2"
+            shift 2
+            ;;
         --help)
-            echo "Usage: $0 [--longhorn-size GB] [--backup-size GB]"
+            echo "Usage: $0 [--longhorn-size GB] [--backup-size GB] [--longhorn-disk DEV] [--backup-disk DEV]"
             echo ""
             echo "Configures storage for Longhorn and backup partitions"
             echo ""
             echo "Options:"
             echo "  --longhorn-size GB    Size of Longhorn storage in GB"
             echo "  --backup-size GB      Size of backup storage in GB"
+            echo "  --longhorn-disk DEV   Use DEV for Longhorn instead of the first free disk"
+            echo "  --backup-disk DEV     Use DEV for backups instead of the next free disk"
             echo "  --help                Show this help message"
             exit 0
             ;;
@@ -46,6 +61,9 @@ while [[ $# -gt 0 ]]; do
     esac
 done
 
+[[ -n "$LONGHORN_DISK" && $LONGHORN_SIZE -eq 0 ]] && LONGHORN_SIZE=1
+[[ -n "$BACKUP_DISK" && $BACKUP_SIZE -eq 0 ]] && BACKUP_SIZE=1
+
 # Check if running as root
 if [[ $EUID -ne 0 ]]; then
    echo -e "${RED}This script must be run as root${NC}" >&2
@@ -57,188 +75,139 @@ echo -e "${GREEN}Post-Install Storage Configuration${NC}"
 echo -e "${GREEN}========================================${NC}"
 echo ""
 
-# Function to safely identify available disks
+# List unused disks as "/dev/NAME:BYTES" from a single lsblk call.
+# A disk is unused if it is not mounted, has no filesystem or LVM/RAID
+# signature and no partitions (so the root disk is never picked); zram
+# swap devices and empty drives are skipped.
 identify_available_disks() {
+    local devices line
+    local -A has_children=()
     local -a disks=()
 
-    # Use lsblk to get JSON output for reliable parsing
+    devices=$(lsblk -P -b -o NAME,TYPE,SIZE,FSTYPE,MOUNTPOINT,PKNAME)
+
+    while IFS= read -r line; do
+        local NAME="" TYPE="" SIZE="" FSTYPE="" MOUNTPOINT="" PKNAME=""
+        eval "$line"
+        [[ -n "$PKNAME" ]] && has_children[$PKNAME]=1
+    done <<< "$devices"
+
     while IFS= read -r line; do
-        local disk_name=$(echo "$line" | jq -r '.name')
-        local disk_type=$(echo "$line" | jq -r '.type')
-        local disk_size=$(echo "$line" | jq -r '.size')
-        local mountpoint=$(echo "$line" | jq -r '.mountpoint // empty')
-        local children=$(echo "$line" | jq -r '.children // [] | length')
-
-        # Skip if:
-        # - Not a disk type
-        # - Has mountpoints (in use)
-        # - Has partitions/children
-        if [[ "$disk_type" == "disk" ]] && [[ -z "$mountpoint" ]] && [[ "$children" -eq 0 ]]; then
-            # Double-check it's not the root disk
-            if ! lsblk -n -o MOUNTPOINT "/dev/$disk_name" 2>/dev/null | grep -q "^/$"; then
-                disks+=("/dev/$disk_name:$disk_size")
-            fi
+        local NAME="" TYPE="" SIZE="" FSTYPE="" MOUNTPOINT="" PKNAME=""
+        eval "$line"
+        [[ "$TYPE" == "disk" && "$NAME" != zram* && $SIZE -gt 0 ]] || continue
+        if [[ -z "$MOUNTPOINT" && -z "$FSTYPE" && -z "${has_children[$NAME]:-}" ]]; then
+            disks+=("/dev/$NAME:$SIZE")
         fi
-    done < <(lsblk -J -o NAME,TYPE,SIZE,MOUNTPOINT | jq -c '.blockdevices[]')
+    done <<< "$devices"
 
     echo "${disks[@]}"
 }
 
-# Check for jq (needed for reliable disk detection)
-if ! command -v jq &> /dev/null; then
-    echo -e "${YELLOW}Installing jq for reliable disk detection...${NC}"
-    apt-get update -qq && apt-get install -y jq
-fi
-
-# Detect available disks using safe method
-echo "Detecting available disks..."
-AVAILABLE_DISKS=($(identify_available_disks))
-
-if [[ ${#AVAILABLE_DISKS[@]} -eq 0 ]]; then
-    echo -e "${YELLOW}No additional disks detected. Trying fallback method...${NC}"
-
-    # Fallback to manual detection
-    for disk_path in /dev/sd[b-z] /dev/vd[b-z] /dev/nvme[0-9]n[1-9]; do
-        if [[ -b "$disk_path" ]]; then
-            # Check if disk is not mounted and has no partitions
-            if ! lsblk -n -o MOUNTPOINT "$disk_path" 2>/dev/null | grep -q .; then
-                if ! lsblk -n -o TYPE "$disk_path" 2>/dev/null | grep -q "part"; then
-                    disk_size=$(lsblk -n -o SIZE "$disk_path" | head -1)
-                    AVAILABLE_DISKS+=("$disk_path:$disk_size")
-                fi
-            fi
-        fi
-    done
-fi
-
-echo ""
-echo "Detected available disks:"
-if [[ ${#AVAILABLE_DISKS[@]} -eq 0 ]]; then
-    echo -e "${YELLOW}  No additional disks detected.${NC}"
-    echo ""
-    echo "This could mean:"
-    echo "  1. No additional disks were attached during VM creation"
-    echo "  2. Disks are already partitioned/mounted"
-    echo "  3. Disks haven't been detected yet (try rebooting)"
-    echo ""
-    exit 0
-fi
-
-for disk_info in "${AVAILABLE_DISKS[@]}"; do
-    disk_path="${disk_info%:*}"
-    disk_size="${disk_info#*:}"
-    echo "  - $disk_path ($disk_size)"
-done
-echo ""
-
-DISK_INDEX=0
+# Partition, format, label and mount one disk (persisted in fstab by UUID)
+configure_disk() {
+    local disk="$1" label="$2" mount_point="$3"
+    local partition uuid
 
-# Configure Longhorn storage
-if [[ $LONGHORN_SIZE -gt 0 ]] && [[ $DISK_INDEX -lt ${#AVAILABLE_DISKS[@]} ]]; then
-    DISK_INFO="${AVAILABLE_DISKS[$DISK_INDEX]}"
-    DISK="${DISK_INFO%:*}"
-    echo -e "${YELLOW}Configuring Longhorn storage on $DISK (${LONGHORN_SIZE}GB)...${NC}"
+    echo -e "${YELLOW}Configuring $label storage on $disk...${NC}"
 
-    # Wipe existing partition table
-    wipefs -a "$DISK" 2>/dev/null || true
+    wipefs -a "$disk" 2>/dev/null || true
+    parted -s "$disk" mklabel gpt
+    parted -s "$disk" mkpart primary ext4 0% 100%
+    partprobe "$disk"
 
-    # Create partition
-    parted -s "$DISK" mklabel gpt
-    parted -s "$DISK" mkpart primary ext4 0% 100%
-    partprobe "$DISK"
-    sleep 2
+    # Wait for udev to create the partition node instead of polling
+    udevadm settle --timeout=30
 
     # Determine partition name (handle both sd/vd and nvme naming)
-    if [[ "$DISK" =~ nvme ]]; then
-        PARTITION="${DISK}p1"
+    if [[ "$disk" =~ nvme ]]; then
+        partition="${disk}p1"
     else
-        PARTITION="${DISK}1"
+        partition="${disk}1"
     fi
 
-    # Wait for partition to appear
-    for i in {1..10}; do
-        if [[ -b "$PARTITION" ]]; then
-            break
-        fi
-        sleep 1
-    done
-
-    if [[ ! -b "$PARTITION" ]]; then
-        echo -e "${RED}Error: Partition $PARTITION not found after creation${NC}" >&2
+    if [[ ! -b "$partition" ]]; then
+        echo -e "${RED}Error: Partition $partition not found after creation${NC}" >&2
         exit 1
     fi
 
-    # Format as ext4
-    mkfs.ext4 -F -L longhorn "$PARTITION"
-
-    # Create mount point
-    mkdir -p /var/lib/longhorn
+    mkfs.ext4 -q -F -L "$label" "$partition"
+    mkdir -p "$mount_point"
 
-    # Add to fstab
-    UUID=$(blkid -s UUID -o value "$PARTITION")
-    if ! grep -q "$UUID" /etc/fstab; then
-        echo "UUID=$UUID /var/lib/longhorn ext4 defaults,noatime 0 2" >> /etc/fstab
+    uuid=$(blkid -s UUID -o value "$partition")
+    if ! grep -q "$uuid" /etc/fstab; then
+        echo "UUID=$uuid $mount_point ext4 defaults,noatime 0 2" >> /etc/fstab
     fi
 
-    # Mount
-    mount "$PARTITION" /var/lib/longhorn
+    mount "$partition" "$mount_point"
 
-    echo -e "${GREEN}✓ Longhorn storage configured on $PARTITION${NC}"
-    DISK_INDEX=$((DISK_INDEX + 1))
-fi
-
-# Configure Backup storage
-if [[ $BACKUP_SIZE -gt 0 ]] && [[ $DISK_INDEX -lt ${#AVAILABLE_DISKS[@]} ]]; then
-    DISK_INFO="${AVAILABLE_DISKS[$DISK_INDEX]}"
-    DISK="${DISK_INFO%:*}"
-    echo -e "${YELLOW}Configuring Backup storage on $DISK (${BACKUP_SIZE}GB)...${NC}"
+    echo -e "${GREEN}✓ $label storage configured on $partition${NC}"
+}
 
-    # Wipe existing partition table
-    wipefs -a "$DISK" 2>/dev/null || true
+# Already configured storage is left alone, so the script can be re-run
+if [[ $LONGHORN_SIZE -gt 0 ]] && mountpoint -q "$LONGHORN_MOUNT"; then
+    echo -e "${GREEN}✓ Longhorn storage already mounted on $LONGHORN_MOUNT${NC}"
+    LONGHORN_SIZE=0
+fi
+if [[ $BACKUP_SIZE -gt 0 ]] && mountpoint -q "$BACKUP_MOUNT"; then
+    echo -e "${GREEN}✓ Backup storage already mounted on $BACKUP_MOUNT${NC}"
+    BACKUP_SIZE=0
+fi
 
-    # Create partition
-    parted -s "$DISK" mklabel gpt
-    parted -s "$DISK" mkpart primary ext4 0% 100%
-    partprobe "$DISK"
-    sleep 2
+if [[ $LONGHORN_SIZE -gt 0 || $BACKUP_SIZE -gt 0 ]]; then
+    echo "Detecting available disks..."
+    AVAILABLE_DISKS=($(identify_available_disks))
 
-    # Determine partition name (handle both sd/vd and nvme naming)
-    if [[ "$DISK" =~ nvme ]]; then
-        PARTITION="${DISK}p1"
-    else
-        PARTITION="${DISK}1"
+    echo ""
+    echo "Detected available disks:"
+    if [[ ${#AVAILABLE_DISKS[@]} -eq 0 ]]; then
+        echo -e "${YELLOW}  No additional disks detected.${NC}"
+        echo ""
+        echo "This could mean:"
+        echo "  1. No additional disks were attached during VM creation"
+        echo "  2. Disks are already partitioned/mounted"
+        echo "  3. Disks haven't been detected yet (try rebooting)"
+        echo ""
+        exit 0
     fi
 
-    # Wait for partition to appear
-    for i in {1..10}; do
-        if [[ -b "$PARTITION" ]]; then
-            break
-        fi
-        sleep 1
+    for disk_info in "${AVAILABLE_DISKS[@]}"; do
+        echo "  - ${disk_info%:*} ($(numfmt --to=iec "${disk_info#*:}"))"
     done
+    echo ""
 
-    if [[ ! -b "$PARTITION" ]]; then
-        echo -e "${RED}Error: Partition $PARTITION not found after creation${NC}" >&2
-        exit 1
-    fi
-
-    # Format as ext4
-    mkfs.ext4 -F -L backups "$PARTITION"
+    # Explicitly requested disks must be among the unused ones
+    for disk in $LONGHORN_DISK $BACKUP_DISK; do
+        if [[ " ${AVAILABLE_DISKS[*]} " != *" $disk:"* ]]; then
+            echo -e "${RED}Error: $disk is not an unused disk${NC}" >&2
+            exit 1
+        fi
+    done
 
-    # Create mount point
-    mkdir -p /var/lib/backups
+    # Remaining roles take the free disks in order
+    FREE_DISKS=()
+    for disk_info in "${AVAILABLE_DISKS[@]}"; do
+        disk="${disk_info%:*}"
+        [[ "$disk" == "$LONGHORN_DISK" || "$disk" == "$BACKUP_DISK" ]] || FREE_DISKS+=("$disk")
+    done
 
-    # Add to fstab
-    UUID=$(blkid -s UUID -o value "$PARTITION")
-    if ! grep -q "$UUID" /etc/fstab; then
-        echo "UUID=$UUID /var/lib/backups ext4 defaults,noatime 0 2" >> /etc/fstab
+    if [[ $LONGHORN_SIZE -gt 0 && -z "$LONGHORN_DISK" && ${#FREE_DISKS[@]} -gt 0 ]]; then
+        LONGHORN_DISK="${FREE_DISKS[0]}"
+        FREE_DISKS=("${FREE_DISKS[@]:1}")
+    fi
+    if [[ $BACKUP_SIZE -gt 0 && -z "$BACKUP_DISK" && ${#FREE_DISKS[@]} -gt 0 ]]; then
+        BACKUP_DISK="${FREE_DISKS[0]}"
     fi
 
-    # Mount
-    mount "$PARTITION" /var/lib/backups
+    # Configure Longhorn storage
+    if [[ $LONGHORN_SIZE -gt 0 && -n "$LONGHORN_DISK" ]]; then
+        configure_disk "$LONGHORN_DISK" longhorn "$LONGHORN_MOUNT"
+    fi
 
-    echo -e "${GREEN}✓ Backup storage configured on $PARTITION${NC}"
-    DISK_INDEX=$((DISK_INDEX + 1))
+    # Configure Backup storage
+    if [[ $BACKUP_SIZE -gt 0 && -n "$BACKUP_DISK" ]]; then
+        configure_disk "$BACKUP_DISK" backups "$BACKUP_MOUNT"
+    fi
 fi
 
 echo ""
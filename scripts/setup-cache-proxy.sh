@@ -0,0 +1,121 @@
+#!/bin/bash
+#
+# Site-Local Cache Proxy Setup Script
+# Turns a host at one location into an APT caching proxy (apt-cacher-ng) and a
+# static mirror of the k3s installer, binary and airgap images, so VMs deployed
+# at the same site install packages and k3s at LAN speed
+#
+# Usage: sudo ./setup-cache-proxy.sh [--k3s-version VERSION] [--mirror-port PORT]
+#
+# After setup:
+#   APT proxy:   http://<host>:3142
+#   k3s mirror:  http://<host>:<mirror-port>/k3s/{install.sh,k3s,k3s-airgap-images-amd64.tar.zst}
+#
+
+set -euo pipefail
+
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m'
+
+K3S_VERSION=""
+MIRROR_PORT=8080
+MIRROR_ROOT="/srv/kapnode-mirror"
+
+# Parse arguments
+while [[ $# -gt 0 ]]; do
+    case $1 in
+        --k3s-version)
+            K3S_VERSION="$2"
+            shift 2
+            ;;
+        --mirror-port)
+            MIRROR_PORT="$2"
+            shift 2
+            ;;
+        --help)
+            echo "Usage: $0 [--k3s-version VERSION] [--mirror-port PORT]"
+            echo ""
+            echo "Sets up apt-cacher-ng and a static k3s artifact mirror"
+            echo ""
+            echo "Options:"
+            echo "  --k3s-version VERSION  K3s release to mirror (default: latest stable)"
+            echo "  --mirror-port PORT     HTTP port for the k3s mirror (default: 8080)"
+            echo "  --help                 Show this help message"
+            exit 0
+            ;;
+        *)
+            echo "Unknown option: $1"
+            exit 1
+            ;;
+    esac
+done
+
+# Check if running as root
+if [[ $EUID -ne 0 ]]; then
+   echo -e "${RED}This script must be run as root${NC}" >&2
+   exit 1
+fi
+
+echo -e "${GREEN}========================================${NC}"
+echo -e "${GREEN}Site-Local Cache Proxy Setup${NC}"
+echo -e "${GREEN}========================================${NC}"
+echo ""
+
+# Install the caching proxy and a small web server (once per host)
+if ! command -v apt-cacher-ng &>/dev/null || ! command -v nginx &>/dev/null; then
+    echo -e "${YELLOW}Installing apt-cacher-ng and nginx...${NC}"
+    # Fresh cloud images ship without package lists
+    apt-get update -q
+    DEBIAN_FRONTEND=noninteractive apt-get install -y -q apt-cacher-ng nginx
+fi
+
+# HTTPS repositories (e.g. Tailscale) cannot be cached; let them tunnel through
+if ! grep -q '^PassThroughPattern' /etc/apt-cacher-ng/acng.conf; then
+    echo 'PassThroughPattern: .*:443$' >> /etc/apt-cacher-ng/acng.conf
+fi
+systemctl enable --now apt-cacher-ng
+systemctl restart apt-cacher-ng
+
+if [[ -z "$K3S_VERSION" ]]; then
+    K3S_VERSION=$(curl -sfL https://update.k3s.io/v1-release/channels/stable -o /dev/null -w '%{redirect_url}' | sed 's|.*/||')
+fi
+
+if [[ -z "$K3S_VERSION" ]]; then
+    echo -e "${RED}Error: Could not determine k3s version${NC}" >&2
+    exit 1
+fi
+
+# Mirror k3s artifacts into a versioned directory and point k3s/ at it
+RELEASE_URL="https://github.com/k3s-io/k3s/releases/download/${K3S_VERSION/+/%2B}"
+VERSION_DIR="$MIRROR_ROOT/k3s-$K3S_VERSION"
+
+if [[ ! -f "$VERSION_DIR/.complete" ]]; then
+    echo -e "${YELLOW}Mirroring k3s $K3S_VERSION...${NC}"
+    mkdir -p "$VERSION_DIR"
+    curl -sfL -o "$VERSION_DIR/install.sh" https://get.k3s.io
+    curl -sfL -o "$VERSION_DIR/k3s" "$RELEASE_URL/k3s"
+    curl -sfL -o "$VERSION_DIR/k3s-airgap-images-amd64.tar.zst" "$RELEASE_URL/k3s-airgap-images-amd64.tar.zst"
+    echo "$K3S_VERSION" > "$VERSION_DIR/version"
+    touch "$VERSION_DIR/.complete"
+else
+    echo -e "${GREEN}k3s $K3S_VERSION already mirrored${NC}"
+fi
+ln -sfn "$VERSION_DIR" "$MIRROR_ROOT/k3s"
+
+cat > /etc/nginx/sites-available/kapnode-mirror <<EOF
+server {
+    listen $MIRROR_PORT;
+    root $MIRROR_ROOT;
+    autoindex on;
+}
+EOF
+ln -sf /etc/nginx/sites-available/kapnode-mirror /etc/nginx/sites-enabled/kapnode-mirror
+systemctl enable nginx
+systemctl reload nginx || systemctl restart nginx
+
+echo ""
+echo -e "${GREEN}Cache proxy ready!${NC}"
+echo "APT proxy:   http://$(hostname -I | awk '{print $1}'):3142"
+echo "k3s mirror:  http://$(hostname -I | awk '{print $1}'):$MIRROR_PORT/k3s/ ($K3S_VERSION)"
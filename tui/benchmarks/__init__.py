@@ -0,0 +1,9 @@
+"""Performance benchmarks for the TUI's lib classes.
+
+Run from the tui directory:
+
+    python -m benchmarks                          # run everything
+    python -m benchmarks -k inventory             # only matching names
+    python -m benchmarks --save-baseline base.json
+    python -m benchmarks --compare base.json      # exit 1 on regressions
+"""
@@ -0,0 +1,79 @@
+"""Command-line runner for the benchmark suite."""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import suite  # noqa: F401  (registers the benchmarks)
+from .harness import REGISTRY, compare, format_rate, format_time, save_baseline
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Time SSH, executor, inventory and validation hot paths",
+    )
+    parser.add_argument("-k", dest="match", action="append", default=[],
+                        help="Only run benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark (default: 5)")
+    parser.add_argument("--list", action="store_true", help="List benchmark names and exit")
+    parser.add_argument("--save-baseline", type=Path, metavar="FILE", help="Write results as a baseline")
+    parser.add_argument("--compare", type=Path, metavar="FILE", help="Compare medians with a baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown before --compare fails (default: 0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    selected = [bench for bench in REGISTRY if not args.match or any(m in bench.name for m in args.match)]
+
+    if args.list:
+        for bench in selected:
+            print(bench.name)
+        return 0
+
+    if not selected:
+        print("No benchmarks match", file=sys.stderr)
+        return 2
+
+    width = max(len(bench.name) for bench in selected)
+    results: Dict[str, Dict[str, Any]] = {}
+
+    for bench in selected:
+        print(f"{bench.name:<{width}}  ", end="", flush=True)
+        try:
+            result = bench.run(args.repeat)
+        except Exception as e:
+            print(f"ERROR: {e}")
+            continue
+        results[bench.name] = result
+
+        line = f"{format_time(result['median']):>10}  ±{format_time(result['stdev']):>10}"
+        if "rate" in result:
+            line += f"  {format_rate(result['rate'], result['items'])}"
+        print(line)
+
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    failed = len(results) < len(selected)
+
+    if args.compare:
+        rows = compare(results, args.compare, args.threshold)
+        print(f"\nCompared with {args.compare} (threshold +{args.threshold:.0%}):")
+        for row in rows:
+            mark = "✗" if row["regressed"] else "✓"
+            print(
+                f"{mark} {row['name']:<{width}}  {format_time(row['baseline']):>10} -> "
+                f"{format_time(row['current']):>10}  ({row['ratio'] - 1:+.0%})"
+            )
+        regressed = [row for row in rows if row["regressed"]]
+        if regressed:
+            print(f"{len(regressed)} regression(s)")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
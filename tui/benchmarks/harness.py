@@ -0,0 +1,198 @@
+"""Benchmark harness - Registry, timing loop and baseline comparison."""
+
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+# Minimum wall time per sample; fast operations are looped until they reach it
+MIN_SAMPLE_TIME = 0.05
+
+
+class Context:
+    """Per-benchmark scratch space: a temporary directory and cleanup hooks."""
+
+    def __init__(self):
+        self.tmp = Path(tempfile.mkdtemp(prefix="kapnode-bench-"))
+        self.cleanups: List[Callable[[], None]] = []
+
+    def cleanup(self, callback: Callable[[], None]) -> None:
+        """Register a callback run after the benchmark (last registered runs first)."""
+        self.cleanups.append(callback)
+
+    def close(self) -> None:
+        for callback in reversed(self.cleanups):
+            try:
+                callback()
+            except Exception:
+                pass
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+class Benchmark:
+    """
+    A registered benchmark.
+
+    The setup function receives a Context (plus the parameter, if any) and
+    returns the callable to time; setup cost is not measured.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        setup: Callable[..., Callable[[], Any]],
+        param: Any = None,
+        items: Optional[str] = None,
+        count: int = 0,
+    ):
+        self.name = name
+        self.setup = setup
+        self.param = param
+        self.items = items
+        self.count = count
+
+    def run(self, repeat: int = 5) -> Dict[str, Any]:
+        """
+        Time the benchmark.
+
+        Args:
+            repeat: Number of samples
+
+        Returns:
+            Result dictionary (times in seconds per call)
+        """
+        context = Context()
+        try:
+            func = self.setup(context) if self.param is None else self.setup(context, self.param)
+
+            # Calibrate loops per sample (the first call also warms caches)
+            loops = 1
+            while True:
+                started = time.perf_counter()
+                for _ in range(loops):
+                    func()
+                elapsed = time.perf_counter() - started
+                if elapsed >= MIN_SAMPLE_TIME or loops >= 1 << 20:
+                    break
+                loops *= 2 if elapsed <= 0 else max(2, min(10, int(MIN_SAMPLE_TIME / elapsed) + 1))
+
+            samples = []
+            for _ in range(max(int(repeat), 1)):
+                started = time.perf_counter()
+                for _ in range(loops):
+                    func()
+                samples.append((time.perf_counter() - started) / loops)
+        finally:
+            context.close()
+
+        result = {
+            "median": statistics.median(samples),
+            "min": min(samples),
+            "max": max(samples),
+            "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            "loops": loops,
+            "samples": len(samples),
+        }
+        if self.items and self.count:
+            result["rate"] = self.count / result["median"]
+            result["items"] = self.items
+        return result
+
+
+REGISTRY: List[Benchmark] = []
+
+
+def benchmark(
+    name: str,
+    params: Optional[Sequence[Any]] = None,
+    items: Optional[str] = None,
+    count: Any = 0,
+) -> Callable[[Callable[..., Callable[[], Any]]], Callable[..., Callable[[], Any]]]:
+    """
+    Register a benchmark setup function.
+
+    Args:
+        name: Benchmark name ('[param]' is appended for parametrized ones)
+        params: Parameter values; one benchmark is registered per value
+        items: Unit processed per call (e.g. 'lines') to report a rate
+        count: Items processed per call, or a function of the parameter
+    """
+    def decorator(setup: Callable[..., Callable[[], Any]]) -> Callable[..., Callable[[], Any]]:
+        for param in params if params is not None else [None]:
+            label = name if param is None else f"{name}[{param}]"
+            number = count(param) if callable(count) else count
+            REGISTRY.append(Benchmark(label, setup, param, items, number))
+        return setup
+    return decorator
+
+
+def format_time(seconds: float) -> str:
+    """Format a duration with a readable unit."""
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def format_rate(rate: float, items: str) -> str:
+    """Format a throughput figure (e.g. '1.2M lines/s')."""
+    for suffix, scale in (("G", 1e9), ("M", 1e6), ("k", 1e3)):
+        if rate >= scale:
+            return f"{rate / scale:.1f}{suffix} {items}/s"
+    return f"{rate:.0f} {items}/s"
+
+
+def save_baseline(results: Dict[str, Dict[str, Any]], path: Path) -> None:
+    """Write results as a baseline file."""
+    data = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline_path: Path,
+    threshold: float = 0.25,
+) -> List[Dict[str, Any]]:
+    """
+    Compare results with a baseline by median time.
+
+    Args:
+        results: Current results
+        baseline_path: Baseline file written by save_baseline()
+        threshold: Allowed slowdown ratio (0.25 = 25% slower)
+
+    Returns:
+        One entry per benchmark in both runs: name, baseline, current,
+        ratio (current / baseline) and regressed
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f).get("results", {})
+
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["median"]
+        ratio = result["median"] / before if before > 0 else 1.0
+        rows.append({
+            "name": name,
+            "baseline": before,
+            "current": result["median"],
+            "ratio": ratio,
+            "regressed": ratio > 1.0 + threshold,
+        })
+    return rows
@@ -0,0 +1,96 @@
+"""In-process SSH server for benchmarks (accepts any key, serves canned output)."""
+
+import socket
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import paramiko
+
+
+class _Server(paramiko.ServerInterface):
+    def __init__(self, outputs: Dict[str, bytes], default: bytes):
+        self.outputs = outputs
+        self.default = default
+
+    def get_allowed_auths(self, username: str) -> str:
+        return "publickey"
+
+    def check_auth_publickey(self, username: str, key: paramiko.PKey) -> int:
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind: str, chanid: int) -> int:
+        return paramiko.OPEN_SUCCEEDED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes) -> bool:
+        return True
+
+    def check_channel_exec_request(self, channel: paramiko.Channel, command: bytes) -> bool:
+        output = self.outputs.get(command.decode(), self.default)
+
+        def reply() -> None:
+            try:
+                channel.sendall(output)
+                channel.send_exit_status(0)
+                # EOF instead of close: a close could overtake the exec reply
+                channel.shutdown_write()
+            except Exception:
+                pass
+
+        threading.Thread(target=reply, daemon=True).start()
+        return True
+
+
+class BenchSSHServer:
+    """
+    Minimal SSH server on 127.0.0.1 for timing the client side.
+
+    Every exec request gets outputs[command] (or the default) followed by
+    exit status 0.
+    """
+
+    def __init__(self, outputs: Optional[Dict[str, bytes]] = None, default: bytes = b"ok\n"):
+        self.outputs = outputs or {}
+        self.default = default
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.transports: List[paramiko.Transport] = []
+        self.listener: Optional[socket.socket] = None
+
+    @property
+    def port(self) -> int:
+        return self.listener.getsockname()[1]
+
+    def start(self) -> "BenchSSHServer":
+        self.listener = socket.socket()
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(64)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self
+
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(sock)
+            transport.add_server_key(self.host_key)
+            self.transports.append(transport)
+            try:
+                transport.start_server(server=_Server(self.outputs, self.default))
+            except Exception:
+                pass
+            # Drop finished sessions so long runs do not pile up threads
+            self.transports = [t for t in self.transports if t.is_active()]
+
+    def stop(self) -> None:
+        if self.listener is not None:
+            self.listener.close()
+        for transport in self.transports:
+            transport.close()
+
+
+def write_client_key(path: Path) -> None:
+    """Write a fresh RSA client key (unencrypted) to path."""
+    paramiko.RSAKey.generate(2048).write_private_key_file(str(path))
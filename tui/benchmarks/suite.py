@@ -0,0 +1,179 @@
+"""Benchmarks for the SSH, executor, inventory and validation hot paths."""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from .harness import Context, benchmark
+
+
+INVENTORY_SIZES = [10, 1000, 10000]
+LOCATIONS = ["brooklyn", "manhattan", "queens", "forest_hills"]
+
+# Streamed by execute_deployment (about 4 MB)
+STREAM_LINES = 50000
+PARSE_LINES = 10000
+VALIDATION_BATCH = 1000
+
+
+def deployment_lines(count: int) -> List[str]:
+    """Back-to-back synthetic deployments (with apt noise), cut to count lines."""
+    from lib.synthetic import generate_deployment_output
+
+    lines: List[str] = []
+    seed = 0
+    while len(lines) < count:
+        # The task log is already inlined; a UPID would make execute_deployment
+        # poll the benchmark server for it
+        lines.extend(
+            line for line in generate_deployment_output(vmid=200 + seed, apt_lines=400, seed=seed)
+            if not line.startswith("TASK_UPID=")
+        )
+        seed += 1
+    return lines[:count]
+
+
+def inventory_data(nodes: int) -> Dict[str, Any]:
+    from lib.synthetic import generate_inventory
+
+    return generate_inventory(nodes, locations=len(LOCATIONS))
+
+
+def _ssh_setup(context: Context, outputs: Dict[str, bytes]):
+    """Start a benchmark SSH server and an SSHManager pointed at it."""
+    from lib.known_hosts import KnownHostsStore
+    from lib.ssh_manager import SSHManager
+
+    from .sshd import BenchSSHServer, write_client_key
+
+    server = BenchSSHServer(outputs).start()
+    context.cleanup(server.stop)
+
+    key = context.tmp / "id_rsa"
+    write_client_key(key)
+
+    manager = SSHManager(KnownHostsStore(context.tmp / "known_hosts"))
+    context.cleanup(manager.close_all)
+    return server, manager, key
+
+
+@benchmark("ssh.connect")
+def ssh_connect(context: Context) -> Callable[[], Any]:
+    """Full handshake + auth + close (what the pool saves)."""
+    server, manager, key = _ssh_setup(context, {})
+
+    def run() -> None:
+        manager._connect("127.0.0.1", "bench", key, server.port).close()
+
+    return run
+
+
+@benchmark("ssh.exec_pooled")
+def ssh_exec_pooled(context: Context) -> Callable[[], Any]:
+    """One command over the pooled connection."""
+    server, manager, key = _ssh_setup(context, {})
+
+    def run() -> None:
+        stdout, stderr, exit_code = manager.execute_command("127.0.0.1", "bench", "true", key, server.port)
+        assert exit_code == 0, stderr
+
+    return run
+
+
+@benchmark("executor.stream", items="lines", count=STREAM_LINES)
+def executor_stream(context: Context) -> Callable[[], Any]:
+    """execute_deployment reading a multi-MB output stream."""
+    from lib.script_executor import ScriptExecutor
+
+    payload = ("\r\n".join(deployment_lines(STREAM_LINES)) + "\r\n").encode()
+    server, manager, key = _ssh_setup(context, {"deploy": payload})
+    executor = ScriptExecutor(manager)
+
+    # execute_deployment uses the default port; pre-pool the client under it
+    manager.pool[("127.0.0.1", 22, "bench", str(key))] = manager._connect(
+        "127.0.0.1", "bench", key, server.port
+    )
+
+    def run() -> None:
+        count = sum(1 for _ in executor.execute_deployment("deploy", "127.0.0.1", "bench", key))
+        assert count >= STREAM_LINES, count
+
+    return run
+
+
+@benchmark("executor.parse_output", items="lines", count=PARSE_LINES)
+def executor_parse_output(context: Context) -> Callable[[], Any]:
+    from lib.script_executor import ScriptExecutor
+
+    executor = ScriptExecutor()
+    lines = deployment_lines(PARSE_LINES)
+
+    def run() -> None:
+        for line in lines:
+            executor.parse_output(line)
+
+    return run
+
+
+def _write_inventory(context: Context, nodes: int) -> Path:
+    import yaml
+
+    path = context.tmp / "inventory.yml"
+    with open(path, "w") as f:
+        yaml.safe_dump(inventory_data(nodes), f, default_flow_style=False, sort_keys=False, indent=2)
+    return path
+
+
+@benchmark("inventory.load", params=INVENTORY_SIZES, items="nodes", count=lambda nodes: nodes)
+def inventory_load(context: Context, nodes: int) -> Callable[[], Any]:
+    from lib.inventory import InventoryManager
+
+    manager = InventoryManager(_write_inventory(context, nodes))
+    return manager.load_inventory
+
+
+@benchmark("inventory.save", params=INVENTORY_SIZES, items="nodes", count=lambda nodes: nodes)
+def inventory_save(context: Context, nodes: int) -> Callable[[], Any]:
+    from lib.inventory import InventoryManager
+
+    manager = InventoryManager(context.tmp / "inventory.yml")
+    manager.inventory_data = inventory_data(nodes)
+    return manager.save_inventory
+
+
+@benchmark("inventory.list", params=INVENTORY_SIZES, items="nodes", count=lambda nodes: nodes)
+def inventory_list(context: Context, nodes: int) -> Callable[[], Any]:
+    from lib.inventory import InventoryManager
+
+    manager = InventoryManager(context.tmp / "inventory.yml")
+    manager.inventory_data = inventory_data(nodes)
+    return manager.list_nodes
+
+
+@benchmark("validators.batch", items="deployments", count=VALIDATION_BATCH)
+def validators_batch(context: Context) -> Callable[[], Any]:
+    """validate_all_deployment_params over a batch, a tenth of them invalid."""
+    from lib.validators import Validators
+
+    batch = []
+    for index in range(VALIDATION_BATCH):
+        bad = index % 10 == 0
+        batch.append({
+            "name": f"kapnode{index}" if not bad else f"-bad_{index}",
+            "vmid": 200 + index % 800,
+            "ip": f"192.168.86.{index % 250 + 1}" if not bad else "192.168.86.300",
+            "gateway": "192.168.86.1",
+            "dns": "192.168.86.1,8.8.8.8",
+            "cores": 4,
+            "memory": 8,
+            "disk_size": 64,
+            "location": LOCATIONS[index % len(LOCATIONS)],
+            "node_type": "k3s-worker",
+            "tailscale_key": "tskey-auth-" + "k" * 40,
+            "k3s_master": "https://minikapserver:6443",
+        })
+
+    def run() -> None:
+        for params in batch:
+            Validators.validate_all_deployment_params(params)
+
+    return run
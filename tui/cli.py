@@ -0,0 +1,463 @@
+"""
+Kapnode Deployment Manager - Command-line subcommands
+
+Non-interactive counterparts of TUI actions, for scripts and cron jobs.
+Each subcommand is registered by add_commands() and returns an exit code.
+
+Usage:
+    python deploy_node.py build-image [--host HOST] [--force]
+    python deploy_node.py setup-cache --location LOCATION --host HOST
+    python deploy_node.py join-nodes [HOSTNAME ...] [--location LOCATION]
+    python deploy_node.py rolling-update [HOSTNAME ...] [--location LOCATION] [--batch-size N]
+    python deploy_node.py known-hosts {scan,rekey} [HOSTNAME ...] [--location LOCATION]
+    python deploy_node.py collect-info [HOSTNAME ...] [--extra USER@HOST] [--diff] [--export DIR]
+    python deploy_node.py provision-storage [HOSTNAME ...] [--location LOCATION] [--dry-run]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from lib.services import ServiceRegistry
+
+
+def _proxmox_target(services: ServiceRegistry, args: argparse.Namespace):
+    """Resolve the Proxmox host, user and key from arguments or config."""
+    config = services.config
+    host = args.host or config.get_preference("proxmox_host", "kapmox")
+    user = args.user or config.get_preference("proxmox_user", "root")
+    key = Path(args.key or config.get_preference("ssh_key", "~/.ssh/homelab_rsa")).expanduser()
+    return host, user, key
+
+
+def _add_target_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add Proxmox connection options (defaults come from the config file)."""
+    parser.add_argument("--host", help="Proxmox host (default: proxmox_host from config)")
+    parser.add_argument("--user", help="SSH user (default: proxmox_user from config)")
+    parser.add_argument("--key", help="SSH private key (default: ssh_key from config)")
+
+
+def build_image(args: argparse.Namespace) -> int:
+    """Build the golden image and make it the default for new deployments."""
+    from lib.image_builder import ImageBuilder
+
+    services = ServiceRegistry()
+    try:
+        config = services.config
+        host, user, key = _proxmox_target(services, args)
+        builder = ImageBuilder(services.executor)
+
+        for line in builder.build(
+            host,
+            user,
+            key,
+            packages=config.get_preference("golden_image.packages", ""),
+            k3s_version=args.k3s_version or config.get_preference("golden_image.k3s_version", ""),
+            force=args.force,
+        ):
+            print(line)
+
+        if not builder.image_name:
+            print("Error: golden image build failed", file=sys.stderr)
+            return 1
+
+        config.set_preference("golden_image.image", builder.image_name)
+        config.set_preference("golden_image.enabled", True)
+        print(f"Golden image ready: {builder.image_name}")
+        return 0
+
+    finally:
+        services.close()
+
+
+def setup_cache(args: argparse.Namespace) -> int:
+    """Provision a site-local cache proxy and use it for the location's deployments."""
+    from lib.cache_proxy import CacheProxyProvisioner
+
+    services = ServiceRegistry()
+    try:
+        config = services.config
+        location = args.location.lower().replace(" ", "_")
+        if location not in config.get_preference("locations", {}):
+            print(f"Error: unknown location '{args.location}'", file=sys.stderr)
+            return 1
+
+        key = Path(args.key or config.get_preference("ssh_key", "~/.ssh/homelab_rsa")).expanduser()
+        provisioner = CacheProxyProvisioner(services.executor)
+
+        for line in provisioner.provision(
+            args.host,
+            args.user,
+            key,
+            k3s_version=args.k3s_version or "",
+            mirror_port=args.mirror_port,
+        ):
+            print(line)
+
+        if not provisioner.ready:
+            print("Error: cache proxy setup failed", file=sys.stderr)
+            return 1
+
+        config.set_preference(f"locations.{location}.cache_mirror_port", args.mirror_port)
+        config.set_preference(f"locations.{location}.cache_proxy", args.host)
+        print(f"New {location} deployments will use the cache at {args.host}")
+        return 0
+
+    finally:
+        services.close()
+
+
+def _select_nodes(services: ServiceRegistry, args: argparse.Namespace) -> list:
+    """Pick cluster nodes from the inventory by hostname, location and type."""
+    from lib.rolling_update import select_nodes
+
+    return select_nodes(
+        services.inventory.list_nodes(),
+        hostnames=args.hostnames,
+        location=args.location,
+        types=getattr(args, "types", None),
+    )
+
+
+def _orchestrator(services: ServiceRegistry, args: argparse.Namespace, key: Path):
+    """Create a JoinOrchestrator for the master from arguments, inventory or config."""
+    from lib.cluster_join import JoinOrchestrator
+
+    return JoinOrchestrator.from_config(
+        services.config,
+        services.inventory,
+        services.ssh_manager,
+        key=key,
+        master_host=args.master,
+        master_user=args.master_user,
+    )
+
+
+def _add_cluster_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add node selection and k3s master options."""
+    parser.add_argument("hostnames", nargs="*", help="Nodes to process (default: all matching nodes)")
+    parser.add_argument("--location", help="Only nodes at this location")
+    parser.add_argument("--master", help="k3s server to run kubectl on (default: from inventory/config)")
+    parser.add_argument("--master-user", help="SSH user on the master (default: root)")
+    parser.add_argument("--key", help="SSH private key (default: ssh_key from config)")
+
+
+def join_nodes(args: argparse.Namespace) -> int:
+    """Wait for deployed nodes to join k3s, label them, and print a readiness report."""
+    from lib.cluster_join import JoinOrchestrator
+
+    services = ServiceRegistry()
+    try:
+        config = services.config
+        key = Path(args.key or config.get_preference("ssh_key", "~/.ssh/homelab_rsa")).expanduser()
+
+        nodes = _select_nodes(services, args)
+        unknown = set(args.hostnames) - {node["hostname"] for node in nodes}
+        if unknown:
+            print(f"Error: not in inventory: {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 1
+        if not nodes:
+            print("Error: no nodes selected", file=sys.stderr)
+            return 1
+
+        orchestrator = _orchestrator(services, args, key)
+        timeout = args.timeout
+        if timeout is None:
+            timeout = config.get_preference("k3s_join.timeout", 600)
+
+        report = orchestrator.finalize(nodes, timeout=timeout, progress=print)
+
+        print("")
+        for line in JoinOrchestrator.format_report(report):
+            print(line)
+
+        return 0 if all(entry["ready"] and entry["labeled"] for entry in report.values()) else 1
+
+    finally:
+        services.close()
+
+
+def rolling_update(args: argparse.Namespace) -> int:
+    """Upgrade cluster nodes in batches, draining each through the k3s master."""
+    from lib.rolling_update import RollingUpdater
+
+    services = ServiceRegistry()
+    try:
+        config = services.config
+        settings = config.get_preference("rolling_update", {}) or {}
+        key = Path(args.key or config.get_preference("ssh_key", "~/.ssh/homelab_rsa")).expanduser()
+
+        nodes = _select_nodes(services, args)
+        unknown = set(args.hostnames) - {node["hostname"] for node in nodes}
+        if unknown:
+            print(f"Error: not selected or not in inventory: {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 1
+        if not nodes:
+            print("Error: no nodes selected", file=sys.stderr)
+            return 1
+
+        updater = RollingUpdater(
+            _orchestrator(services, args, key),
+            key=key,
+            batch_size=args.batch_size or settings.get("batch_size", 2),
+            max_per_site=args.max_per_site or settings.get("max_per_site", 1),
+            failure_threshold=(
+                args.failure_threshold if args.failure_threshold is not None
+                else settings.get("failure_threshold", 0.25)
+            ),
+            drain_timeout=settings.get("drain_timeout", 300),
+            ready_timeout=settings.get("ready_timeout", 600),
+        )
+        if not updater.updatable(nodes):
+            print(
+                f"Error: no nodes selected besides {updater.orchestrator.master_host}, "
+                "which kubectl runs on",
+                file=sys.stderr,
+            )
+            return 1
+
+        for line in updater.run(nodes):
+            print(line)
+
+        ok = not updater.aborted and all(result["ok"] for result in updater.results.values())
+        return 0 if ok else 1
+
+    finally:
+        services.close()
+
+
+def known_hosts(args: argparse.Namespace) -> int:
+    """Scan inventory hosts and pin their SSH host keys (rekey replaces them)."""
+    services = ServiceRegistry()
+    try:
+        config = services.config
+        store = services.ssh_manager.known_hosts
+
+        nodes = [
+            node for node in services.inventory.list_nodes()
+            if (not args.hostnames or node["hostname"] in args.hostnames)
+            and (not args.location or str(node.get("location", "")).lower() == args.location.lower())
+        ]
+        targets = store.inventory_targets(nodes)
+
+        # The Proxmox host from the config may not be in the inventory
+        proxmox_host = config.get_preference("proxmox_host", "")
+        known = {address for address, names in targets} | {name for _, names in targets for name in names}
+        if proxmox_host and proxmox_host not in known and not args.location:
+            if not args.hostnames or proxmox_host in args.hostnames:
+                targets.append((proxmox_host, []))
+
+        unknown = set(args.hostnames) - {node["hostname"] for node in nodes} - {proxmox_host}
+        if unknown:
+            print(f"Error: not in inventory: {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 1
+        if args.action == "rekey" and not (args.hostnames or args.location):
+            print("Error: rekey needs hostnames or --location", file=sys.stderr)
+            return 1
+
+        results = store.scan(targets, timeout=args.timeout, replace=args.action == "rekey")
+
+        width = max((len(address) for address in results), default=0)
+        for address in sorted(results):
+            print(f"{address:<{width}}  {results[address]}")
+
+        failed = [result for result in results.values() if result.startswith(("ERROR", "MISMATCH"))]
+        print(f"{len(results) - len(failed)}/{len(results)} host keys pinned in {store.path}")
+        return 1 if failed else 0
+
+    finally:
+        services.close()
+
+
+def collect_info(args: argparse.Namespace) -> int:
+    """Snapshot system information of all hosts in parallel (one SSH probe each)."""
+    from lib.system_info import (
+        SECTIONS, SnapshotStore, SystemInfoCollector, diff_snapshots, parse_host_argument, write_snapshot,
+    )
+
+    services = ServiceRegistry()
+    try:
+        unknown_sections = set(args.sections or []) - set(SECTIONS)
+        if unknown_sections:
+            print(f"Error: unknown sections: {', '.join(sorted(unknown_sections))}", file=sys.stderr)
+            print(f"Available: {', '.join(SECTIONS)}", file=sys.stderr)
+            return 1
+
+        targets = [
+            target for target in services.preflight.get_targets()
+            if (not args.hostnames or target["name"] in args.hostnames)
+            and (not args.location or target["location"].lower() == args.location.lower())
+        ]
+        unknown = set(args.hostnames) - {target["name"] for target in targets}
+        if unknown and not args.location:
+            print(f"Error: not in inventory: {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 1
+        for value in args.extra:
+            target = parse_host_argument(value)
+            target["key"] = services.preflight.default_key
+            targets.append(target)
+        if not targets:
+            print("Error: no hosts selected", file=sys.stderr)
+            return 1
+
+        store = SnapshotStore(Path(args.snapshot_dir).expanduser() if args.snapshot_dir else None)
+        previous = {target["name"]: store.latest(target["name"]) for target in targets} if args.diff else {}
+        collector = SystemInfoCollector(services.ssh_manager, store, max_workers=args.max_workers)
+
+        def on_result(snapshot):
+            if snapshot["error"]:
+                print(f"{snapshot['host']}: ERROR {snapshot['error']}")
+            else:
+                changed = ", ".join(snapshot["changed"]) or "no changes"
+                print(f"{snapshot['host']}: {snapshot['duration']:.1f}s ({changed})")
+
+        snapshots = collector.collect_all(targets, args.sections, incremental=not args.full, on_result=on_result)
+
+        for name, snapshot in sorted(snapshots.items()):
+            if args.diff and previous.get(name) and not snapshot["error"]:
+                for path, old, new in diff_snapshots(previous[name], snapshot):
+                    print(f"  {name} {path}: {old!r} -> {new!r}")
+            if args.export and not snapshot["error"]:
+                exported = {key: value for key, value in snapshot.items() if key not in ("path", "changed", "duration")}
+                write_snapshot(Path(args.export) / f"{name}.json", exported)
+
+        failed = [snapshot for snapshot in snapshots.values() if snapshot["error"]]
+        print(f"{len(snapshots) - len(failed)}/{len(snapshots)} hosts collected into {store.directory}")
+        return 1 if failed else 0
+
+    finally:
+        services.close()
+
+
+def provision_storage(args: argparse.Namespace) -> int:
+    """Partition, format and mount Longhorn/backup disks on nodes in parallel."""
+    from lib.storage import StorageProvisioner
+
+    services = ServiceRegistry()
+    try:
+        nodes = _select_nodes(services, args)
+        unknown = set(args.hostnames) - {node["hostname"] for node in nodes}
+        if unknown:
+            print(f"Error: not in inventory: {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 1
+        if not nodes:
+            print("Error: no nodes selected", file=sys.stderr)
+            return 1
+
+        roles = None
+        if args.longhorn or args.backup:
+            roles = [role for role, wanted in (("longhorn", args.longhorn), ("backup", args.backup)) if wanted]
+
+        key = Path(args.key or services.config.get_preference("ssh_key", "~/.ssh/homelab_rsa")).expanduser()
+        provisioner = StorageProvisioner(services.ssh_manager, key=key, max_workers=args.max_workers)
+        for line in provisioner.run(nodes, roles, dry_run=args.dry_run):
+            print(line)
+
+        return 0 if all(result["ok"] for result in provisioner.results.values()) else 1
+
+    finally:
+        services.close()
+
+
+def add_commands(subparsers) -> None:
+    """
+    Register all subcommands.
+
+    Args:
+        subparsers: Result of ArgumentParser.add_subparsers()
+    """
+    parser = subparsers.add_parser(
+        "build-image",
+        help="Build the golden VM image on the Proxmox host",
+    )
+    _add_target_arguments(parser)
+    parser.add_argument("--k3s-version", help="K3s release to bake in (default: latest stable)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if up to date")
+    parser.set_defaults(func=build_image)
+
+    parser = subparsers.add_parser(
+        "setup-cache",
+        help="Provision a site-local APT/k3s cache proxy for a location",
+    )
+    parser.add_argument("--location", required=True, help="Location served by the cache")
+    parser.add_argument("--host", required=True, help="Host at that location to run the cache")
+    parser.add_argument("--user", default="ubuntu", help="SSH user (default: ubuntu, uses sudo)")
+    parser.add_argument("--key", help="SSH private key (default: ssh_key from config)")
+    parser.add_argument("--k3s-version", help="K3s release to mirror (default: latest stable)")
+    parser.add_argument("--mirror-port", type=int, default=8080, help="k3s mirror HTTP port")
+    parser.set_defaults(func=setup_cache)
+
+    parser = subparsers.add_parser(
+        "join-nodes",
+        help="Wait for deployed nodes to join k3s, then label and taint them from the master",
+    )
+    _add_cluster_arguments(parser)
+    parser.add_argument("--timeout", type=float, help="Seconds to wait for nodes to become Ready")
+    parser.set_defaults(func=join_nodes)
+
+    parser = subparsers.add_parser(
+        "rolling-update",
+        help="Upgrade nodes in batches with k3s drain, reboot and readiness checks",
+    )
+    _add_cluster_arguments(parser)
+    parser.add_argument(
+        "--type", dest="types", action="append",
+        choices=["k3s-worker", "backup", "k3s-master"],
+        help="Node types to update (repeatable, default: k3s-worker and backup)",
+    )
+    parser.add_argument("--batch-size", type=int, help="Nodes updated in parallel (default: 2)")
+    parser.add_argument("--max-per-site", type=int, help="Nodes per location down at once (default: 1)")
+    parser.add_argument(
+        "--failure-threshold", type=float,
+        help="Abort when this fraction of processed nodes failed (default: 0.25)",
+    )
+    parser.set_defaults(func=rolling_update)
+
+    parser = subparsers.add_parser(
+        "known-hosts",
+        help="Pin SSH host keys of inventory hosts (scan) or replace them after reprovisioning (rekey)",
+    )
+    parser.add_argument("action", choices=["scan", "rekey"], help="scan: pin new hosts, rekey: replace keys")
+    parser.add_argument("hostnames", nargs="*", help="Hosts to process (default: whole inventory)")
+    parser.add_argument("--location", help="Only hosts at this location")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Per-host timeout in seconds")
+    parser.set_defaults(func=known_hosts)
+
+    parser = subparsers.add_parser(
+        "collect-info",
+        help="Snapshot system information (hardware, network, services, containers) of all hosts",
+    )
+    parser.add_argument("hostnames", nargs="*", help="Inventory hosts to collect (default: all)")
+    parser.add_argument("--location", help="Only hosts at this location")
+    parser.add_argument(
+        "--extra", action="append", default=[], metavar="USER@HOST",
+        help="Also collect a host outside the inventory (repeatable)",
+    )
+    parser.add_argument(
+        "--section", dest="sections", action="append",
+        help="Only refresh these sections (repeatable, default: all)",
+    )
+    parser.add_argument("--full", action="store_true", help="Re-send every section, not only changed ones")
+    parser.add_argument("--diff", action="store_true", help="Print what changed since the previous snapshot")
+    parser.add_argument("--export", metavar="DIR", help="Also write <host>.json to DIR (e.g. docs/system-info)")
+    parser.add_argument("--snapshot-dir", help="Snapshot directory (default: ~/.homelab/system-info)")
+    parser.add_argument("--max-workers", type=int, default=16, help="Hosts probed at once")
+    parser.set_defaults(func=collect_info)
+
+    parser = subparsers.add_parser(
+        "provision-storage",
+        help="Set up Longhorn and backup disks on nodes in parallel (post-install-storage.sh)",
+    )
+    parser.add_argument("hostnames", nargs="*", help="Nodes to provision (default: all matching nodes)")
+    parser.add_argument("--location", help="Only nodes at this location")
+    parser.add_argument("--key", help="SSH private key (default: ssh_key from config)")
+    parser.add_argument(
+        "--type", dest="types", action="append",
+        choices=["k3s-worker", "backup", "k3s-master"],
+        help="Node types to provision (repeatable, default: k3s-worker and backup)",
+    )
+    parser.add_argument("--longhorn", action="store_true", help="Set up Longhorn on every selected node")
+    parser.add_argument("--backup", action="store_true", help="Set up backup storage on every selected node")
+    parser.add_argument("--dry-run", action="store_true", help="Only show which disks would be used")
+    parser.add_argument("--max-workers", type=int, default=8, help="Nodes provisioned at once")
+    parser.set_defaults(func=provision_storage)
@@ -5,4 +5,5 @@ __all__ = [
     "node_selector",
     "log_viewer",
     "progress",
+    "confirm_dialog",
 ]
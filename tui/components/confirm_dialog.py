@@ -0,0 +1,93 @@
+"""Confirm Dialog - Ask before running an action on many nodes."""
+
+from typing import List
+from textual.app import ComposeResult
+from textual.containers import Container, Horizontal, VerticalScroll
+from textual.screen import ModalScreen
+from textual.widgets import Button, Static
+from textual import on
+
+
+class ConfirmScreen(ModalScreen[bool]):
+    """Modal dialog listing what an action will do; dismissed with True to proceed."""
+
+    BINDINGS = [
+        ("escape", "cancel", "Cancel"),
+    ]
+
+    CSS = """
+    ConfirmScreen {
+        align: center middle;
+    }
+
+    #confirm-dialog {
+        width: 80%;
+        max-width: 100;
+        height: auto;
+        max-height: 80%;
+        border: thick $warning;
+        background: $surface;
+        padding: 1 2;
+    }
+
+    #confirm-title {
+        text-style: bold;
+        color: $accent;
+        margin-bottom: 1;
+    }
+
+    #confirm-details {
+        height: auto;
+        max-height: 20;
+        border: solid $primary;
+        padding: 0 1;
+    }
+
+    #confirm-buttons {
+        height: 5;
+        align: center middle;
+        margin-top: 1;
+    }
+
+    #confirm-buttons Button {
+        margin: 0 2;
+    }
+    """
+
+    def __init__(self, title: str, lines: List[str], confirm_label: str = "Proceed"):
+        """
+        Initialize confirm dialog.
+
+        Args:
+            title: Question shown above the details
+            lines: Details of the action (e.g. batches or planned disks)
+            confirm_label: Label of the confirm button
+        """
+        super().__init__()
+        self.title = title
+        self.lines = lines
+        self.confirm_label = confirm_label
+
+    def compose(self) -> ComposeResult:
+        """Create child widgets for the dialog."""
+        with Container(id="confirm-dialog"):
+            yield Static(self.title, id="confirm-title")
+            with VerticalScroll(id="confirm-details"):
+                yield Static("\n".join(self.lines), markup=False)
+            with Horizontal(id="confirm-buttons"):
+                yield Button(self.confirm_label, id="btn-confirm", variant="warning")
+                yield Button("Cancel", id="btn-cancel", variant="primary")
+
+    def on_mount(self) -> None:
+        """Focus Cancel so Enter does not start the action by accident."""
+        self.query_one("#btn-cancel", Button).focus()
+
+    @on(Button.Pressed, "#btn-confirm")
+    def confirm(self) -> None:
+        """Proceed with the action."""
+        self.dismiss(True)
+
+    @on(Button.Pressed, "#btn-cancel")
+    def action_cancel(self) -> None:
+        """Close without running the action."""
+        self.dismiss(False)
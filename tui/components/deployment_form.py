@@ -7,8 +7,8 @@ from textual.widget import Widget
 from textual import on
 from rich.text import Text
 
-from ..lib.validators import Validators
-from ..lib.config_manager import ConfigManager
+from lib.validators import Validators
+from lib.config_manager import ConfigManager
 
 
 class DeploymentForm(Widget):
@@ -66,8 +66,7 @@ class DeploymentForm(Widget):
 
     def __init__(self, config: ConfigManager = None):
         super().__init__()
-        self.config = config or ConfigManager()
-        self.config.load_config()
+        self.config = config or self.app.services.config
         self.validators = Validators()
         self.validation_errors = {}
 
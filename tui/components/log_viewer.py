@@ -1,17 +1,19 @@
 """Log Viewer - Real-time deployment log display."""
 
+import time
 from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 from textual.app import ComposeResult
-from textual.containers import Container, VerticalScroll
+from textual.containers import Container, Horizontal, VerticalScroll
 from textual.screen import Screen
 from textual.widgets import Header, Footer, Button, Static, RichLog
 from textual import on, work
 from rich.text import Text
 
-from ..lib.script_executor import ScriptExecutor
-from ..lib.ssh_manager import SSHManager
-from ..lib.inventory import InventoryManager
-from ..lib.config_manager import ConfigManager
+from lib.metrics import metrics
+from lib.profiler import profiler
+from lib.tracing import tracer
+from .progress import DeploymentProgress
 
 
 class LogViewerScreen(Screen):
@@ -37,6 +39,17 @@ class LogViewerScreen(Screen):
         height: 100%;
     }
 
+    #replay-container {
+        height: 1fr;
+    }
+
+    #replay-container DeploymentProgress {
+        width: 40;
+        height: 100%;
+        overflow-y: auto;
+        margin: 1 0 1 2;
+    }
+
     #status-bar {
         height: 3;
         background: $surface;
@@ -56,27 +69,47 @@ class LogViewerScreen(Screen):
     }
     """
 
-    def __init__(self, deployment_params: dict, parent_screen):
+    def __init__(
+        self,
+        deployment_params: dict,
+        parent_screen,
+        replay: Optional[Path] = None,
+        speed: Optional[float] = 1.0,
+    ):
+        """
+        Initialize log viewer.
+
+        Args:
+            deployment_params: Parameters of the deployment to run
+            parent_screen: Screen that opened the viewer
+            replay: Recorded session to play back instead of deploying
+            speed: Replay speed (1.0 = original timing, None or 0 = as fast as possible)
+        """
         super().__init__()
         self.params = deployment_params
         self.parent_screen = parent_screen
-        self.executor = ScriptExecutor()
-        self.ssh_manager = SSHManager()
-        self.inventory = InventoryManager()
-        self.config = ConfigManager()
-
-        self.inventory.load_inventory()
-        self.config.load_config()
+        self.executor = self.app.services.executor
+        self.inventory = self.app.services.inventory
+        self.config = self.app.services.config
+        self.replay = replay
+        self.speed = speed
 
         self.deployment_success = False
         self.log_lines = []
+        self.replay_stopped = False
 
     def compose(self) -> ComposeResult:
         """Create child widgets for log viewer."""
         yield Header()
 
-        with Container(id="log-container"):
-            yield RichLog(id="log-display", wrap=True, highlight=True, markup=True)
+        if self.replay is not None:
+            with Horizontal(id="replay-container"):
+                yield DeploymentProgress(self.replay.name)
+                with Container(id="log-container"):
+                    yield RichLog(id="log-display", wrap=True, highlight=True, markup=True)
+        else:
+            with Container(id="log-container"):
+                yield RichLog(id="log-display", wrap=True, highlight=True, markup=True)
 
         yield Static("Preparing deployment...", id="status-bar")
 
@@ -106,9 +139,77 @@ class LogViewerScreen(Screen):
             self.query_one(button_id, Button).disabled = False
         self.app.call_from_thread(enable)
 
-    @work
-    async def on_mount(self) -> None:
-        """Start deployment when screen mounts (thread-safe)."""
+    def _show_output(self, line: str, parsed: Dict[str, Any], stage: Optional[str]) -> Optional[str]:
+        """
+        Write one output line and update the status bar (worker thread).
+
+        Returns:
+            The active stage after this line
+        """
+        # Color code based on type
+        if parsed["type"] == "error":
+            self._safe_write_log(f"[bold red]{line}[/bold red]")
+        elif parsed["type"] == "warning":
+            self._safe_write_log(f"[yellow]{line}[/yellow]")
+        elif parsed["type"] == "success":
+            self._safe_write_log(f"[green]{line}[/green]")
+        else:
+            self._safe_write_log(line)
+
+        # Update status bar with stage info
+        if parsed["stage"]:
+            stage = parsed["stage"]
+            self._safe_update_status(f"Stage: {stage}")
+        elif parsed["bytes_total"]:
+            # Transfer progress from a followed Proxmox task
+            self._safe_update_status(
+                f"Stage: {stage or 'Transferring'} - {parsed['progress']}% "
+                f"({parsed['bytes_done'] / 1024 ** 3:.1f}/{parsed['bytes_total'] / 1024 ** 3:.1f} GiB)"
+            )
+
+        return stage
+
+    def _start_recording(self):
+        """Open a session recorder for this deployment, if recording is enabled."""
+        if not self.config.get_preference("record_sessions", True):
+            return None
+
+        from lib.session_recorder import SessionRecorder
+
+        try:
+            recorder = SessionRecorder.for_deployment(self.params)
+        except OSError as e:
+            self._safe_write_log(f"[yellow]Warning: Not recording session: {e}[/yellow]")
+            return None
+
+        self._safe_write_log(f"Recording session to {recorder.path}")
+        return recorder
+
+    @work(thread=True, exclusive=True, group="deployment")
+    @profiler.profiled("LogViewerScreen.on_mount")
+    def on_mount(self) -> None:
+        """Start deployment when screen mounts (runs in a worker thread)."""
+        if self.replay is not None:
+            self._replay_session()
+            return
+
+        location = self.params.get("location", "")
+        metrics.deployments_started.inc(location=location)
+        started = time.monotonic()
+
+        with tracer.span("deploy", host=self.params.get("name"), vmid=self.params.get("vmid")) as span:
+            self._run_deployment()
+            span.tag(success=self.deployment_success)
+
+        metrics.deployment_seconds.observe(time.monotonic() - started, location=location)
+        if self.deployment_success:
+            metrics.deployments_succeeded.inc(location=location)
+        else:
+            metrics.deployments_failed.inc(location=location)
+        metrics.flush()
+
+    def _run_deployment(self) -> None:
+        """Copy the script, upload cloud-init and stream the deployment (worker thread)."""
         # Log deployment parameters
         self._safe_write_log("=== Kapnode Deployment Starting ===")
         self._safe_write_log(f"Hostname: {self.params['name']}")
@@ -118,6 +219,8 @@ class LogViewerScreen(Screen):
         self._safe_write_log("=" * 40)
         self._safe_write_log("")
 
+        self._forget_host_keys()
+
         # Step 1: Copy script to Proxmox host
         self._safe_update_status("Step 1/3: Copying deployment script...")
         self._safe_write_log("[yellow]Copying deployment script to Proxmox host...[/yellow]")
@@ -125,12 +228,13 @@ class LogViewerScreen(Screen):
         script_path = Path(__file__).parent.parent.parent / "scripts" / "deploy-ubuntu-vm.sh"
         ssh_key = Path(self.params['ssh_key_path']).expanduser()
 
-        success = self.executor.copy_script_to_host(
-            script=script_path,
-            host=self.params['proxmox_host'],
-            user=self.params['proxmox_user'],
-            key=ssh_key
-        )
+        with tracer.span("deploy.copy_script", host=self.params['proxmox_host']):
+            success = self.executor.copy_script_to_host(
+                script=script_path,
+                host=self.params['proxmox_host'],
+                user=self.params['proxmox_user'],
+                key=ssh_key
+            )
 
         if not success:
             self._safe_write_log("[bold red]✗ Failed to copy script to Proxmox host[/bold red]")
@@ -141,10 +245,32 @@ class LogViewerScreen(Screen):
         self._safe_write_log("[green]✓ Script copied successfully[/green]")
         self._safe_write_log("")
 
-        # Step 2: Prepare command
-        self._safe_update_status("Step 2/3: Preparing deployment command...")
-        self._safe_write_log("[yellow]Building deployment command...[/yellow]")
+        # Step 2: Render cloud-init locally and upload the snippets
+        self._safe_update_status("Step 2/3: Uploading cloud-init snippets...")
+        self._safe_write_log("[yellow]Rendering cloud-init snippets...[/yellow]")
+
+        from lib.cloud_init import CloudInitRenderer
 
+        with tracer.span("deploy.cloud_init", host=self.params['proxmox_host']):
+            uploaded, errors = CloudInitRenderer().upload_batch(
+                [self.params],
+                self.executor.ssh_manager,
+                host=self.params['proxmox_host'],
+                user=self.params['proxmox_user'],
+                key=ssh_key
+            )
+
+        if not uploaded:
+            for error in errors:
+                self._safe_write_log(f"[bold red]✗ {error}[/bold red]")
+            self._safe_update_status("Deployment failed: Invalid or failed cloud-init upload")
+            self._safe_enable_button("#btn-close")
+            return
+
+        self._safe_write_log("[green]✓ Cloud-init snippets uploaded[/green]")
+        self.params["snippets_uploaded"] = True
+
+        self._safe_write_log("[yellow]Building deployment command...[/yellow]")
         command = self.executor.prepare_deployment(self.params)
         self._safe_write_log(f"Command: {command[:100]}...")
         self._safe_write_log("")
@@ -154,6 +280,8 @@ class LogViewerScreen(Screen):
         self._safe_write_log("[yellow]Starting VM deployment...[/yellow]")
         self._safe_write_log("")
 
+        recorder = self._start_recording()
+
         try:
             output_iterator = self.executor.execute_deployment(
                 command=command,
@@ -162,26 +290,44 @@ class LogViewerScreen(Screen):
                 key=ssh_key
             )
 
+            stage = None
+            # One span per stage, tagged with where the local time went
+            stage_span = None
+            lines = parse_time = ui_time = 0
+
             for line in output_iterator:
+                if stage_span is None:
+                    stage_span = tracer.span("deploy.stage", stage=stage or "Starting")
+                    stage_started = time.monotonic()
+
                 # Parse output
+                started = time.perf_counter()
                 parsed = self.executor.parse_output(line)
+                parsed_at = time.perf_counter()
 
                 # Store log line
                 self.log_lines.append(line)
 
-                # Color code based on type
-                if parsed["type"] == "error":
-                    self._safe_write_log(f"[bold red]{line}[/bold red]")
-                elif parsed["type"] == "warning":
-                    self._safe_write_log(f"[yellow]{line}[/yellow]")
-                elif parsed["type"] == "success":
-                    self._safe_write_log(f"[green]{line}[/green]")
-                else:
-                    self._safe_write_log(line)
+                previous = stage
+                stage = self._show_output(line, parsed, stage)
+                lines += 1
+                parse_time += parsed_at - started
+                ui_time += time.perf_counter() - parsed_at
+
+                if recorder:
+                    source = "stderr" if line.startswith("STDERR: ") else "stdout"
+                    recorder.record(line, source, stage)
+
+                if stage != previous:
+                    stage_span.tag(lines=lines, parse_ms=parse_time * 1000, ui_ms=ui_time * 1000).finish()
+                    metrics.stage_seconds.observe(time.monotonic() - stage_started, stage=previous or "Starting")
+                    stage_span = tracer.span("deploy.stage", stage=stage)
+                    stage_started = time.monotonic()
+                    lines = parse_time = ui_time = 0
 
-                # Update status bar with stage info
-                if parsed["stage"]:
-                    self._safe_update_status(f"Stage: {parsed['stage']}")
+            if stage_span is not None:
+                stage_span.tag(lines=lines, parse_ms=parse_time * 1000, ui_ms=ui_time * 1000).finish()
+                metrics.stage_seconds.observe(time.monotonic() - stage_started, stage=stage or "Starting")
 
             # Deployment completed
             if "error" not in "\n".join(self.log_lines).lower():
@@ -203,10 +349,85 @@ class LogViewerScreen(Screen):
             self._safe_write_log(f"[bold red]✗ Deployment error: {str(e)}[/bold red]")
             self._safe_update_status(f"Error: {str(e)}")
 
+        finally:
+            if recorder:
+                recorder.close()
+
         # Enable buttons (thread-safe)
         self._safe_enable_button("#btn-save")
         self._safe_enable_button("#btn-close")
 
+    def _replay_session(self) -> None:
+        """Play back a recorded session through the normal output path (worker thread)."""
+        from lib.session_recorder import load_session, replay_session
+
+        try:
+            header, records = load_session(self.replay)
+        except (OSError, ValueError) as e:
+            self._safe_write_log(f"[bold red]✗ Could not load session: {e}[/bold red]")
+            self._safe_update_status("Replay failed")
+            self._safe_enable_button("#btn-close")
+            return
+
+        self.params = header.get("meta", {})
+        speed = f"{self.speed:g}x" if self.speed else "max speed"
+        self._safe_write_log(
+            f"=== Replaying {self.replay.name}: {len(records)} lines recorded "
+            f"{header.get('started', '?')} ({speed}) ==="
+        )
+        self._safe_write_log("")
+
+        progress = self.query_one(DeploymentProgress)
+        stage = None
+        started = time.monotonic()
+
+        for record in replay_session(records, self.speed):
+            if self.replay_stopped:
+                break
+
+            line = str(record.get("line", ""))
+            self.log_lines.append(line)
+            parsed = self.executor.parse_output(line)
+
+            previous = stage
+            stage = self._show_output(line, parsed, stage)
+            if stage != previous:
+                self.app.call_from_thread(progress.set_stage_name, stage)
+
+        elapsed = time.monotonic() - started
+        state = "stopped" if self.replay_stopped else "finished"
+        self._safe_update_status(
+            f"Replay {state}: {len(self.log_lines)} lines in {elapsed:.1f}s "
+            f"({len(self.log_lines) / max(elapsed, 1e-6):.0f} lines/s)"
+        )
+        self._safe_enable_button("#btn-save")
+        self._safe_enable_button("#btn-close")
+
+    @on(Button.Pressed, "#cancel-button")
+    def stop_replay(self) -> None:
+        """Stop a running replay (the progress panel's cancel button)."""
+        self.replay_stopped = True
+
+    def _forget_host_keys(self) -> None:
+        """
+        Drop pinned host keys for the node being deployed (worker thread).
+
+        A redeployed VM gets new host keys under the same name and addresses,
+        so old pins would make every later connection fail verification.
+        """
+        names = {self.params.get("name"), self.params.get("ip"), self.params.get("tailscale_name")}
+        existing = self.inventory.get_node(self.params["name"]) or {}
+        names.update(existing.get(field) for field in ("ansible_host", "initial_ip", "tailscale_name"))
+
+        try:
+            removed = self.executor.ssh_manager.known_hosts.remove(sorted(str(name) for name in names if name))
+        except Exception as e:
+            self._safe_write_log(f"[yellow]Could not clear old host keys: {e}[/yellow]")
+            return
+
+        if removed:
+            self._safe_write_log(f"[dim]Removed {removed} old host key(s) for {self.params['name']}[/dim]")
+
     def _add_to_inventory(self) -> None:
         """Add deployed node to inventory."""
         try:
@@ -222,6 +443,7 @@ class LogViewerScreen(Screen):
                     'ram_gb': self.params.get('memory', 16),
                     'disk_gb': self.params.get('disk_size', 200),
                     'longhorn_gb': self.params.get('longhorn_size', 0),
+                    'backup_gb': self.params.get('backup_size', 0),
                 }
             )
 
@@ -239,6 +461,12 @@ class LogViewerScreen(Screen):
 
             self._safe_write_log("[green]✓ Node added to inventory[/green]")
 
+            if self.params.get("k3s_master"):
+                self._safe_write_log(
+                    f"Once the VM has booted, run 'python deploy_node.py join-nodes {self.params['name']}' "
+                    "to verify the join and apply location labels"
+                )
+
         except Exception as e:
             self._safe_write_log(f"[yellow]Warning: Failed to add to inventory: {str(e)}[/yellow]")
 
@@ -267,3 +495,98 @@ class LogViewerScreen(Screen):
     def action_cancel(self) -> None:
         """Close the log viewer."""
         self.app.pop_screen()
+
+
+class TaskLogScreen(Screen):
+    """Screen streaming the output of a long-running remote task."""
+
+    BINDINGS = [
+        ("escape", "close", "Close"),
+        ("s", "save", "Save Log"),
+    ]
+
+    CSS = LogViewerScreen.CSS.replace("LogViewerScreen", "TaskLogScreen")
+
+    def __init__(
+        self,
+        title: str,
+        task: Callable[[], Iterator[str]],
+        on_complete: Optional[Callable[[], Tuple[bool, str]]] = None,
+    ):
+        """
+        Initialize task log screen.
+
+        Args:
+            title: Task name shown in the log and status bar
+            task: Callable returning an iterator of output lines (run in a thread)
+            on_complete: Called in the worker thread after the task finishes;
+                returns (success, status message)
+        """
+        super().__init__()
+        self.title = title
+        self.task_lines = task
+        self.on_complete = on_complete
+        self.log_lines = []
+
+    def compose(self) -> ComposeResult:
+        """Create child widgets for task log."""
+        yield Header()
+
+        with Container(id="log-container"):
+            yield RichLog(id="log-display", wrap=True, highlight=True, markup=False)
+
+        yield Static(f"{self.title}...", id="status-bar")
+
+        with Container(id="button-container"):
+            yield Button("Save Log", id="btn-save", disabled=True)
+            yield Button("Close", id="btn-close", variant="error", disabled=True)
+
+        yield Footer()
+
+    def _finish(self, success: bool, message: str) -> None:
+        """Show the final status and enable the buttons (UI thread)."""
+        style = "bold green" if success else "bold red"
+        self.query_one("#status-bar", Static).update(Text(message, style=style))
+        self.query_one("#btn-save", Button).disabled = False
+        self.query_one("#btn-close", Button).disabled = False
+
+    @work(thread=True, exclusive=True, group="task")
+    @profiler.profiled("TaskLogScreen.on_mount")
+    def on_mount(self) -> None:
+        """Run the task when the screen mounts (runs in a worker thread)."""
+        log = self.query_one("#log-display", RichLog)
+
+        try:
+            for line in self.task_lines():
+                self.log_lines.append(line)
+                self.app.call_from_thread(log.write, line)
+
+            success, message = True, f"{self.title} finished"
+            if self.on_complete:
+                success, message = self.on_complete()
+
+        except Exception as e:
+            success, message = False, f"{self.title} failed: {e}"
+
+        self.app.call_from_thread(self._finish, success, message)
+
+    @on(Button.Pressed, "#btn-save")
+    def action_save(self) -> None:
+        """Save log to file."""
+        from datetime import datetime
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        slug = self.title.lower().replace(" ", "_")
+        log_path = Path.home() / f"kapnode_{slug}_{timestamp}.log"
+
+        try:
+            log_path.write_text("\n".join(self.log_lines))
+            self.query_one("#status-bar", Static).update(f"✓ Log saved to {log_path}")
+        except Exception as e:
+            self.query_one("#status-bar", Static).update(f"Error saving log: {str(e)}")
+
+    @on(Button.Pressed, "#btn-close")
+    def action_close(self) -> None:
+        """Close the task log once the task has finished."""
+        if not self.query_one("#btn-close", Button).disabled:
+            self.app.pop_screen()
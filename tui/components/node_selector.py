@@ -7,7 +7,8 @@ from textual.widget import Widget
 from textual import on
 from rich.text import Text
 
-from ..lib.inventory import InventoryManager
+from lib.services import INVENTORY_CHANGED
+from lib.table_filter import TableFilter, FILTER_DEBOUNCE
 
 
 class NodeSelector(Widget):
@@ -64,10 +65,13 @@ class NodeSelector(Widget):
         self.title = title
         self.filter_location = filter_location
         self.filter_type = filter_type
-        self.inventory = InventoryManager()
-        self.inventory.load_inventory()
+        self.inventory = self.app.services.inventory
         self.selected_node = None
 
+        self.row_filter = TableFilter()
+        self.search_timer = None
+        self.row_cells = {}
+
     def compose(self) -> ComposeResult:
         """Create child widgets."""
         yield Static(self.title, id="selector-title")
@@ -86,52 +90,125 @@ class NodeSelector(Widget):
         table = self.query_one("#selector-table", DataTable)
 
         # Add columns
-        table.add_columns("Hostname", "Location", "IP", "Type", "Status")
+        columns = table.add_columns("Hostname", "Location", "IP", "Type", "Status")
+        self.column_keys = columns
+        self.hostname_column = columns[0]
 
         # Load nodes
-        self._refresh_table()
+        self._load_rows()
+        self._apply_search()
+
+        self.app.services.subscribe(INVENTORY_CHANGED, self._on_inventory_changed)
+
+    def on_unmount(self) -> None:
+        """Stop listening for inventory changes."""
+        self.app.services.unsubscribe(INVENTORY_CHANGED, self._on_inventory_changed)
 
-    def _refresh_table(self, search_text: str = "") -> None:
-        """Refresh the nodes table."""
+    def _on_inventory_changed(self, payload=None) -> None:
+        """Patch the rows affected by an inventory change."""
         table = self.query_one("#selector-table", DataTable)
-        table.clear()
 
+        if not payload:
+            # No diff available, so rebuild the table from scratch
+            table.clear()
+            self.row_filter.reset()
+            self._load_rows()
+            self._apply_search()
+            return
+
+        gone = list(payload["removed"])
+        updated = []
+        for hostname in payload["added"] + payload["changed"]:
+            node = self.inventory.get_node(hostname)
+            if node is None or not self._included(node):
+                gone.append(hostname)
+                continue
+            self.row_cells[hostname] = self._build_cells(node)
+            updated.append((hostname, hostname, {}))
+
+        for hostname in gone:
+            self.row_cells.pop(hostname, None)
+
+        visible_before = set(self.row_filter.visible)
+        added, removed = self.row_filter.update(updated, gone)
+
+        for hostname in removed:
+            table.remove_row(hostname)
+
+        for hostname in payload["changed"]:
+            if hostname in visible_before and hostname in self.row_filter.visible:
+                for column, value in zip(self.column_keys, self.row_cells[hostname]):
+                    table.update_cell(hostname, column, value)
+
+        for hostname in added:
+            table.add_row(*self.row_cells[hostname], key=hostname)
+
+        if added:
+            table.sort(self.hostname_column, key=self.row_filter.position)
+
+        info_widget = self.query_one("#selector-info", Static)
+        info_widget.update(f"Found {len(self.row_filter.visible)} nodes")
+
+    def _included(self, node: dict) -> bool:
+        """Check a node against the selector's location and type filters."""
+        if self.filter_location and node.get("location") != self.filter_location:
+            return False
+        if self.filter_type and node.get("node_type") != self.filter_type:
+            return False
+        return True
+
+    def _build_cells(self, node: dict) -> tuple:
+        """Build the table cells for one node."""
+        tailscale_name = node.get("tailscale_name", "N/A")
+        status = "🟢 Online" if tailscale_name != "N/A" else "⚪ Unknown"
+
+        return (
+            node.get("hostname", ""),
+            node.get("location", ""),
+            node.get("ansible_host", ""),
+            node.get("node_type", ""),
+            status,
+        )
+
+    def _load_rows(self) -> None:
+        """Build the row cache and search index from the inventory."""
         # Get nodes with filters
         nodes = self.inventory.list_nodes(
             location=self.filter_location,
             node_type=self.filter_type
         )
 
-        # Apply search filter
-        if search_text:
-            nodes = [
-                n for n in nodes
-                if search_text.lower() in n.get("hostname", "").lower()
-            ]
-
-        # Populate table
-        for node in nodes:
-            hostname = node.get("hostname", "")
-            tailscale_name = node.get("tailscale_name", "N/A")
-            status = "🟢 Online" if tailscale_name != "N/A" else "⚪ Unknown"
-
-            table.add_row(
-                hostname,
-                node.get("location", ""),
-                node.get("ansible_host", ""),
-                node.get("node_type", ""),
-                status,
-                key=hostname
-            )
+        self.row_cells = {node.get("hostname", ""): self._build_cells(node) for node in nodes}
+        self.row_filter.load((hostname, hostname, {}) for hostname in self.row_cells)
+
+    def _apply_search(self) -> None:
+        """Apply the search text, adding and removing only changed rows."""
+        self.search_timer = None
+        table = self.query_one("#selector-table", DataTable)
+
+        search_text = self.query_one("#selector-filter", Input).value
+        added, removed = self.row_filter.filter(search_text)
+
+        for hostname in removed:
+            table.remove_row(hostname)
+
+        for hostname in added:
+            table.add_row(*self.row_cells[hostname], key=hostname)
+
+        if added:
+            # New rows are appended at the bottom; restore inventory order
+            table.sort(self.hostname_column, key=self.row_filter.position)
 
         # Update info
         info_widget = self.query_one("#selector-info", Static)
-        info_widget.update(f"Found {len(nodes)} nodes")
+        info_widget.update(f"Found {len(self.row_filter.visible)} nodes")
 
     @on(Input.Changed, "#selector-filter")
     def on_search_change(self, event: Input.Changed) -> None:
-        """Filter nodes when search input changes."""
-        self._refresh_table(event.value)
+        """Filter nodes when search input changes (debounced)."""
+        if self.search_timer is not None:
+            self.search_timer.stop()
+        self.search_timer = self.set_timer(FILTER_DEBOUNCE, self._apply_search)
 
     @on(DataTable.RowSelected)
     def on_row_selected(self, event: DataTable.RowSelected) -> None:
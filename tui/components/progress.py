@@ -1,5 +1,7 @@
 """Progress Indicator - Show deployment progress."""
 
+from typing import Optional
+
 from textual.app import ComposeResult
 from textual.containers import Container
 from textual.widgets import ProgressBar, Static, Button
@@ -192,10 +194,12 @@ class DeploymentProgress(Container):
     def __init__(self, hostname: str):
         super().__init__()
         self.hostname = hostname
+        # In the order deploy-ubuntu-vm.sh runs them
         self.stages = [
-            "Downloading image",
             "Creating VM",
+            "Downloading image",
             "Configuring cloud-init",
+            "Importing disk",
             "Starting VM",
             "Waiting for boot",
             "Installing K3s",
@@ -252,6 +256,26 @@ class DeploymentProgress(Container):
 
         self.current_stage = stage_index
 
+    def set_stage_name(self, name: Optional[str]) -> bool:
+        """
+        Set the current stage by name (as reported by ScriptExecutor.parse_output).
+
+        Args:
+            name: Stage name, matched case-insensitively
+
+        Returns:
+            True if the stage is known
+        """
+        if not name:
+            return False
+
+        lowered = [stage.lower() for stage in self.stages]
+        if name.lower() not in lowered:
+            return False
+
+        self.set_stage(lowered.index(name.lower()))
+        return True
+
     def set_stage_error(self, stage_index: int, error: str) -> None:
         """
         Mark a stage as failed.
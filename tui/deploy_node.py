@@ -6,20 +6,78 @@ Main entry point for the interactive Terminal UI for deploying and managing
 Kapnode VMs across the distributed K3s cluster.
 
 Usage:
-    python deploy_node.py [--debug]
+    python deploy_node.py [--debug] [--profile-startup] [--trace FILE]
+                          [--metrics-textfile FILE] [--metrics-port PORT]
+                          [--profile [cprofile|sample]] [--profile-dir DIR]
+    python deploy_node.py --replay SESSION [--replay-speed N]
+    python deploy_node.py <command> [options]
 
 Options:
-    --debug     Enable debug mode with verbose output
+    --debug             Enable debug mode with verbose output
+    --profile-startup   Report import and mount timings on exit
+    --trace FILE        Record spans and write them to FILE on exit
+                        (Chrome trace format, OTLP/JSON if FILE contains 'otlp')
+    --metrics-textfile FILE
+                        Write Prometheus metrics to FILE (node_exporter
+                        textfile collector) after each deployment and on exit
+    --metrics-port PORT Serve Prometheus metrics on 127.0.0.1:PORT/metrics
+    --profile [MODE]    Profile screens and workers (cprofile or sample) and
+                        write the profiles on exit; F9 shows the top functions
+    --profile-dir DIR   Directory for profiles (default: ~/.homelab/profiles/<time>)
+    --replay SESSION    Play back a recorded deployment session
+    --replay-speed N    Replay speed multiplier (0 = as fast as possible)
+
+Commands:
+    build-image         Build the golden VM image on the Proxmox host
+    setup-cache         Provision a site-local APT/k3s cache proxy
 """
 
+import time
+
+# Taken before any heavy import so --profile-startup covers the whole startup
+_PROCESS_START = time.perf_counter()
+
 import argparse
+import atexit
+import os
 import sys
+import threading
 from pathlib import Path
+from typing import List, Tuple
 
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 
-from screens.main_menu import MainMenu
+_TEXTUAL_IMPORTED = time.perf_counter()
+
+from lib.services import ServiceRegistry
+
+
+class StartupProfile:
+    """Collect named startup milestones relative to process start."""
+
+    def __init__(self):
+        self.marks: List[Tuple[str, float]] = [
+            ("import textual", _TEXTUAL_IMPORTED),
+        ]
+
+    def mark(self, label: str) -> None:
+        """Record a milestone at the current time."""
+        self.marks.append((label, time.perf_counter()))
+
+    def report(self) -> str:
+        """Format milestones with step and cumulative times in milliseconds."""
+        lines = ["Startup profile (ms):", f"  {'step':<24}{'delta':>10}{'total':>10}"]
+        previous = _PROCESS_START
+
+        for label, timestamp in self.marks:
+            lines.append(
+                f"  {label:<24}{(timestamp - previous) * 1000:>10.1f}"
+                f"{(timestamp - _PROCESS_START) * 1000:>10.1f}"
+            )
+            previous = timestamp
+
+        return "\n".join(lines)
 
 
 class KapnodeDeployApp(App):
@@ -31,26 +89,128 @@ class KapnodeDeployApp(App):
     BINDINGS = [
         Binding("q", "quit", "Quit", priority=True),
         Binding("d", "toggle_dark", "Toggle Dark Mode"),
+        Binding("f9", "show_profile", "Profile"),
     ]
 
-    def __init__(self, debug: bool = False):
+    def __init__(
+        self,
+        debug: bool = False,
+        startup_profile: StartupProfile = None,
+        replay: Path = None,
+        replay_speed: float = 1.0,
+    ):
         super().__init__()
         self.debug_mode = debug
+        self.startup_profile = startup_profile
+        self.replay = replay
+        self.replay_speed = replay_speed
+
+        # Managers shared by every screen; change events run on the UI thread
+        self.services = ServiceRegistry()
+        self.services.dispatcher = self._dispatch_service_event
+        self._ui_thread_id = threading.get_ident()
 
-    def on_mount(self) -> None:
+    def _dispatch_service_event(self, callback) -> None:
+        """Run a service change callback on the UI thread."""
+        if threading.get_ident() == self._ui_thread_id:
+            callback()
+        else:
+            self.call_from_thread(callback)
+
+    async def on_mount(self) -> None:
         """Load main menu on startup."""
+        # Screens are imported here so argument parsing and --help stay fast
+        from screens.main_menu import MainMenu
+
+        if self.startup_profile:
+            self.startup_profile.mark("import main menu")
+
         # Show welcome banner in debug mode
         if self.debug_mode:
             self.notify("Kapnode Deployment Manager started in debug mode", severity="information")
 
         # Push the main menu screen
-        self.push_screen(MainMenu())
+        await self.push_screen(MainMenu())
+
+        # Pick up inventory/config edits made by Ansible or an editor
+        self.services.start_watching()
+
+        # Find unreachable hosts before the first deploy; results are cached
+        if not self.replay:
+            self.run_worker(self._startup_preflight, thread=True, group="preflight")
+
+        if self.replay:
+            from components.log_viewer import LogViewerScreen
+            await self.push_screen(LogViewerScreen({}, None, replay=self.replay, speed=self.replay_speed))
+
+        if self.startup_profile:
+            self.startup_profile.mark("mount main menu")
+            self.call_after_refresh(self._mark_first_frame)
+
+    def _startup_preflight(self) -> None:
+        """Check all hosts in the background if enabled in the config (worker thread)."""
+        if self.services.config.get_preference("preflight.on_startup", True):
+            self.services.preflight.run()
+
+    def _mark_first_frame(self) -> None:
+        """Record the first rendered frame of the main menu."""
+        self.startup_profile.mark("first frame")
+        self.notify(self.startup_profile.report(), title="Startup profile", timeout=10)
+
+    def check_action(self, action: str, parameters) -> bool:
+        """Only offer the profile panel while profiling."""
+        if action == "show_profile":
+            from lib.profiler import profiler
+            return profiler.enabled
+        return True
+
+    def action_show_profile(self) -> None:
+        """Show the top functions by cumulative time."""
+        from screens.profile_screen import ProfileScreen
+        self.push_screen(ProfileScreen())
 
     def action_toggle_dark(self) -> None:
         """Toggle dark mode."""
         self.dark = not self.dark
 
 
+def _export_trace(path: Path) -> None:
+    """Write recorded spans to a trace file."""
+    from lib.tracing import tracer
+
+    try:
+        count = tracer.export(path)
+        print(f"Wrote {count} spans to {path}", file=sys.stderr)
+    except OSError as e:
+        print(f"Error: Could not write trace {path}: {e}", file=sys.stderr)
+
+
+def _write_metrics() -> None:
+    """Write the metrics textfile on exit."""
+    from lib.metrics import metrics
+
+    try:
+        metrics.write_textfile()
+    except OSError as e:
+        print(f"Error: Could not write metrics {metrics.textfile}: {e}", file=sys.stderr)
+
+
+def _write_profiles() -> None:
+    """Stop the profiler and write the collected profiles."""
+    from lib.profiler import profiler
+
+    profiler.stop()
+    try:
+        paths = profiler.write()
+    except OSError as e:
+        print(f"Error: Could not write profiles: {e}", file=sys.stderr)
+        return
+
+    if paths:
+        print(f"Wrote {len(paths)} profile files to {paths[0].parent}", file=sys.stderr)
+        print(profiler.summary(limit=15), file=sys.stderr)
+
+
 def main():
     """Entry point for deploy-node command."""
     parser = argparse.ArgumentParser(
@@ -61,8 +221,94 @@ def main():
         action="store_true",
         help="Enable debug mode with verbose output"
     )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Report import and mount timings on exit"
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        metavar="FILE",
+        default=os.environ.get("KAPNODE_TRACE") or None,
+        help="Write a span trace to FILE on exit (OTLP/JSON if the name contains 'otlp', "
+             "else Chrome trace format; default: $KAPNODE_TRACE)"
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        type=Path,
+        metavar="FILE",
+        default=os.environ.get("KAPNODE_METRICS_TEXTFILE") or None,
+        help="Write Prometheus metrics to FILE for node_exporter's textfile collector "
+             "(default: $KAPNODE_METRICS_TEXTFILE)"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics while running"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="cprofile",
+        choices=["cprofile", "sample"],
+        metavar="MODE",
+        help="Profile screens and workers with cProfile (default) or a sampling "
+             "thread ('sample') and write pstats/collapsed-stack files on exit"
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        metavar="DIR",
+        help="Directory for profile files (default: ~/.homelab/profiles/<timestamp>)"
+    )
+    parser.add_argument(
+        "--replay",
+        type=Path,
+        metavar="SESSION",
+        help="Play back a recorded deployment session (~/.homelab/sessions)"
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=1.0,
+        metavar="N",
+        help="Replay speed multiplier (default: 1, 0 = as fast as possible)"
+    )
+
+    # Subcommands run without starting the TUI
+    import cli
+    cli.add_commands(parser.add_subparsers(dest="command"))
+
     args = parser.parse_args()
 
+    if args.trace:
+        from lib.tracing import tracer
+        tracer.enable()
+        # Runs on sys.exit() too, so subcommands are traced as well
+        atexit.register(_export_trace, args.trace)
+
+    if args.profile:
+        from lib.profiler import profiler
+        profiler.start(args.profile, output_dir=args.profile_dir)
+        atexit.register(_write_profiles)
+
+    if args.metrics_textfile or args.metrics_port:
+        from lib.metrics import metrics
+        if args.metrics_textfile:
+            metrics.textfile = args.metrics_textfile.expanduser()
+            atexit.register(_write_metrics)
+        if args.metrics_port:
+            try:
+                metrics.serve(args.metrics_port)
+            except OSError as e:
+                print(f"Error: Could not serve metrics on port {args.metrics_port}: {e}", file=sys.stderr)
+                sys.exit(1)
+
+    if args.command:
+        sys.exit(args.func(args))
+
     # Verify we're in the right location
     script_dir = Path(__file__).parent
     if not (script_dir / "screens").exists():
@@ -70,8 +316,18 @@ def main():
         print(f"Expected to find: {script_dir / 'screens'}", file=sys.stderr)
         sys.exit(1)
 
+    startup_profile = StartupProfile() if args.profile_startup else None
+
     # Create and run the app
-    app = KapnodeDeployApp(debug=args.debug)
+    app = KapnodeDeployApp(
+        debug=args.debug,
+        startup_profile=startup_profile,
+        replay=args.replay,
+        replay_speed=args.replay_speed,
+    )
+
+    if startup_profile:
+        startup_profile.mark("create app")
 
     try:
         app.run()
@@ -84,6 +340,10 @@ def main():
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        app.services.close()
+        if startup_profile:
+            print(startup_profile.report(), file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -6,4 +6,27 @@ __all__ = [
     "config_manager",
     "script_executor",
     "validators",
+    "fleet_status",
+    "table_filter",
+    "services",
+    "file_watcher",
+    "image_builder",
+    "cache_proxy",
+    "cloud_init",
+    "proxmox_api",
+    "proxmox_mock",
+    "proxmox_tasks",
+    "cluster_join",
+    "rolling_update",
+    "known_hosts",
+    "ssh_keys",
+    "synthetic",
+    "session_recorder",
+    "tracing",
+    "metrics",
+    "profiler",
+    "preflight",
+    "dialer",
+    "system_info",
+    "storage",
 ]
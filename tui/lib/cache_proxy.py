@@ -0,0 +1,116 @@
+"""Cache Proxy - Provision and reference site-local APT/k3s caches."""
+
+import shlex
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from .script_executor import ScriptExecutor
+
+
+SETUP_SCRIPT = Path(__file__).parent.parent.parent / "scripts" / "setup-cache-proxy.sh"
+REMOTE_SETUP_SCRIPT = "/tmp/setup-cache-proxy.sh"
+
+APT_PROXY_PORT = 3142
+MIRROR_PORT = 8080
+
+# Printed by setup-cache-proxy.sh once everything is running
+READY_MARKER = "Cache proxy ready!"
+
+
+def cache_urls(cache_host: str, mirror_port: int = MIRROR_PORT) -> Dict[str, str]:
+    """
+    Build the URLs injected into cloud-init for a cache host.
+
+    Args:
+        cache_host: Hostname or IP of the site-local cache
+        mirror_port: HTTP port of the k3s artifact mirror
+
+    Returns:
+        Dictionary with 'apt_proxy' and 'k3s_mirror' URLs
+    """
+    return {
+        "apt_proxy": f"http://{cache_host}:{APT_PROXY_PORT}",
+        "k3s_mirror": f"http://{cache_host}:{mirror_port}/k3s",
+    }
+
+
+class CacheProxyProvisioner:
+    """Set up apt-cacher-ng and a k3s artifact mirror on a host at one location."""
+
+    def __init__(self, executor: Optional[ScriptExecutor] = None):
+        """
+        Initialize cache proxy provisioner.
+
+        Args:
+            executor: Script executor instance (creates new one if None)
+        """
+        self.executor = executor or ScriptExecutor()
+        self.ready = False
+
+    def setup_command(
+        self,
+        user: str,
+        k3s_version: str = "",
+        mirror_port: int = MIRROR_PORT,
+    ) -> str:
+        """
+        Build the remote setup command.
+
+        Args:
+            user: SSH user (non-root users run the script through sudo)
+            k3s_version: K3s release to mirror (latest stable if empty)
+            mirror_port: HTTP port for the k3s mirror
+
+        Returns:
+            Shell-escaped command string
+        """
+        cmd_parts = ["bash", REMOTE_SETUP_SCRIPT, "--mirror-port", str(int(mirror_port))]
+
+        if user != "root":
+            cmd_parts.insert(0, "sudo")
+        if k3s_version:
+            cmd_parts.extend(["--k3s-version", shlex.quote(k3s_version)])
+
+        return " ".join(cmd_parts)
+
+    def provision(
+        self,
+        host: str,
+        user: str,
+        key: Optional[Path] = None,
+        k3s_version: str = "",
+        mirror_port: int = MIRROR_PORT,
+    ) -> Iterator[str]:
+        """
+        Copy the setup script to the cache host and stream its output.
+
+        After the iterator is exhausted, ready tells whether setup finished.
+
+        Args:
+            host: Cache hostname or IP
+            user: Username for SSH connection
+            key: Path to SSH private key
+            k3s_version: K3s release to mirror (latest stable if empty)
+            mirror_port: HTTP port for the k3s mirror
+
+        Yields:
+            Lines of setup output
+        """
+        self.ready = False
+
+        copied = self.executor.ssh_manager.scp_file(
+            local_path=SETUP_SCRIPT,
+            remote_path=REMOTE_SETUP_SCRIPT,
+            host=host,
+            user=user,
+            key=key,
+        )
+        if not copied:
+            yield "ERROR: Failed to copy setup script to cache host"
+            return
+
+        command = self.setup_command(user, k3s_version, mirror_port)
+        for line in self.executor.execute_deployment(command, host, user, key):
+            if READY_MARKER in line:
+                self.ready = True
+            yield line
@@ -0,0 +1,445 @@
+"""Cloud-Init Renderer - Render and upload per-VM cloud-init snippets."""
+
+import copy
+import functools
+import shlex
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .ssh_manager import SSHManager
+
+
+# Proxmox "local:snippets/" storage
+SNIPPETS_DIR = "/var/lib/vz/snippets"
+
+# Literal shell variables are written as $$VAR; ${name} are render parameters.
+# Inside the embedded shell scripts only the shell-quoted *_sh parameters are
+# used. Keep in sync with the user-data heredoc in scripts/deploy-ubuntu-vm.sh.
+USER_DATA_TEMPLATE = """\
+hostname: ${name}
+fqdn: ${name}.local
+manage_etc_hosts: true
+
+users:
+  - name: ubuntu
+    groups: [adm, audio, cdrom, dialout, dip, floppy, lxd, netdev, plugdev, sudo, video]
+    lock_passwd: false
+    shell: /bin/bash
+    sudo: ['ALL=(ALL) NOPASSWD:ALL']
+    ssh_authorized_keys:
+      - ${ssh_pubkey}
+
+ssh_pwauth: false
+disable_root: true
+
+package_update: true
+package_upgrade: true
+
+packages:
+  - curl
+  - wget
+  - git
+  - vim
+  - htop
+  - net-tools
+  - lvm2
+  - parted
+  - tailscale
+  - open-iscsi
+  - nfs-common
+
+write_files:
+  - path: /etc/netplan/00-installer-config.yaml
+    content: |
+      network:
+        version: 2
+        renderer: networkd
+        ethernets:
+          eth0:
+            dhcp4: false
+            addresses:
+              - ${ip}/24
+            routes:
+              - to: default
+                via: ${gateway}
+            nameservers:
+              addresses: [${dns}]
+    permissions: '0644'
+  - path: /usr/local/bin/configure-tailscale.sh
+    content: |
+      #!/bin/bash
+      set -e
+      echo "Configuring Tailscale..."
+      tailscale up --authkey=${tailscale_key_sh} --accept-routes --hostname=${name_sh}
+      systemctl enable tailscaled
+      echo "Tailscale configured successfully"
+    permissions: '0755'
+  - path: /usr/local/bin/configure-storage.sh
+    content: |
+      #!/bin/bash
+      set -e
+
+      # Wait for disks to be detected
+      sleep 10
+
+      # Configure storage - will be run by post-install-storage.sh
+      LONGHORN_SIZE=${longhorn_size_sh}
+      BACKUP_SIZE=${backup_size_sh}
+
+      if [[ $$LONGHORN_SIZE -gt 0 ]] || [[ $$BACKUP_SIZE -gt 0 ]]; then
+        echo "Storage configuration needed. Run post-install-storage.sh manually."
+      fi
+    permissions: '0755'
+  - path: /usr/local/bin/join-k3s.sh
+    content: |
+      #!/bin/bash
+      set -e
+
+      K3S_MASTER=${k3s_master_sh}
+      K3S_TOKEN=${k3s_token_sh}
+
+      echo "Joining K3s cluster at $$K3S_MASTER..."
+      ${k3s_install}
+    permissions: '0755'
+  - path: /etc/systemd/system/configure-tailscale.service
+    content: |
+      [Unit]
+      Description=Configure Tailscale
+      After=network-online.target
+      Wants=network-online.target
+
+      [Service]
+      Type=oneshot
+      ExecStart=/usr/local/bin/configure-tailscale.sh
+      RemainAfterExit=yes
+
+      [Install]
+      WantedBy=multi-user.target
+    permissions: '0644'
+
+runcmd:
+  - systemctl enable configure-tailscale.service
+  - systemctl start configure-tailscale.service
+  - systemctl enable iscsid
+  - systemctl start iscsid
+
+final_message: |
+  Ubuntu 24.04 LTS VM deployment complete!
+  Hostname: ${name}
+  IP: ${ip}
+  Location: ${location}
+  Tailscale: Configured
+  Next steps:
+    1. SSH into the VM: ssh ubuntu@${ip}
+    2. Run post-install-storage.sh if storage was configured
+    3. Join K3s cluster if not auto-joined
+"""
+
+META_DATA_TEMPLATE = """\
+instance-id: ${vmid}
+local-hostname: ${name}
+"""
+
+NETWORK_CONFIG_TEMPLATE = """\
+version: 2
+ethernets:
+  eth0:
+    dhcp4: false
+    addresses:
+      - ${ip}/24
+    routes:
+      - to: default
+        via: ${gateway}
+    nameservers:
+      addresses: ${dns_servers}
+"""
+
+TEMPLATES = {
+    "user-data": USER_DATA_TEMPLATE,
+    "meta-data": META_DATA_TEMPLATE,
+    "network-config": NETWORK_CONFIG_TEMPLATE,
+}
+
+# Inserted verbatim into join-k3s.sh, so shell variables use a single $
+K3S_INSTALL_DEFAULT = 'curl -sfL https://get.k3s.io | K3S_URL="$K3S_MASTER" K3S_TOKEN="$K3S_TOKEN" sh -'
+K3S_INSTALL_BAKED = (
+    'INSTALL_K3S_SKIP_DOWNLOAD=true K3S_URL="$K3S_MASTER" K3S_TOKEN="$K3S_TOKEN" '
+    '/usr/local/bin/k3s-install.sh'
+)
+K3S_INSTALL_MIRROR = (
+    "mkdir -p /var/lib/rancher/k3s/agent/images"
+    " && curl -sfL -o /usr/local/bin/k3s-install.sh {install}"
+    " && curl -sfL -o /usr/local/bin/k3s {binary}"
+    " && curl -sfL -o /var/lib/rancher/k3s/agent/images/k3s-airgap-images-amd64.tar.zst"
+    " {images}"
+    " && chmod 0755 /usr/local/bin/k3s /usr/local/bin/k3s-install.sh"
+    " && " + K3S_INSTALL_BAKED
+)
+
+
+class CloudInitError(Exception):
+    """Raised when rendered cloud-init documents are invalid."""
+    pass
+
+
+class _Whole:
+    """Placeholder for a value that replaces an entire YAML node (e.g. a list)."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+def _compile(node: Any) -> Any:
+    """Replace every string containing placeholders with a Template."""
+    if isinstance(node, dict):
+        return {key: _compile(value) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_compile(value) for value in node]
+    if isinstance(node, str) and "$" in node:
+        stripped = node.strip()
+        if stripped.startswith("${") and stripped.endswith("}") and stripped.count("$") == 1:
+            return _Whole(stripped[2:-1])
+        return Template(node)
+    return node
+
+
+def _fill(node: Any, values: Dict[str, Any]) -> Any:
+    """Substitute parameters into a compiled template tree."""
+    if isinstance(node, dict):
+        return {key: _fill(value, values) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_fill(value, values) for value in node]
+    if isinstance(node, _Whole):
+        return copy.deepcopy(values[node.name])
+    if isinstance(node, Template):
+        return node.substitute(values)
+    return node
+
+
+@functools.lru_cache(maxsize=None)
+def compiled_template(name: str) -> Any:
+    """
+    Parse and precompile a document template once per process.
+
+    Templates are parsed into YAML structures before parameters are filled in,
+    so no parameter value can change the document structure. Values used in
+    the embedded shell scripts are shell-quoted (the *_sh parameters), so
+    they cannot change those scripts either.
+
+    Args:
+        name: Document name (user-data, meta-data, network-config)
+
+    Returns:
+        Template tree with Template objects at every parameterised leaf
+    """
+    import yaml
+
+    return _compile(yaml.safe_load(TEMPLATES[name]))
+
+
+def _block_dumper():
+    """Build a YAML dumper that writes multi-line strings as block scalars."""
+    import yaml
+
+    # The libyaml-backed dumper is several times faster when available
+    class BlockDumper(getattr(yaml, "CSafeDumper", yaml.SafeDumper)):
+        pass
+
+    def represent_str(dumper, data):
+        style = "|" if "\n" in data else None
+        return dumper.represent_scalar("tag:yaml.org,2002:str", data, style=style)
+
+    BlockDumper.add_representer(str, represent_str)
+    return BlockDumper
+
+
+class CloudInitRenderer:
+    """Render user-data, meta-data and network-config for VMs locally."""
+
+    def __init__(self):
+        self.dumper = _block_dumper()
+
+    def template_values(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Derive template parameters from deployment parameters.
+
+        Args:
+            params: Deployment parameters (as collected by the deploy screen)
+
+        Returns:
+            Dictionary of template parameter values
+        """
+        dns = str(params.get("dns") or "192.168.86.1,8.8.8.8")
+        location = str(params.get("location") or "")
+
+        if params.get("golden_image"):
+            k3s_install = K3S_INSTALL_BAKED
+        elif params.get("k3s_mirror"):
+            mirror = str(params["k3s_mirror"]).rstrip("/")
+            k3s_install = K3S_INSTALL_MIRROR.format(
+                install=shlex.quote(f"{mirror}/install.sh"),
+                binary=shlex.quote(f"{mirror}/k3s"),
+                images=shlex.quote(f"{mirror}/k3s-airgap-images-amd64.tar.zst"),
+            )
+        else:
+            k3s_install = K3S_INSTALL_DEFAULT
+
+        values = {
+            "name": str(params["name"]),
+            "vmid": str(params["vmid"]),
+            "ip": str(params["ip"]),
+            "gateway": str(params.get("gateway") or "192.168.86.1"),
+            "dns": dns,
+            "dns_servers": [server.strip() for server in dns.split(",") if server.strip()],
+            "ssh_pubkey": str(params.get("ssh_pubkey") or "").strip(),
+            "tailscale_key": str(params.get("tailscale_key") or ""),
+            "location": location or "Not specified",
+            "longhorn_size": str(params.get("longhorn_size", 0)),
+            "backup_size": str(params.get("backup_size", 0)),
+            "k3s_master": str(params.get("k3s_master") or ""),
+            "k3s_token": str(params.get("k3s_token") or ""),
+            "k3s_install": k3s_install,
+        }
+
+        # Values placed in the embedded shell scripts
+        for name in ("name", "tailscale_key", "longhorn_size", "backup_size", "k3s_master", "k3s_token"):
+            values[f"{name}_sh"] = shlex.quote(values[name])
+
+        return values
+
+    def render(self, params: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Render all three cloud-init documents for one VM.
+
+        Args:
+            params: Deployment parameters
+
+        Returns:
+            Dictionary of document name -> YAML text
+        """
+        import yaml
+
+        values = self.template_values(params)
+        documents = {name: _fill(compiled_template(name), values) for name in TEMPLATES}
+
+        user_data = documents["user-data"]
+        if params.get("golden_image"):
+            # Packages and k3s are already in the image
+            user_data["package_update"] = False
+            user_data["package_upgrade"] = False
+            del user_data["packages"]
+
+        if params.get("apt_proxy"):
+            user_data["apt"] = {"http_proxy": str(params["apt_proxy"])}
+
+        if values["k3s_master"] and values["k3s_token"]:
+            user_data["runcmd"].append(
+                '/usr/local/bin/join-k3s.sh || echo "K3s join failed, run manually"'
+            )
+
+        rendered = {
+            name: yaml.dump(document, Dumper=self.dumper, sort_keys=False, default_flow_style=False)
+            for name, document in documents.items()
+        }
+        rendered["user-data"] = "#cloud-config\n" + rendered["user-data"]
+
+        self.validate(rendered)
+        return rendered
+
+    def validate(self, rendered: Dict[str, str]) -> None:
+        """
+        Check that rendered documents parse and contain the required keys.
+
+        Args:
+            rendered: Dictionary of document name -> YAML text
+
+        Raises:
+            CloudInitError: If any document is invalid
+        """
+        import yaml
+
+        required = {
+            "user-data": ("hostname", "users", "write_files"),
+            "meta-data": ("instance-id", "local-hostname"),
+            "network-config": ("version", "ethernets"),
+        }
+
+        if not rendered["user-data"].startswith("#cloud-config\n"):
+            raise CloudInitError("user-data must start with #cloud-config")
+
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+        for name, keys in required.items():
+            try:
+                document = yaml.load(rendered[name], Loader=loader)
+            except yaml.YAMLError as e:
+                raise CloudInitError(f"{name} is not valid YAML: {e}")
+
+            if not isinstance(document, dict):
+                raise CloudInitError(f"{name} must be a mapping")
+
+            missing = [key for key in keys if not document.get(key)]
+            if missing:
+                raise CloudInitError(f"{name} is missing {', '.join(missing)}")
+
+    @staticmethod
+    def snippet_paths(vmid: Any) -> Dict[str, str]:
+        """
+        Get the remote snippet path of each document for a VM.
+
+        Args:
+            vmid: Proxmox VM ID
+
+        Returns:
+            Dictionary of document name -> absolute path on the Proxmox host
+        """
+        return {name: f"{SNIPPETS_DIR}/{name}-{vmid}.yaml" for name in TEMPLATES}
+
+    def upload_batch(
+        self,
+        batch: Iterable[Dict[str, Any]],
+        ssh_manager: SSHManager,
+        host: str,
+        user: str,
+        key: Optional[Path] = None,
+    ) -> Tuple[bool, List[str]]:
+        """
+        Render every VM in a batch, then upload all snippets in one SFTP session.
+
+        Nothing is uploaded unless every document renders and validates.
+
+        Args:
+            batch: Deployment parameters for each VM
+            ssh_manager: SSH manager providing the pooled connection
+            host: Proxmox hostname or IP
+            user: Username for SSH connection
+            key: Path to SSH private key
+
+        Returns:
+            Tuple of (success, error messages)
+        """
+        files: Dict[str, str] = {}
+        errors: List[str] = []
+
+        for params in batch:
+            try:
+                rendered = self.render(params)
+            except (CloudInitError, KeyError) as e:
+                errors.append(f"{params.get('name', '?')}: {e}")
+                continue
+
+            for name, path in self.snippet_paths(params["vmid"]).items():
+                files[path] = rendered[name]
+
+        if errors:
+            return False, errors
+
+        _, stderr, exit_code = ssh_manager.execute_command(host, user, f"mkdir -p {SNIPPETS_DIR}", key)
+        if exit_code != 0:
+            return False, [f"Cannot create {SNIPPETS_DIR} on {host}: {stderr.strip()}"]
+
+        if not ssh_manager.upload_files(files, host, user, key):
+            return False, [f"Failed to upload cloud-init snippets to {host}"]
+
+        return True, []
@@ -0,0 +1,376 @@
+"""Cluster Join - Verify k3s joins and label new nodes from the master."""
+
+import json
+import shlex
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from .ssh_manager import SSHManager
+
+if TYPE_CHECKING:
+    from .config_manager import ConfigManager
+    from .inventory import InventoryManager
+
+
+ZONE_LABEL = "topology.kubernetes.io/zone"
+LOCATION_LABEL = "kapnode.io/location"
+NODE_TYPE_LABEL = "kapnode.io/node-type"
+
+# Default taints per node type, as key=value:Effect
+DEFAULT_TAINTS = {
+    "backup": ["kapnode.io/backup=true:NoSchedule"],
+}
+
+AGENT_CHECK_COMMAND = "systemctl is-active k3s-agent 2>/dev/null || systemctl is-active k3s 2>/dev/null"
+
+
+def location_tag(location: str) -> str:
+    """Convert a location name to a label value (e.g. 'Forest Hills' -> 'Forest-Hills')."""
+    return str(location).strip().replace(" ", "-")
+
+
+def node_labels(node: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Get the labels a deployed node should carry.
+
+    Args:
+        node: Inventory node dictionary (location, node_type)
+
+    Returns:
+        Dictionary of label -> value
+    """
+    labels = {}
+    location = node.get("location")
+    if location:
+        labels[ZONE_LABEL] = location_tag(location)
+        labels[LOCATION_LABEL] = location_tag(location).lower()
+    if node.get("node_type"):
+        labels[NODE_TYPE_LABEL] = str(node["node_type"])
+    return labels
+
+
+def _node_ready(item: Dict[str, Any]) -> bool:
+    """Check the Ready condition of a Kubernetes node object."""
+    for condition in item.get("status", {}).get("conditions", []):
+        if condition.get("type") == "Ready":
+            return condition.get("status") == "True"
+    return False
+
+
+class JoinOrchestrator:
+    """
+    Finish k3s joins for a batch of freshly deployed nodes.
+
+    Nodes cannot label themselves (workers have no admin kubeconfig), so all
+    cluster changes are made on the master over the pooled SSH connection:
+    one 'kubectl get nodes' per poll for the whole batch, then a single
+    command that applies every label and taint. Nodes that never register
+    are checked in parallel to explain why.
+    """
+
+    def __init__(
+        self,
+        ssh_manager: Optional[SSHManager] = None,
+        master_host: str = "minikapserver",
+        master_user: str = "root",
+        key: Optional[Path] = None,
+        taints: Optional[Dict[str, List[str]]] = None,
+        max_workers: int = 8,
+    ):
+        """
+        Initialize join orchestrator.
+
+        Args:
+            ssh_manager: SSH manager instance (creates new one if None)
+            master_host: k3s server to run kubectl on
+            master_user: SSH user on the master (non-root users need sudo)
+            key: SSH private key path
+            taints: Taints per node type (default: DEFAULT_TAINTS)
+            max_workers: Parallel SSH checks for nodes that did not join
+        """
+        self.ssh_manager = ssh_manager or SSHManager()
+        self.master_host = master_host
+        self.master_user = master_user
+        self.key = key
+        self.taints = DEFAULT_TAINTS if taints is None else taints
+        self.max_workers = max(int(max_workers), 1)
+
+    @classmethod
+    def from_config(
+        cls,
+        config: "ConfigManager",
+        inventory: "InventoryManager",
+        ssh_manager: SSHManager,
+        key: Optional[Path] = None,
+        master_host: Optional[str] = None,
+        master_user: Optional[str] = None,
+    ) -> "JoinOrchestrator":
+        """
+        Create an orchestrator for the configured k3s master.
+
+        The master is the first k3s_masters inventory host, or the host in
+        the k3s_master URL; settings come from the k3s_join config block.
+
+        Args:
+            config: Loaded configuration manager
+            inventory: Loaded inventory manager
+            ssh_manager: Shared SSH manager
+            key: SSH private key path
+            master_host: Override the master host
+            master_user: Override the master SSH user
+
+        Returns:
+            Configured orchestrator
+        """
+        settings = config.get_preference("k3s_join", {}) or {}
+
+        if not master_host:
+            masters = [node for node in inventory.list_nodes() if node.get("group") == "k3s_masters"]
+            if masters:
+                master_host = masters[0].get("ansible_host") or masters[0]["hostname"]
+            else:
+                master_host = cls.master_from_url(config.get_preference("k3s_master", ""))
+
+        return cls(
+            ssh_manager,
+            master_host=master_host,
+            master_user=master_user or settings.get("master_user", "root"),
+            key=key,
+            taints=settings.get("taints"),
+        )
+
+    @staticmethod
+    def master_from_url(url: str) -> str:
+        """Get the master hostname from a k3s server URL."""
+        return urlsplit(url if "://" in url else f"https://{url}").hostname or url
+
+    @property
+    def kubectl(self) -> str:
+        """kubectl invocation on the master (k3s ships it as 'k3s kubectl')."""
+        prefix = "" if self.master_user == "root" else "sudo "
+        return f"{prefix}k3s kubectl"
+
+    def run_kubectl(self, args: str) -> str:
+        """
+        Run kubectl on the master.
+
+        Args:
+            args: kubectl arguments (already shell-quoted)
+
+        Returns:
+            Command output
+
+        Raises:
+            RuntimeError: If kubectl fails
+        """
+        return self._run_on_master(f"{self.kubectl} {args}")
+
+    def _run_on_master(self, command: str) -> str:
+        stdout, stderr, exit_code = self.ssh_manager.execute_command(
+            self.master_host, self.master_user, command, self.key
+        )
+        if exit_code != 0:
+            raise RuntimeError(stderr.strip() or f"kubectl exited with {exit_code}")
+        return stdout
+
+    def get_cluster_nodes(self) -> Dict[str, Dict[str, Any]]:
+        """
+        List all cluster nodes in one request.
+
+        Returns:
+            Dictionary of node name -> {'ready': bool, 'labels': dict, 'taints': list}
+        """
+        data = json.loads(self.run_kubectl("get nodes -o json"))
+        nodes = {}
+        for item in data.get("items", []):
+            metadata = item.get("metadata", {})
+            nodes[metadata.get("name", "")] = {
+                "ready": _node_ready(item),
+                "labels": metadata.get("labels", {}),
+                "taints": item.get("spec", {}).get("taints", []),
+            }
+        return nodes
+
+    def wait_for_nodes(
+        self,
+        hostnames: List[str],
+        timeout: float = 600.0,
+        interval: float = 10.0,
+        progress: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Poll the master until all nodes are registered and Ready.
+
+        Args:
+            hostnames: Nodes to wait for
+            timeout: Seconds before giving up on the remaining nodes
+            interval: Seconds between polls
+            progress: Optional callback for status messages
+
+        Returns:
+            Cluster nodes from the last poll (see get_cluster_nodes)
+        """
+        deadline = time.monotonic() + timeout
+        nodes: Dict[str, Dict[str, Any]] = {}
+
+        while True:
+            try:
+                nodes = self.get_cluster_nodes()
+            except Exception as e:
+                if progress:
+                    progress(f"WARNING: Could not list cluster nodes: {e}")
+
+            ready = [name for name in hostnames if nodes.get(name, {}).get("ready")]
+            if progress:
+                progress(f"{len(ready)}/{len(hostnames)} nodes Ready")
+
+            if len(ready) == len(hostnames) or time.monotonic() >= deadline:
+                return nodes
+
+            time.sleep(interval)
+
+    def label_command(self, nodes: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Build one shell command that labels and taints a batch of nodes.
+
+        Nodes sharing the same labels are grouped into a single kubectl call.
+
+        Args:
+            nodes: Inventory node dictionaries (hostname, location, node_type)
+
+        Returns:
+            Command string, or None if there is nothing to apply
+        """
+        label_groups: Dict[Tuple[Tuple[str, str], ...], List[str]] = {}
+        taint_groups: Dict[Tuple[str, ...], List[str]] = {}
+
+        for node in nodes:
+            labels = tuple(sorted(node_labels(node).items()))
+            if labels:
+                label_groups.setdefault(labels, []).append(node["hostname"])
+            taints = tuple(self.taints.get(str(node.get("node_type", "")), []))
+            if taints:
+                taint_groups.setdefault(taints, []).append(node["hostname"])
+
+        commands = []
+        for labels, hostnames in label_groups.items():
+            args = " ".join(shlex.quote(f"{key}={value}") for key, value in labels)
+            names = " ".join(shlex.quote(name) for name in hostnames)
+            commands.append(f"{self.kubectl} label nodes {names} {args} --overwrite")
+        for taints, hostnames in taint_groups.items():
+            args = " ".join(shlex.quote(taint) for taint in taints)
+            names = " ".join(shlex.quote(name) for name in hostnames)
+            commands.append(f"{self.kubectl} taint nodes {names} {args} --overwrite")
+
+        return " && ".join(commands) if commands else None
+
+    def check_agents(self, nodes: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Check the k3s agent service on several nodes in parallel.
+
+        Args:
+            nodes: Inventory node dictionaries (ansible_host, ansible_user, ssh_key)
+
+        Returns:
+            Dictionary of hostname -> agent state or error message
+        """
+        def check(node: Dict[str, Any]) -> Tuple[str, str]:
+            key = node.get("ssh_key")
+            stdout, stderr, exit_code = self.ssh_manager.execute_command(
+                node.get("ansible_host") or node["hostname"],
+                node.get("ansible_user", "ubuntu"),
+                AGENT_CHECK_COMMAND,
+                Path(key).expanduser() if key else self.key,
+            )
+            state = stdout.strip().splitlines()[-1] if stdout.strip() else ""
+            return node["hostname"], state or stderr.strip() or f"exit {exit_code}"
+
+        if not nodes:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(nodes))) as pool:
+            return dict(pool.map(check, nodes))
+
+    def finalize(
+        self,
+        nodes: List[Dict[str, Any]],
+        timeout: float = 600.0,
+        interval: float = 10.0,
+        progress: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Wait for a batch to join, label and taint it, and report readiness.
+
+        Args:
+            nodes: Inventory node dictionaries (must include hostname)
+            timeout: Seconds to wait for nodes to become Ready
+            interval: Seconds between cluster polls
+            progress: Optional callback for status messages
+
+        Returns:
+            Dictionary of hostname -> {'registered', 'ready', 'labeled', 'detail'}
+        """
+        hostnames = [node["hostname"] for node in nodes]
+        cluster = self.wait_for_nodes(hostnames, timeout, interval, progress)
+
+        registered = [node for node in nodes if node["hostname"] in cluster]
+        missing = [node for node in nodes if node["hostname"] not in cluster]
+
+        label_error = ""
+        command = self.label_command(registered)
+        if command:
+            if progress:
+                progress(f"Labeling {len(registered)} nodes on {self.master_host}")
+            try:
+                self._run_on_master(command)
+            except Exception as e:
+                label_error = str(e)
+
+        agents = self.check_agents(missing)
+
+        report = {}
+        for node in nodes:
+            hostname = node["hostname"]
+            state = cluster.get(hostname)
+            if state is None:
+                detail = f"not registered (k3s agent: {agents.get(hostname, 'unknown')})"
+            elif label_error:
+                detail = f"labeling failed: {label_error}"
+            elif not state["ready"]:
+                detail = "registered, not Ready"
+            else:
+                detail = "Ready"
+
+            report[hostname] = {
+                "registered": state is not None,
+                "ready": bool(state and state["ready"]),
+                "labeled": state is not None and not label_error,
+                "detail": detail,
+            }
+
+        return report
+
+    @staticmethod
+    def format_report(report: Dict[str, Dict[str, Any]]) -> List[str]:
+        """
+        Format a readiness report as aligned text lines.
+
+        Args:
+            report: Result of finalize()
+
+        Returns:
+            List of lines, ending with a summary
+        """
+        width = max((len(hostname) for hostname in report), default=8)
+        lines = []
+        for hostname in sorted(report):
+            entry = report[hostname]
+            mark = "✓" if entry["ready"] and entry["labeled"] else "✗"
+            lines.append(f"{mark} {hostname:<{width}}  {entry['detail']}")
+
+        ready = sum(1 for entry in report.values() if entry["ready"] and entry["labeled"])
+        lines.append(f"{ready}/{len(report)} nodes joined, Ready and labeled")
+        return lines
@@ -3,10 +3,13 @@
 import json
 import os
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Callable
 from datetime import datetime
 
 
+DEFAULT_CONFIG_PATH = Path.home() / ".homelab-deploy.conf"
+
+
 class ConfigManager:
     """Manage TUI configuration and deployment tracking."""
 
@@ -18,10 +21,25 @@ class ConfigManager:
             config_path: Path to config file (default: ~/.homelab-deploy.conf)
         """
         if config_path is None:
-            config_path = Path.home() / ".homelab-deploy.conf"
+            config_path = DEFAULT_CONFIG_PATH
 
         self.config_path = Path(config_path)
         self.config_data: Dict[str, Any] = {}
+        self.listeners: List[Callable[[], None]] = []
+
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """
+        Register a callback invoked whenever the configuration changes.
+
+        Args:
+            callback: Function called with no arguments after a change
+        """
+        self.listeners.append(callback)
+
+    def _notify_listeners(self) -> None:
+        """Invoke all change listeners."""
+        for callback in self.listeners:
+            callback()
 
     def load_config(self) -> Dict[str, Any]:
         """
@@ -30,6 +48,8 @@ class ConfigManager:
         Returns:
             Dictionary containing configuration data
         """
+        previous = self.config_data
+
         if not self.config_path.exists():
             # Return default configuration
             self.config_data = self._get_default_config()
@@ -45,6 +65,10 @@ class ConfigManager:
                 if key not in self.config_data:
                     self.config_data[key] = value
 
+            # Only tell subscribers when a reload actually changed something
+            if previous and previous != self.config_data:
+                self._notify_listeners()
+
             return self.config_data
 
         except Exception as e:
@@ -71,6 +95,7 @@ class ConfigManager:
             with open(self.config_path, 'w') as f:
                 json.dump(self.config_data, f, indent=2)
 
+            self._notify_listeners()
             return True
 
         except Exception as e:
@@ -92,6 +117,9 @@ class ConfigManager:
         return {
             "last_vmid": 205,
             "ssh_key": "~/.ssh/homelab_rsa",
+            "host_key_policy": "accept-new",
+            "ssh_use_agent": False,
+            "record_sessions": True,
             "proxmox_host": "kapmox",
             "proxmox_user": "root",
             "tailscale_key": tailscale_key,
@@ -126,6 +154,49 @@ class ConfigManager:
                 "node_type": "k3s-worker",
                 "storage": "local-lvm"
             },
+            "dashboard": {
+                "poll_interval": 15,
+                "poll_jitter": 0.2
+            },
+            "dialer": {
+                "enabled": True,
+                "stagger": 0.25,
+                "ttl": 300
+            },
+            "preflight": {
+                "on_startup": True,
+                "connect_timeout": 2,
+                "ssh_timeout": 5,
+                "ttl": 60,
+                "max_workers": 16
+            },
+            "golden_image": {
+                "enabled": False,
+                "image": "",
+                "k3s_version": "",
+                "packages": ""
+            },
+            "k3s_join": {
+                "master_user": "root",
+                "timeout": 600,
+                "taints": {
+                    "backup": ["kapnode.io/backup=true:NoSchedule"]
+                }
+            },
+            "rolling_update": {
+                "batch_size": 2,
+                "max_per_site": 1,
+                "failure_threshold": 0.25,
+                "drain_timeout": 300,
+                "ready_timeout": 600
+            },
+            "proxmox_api": {
+                "enabled": False,
+                "url": "",
+                "token_id": "",
+                "token_secret": "",
+                "verify_ssl": False
+            },
             "deployment_history": []
         }
 
@@ -0,0 +1,198 @@
+"""Dialer - Race TCP connections across all known addresses of a node.
+
+Inventory nodes are usually reachable several ways: ansible_host (the
+Tailscale 100.x address), initial_ip on the site LAN and the MagicDNS
+tailscale_name. A happy-eyeballs dialer (RFC 8305 style) starts a connection
+to the first address, then one more every `stagger` seconds (or immediately
+after a failure), and keeps whichever completes first. The winning address
+is remembered per node for `ttl` seconds and tried first next time, so a
+dead route costs at most one stagger delay instead of a full timeout.
+"""
+
+import queue
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .tracing import tracer
+
+
+DEFAULT_STAGGER = 0.25
+DEFAULT_TTL = 300.0
+
+# Inventory fields holding a node's addresses, in default preference order
+ADDRESS_FIELDS = ("ansible_host", "initial_ip", "tailscale_name")
+
+
+def node_addresses(node: Dict[str, Any]) -> List[str]:
+    """Get the distinct addresses of an inventory node in preference order."""
+    addresses: List[str] = []
+    for field in ADDRESS_FIELDS:
+        value = node.get(field)
+        if value and str(value) not in addresses:
+            addresses.append(str(value))
+    return addresses
+
+
+class Dialer:
+    """Open TCP connections, racing all known addresses of a host."""
+
+    def __init__(
+        self,
+        nodes: Optional[Callable[[], Iterable[Dict[str, Any]]]] = None,
+        stagger: float = DEFAULT_STAGGER,
+        ttl: float = DEFAULT_TTL,
+    ):
+        """
+        Initialize dialer.
+
+        Args:
+            nodes: Returns the inventory nodes whose addresses are raced
+                (called on first use and after reset())
+            stagger: Seconds between starting connection attempts
+            ttl: Seconds the fastest address of a node is remembered
+        """
+        self.nodes = nodes
+        self.stagger = stagger
+        self.ttl = ttl
+
+        self.lock = threading.Lock()
+        # Any name or address of a node -> all of its addresses
+        self._aliases: Optional[Dict[str, Tuple[str, ...]]] = None
+        # All addresses of a node -> (fastest address, when it won)
+        self._preferred: Dict[Tuple[str, ...], Tuple[str, float]] = {}
+
+    def reset(self) -> None:
+        """Re-read node addresses on next use (e.g. after an inventory change)."""
+        with self.lock:
+            self._aliases = None
+
+    def _load_aliases(self) -> Dict[str, Tuple[str, ...]]:
+        with self.lock:
+            if self._aliases is not None:
+                return self._aliases
+
+        aliases: Dict[str, Tuple[str, ...]] = {}
+        for node in (self.nodes() if self.nodes else []):
+            addresses = tuple(node_addresses(node))
+            if len(addresses) < 2:
+                continue
+            for name in addresses + (str(node.get("hostname", "")),):
+                if name:
+                    aliases.setdefault(name, addresses)
+
+        with self.lock:
+            self._aliases = aliases
+        return aliases
+
+    def candidates(self, host: str) -> List[str]:
+        """
+        Get the addresses to race for a host, fastest known first.
+
+        Returns:
+            The host's node addresses, or just [host] if it has no alternatives
+        """
+        addresses = self._load_aliases().get(host)
+        if not addresses:
+            return [host]
+
+        with self.lock:
+            preferred = self._preferred.get(addresses)
+
+        ordered = list(addresses)
+        if preferred and time.monotonic() - preferred[1] < self.ttl and preferred[0] in ordered:
+            ordered.remove(preferred[0])
+            ordered.insert(0, preferred[0])
+        return ordered
+
+    def preferred(self, host: str) -> Optional[str]:
+        """Get the remembered fastest address of a host, if still valid."""
+        addresses = self._load_aliases().get(host)
+        with self.lock:
+            entry = self._preferred.get(addresses) if addresses else None
+        if entry and time.monotonic() - entry[1] < self.ttl:
+            return entry[0]
+        return None
+
+    def connect(self, host: str, port: int = 22, timeout: float = 30.0) -> socket.socket:
+        """
+        Connect to a host over its fastest reachable address.
+
+        Args:
+            host: Hostname or address (any alias of an inventory node)
+            port: TCP port
+            timeout: Overall timeout in seconds
+
+        Returns:
+            Connected socket
+
+        Raises:
+            OSError: If no address could be reached (the last error)
+        """
+        candidates = self.candidates(host)
+        if len(candidates) == 1:
+            return socket.create_connection((candidates[0], port), timeout=timeout)
+
+        with tracer.span("dialer.connect", host=host, candidates=len(candidates)) as span:
+            address, sock = self._race(candidates, port, timeout)
+            span.tag(address=address)
+
+        addresses = self._load_aliases().get(host)
+        if addresses:
+            with self.lock:
+                self._preferred[addresses] = (address, time.monotonic())
+        return sock
+
+    def _race(self, candidates: List[str], port: int, timeout: float) -> Tuple[str, socket.socket]:
+        """Start staggered attempts and return the first connected (address, socket)."""
+        results: "queue.Queue[Tuple[str, Optional[socket.socket], Optional[OSError]]]" = queue.Queue()
+        deadline = time.monotonic() + timeout
+
+        def attempt(address: str) -> None:
+            try:
+                sock = socket.create_connection((address, port), timeout=max(deadline - time.monotonic(), 0.1))
+            except OSError as e:
+                results.put((address, None, e))
+                return
+            results.put((address, sock, None))
+
+        pending = list(candidates)
+        running = 0
+        last_error: Optional[OSError] = None
+
+        while True:
+            if pending:
+                threading.Thread(target=attempt, args=(pending.pop(0),), daemon=True).start()
+                running += 1
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            try:
+                address, sock, error = results.get(timeout=min(self.stagger, remaining) if pending else remaining)
+            except queue.Empty:
+                continue
+
+            running -= 1
+            if sock is not None:
+                if running:
+                    threading.Thread(target=self._close_losers, args=(results, running), daemon=True).start()
+                return address, sock
+
+            last_error = error
+            if not pending and not running:
+                break
+
+        if running:
+            threading.Thread(target=self._close_losers, args=(results, running), daemon=True).start()
+        raise last_error or socket.timeout(f"timed out connecting to {', '.join(candidates)}")
+
+    @staticmethod
+    def _close_losers(results: queue.Queue, count: int) -> None:
+        """Close connections that completed after the race was decided."""
+        for _ in range(count):
+            _, sock, _ = results.get()
+            if sock is not None:
+                sock.close()
@@ -0,0 +1,250 @@
+"""File Watcher - Notice external edits to inventory and config files."""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Watch the parent directory so atomic replaces (write + rename) are seen too
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE | IN_ATTRIB
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_inotify():
+    """Load libc inotify functions, or return None if unavailable."""
+    if not hasattr(os, "uname") or os.uname().sysname != "Linux":
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class FileWatcher:
+    """
+    Watch a set of files and call back once per burst of changes.
+
+    Uses inotify through ctypes on Linux and falls back to polling
+    os.stat() elsewhere (or when inotify cannot be initialised). Events are
+    debounced per file, so an editor or Ansible run that writes a file in
+    several steps triggers a single callback.
+    """
+
+    def __init__(
+        self,
+        paths: List[Path],
+        callback: Callable[[Path], None],
+        debounce: float = 0.5,
+        poll_interval: float = 2.0,
+        use_inotify: bool = True,
+    ):
+        """
+        Initialize file watcher.
+
+        Args:
+            paths: Files to watch (they do not need to exist yet)
+            callback: Called with the changed path from the watcher thread
+            debounce: Seconds of quiet required before calling back
+            poll_interval: Seconds between stat checks in polling mode
+            use_inotify: Try inotify before falling back to polling
+        """
+        self.paths = [Path(p).expanduser().resolve() for p in paths]
+        self.callback = callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+
+        self.mode: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._pending: Dict[Path, float] = {}
+        self._libc = None
+        # inotify watch descriptor -> watched directory
+        self._watches: Dict[int, Path] = {}
+
+    def start(self) -> None:
+        """Start watching in a daemon thread."""
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        fd = self._init_inotify() if self.use_inotify else None
+
+        if fd is not None:
+            self.mode = "inotify"
+            target = self._run_inotify
+            args: Tuple = (fd,)
+        else:
+            self.mode = "polling"
+            target = self._run_polling
+            args = ()
+
+        self._thread = threading.Thread(target=target, args=args, name="file-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching and wait for the thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _init_inotify(self) -> Optional[int]:
+        """Create an inotify descriptor watching each file's directory."""
+        libc = _load_inotify()
+        if libc is None:
+            return None
+
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+
+        self._libc = libc
+        self._watches = {}
+        if not self._add_watches(fd):
+            os.close(fd)
+            return None
+
+        return fd
+
+    def _add_watches(self, fd: int) -> bool:
+        """
+        Watch each file's directory, or its nearest existing ancestor.
+
+        A missing directory (e.g. ~/.homelab before the first deployment) is
+        covered by watching the closest ancestor that exists; once the
+        directory is created the watch moves down to it.
+
+        Returns:
+            False if a watch could not be added
+        """
+        for directory in {path.parent for path in self.paths}:
+            while not directory.is_dir() and directory.parent != directory:
+                directory = directory.parent
+            if directory in self._watches.values():
+                continue
+            wd = self._libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                return False
+            self._watches[wd] = directory
+
+        return True
+
+    def _missing_parents(self) -> Set[Path]:
+        """Get the directories of watched files that are not watched themselves yet."""
+        watched = set(self._watches.values())
+        return {path.parent for path in self.paths if path.parent not in watched}
+
+    def _mark(self, path: Path) -> None:
+        """Schedule a debounced callback for a path."""
+        self._pending[path] = time.monotonic() + self.debounce
+
+    def _flush(self) -> float:
+        """
+        Fire callbacks whose debounce period has passed.
+
+        Returns:
+            Seconds until the next pending callback is due (or poll interval)
+        """
+        now = time.monotonic()
+
+        for path, due in list(self._pending.items()):
+            if due <= now:
+                del self._pending[path]
+                try:
+                    self.callback(path)
+                except Exception as e:
+                    print(f"Error handling change to {path}: {e}")
+
+        if self._pending:
+            return max(min(self._pending.values()) - now, 0.0)
+        return self.poll_interval
+
+    def _run_inotify(self, fd: int) -> None:
+        """Read inotify events until stopped."""
+        watched = {(path.parent, path.name): path for path in self.paths}
+        missing = self._missing_parents()
+
+        try:
+            while not self._stop.is_set():
+                timeout = min(self._flush(), 0.5)
+                readable, _, _ = select.select([fd], [], [], timeout)
+                if not readable:
+                    continue
+
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+
+                offset = 0
+                rescan = False
+                while offset + EVENT_HEADER.size <= len(data):
+                    wd, _, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+                    start = offset + EVENT_HEADER.size
+                    name = data[start:start + name_len].rstrip(b"\0").decode(errors="replace")
+                    offset = start + name_len
+
+                    directory = self._watches.get(wd)
+                    # Directory events cover sibling files; keep only ours
+                    if (directory, name) in watched:
+                        self._mark(watched[(directory, name)])
+                    elif directory is not None and name:
+                        # An entry on the way to a missing directory appeared
+                        entry = directory / name
+                        if any(parent == entry or entry in parent.parents for parent in missing):
+                            rescan = True
+
+                if rescan:
+                    # Something appeared on the way to a missing directory;
+                    # files created before its watch was added count as changed
+                    before = set(self._watches.values())
+                    self._add_watches(fd)
+                    for path in self.paths:
+                        if path.parent not in before and path.parent in self._watches.values() and path.exists():
+                            self._mark(path)
+                    missing = self._missing_parents()
+        finally:
+            os.close(fd)
+
+    def _signature(self, path: Path) -> Optional[Tuple[int, int, int]]:
+        """Get a cheap change signature (inode, size, mtime) for a path."""
+        try:
+            stat = path.stat()
+            return stat.st_ino, stat.st_size, stat.st_mtime_ns
+        except OSError:
+            return None
+
+    def _run_polling(self) -> None:
+        """Poll file signatures until stopped."""
+        signatures = {path: self._signature(path) for path in self.paths}
+
+        while not self._stop.is_set():
+            for path in self.paths:
+                signature = self._signature(path)
+                if signature != signatures[path]:
+                    signatures[path] = signature
+                    self._mark(path)
+
+            self._stop.wait(min(self._flush(), self.poll_interval))
@@ -0,0 +1,252 @@
+"""Fleet Status - Poll Proxmox hosts in bulk for the cluster dashboard."""
+
+import json
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .ssh_manager import SSHManager
+from .inventory import InventoryManager
+
+if TYPE_CHECKING:
+    from .proxmox_api import ProxmoxAPI
+
+
+CLUSTER_RESOURCES_COMMAND = "pvesh get /cluster/resources --output-format json"
+
+# Dashboard columns in display order: (column key, header label)
+FLEET_COLUMNS = [
+    ("hostname", "Hostname"),
+    ("location", "Location"),
+    ("vmid", "VMID"),
+    ("status", "Status"),
+    ("node", "Proxmox Node"),
+    ("load", "Load"),
+    ("memory", "Memory"),
+    ("disk", "Disk"),
+]
+
+
+def _format_bytes(value: Any) -> str:
+    """Format a byte count as GiB with one decimal."""
+    try:
+        return f"{float(value) / (1024 ** 3):.1f}"
+    except (TypeError, ValueError):
+        return "?"
+
+
+def _format_usage(used: Any, total: Any) -> str:
+    """Format a used/total byte pair, e.g. '4.2/16.0 GiB'."""
+    if not total:
+        return "N/A"
+    return f"{_format_bytes(used)}/{_format_bytes(total)} GiB"
+
+
+def _format_load(resource: Dict[str, Any]) -> str:
+    """Format CPU utilisation of a resource as a percentage of its cores."""
+    if resource.get("status") != "running" and resource.get("type") == "qemu":
+        return "-"
+    try:
+        return f"{float(resource.get('cpu', 0)) * 100:.1f}%"
+    except (TypeError, ValueError):
+        return "?"
+
+
+class FleetPoller:
+    """Collect VM status for all inventory nodes with one request per Proxmox host."""
+
+    def __init__(
+        self,
+        inventory: InventoryManager,
+        ssh_manager: Optional[SSHManager] = None,
+        interval: float = 15.0,
+        jitter: float = 0.2,
+        fallback_host: Optional[Dict[str, Any]] = None,
+        api: Optional["ProxmoxAPI"] = None,
+    ):
+        """
+        Initialize fleet poller.
+
+        Args:
+            inventory: Inventory manager providing nodes and Proxmox hosts
+            ssh_manager: SSH manager instance (creates new one if None)
+            interval: Base seconds between polls
+            jitter: Fraction of the interval to randomise by (0.2 = ±20%)
+            fallback_host: Proxmox host to poll when the inventory lists none
+                (dict with ansible_host, ansible_user and ssh_key)
+            api: Proxmox API client; when set, each poll is a single HTTP
+                request to /cluster/resources instead of SSH to every host
+        """
+        self.inventory = inventory
+        self.ssh_manager = ssh_manager or SSHManager()
+        self.interval = max(float(interval), 1.0)
+        self.jitter = min(max(float(jitter), 0.0), 1.0)
+        self.fallback_host = fallback_host
+        self.api = api
+
+        # Resources from the most recent poll, for re-matching on inventory changes
+        self.last_resources: List[Dict[str, Any]] = []
+
+    def next_delay(self) -> float:
+        """
+        Get the delay before the next poll.
+
+        Jitter keeps several open dashboards from hitting the hosts in lockstep.
+
+        Returns:
+            Seconds to wait
+        """
+        spread = self.interval * self.jitter
+        return self.interval + random.uniform(-spread, spread)
+
+    def get_proxmox_hosts(self) -> List[Dict[str, Any]]:
+        """
+        Get the Proxmox hosts to poll.
+
+        Returns:
+            List of host dictionaries from the proxmox_hosts inventory group
+        """
+        hosts = [
+            node for node in self.inventory.list_nodes()
+            if node.get("group") == "proxmox_hosts"
+        ]
+
+        if not hosts and self.fallback_host:
+            hosts = [self.fallback_host]
+
+        return hosts
+
+    def fetch_cluster_resources(self, host: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Fetch all cluster resources from one Proxmox host.
+
+        Args:
+            host: Host dictionary (ansible_host, ansible_user, ssh_key)
+
+        Returns:
+            List of resource dictionaries as returned by pvesh
+
+        Raises:
+            RuntimeError: If the command fails or returns invalid JSON
+        """
+        address = host.get("ansible_host") or host.get("hostname")
+        key = host.get("ssh_key")
+
+        stdout, stderr, exit_code = self.ssh_manager.execute_command(
+            host=address,
+            user=host.get("ansible_user", "root"),
+            command=CLUSTER_RESOURCES_COMMAND,
+            key=Path(key).expanduser() if key else None,
+        )
+
+        if exit_code != 0:
+            raise RuntimeError(stderr.strip() or f"pvesh exited with {exit_code}")
+
+        try:
+            resources = json.loads(stdout)
+        except ValueError as e:
+            raise RuntimeError(f"Invalid pvesh output: {e}")
+
+        if not isinstance(resources, list):
+            raise RuntimeError("Unexpected pvesh output format")
+
+        return resources
+
+    def poll(self) -> Tuple[Dict[str, Dict[str, str]], Dict[str, str]]:
+        """
+        Poll every Proxmox host once and build dashboard rows.
+
+        Returns:
+            Tuple of (rows keyed by hostname, errors keyed by Proxmox host)
+        """
+        resources: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+
+        if self.api is not None:
+            try:
+                self.last_resources = self.api.cluster_resources()
+                return self.build_rows(self.last_resources), errors
+            except Exception as e:
+                # Fall back to SSH so the dashboard keeps working
+                errors["api"] = str(e)
+
+        for host in self.get_proxmox_hosts():
+            name = host.get("hostname") or host.get("ansible_host", "?")
+            try:
+                for resource in self.fetch_cluster_resources(host):
+                    # Hosts in the same cluster report the same resources
+                    resource_id = resource.get("id") or f"{resource.get('type')}/{resource.get('vmid')}"
+                    resources[resource_id] = resource
+            except Exception as e:
+                errors[name] = str(e)
+
+        self.last_resources = list(resources.values())
+        return self.build_rows(self.last_resources, unreachable=bool(errors)), errors
+
+    def build_rows(
+        self,
+        resources: List[Dict[str, Any]],
+        unreachable: bool = False,
+    ) -> Dict[str, Dict[str, str]]:
+        """
+        Match cluster resources to inventory nodes.
+
+        Args:
+            resources: Resource dictionaries from /cluster/resources
+            unreachable: Whether any host failed (unmatched nodes show 'unknown')
+
+        Returns:
+            Dictionary of hostname -> column key -> display value
+        """
+        vms_by_name: Dict[str, Dict[str, Any]] = {}
+        vms_by_id: Dict[int, Dict[str, Any]] = {}
+        hosts_by_name: Dict[str, Dict[str, Any]] = {}
+
+        for resource in resources:
+            if resource.get("type") == "qemu":
+                vms_by_name[resource.get("name", "")] = resource
+                try:
+                    vms_by_id[int(resource.get("vmid"))] = resource
+                except (TypeError, ValueError):
+                    pass
+            elif resource.get("type") == "node":
+                hosts_by_name[resource.get("node", "")] = resource
+
+        rows: Dict[str, Dict[str, str]] = {}
+        missing = "unknown" if unreachable else "missing"
+
+        for node in self.inventory.list_nodes():
+            hostname = node.get("hostname", "")
+            if node.get("group") == "proxmox_hosts":
+                resource = hosts_by_name.get(hostname)
+            else:
+                resource = vms_by_name.get(hostname)
+                if resource is None and node.get("vmid") is not None:
+                    try:
+                        resource = vms_by_id.get(int(node["vmid"]))
+                    except (TypeError, ValueError):
+                        resource = None
+
+            row = {
+                "hostname": hostname,
+                "location": str(node.get("location", "")),
+                "vmid": str(node.get("vmid", "")),
+                "status": missing,
+                "node": "",
+                "load": "-",
+                "memory": "-",
+                "disk": "-",
+            }
+
+            if resource is not None:
+                row.update({
+                    "status": str(resource.get("status", "unknown")),
+                    "node": str(resource.get("node", "")),
+                    "load": _format_load(resource),
+                    "memory": _format_usage(resource.get("mem"), resource.get("maxmem")),
+                    "disk": _format_usage(resource.get("disk"), resource.get("maxdisk")),
+                })
+
+            rows[hostname] = row
+
+        return rows
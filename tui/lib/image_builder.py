@@ -0,0 +1,125 @@
+"""Image Builder - Build versioned golden images on Proxmox hosts."""
+
+import shlex
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .script_executor import ScriptExecutor
+
+
+BUILD_SCRIPT = Path(__file__).parent.parent.parent / "scripts" / "build-golden-image.sh"
+REMOTE_BUILD_SCRIPT = "/tmp/build-golden-image.sh"
+
+# Last line printed by build-golden-image.sh
+IMAGE_MARKER = "GOLDEN_IMAGE="
+
+
+class ImageBuilder:
+    """
+    Build a golden VM image on a Proxmox host.
+
+    The build runs build-golden-image.sh remotely, which customizes the Ubuntu
+    cloud image offline with virt-customize and names the result by a hash of
+    its recipe. Rebuilding an unchanged recipe is a no-op, so it is cheap to
+    run before every batch of deployments.
+    """
+
+    def __init__(self, executor: Optional[ScriptExecutor] = None):
+        """
+        Initialize image builder.
+
+        Args:
+            executor: Script executor instance (creates new one if None)
+        """
+        self.executor = executor or ScriptExecutor()
+        self.image_name: Optional[str] = None
+
+    def build_command(
+        self,
+        packages: str = "",
+        k3s_version: str = "",
+        force: bool = False,
+    ) -> str:
+        """
+        Build the remote build command.
+
+        Args:
+            packages: Comma-separated package list (script default if empty)
+            k3s_version: K3s release to bake in (latest stable if empty)
+            force: Rebuild even if the versioned image exists
+
+        Returns:
+            Shell-escaped command string
+        """
+        cmd_parts = ["bash", REMOTE_BUILD_SCRIPT]
+
+        if packages:
+            cmd_parts.extend(["--packages", shlex.quote(packages)])
+        if k3s_version:
+            cmd_parts.extend(["--k3s-version", shlex.quote(k3s_version)])
+        if force:
+            cmd_parts.append("--force")
+
+        return " ".join(cmd_parts)
+
+    @staticmethod
+    def parse_image_name(line: str) -> Optional[str]:
+        """
+        Extract the image file name from a build output line.
+
+        Args:
+            line: Single line of output
+
+        Returns:
+            Image file name, or None if the line is not the result marker
+        """
+        line = line.strip()
+        if line.startswith(IMAGE_MARKER):
+            return line[len(IMAGE_MARKER):] or None
+        return None
+
+    def build(
+        self,
+        host: str,
+        user: str,
+        key: Optional[Path] = None,
+        packages: str = "",
+        k3s_version: str = "",
+        force: bool = False,
+    ) -> Iterator[str]:
+        """
+        Copy the build script to the host and stream its output.
+
+        After the iterator is exhausted, image_name holds the built (or
+        already current) image, or None if the build failed.
+
+        Args:
+            host: Proxmox hostname or IP
+            user: Username for SSH connection
+            key: Path to SSH private key
+            packages: Comma-separated package list (script default if empty)
+            k3s_version: K3s release to bake in (latest stable if empty)
+            force: Rebuild even if the versioned image exists
+
+        Yields:
+            Lines of build output
+        """
+        self.image_name = None
+
+        copied = self.executor.ssh_manager.scp_file(
+            local_path=BUILD_SCRIPT,
+            remote_path=REMOTE_BUILD_SCRIPT,
+            host=host,
+            user=user,
+            key=key,
+        )
+        if not copied:
+            yield "ERROR: Failed to copy build script to Proxmox host"
+            return
+
+        command = self.build_command(packages, k3s_version, force)
+        for line in self.executor.execute_deployment(command, host, user, key):
+            image_name = self.parse_image_name(line)
+            if image_name:
+                self.image_name = image_name
+            yield line
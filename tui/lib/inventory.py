@@ -1,10 +1,39 @@
 """Inventory Manager - Read/write Ansible-compatible inventory files."""
 
-import yaml
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Callable
 from datetime import datetime
 
+from .metrics import metrics
+from .tracing import tracer
+
+
+DEFAULT_INVENTORY_PATH = Path.home() / ".homelab" / "inventory.yml"
+
+
+def diff_nodes(
+    old: Dict[str, Dict[str, Any]],
+    new: Dict[str, Dict[str, Any]],
+) -> Dict[str, List[str]]:
+    """
+    Compare two node indexes (hostname -> node info).
+
+    Args:
+        old: Previous node index
+        new: Current node index
+
+    Returns:
+        Dictionary with sorted 'added', 'removed' and 'changed' hostnames
+    """
+    return {
+        "added": sorted(hostname for hostname in new if hostname not in old),
+        "removed": sorted(hostname for hostname in old if hostname not in new),
+        "changed": sorted(
+            hostname for hostname, node in new.items()
+            if hostname in old and old[hostname] != node
+        ),
+    }
+
 
 class InventoryManager:
     """Manage Ansible-compatible inventory files."""
@@ -17,10 +46,49 @@ class InventoryManager:
             inventory_path: Path to inventory file (default: ~/.homelab/inventory.yml)
         """
         if inventory_path is None:
-            inventory_path = Path.home() / ".homelab" / "inventory.yml"
+            inventory_path = DEFAULT_INVENTORY_PATH
 
         self.inventory_path = Path(inventory_path)
         self.inventory_data: Dict[str, Any] = {}
+        self.listeners: List[Callable[[Dict[str, List[str]]], None]] = []
+
+        # Node index as last reported to listeners, used to compute diffs
+        self.snapshot: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def add_listener(self, callback: Callable[[Dict[str, List[str]]], None]) -> None:
+        """
+        Register a callback invoked whenever the inventory data changes.
+
+        Args:
+            callback: Function called with the node diff (see diff_nodes)
+        """
+        self.listeners.append(callback)
+
+    def _notify_listeners(self) -> None:
+        """Invoke all change listeners if any node was added, removed or changed."""
+        current = self.node_index()
+        previous = self.snapshot
+        self.snapshot = current
+
+        # The first load only establishes the baseline
+        if previous is None:
+            return
+
+        diff = diff_nodes(previous, current)
+        if not any(diff.values()):
+            return
+
+        for callback in self.listeners:
+            callback(diff)
+
+    def node_index(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get all nodes keyed by hostname.
+
+        Returns:
+            Dictionary of hostname -> node info (copies, as from list_nodes)
+        """
+        return {node["hostname"]: node for node in self.list_nodes()}
 
     def load_inventory(self, path: Optional[Path] = None) -> Dict[str, Any]:
         """
@@ -47,16 +115,24 @@ class InventoryManager:
                     }
                 }
             }
+            self._notify_listeners()
             return self.inventory_data
 
         try:
-            with open(self.inventory_path, 'r') as f:
-                self.inventory_data = yaml.safe_load(f) or {}
+            import yaml
+
+            with tracer.span("inventory.load", path=str(self.inventory_path)), \
+                    metrics.inventory_load_seconds.time():
+                with open(self.inventory_path, 'r') as f:
+                    self.inventory_data = yaml.safe_load(f) or {}
 
             # Ensure basic structure exists
             if "all" not in self.inventory_data:
                 self.inventory_data["all"] = {"children": {}}
 
+            # Only tell subscribers when a reload actually changed a node
+            self._notify_listeners()
+
             return self.inventory_data
 
         except Exception as e:
@@ -81,18 +157,22 @@ class InventoryManager:
             self.inventory_data = data
 
         try:
+            import yaml
+
             # Ensure directory exists
             self.inventory_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(self.inventory_path, 'w') as f:
-                yaml.safe_dump(
-                    self.inventory_data,
-                    f,
-                    default_flow_style=False,
-                    sort_keys=False,
-                    indent=2,
-                )
-
+            with tracer.span("inventory.save", path=str(self.inventory_path)):
+                with open(self.inventory_path, 'w') as f:
+                    yaml.safe_dump(
+                        self.inventory_data,
+                        f,
+                        default_flow_style=False,
+                        sort_keys=False,
+                        indent=2,
+                    )
+
+            self._notify_listeners()
             return True
 
         except Exception as e:
@@ -0,0 +1,271 @@
+"""Known Hosts - Managed SSH host-key store with parallel key scanning."""
+
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+# paramiko is imported on first use to keep it off the TUI startup path
+if TYPE_CHECKING:
+    import paramiko
+
+
+DEFAULT_KNOWN_HOSTS_PATH = Path.home() / ".homelab" / "known_hosts"
+
+# Policies for hosts that are not in the store yet
+ACCEPT_NEW = "accept-new"   # trust on first use, then pin
+STRICT = "strict"           # refuse until the host has been scanned
+
+
+def host_entry(host: str, port: int = 22) -> str:
+    """Get the known_hosts name for a host ('[host]:port' for non-standard ports)."""
+    return host if port == 22 else f"[{host}]:{port}"
+
+
+class KnownHostsStore:
+    """
+    Host keys for the fleet, kept in one OpenSSH-format file.
+
+    The file is parsed once per process. Connections load only the keys for
+    their target, so paramiko offers the pinned key type first (no
+    algorithm renegotiation) and raises BadHostKeyException on a mismatch.
+    """
+
+    def __init__(self, path: Optional[Path] = None, policy: str = ACCEPT_NEW):
+        """
+        Initialize known hosts store.
+
+        Args:
+            path: known_hosts file (default: ~/.homelab/known_hosts)
+            policy: ACCEPT_NEW or STRICT for hosts not in the store
+        """
+        self.path = Path(path) if path else DEFAULT_KNOWN_HOSTS_PATH
+        self.policy = policy
+        self.lock = threading.Lock()
+        self._keys: Optional["paramiko.HostKeys"] = None
+
+    @property
+    def keys(self) -> "paramiko.HostKeys":
+        """Get the parsed host keys (loaded on first access)."""
+        with self.lock:
+            if self._keys is None:
+                import paramiko
+                self._keys = paramiko.HostKeys()
+                if self.path.exists():
+                    self._keys.load(str(self.path))
+            return self._keys
+
+    def lookup(self, host: str, port: int = 22) -> Dict[str, "paramiko.PKey"]:
+        """
+        Get the pinned keys of a host.
+
+        Returns:
+            Dictionary of key type -> key (empty if unknown)
+        """
+        keys = self.keys
+        with self.lock:
+            entry = keys.lookup(host_entry(host, port))
+            return dict(entry) if entry else {}
+
+    def add(self, names: Iterable[str], key: "paramiko.PKey", port: int = 22) -> None:
+        """
+        Pin a host key under one or more names and append it to the file.
+
+        Args:
+            names: Hostnames/addresses the host is reached by
+            key: Server host key
+            port: SSH port
+        """
+        keys = self.keys
+        entries = [host_entry(name, port) for name in dict.fromkeys(names) if name]
+
+        with self.lock:
+            # A host can have one pinned key per type; a changed key of a
+            # pinned type needs a rewrite, a new type is appended
+            new = []
+            changed = False
+            for entry in entries:
+                pinned = keys.lookup(entry) or {}
+                if key.get_name() not in pinned:
+                    new.append(entry)
+                elif pinned[key.get_name()].asbytes() != key.asbytes():
+                    changed = True
+                keys.add(entry, key.get_name(), key)
+
+            if changed:
+                self._save()
+            elif new:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a") as f:
+                    for entry in new:
+                        f.write(f"{entry} {key.get_name()} {key.get_base64()}\n")
+
+    def remove(self, names: Iterable[str], port: int = 22) -> int:
+        """
+        Forget the keys of several hosts and rewrite the file.
+
+        Returns:
+            Number of names that had keys
+        """
+        keys = self.keys
+        removed = 0
+
+        with self.lock:
+            for name in names:
+                entry = host_entry(name, port)
+                if entry in keys:
+                    removed += 1
+                # Deleting drops one line; a host has a line per key type
+                while entry in keys:
+                    del keys[entry]
+
+            if removed:
+                self._save()
+
+        return removed
+
+    def _save(self) -> None:
+        """Rewrite the file atomically (caller holds the lock)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(".tmp")
+        self._keys.save(str(temp_path))
+        os.replace(temp_path, self.path)
+
+    def configure_client(self, client: "paramiko.SSHClient", host: str, port: int = 22) -> None:
+        """
+        Prepare a paramiko client for connecting to a host.
+
+        Loads the host's pinned keys and installs the missing-key policy.
+
+        Args:
+            client: New, unconnected client
+            host: Hostname or IP address being connected to
+            port: SSH port
+        """
+        import paramiko
+
+        host_keys = client.get_host_keys()
+        for key_type, key in self.lookup(host, port).items():
+            host_keys.add(host_entry(host, port), key_type, key)
+
+        if self.policy == STRICT:
+            client.set_missing_host_key_policy(paramiko.RejectPolicy())
+        else:
+            client.set_missing_host_key_policy(_PinNewKeyPolicy(self, port))
+
+    def scan_host(self, address: str, port: int = 22, timeout: float = 5.0) -> "paramiko.PKey":
+        """
+        Fetch a server's host key without authenticating (like ssh-keyscan).
+
+        Raises:
+            OSError or paramiko.SSHException: If the host cannot be reached
+        """
+        import paramiko
+
+        sock = socket.create_connection((address, port), timeout=timeout)
+        transport = paramiko.Transport(sock)
+
+        # Ask for the pinned key type so a re-scan compares like with like
+        pinned = list(self.lookup(address, port))
+        if pinned:
+            options = transport.get_security_options()
+            options.key_types = [t for t in pinned if t in options.key_types] + [
+                t for t in options.key_types if t not in pinned
+            ]
+
+        try:
+            transport.banner_timeout = timeout
+            transport.start_client(timeout=timeout)
+            return transport.get_remote_server_key()
+        finally:
+            transport.close()
+
+    def scan(
+        self,
+        targets: List[Tuple[str, List[str]]],
+        port: int = 22,
+        timeout: float = 5.0,
+        max_workers: int = 16,
+        replace: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Scan many hosts in parallel and pin their keys.
+
+        Args:
+            targets: List of (address to scan, names to pin the key under)
+            port: SSH port
+            timeout: Per-host connect/handshake timeout
+            max_workers: Parallel scans
+            replace: Drop existing keys first (for reprovisioned hosts)
+
+        Returns:
+            Dictionary of address -> key fingerprint 'TYPE SHA256:...', or
+            an 'ERROR: ...' / 'MISMATCH: ...' message
+        """
+        import paramiko
+
+        def scan_one(target: Tuple[str, List[str]]) -> Tuple[str, str]:
+            address, names = target
+            try:
+                key = self.scan_host(address, port, timeout)
+            except (OSError, paramiko.SSHException) as e:
+                return address, f"ERROR: {e}"
+
+            known = self.lookup(address, port).get(key.get_name())
+            if known is not None and known != key and not replace:
+                return address, f"MISMATCH: {key.get_name()} {key.fingerprint} (use rekey)"
+
+            self.add([address] + list(names), key, port)
+            return address, f"{key.get_name()} {key.fingerprint}"
+
+        if replace:
+            self.remove([name for address, names in targets for name in [address] + list(names)], port)
+
+        if not targets:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(targets))) as pool:
+            return dict(pool.map(scan_one, targets))
+
+    @staticmethod
+    def inventory_targets(nodes: List[Dict[str, Any]]) -> List[Tuple[str, List[str]]]:
+        """
+        Get scan targets for inventory nodes.
+
+        Each node is scanned at its ansible_host and pinned under its
+        hostname, Tailscale name and initial LAN IP as well.
+
+        Args:
+            nodes: Nodes from InventoryManager.list_nodes()
+
+        Returns:
+            List of (address, names) tuples
+        """
+        targets = []
+        for node in nodes:
+            address = node.get("ansible_host") or node.get("hostname")
+            if not address:
+                continue
+            names = [
+                str(name) for name in (node.get("hostname"), node.get("tailscale_name"), node.get("initial_ip"))
+                if name and str(name) != address
+            ]
+            targets.append((str(address), names))
+        return targets
+
+
+class _PinNewKeyPolicy:
+    """Trust-on-first-use: pin unknown hosts in the store (mismatches still fail)."""
+
+    def __init__(self, store: KnownHostsStore, port: int = 22):
+        self.store = store
+        self.port = port
+
+    def missing_host_key(self, client: "paramiko.SSHClient", hostname: str, key: "paramiko.PKey") -> None:
+        # paramiko passes '[host]:port' for non-standard ports
+        if hostname.startswith("[") and "]:" in hostname:
+            hostname = hostname[1:hostname.index("]:")]
+        self.store.add([hostname], key, self.port)
+        client.get_host_keys().add(host_entry(hostname, self.port), key.get_name(), key)
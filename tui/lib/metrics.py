@@ -0,0 +1,302 @@
+"""Metrics - Prometheus counters and histograms for deployment operations.
+
+Instrumented code updates the module-level metrics:
+
+    from .metrics import metrics
+
+    metrics.ssh_pool_hits.inc()
+    metrics.ssh_connect_seconds.observe(elapsed)
+
+The registry renders the Prometheus text exposition format, which can be
+written atomically for node_exporter's textfile collector or served over
+HTTP while a headless command runs. Values are per process; Prometheus
+treats a restart as a counter reset.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0, 1800.0)
+DEPLOY_BUCKETS = (60.0, 120.0, 300.0, 600.0, 900.0, 1200.0, 1800.0, 3600.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base for metrics with optional labels."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Increase the counter (amount must not be negative)."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Get the current value for a label set."""
+        with self.lock:
+            return self.values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self.lock:
+            values = sorted(self.values.items())
+        if not values and not self.label_names:
+            values = [((), 0)]
+        for key, value in values:
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Label values -> [per-bucket counts..., +Inf count, sum]
+        self.values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation."""
+        key = self._key(labels)
+        with self.lock:
+            data = self.values.get(key)
+            if data is None:
+                data = self.values[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[index] += 1
+                    break
+            else:
+                data[len(self.buckets)] += 1
+            data[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of a block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        """Get the number of observations for a label set."""
+        with self.lock:
+            data = self.values.get(self._key(labels))
+            return int(sum(data[:-1])) if data else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self.lock:
+            values = sorted((key, list(data)) for key, data in self.values.items())
+        if not values and not self.label_names:
+            values = [((), [0] * (len(self.buckets) + 2))]
+
+        for key, data in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), data[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {_format_value(cumulative)}"
+                )
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(data[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics reported by this tool, plus text-file and HTTP export."""
+
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+        self.textfile: Optional[Path] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+        self.deployments_started = self.counter(
+            "kapnode_deployments_started_total", "Deployments started", ["location"])
+        self.deployments_succeeded = self.counter(
+            "kapnode_deployments_succeeded_total", "Deployments that completed successfully", ["location"])
+        self.deployments_failed = self.counter(
+            "kapnode_deployments_failed_total", "Deployments that failed or were cancelled", ["location"])
+        self.deployment_seconds = self.histogram(
+            "kapnode_deployment_duration_seconds", "End-to-end deployment duration",
+            ["location"], DEPLOY_BUCKETS)
+        self.stage_seconds = self.histogram(
+            "kapnode_deploy_stage_duration_seconds", "Duration of each deployment stage",
+            ["stage"], STAGE_BUCKETS)
+        self.ssh_connect_seconds = self.histogram(
+            "kapnode_ssh_connect_seconds", "SSH connection and authentication latency")
+        self.ssh_connect_failures = self.counter(
+            "kapnode_ssh_connect_failures_total", "SSH connections that failed")
+        self.ssh_pool_hits = self.counter(
+            "kapnode_ssh_pool_hits_total", "SSH operations served by a pooled connection")
+        self.ssh_pool_misses = self.counter(
+            "kapnode_ssh_pool_misses_total", "SSH operations that opened a new connection")
+        self.ssh_bytes = self.counter(
+            "kapnode_ssh_bytes_total", "Bytes transferred over SSH", ["direction"])
+        self.inventory_load_seconds = self.histogram(
+            "kapnode_inventory_load_seconds", "Inventory file load and parse time")
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        """Create and register a counter."""
+        metric = Counter(name, help_text, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        metric = Histogram(name, help_text, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Optional[Path] = None) -> bool:
+        """
+        Write metrics for node_exporter's textfile collector.
+
+        The file is written next to the target and renamed into place, so the
+        collector never reads a partial file.
+
+        Args:
+            path: Target .prom file (default: the configured textfile)
+
+        Returns:
+            True if a file was written
+        """
+        path = Path(path).expanduser() if path else self.textfile
+        if not path:
+            return False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "w") as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+        return True
+
+    def flush(self) -> None:
+        """Update the configured textfile, if any (errors are ignored)."""
+        try:
+            self.write_textfile()
+        except OSError:
+            pass
+
+    def serve(self, port: int, address: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve /metrics over HTTP from a background thread.
+
+        Args:
+            port: TCP port (0 picks a free port)
+            address: Interface to bind (default: loopback only)
+
+        Returns:
+            The running server (see server_address for the bound port)
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((address, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+    def stop(self) -> None:
+        """Stop the HTTP server, if running."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# Process-wide registry used by all instrumented code
+metrics = MetricsRegistry()
@@ -0,0 +1,388 @@
+"""Preflight - Concurrent connectivity checks for Proxmox hosts and inventory nodes."""
+
+import shlex
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .inventory import InventoryManager
+from .ssh_manager import SSHManager
+from .tracing import tracer
+
+
+# Checks in display order: (check key, header label)
+PREFLIGHT_CHECKS = [
+    ("tcp", "TCP"),
+    ("ssh", "SSH"),
+    ("tailscale", "Tailscale"),
+    ("vmid", "VMID"),
+    ("ip", "IP"),
+]
+
+# Check outcomes
+OK = "ok"
+WARN = "warn"
+FAIL = "fail"
+SKIPPED = "skipped"
+
+# Results kept per (target, VMID, IP)
+CacheKey = Tuple[str, Optional[int], Optional[str]]
+
+
+def _result(status: str, detail: str = "", duration: float = 0.0) -> Dict[str, Any]:
+    return {"status": status, "detail": detail, "duration": duration}
+
+
+class PreflightChecker:
+    """
+    Check every Proxmox host and inventory node in parallel.
+
+    Each target gets a TCP connect to its SSH port, then one SSH command that
+    reports its Tailscale address and, on Proxmox hosts, whether a VMID and
+    IP address are free. Timeouts are short and targets run concurrently,
+    so a full pass takes about one timeout instead of one per host. Results
+    are cached; failures expire sooner so fixed hosts are re-checked quickly.
+    The SSH connection stays in the pool for the deployment that follows.
+    """
+
+    def __init__(
+        self,
+        inventory: InventoryManager,
+        ssh_manager: Optional[SSHManager] = None,
+        fallback_host: Optional[Dict[str, Any]] = None,
+        default_key: Optional[Path] = None,
+        connect_timeout: float = 2.0,
+        ssh_timeout: float = 5.0,
+        ttl: float = 60.0,
+        failure_ttl: float = 15.0,
+        max_workers: int = 16,
+    ):
+        """
+        Initialize preflight checker.
+
+        Args:
+            inventory: Inventory manager providing nodes and Proxmox hosts
+            ssh_manager: SSH manager instance (creates new one if None)
+            fallback_host: Proxmox host to check when the inventory lists none
+                (dict with hostname, ansible_host, ansible_user and ssh_key)
+            default_key: SSH key for nodes without ssh_key in the inventory
+            connect_timeout: TCP connect timeout in seconds
+            ssh_timeout: SSH connect, authentication and command timeout
+            ttl: Seconds a passing result stays valid
+            failure_ttl: Seconds a failing result stays valid
+            max_workers: Targets checked at once
+        """
+        self.inventory = inventory
+        self.ssh_manager = ssh_manager or SSHManager()
+        self.fallback_host = fallback_host
+        self.default_key = default_key
+        self.connect_timeout = connect_timeout
+        self.ssh_timeout = ssh_timeout
+        self.ttl = ttl
+        self.failure_ttl = min(failure_ttl, ttl)
+        self.max_workers = max_workers
+
+        self.lock = threading.Lock()
+        self.cache: Dict[CacheKey, Tuple[float, Dict[str, Dict[str, Any]]]] = {}
+
+    def make_target(
+        self,
+        host: str,
+        user: str = "root",
+        key: Optional[Path] = None,
+        proxmox: bool = True,
+        name: Optional[str] = None,
+        port: int = 22,
+    ) -> Dict[str, Any]:
+        """
+        Build a target for a host that may not be in the inventory.
+
+        Args:
+            host: Address to connect to
+            user: SSH user
+            key: SSH private key (default: the checker's default key)
+            proxmox: Whether VMID/IP checks run on this host
+            name: Display name (default: the address)
+            port: SSH port
+        """
+        return {
+            "name": name or host,
+            "address": host,
+            "port": port,
+            "user": user,
+            "key": key or self.default_key,
+            "proxmox": proxmox,
+            "location": "",
+        }
+
+    def _inventory_vars(self, group: Optional[str] = None) -> Dict[str, Any]:
+        """Get the inventory's all.vars, overridden by the group's vars."""
+        data = self.inventory.inventory_data.get("all") or {}
+        inventory_vars = dict(data.get("vars") or {})
+        if group:
+            group_data = (data.get("children") or {}).get(group) or {}
+            inventory_vars.update(group_data.get("vars") or {})
+        return inventory_vars
+
+    def _login(self, host: Dict[str, Any], group: Optional[str]) -> Tuple[str, Optional[Path]]:
+        """
+        Get the SSH user and key for a host the way Ansible would.
+
+        Host values win over group and all.vars values; without any, Proxmox
+        hosts use root and cluster nodes ubuntu (the cloud-init user).
+        """
+        inventory_vars = self._inventory_vars(group)
+        user = host.get("ansible_user") or inventory_vars.get("ansible_user")
+        if not user:
+            user = "root" if group in (None, "proxmox_hosts") else "ubuntu"
+        key = host.get("ssh_key") or inventory_vars.get("ansible_ssh_private_key_file")
+        return str(user), Path(key).expanduser() if key else None
+
+    def get_targets(self) -> List[Dict[str, Any]]:
+        """
+        Get all Proxmox hosts and inventory nodes (once each), Proxmox hosts first.
+
+        Returns:
+            List of target dictionaries (name, address, port, user, key, proxmox, location)
+        """
+        targets = []
+        seen = set()
+        for node in self.inventory.list_nodes():
+            address = node.get("ansible_host") or node.get("hostname")
+            # A host can be listed in several groups
+            if not address or (node.get("hostname") or address) in seen:
+                continue
+            seen.add(node.get("hostname") or address)
+            user, key = self._login(node, node.get("group"))
+            target = self.make_target(
+                str(address),
+                user,
+                key,
+                proxmox=node.get("group") == "proxmox_hosts",
+                name=node.get("hostname"),
+                port=int(node.get("ansible_port", 22)),
+            )
+            target["location"] = str(node.get("location", ""))
+            targets.append(target)
+
+        if self.fallback_host and not any(target["proxmox"] for target in targets):
+            host = self.fallback_host
+            user, key = self._login(host, "proxmox_hosts")
+            targets.append(self.make_target(
+                host.get("ansible_host") or host.get("hostname"),
+                user,
+                key,
+                name=host.get("hostname"),
+            ))
+
+        targets.sort(key=lambda target: (not target["proxmox"], target["name"]))
+        return targets
+
+    def cached(
+        self,
+        target: Dict[str, Any],
+        vmid: Optional[int] = None,
+        ip: Optional[str] = None,
+    ) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Get unexpired results for a target.
+
+        Returns:
+            Dictionary of check -> result, or None if not checked recently
+        """
+        with self.lock:
+            entry = self.cache.get(self._cache_key(target, vmid, ip))
+
+        if entry is None:
+            return None
+
+        checked, results = entry
+        failed = any(result["status"] == FAIL for result in results.values())
+        if time.monotonic() - checked > (self.failure_ttl if failed else self.ttl):
+            return None
+        return results
+
+    def invalidate(self, target: Optional[Dict[str, Any]] = None) -> None:
+        """Forget cached results for one target, or for all targets."""
+        with self.lock:
+            if target is None:
+                self.cache.clear()
+            else:
+                for key in [key for key in self.cache if key[0] == target["name"]]:
+                    del self.cache[key]
+
+    def _cache_key(self, target: Dict[str, Any], vmid: Optional[int], ip: Optional[str]) -> CacheKey:
+        # VMID and IP only matter on Proxmox hosts
+        if not target["proxmox"]:
+            return target["name"], None, None
+        return target["name"], vmid, ip
+
+    def check_tcp(self, address: str, port: int = 22) -> Dict[str, Any]:
+        """Check that a TCP connection to the SSH port succeeds."""
+        started = time.monotonic()
+        try:
+            with socket.create_connection((address, port), timeout=self.connect_timeout):
+                pass
+        except socket.timeout:
+            return _result(FAIL, f"timed out after {self.connect_timeout:g}s", time.monotonic() - started)
+        except OSError as e:
+            return _result(FAIL, e.strerror or str(e), time.monotonic() - started)
+
+        elapsed = time.monotonic() - started
+        return _result(OK, f"{elapsed * 1000:.0f} ms", elapsed)
+
+    def _probe_command(self, target: Dict[str, Any], vmid: Optional[int], ip: Optional[str]) -> str:
+        """Build the single command run on a target."""
+        lines = ['printf "tailscale=%s\\n" "$(tailscale ip -4 2>/dev/null | head -n1)"']
+
+        if target["proxmox"] and vmid is not None:
+            lines.append(
+                "pvesh get /cluster/resources --type vm --output-format json 2>/dev/null"
+                f" | grep -q '\"vmid\":{int(vmid)}[,}}]' && echo vmid=used || echo vmid=free"
+            )
+        if target["proxmox"] and ip:
+            lines.append(f"ping -c1 -W1 {shlex.quote(ip)} >/dev/null 2>&1 && echo ip=used || echo ip=free")
+
+        return "; ".join(lines)
+
+    def _inventory_owner(self, field: str, value: Any) -> Optional[str]:
+        """Get the inventory node already using a VMID or IP, if any."""
+        for node in self.inventory.list_nodes():
+            values = [node.get("vmid")] if field == "vmid" else [node.get("ansible_host"), node.get("initial_ip")]
+            if any(candidate is not None and str(candidate) == str(value) for candidate in values):
+                return node.get("hostname", "?")
+        return None
+
+    def check_target(
+        self,
+        target: Dict[str, Any],
+        vmid: Optional[int] = None,
+        ip: Optional[str] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Run all checks against one target and cache the results.
+
+        Args:
+            target: Target from get_targets() or make_target()
+            vmid: VMID to check for on Proxmox hosts (optional)
+            ip: IP address to check for on Proxmox hosts (optional)
+
+        Returns:
+            Dictionary of check -> result (status, detail, duration)
+        """
+        skipped = _result(SKIPPED)
+        results = {check: skipped for check, _ in PREFLIGHT_CHECKS}
+        remote_vmid = target["proxmox"] and vmid is not None
+        remote_ip = target["proxmox"] and bool(ip)
+
+        # Numbers already taken in the inventory fail without asking the host
+        if remote_vmid:
+            owner = self._inventory_owner("vmid", vmid)
+            if owner:
+                results["vmid"] = _result(FAIL, f"{vmid} used by {owner} (inventory)")
+                remote_vmid = False
+        if remote_ip:
+            owner = self._inventory_owner("ip", ip)
+            if owner:
+                results["ip"] = _result(FAIL, f"{ip} used by {owner} (inventory)")
+                remote_ip = False
+
+        with tracer.span("preflight.target", host=target["address"], proxmox=target["proxmox"]) as span:
+            results["tcp"] = self.check_tcp(target["address"], target["port"])
+
+            if results["tcp"]["status"] == OK:
+                results.update(self._check_ssh(
+                    target,
+                    vmid if remote_vmid else None,
+                    ip if remote_ip else None,
+                ))
+            span.tag(**{check: result["status"] for check, result in results.items()})
+
+        with self.lock:
+            self.cache[self._cache_key(target, vmid, ip)] = (time.monotonic(), results)
+        return results
+
+    def _check_ssh(
+        self,
+        target: Dict[str, Any],
+        vmid: Optional[int],
+        ip: Optional[str],
+    ) -> Dict[str, Dict[str, Any]]:
+        """Authenticate and run the probe command in one SSH round trip."""
+        address, port, user, key = target["address"], target["port"], target["user"], target["key"]
+        started = time.monotonic()
+
+        try:
+            client = self.ssh_manager.get_client(address, user, key, port, timeout=self.ssh_timeout)
+            stdin, stdout, stderr = client.exec_command(
+                self._probe_command(target, vmid, ip), timeout=self.ssh_timeout
+            )
+            output = stdout.read().decode(errors="replace")
+            stdout.channel.recv_exit_status()
+        except Exception as e:
+            self.ssh_manager.discard_client(address, user, key, port)
+            return {"ssh": _result(FAIL, str(e) or type(e).__name__, time.monotonic() - started)}
+
+        elapsed = time.monotonic() - started
+        values = dict(
+            line.split("=", 1) for line in output.splitlines() if "=" in line
+        )
+
+        results = {"ssh": _result(OK, f"{user}@{address}", elapsed)}
+
+        tailscale_ip = values.get("tailscale", "").strip()
+        if tailscale_ip:
+            results["tailscale"] = _result(OK, tailscale_ip)
+        else:
+            results["tailscale"] = _result(WARN, "not connected")
+
+        if "vmid" in values:
+            used = values["vmid"].strip() == "used"
+            results["vmid"] = _result(FAIL if used else OK, f"{vmid} {'in use' if used else 'free'}")
+        if "ip" in values:
+            used = values["ip"].strip() == "used"
+            results["ip"] = _result(FAIL if used else OK, f"{ip} {'answers ping' if used else 'free'}")
+
+        return results
+
+    def run(
+        self,
+        targets: Optional[List[Dict[str, Any]]] = None,
+        vmid: Optional[int] = None,
+        ip: Optional[str] = None,
+        force: bool = False,
+        on_result: Optional[Callable[[Dict[str, Any], Dict[str, Dict[str, Any]]], None]] = None,
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Check many targets in parallel.
+
+        Args:
+            targets: Targets to check (default: get_targets())
+            vmid: VMID to check for on Proxmox hosts (optional)
+            ip: IP address to check for on Proxmox hosts (optional)
+            force: Ignore cached results
+            on_result: Called with (target, results) as each target finishes
+                (from worker threads), including cached targets
+
+        Returns:
+            Dictionary of target name -> check -> result
+        """
+        if targets is None:
+            targets = self.get_targets()
+
+        def check_one(target: Dict[str, Any]) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+            results = None if force else self.cached(target, vmid, ip)
+            if results is None:
+                results = self.check_target(target, vmid, ip)
+            if on_result:
+                on_result(target, results)
+            return target["name"], results
+
+        if not targets:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(targets))) as pool:
+            return dict(pool.map(check_one, targets))
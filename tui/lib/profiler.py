@@ -0,0 +1,338 @@
+"""Profiler - cProfile or sampling profiles per screen and worker.
+
+Profiled code paths are named sections, usually a screen handler or worker:
+
+    from lib.profiler import profiler
+
+    @profiler.profiled("HistoryScreen._apply_filter")
+    def _apply_filter(self):
+        ...
+
+In 'cprofile' mode every call of a section runs under cProfile and is merged
+into that section's statistics; a section entered while another is active on
+the same thread counts as part of the outer one. In 'sample' mode a thread
+records the stack of every thread at a fixed interval and attributes each
+sample to the innermost active section of its thread, or to the thread name
+outside sections, so it also covers the UI thread as a whole.
+
+While profiling is off, a section costs one attribute check.
+"""
+
+import cProfile
+import functools
+import io
+import pstats
+import re
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+MODES = ("cprofile", "sample")
+
+DEFAULT_PROFILES_DIR = Path.home() / ".homelab" / "profiles"
+
+# Seconds between stack samples
+DEFAULT_INTERVAL = 0.005
+
+# (filename, first line, function name), as used by pstats
+Frame = Tuple[str, int, str]
+
+
+def _frame_label(frame: Frame) -> str:
+    """Format a frame for collapsed stacks (no ';' allowed)."""
+    filename, line, name = frame
+    return f"{name} ({Path(filename).name}:{line})".replace(";", ":")
+
+
+def _file_name(section: str) -> str:
+    """Turn a section name into a safe file name."""
+    return re.sub(r"[^\w.-]+", "_", section) or "section"
+
+
+class Profiler:
+    """Collect per-section profiles with cProfile or a sampling thread."""
+
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.interval = DEFAULT_INTERVAL
+        self.output_dir: Optional[Path] = None
+        self.lock = threading.Lock()
+
+        # Calls per section (both modes)
+        self.calls: Dict[str, int] = {}
+        # cProfile statistics per section
+        self.stats: Dict[str, pstats.Stats] = {}
+        # Sample counts per section and stack (outermost frame first)
+        self.samples: Dict[str, Counter] = {}
+
+        # Active sections per thread ID, innermost last
+        self._sections: Dict[int, List[str]] = {}
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether profiling is running."""
+        return self.mode is not None
+
+    def start(
+        self,
+        mode: str = "cprofile",
+        output_dir: Optional[Path] = None,
+        interval: float = DEFAULT_INTERVAL,
+    ) -> None:
+        """
+        Start profiling.
+
+        Args:
+            mode: 'cprofile' (deterministic, per section) or 'sample'
+                (statistical, all threads)
+            output_dir: Directory for write() (default: a timestamped
+                directory under ~/.homelab/profiles)
+            interval: Sampling interval in seconds ('sample' mode)
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiler mode '{mode}' (expected one of: {', '.join(MODES)})")
+
+        self.stop()
+        self.mode = mode
+        self.interval = interval
+        self.output_dir = output_dir or DEFAULT_PROFILES_DIR / datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        if mode == "sample":
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop profiling (collected profiles are kept)."""
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        self.mode = None
+
+    def profiled(self, name: str) -> Callable:
+        """
+        Decorator that profiles every call of a function as a section.
+
+        Place it below @work so the section runs in the worker thread.
+
+        Args:
+            name: Section name (e.g. 'LogViewerScreen.on_mount')
+        """
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if self.mode is None:
+                    return func(*args, **kwargs)
+                with self.section(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        """Profile a block as the named section."""
+        mode = self.mode
+        if mode is None:
+            yield
+            return
+
+        thread_id = threading.get_ident()
+        active = self._sections.setdefault(thread_id, [])
+        active.append(name)
+
+        profile = None
+        if mode == "cprofile" and len(active) == 1:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler (e.g. a debugger) owns this thread
+                profile = None
+
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            active.pop()
+            if not active:
+                self._sections.pop(thread_id, None)
+
+            with self.lock:
+                self.calls[name] = self.calls.get(name, 0) + 1
+                if profile is not None:
+                    if name in self.stats:
+                        self.stats[name].add(profile)
+                    else:
+                        self.stats[name] = pstats.Stats(profile)
+
+    def _sample_loop(self) -> None:
+        """Record the stack of every other thread until stopped."""
+        own_id = threading.get_ident()
+
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+
+                try:
+                    section = self._sections[thread_id][-1]
+                except (KeyError, IndexError):
+                    section = names.get(thread_id, f"thread-{thread_id}")
+
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                stack.reverse()
+
+                with self.lock:
+                    self.samples.setdefault(section, Counter())[tuple(stack)] += 1
+
+    def sections(self) -> List[str]:
+        """Get the names of all sections with data, sorted."""
+        with self.lock:
+            return sorted(set(self.stats) | set(self.samples))
+
+    def top(self, section: Optional[str] = None, limit: int = 25) -> List[Dict[str, Any]]:
+        """
+        Get the functions with the most cumulative time.
+
+        Args:
+            section: Only this section (default: all sections)
+            limit: Maximum number of rows
+
+        Returns:
+            List of dictionaries (section, function, calls, own and
+            cumulative seconds); calls is None for sampled profiles
+        """
+        rows: List[Dict[str, Any]] = []
+
+        with self.lock:
+            for name, stats in self.stats.items():
+                if section and name != section:
+                    continue
+                for frame, (_, calls, own, cumulative, _) in stats.stats.items():
+                    rows.append({
+                        "section": name,
+                        "function": pstats.func_std_string(frame),
+                        "calls": calls,
+                        "own": own,
+                        "cumulative": cumulative,
+                    })
+
+            for name, stacks in self.samples.items():
+                if section and name != section:
+                    continue
+                own: Counter = Counter()
+                inclusive: Counter = Counter()
+                for stack, count in stacks.items():
+                    own[stack[-1]] += count
+                    for frame in set(stack):
+                        inclusive[frame] += count
+                for frame, count in inclusive.items():
+                    rows.append({
+                        "section": name,
+                        "function": pstats.func_std_string(frame),
+                        "calls": None,
+                        "own": own[frame] * self.interval,
+                        "cumulative": count * self.interval,
+                    })
+
+        rows.sort(key=lambda row: row["cumulative"], reverse=True)
+        return rows[:limit]
+
+    def write(self, output_dir: Optional[Path] = None) -> List[Path]:
+        """
+        Write collected profiles.
+
+        cProfile sections are written as '<section>.pstats' (for pstats,
+        snakeviz); sampled sections as '<section>.collapsed' plus an
+        'all.collapsed' with the section as the root frame (for
+        flamegraph.pl, speedscope). 'summary.txt' lists the top functions.
+
+        Args:
+            output_dir: Target directory (default: the one given to start())
+
+        Returns:
+            Paths of the written files
+        """
+        directory = Path(output_dir or self.output_dir or DEFAULT_PROFILES_DIR)
+        written: List[Path] = []
+
+        with self.lock:
+            stats = dict(self.stats)
+            samples = {name: Counter(stacks) for name, stacks in self.samples.items()}
+
+        if not stats and not samples:
+            return written
+
+        directory.mkdir(parents=True, exist_ok=True)
+
+        for name, section_stats in stats.items():
+            path = directory / f"{_file_name(name)}.pstats"
+            section_stats.dump_stats(str(path))
+            written.append(path)
+
+        combined = []
+        for name, stacks in samples.items():
+            lines = [
+                f"{';'.join(_frame_label(frame) for frame in stack)} {count}"
+                for stack, count in stacks.items()
+            ]
+            path = directory / f"{_file_name(name)}.collapsed"
+            path.write_text("\n".join(lines) + "\n")
+            written.append(path)
+            combined.extend(f"{name.replace(';', ':')};{line}" for line in lines)
+
+        if combined:
+            path = directory / "all.collapsed"
+            path.write_text("\n".join(combined) + "\n")
+            written.append(path)
+
+        path = directory / "summary.txt"
+        path.write_text(self.summary())
+        written.append(path)
+        return written
+
+    def summary(self, limit: int = 40) -> str:
+        """Format the top functions by cumulative time as text."""
+        out = io.StringIO()
+        out.write(f"Top {limit} functions by cumulative time\n\n")
+        with self.lock:
+            calls = dict(self.calls)
+            samples = {name: sum(stacks.values()) for name, stacks in self.samples.items()}
+        for name in sorted(set(calls) | set(samples)):
+            counts = []
+            if name in calls:
+                counts.append(f"{calls[name]} calls")
+            if name in samples:
+                counts.append(f"{samples[name]} samples")
+            out.write(f"  {name}: {', '.join(counts)}\n")
+        out.write(f"\n  {'cumulative':>12}{'own':>12}{'calls':>10}  function\n")
+        for row in self.top(limit=limit):
+            count = "-" if row["calls"] is None else str(row["calls"])
+            out.write(
+                f"  {row['cumulative'] * 1000:>10.1f}ms{row['own'] * 1000:>10.1f}ms{count:>10}"
+                f"  [{row['section']}] {row['function']}\n"
+            )
+        return out.getvalue()
+
+
+# Process-wide profiler used by all profiled sections
+profiler = Profiler()
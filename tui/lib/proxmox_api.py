@@ -0,0 +1,264 @@
+"""Proxmox API - Minimal Proxmox VE REST client with pooled keep-alive connections."""
+
+import http.client
+import json
+import ssl
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode, urlsplit
+
+
+class ProxmoxAPIError(Exception):
+    """Raised when the Proxmox API returns an error or cannot be reached."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class ProxmoxAPI:
+    """
+    Client for the Proxmox VE HTTP API (/api2/json).
+
+    Authenticates with an API token, so no ticket/CSRF handling is needed.
+    Persistent HTTP/1.1 connections are kept in a pool shared by all threads
+    (worker threads are short-lived, so a per-thread connection would not be
+    reused). Only idempotent GETs are retried after a connection failure.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        token_id: str,
+        token_secret: str,
+        verify_ssl: bool = True,
+        timeout: float = 10.0,
+        max_idle: int = 4,
+    ):
+        """
+        Initialize API client.
+
+        Args:
+            url: Base URL, e.g. https://kapmox:8006
+            token_id: Token ID in the form user@realm!tokenname
+            token_secret: Token secret (UUID)
+            verify_ssl: Verify the server certificate (Proxmox defaults to self-signed)
+            timeout: Socket timeout in seconds
+            max_idle: Idle connections kept open for reuse
+        """
+        parts = urlsplit(url if "://" in url else f"https://{url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname or ""
+        self.port = parts.port or (8006 if self.scheme == "https" else 80)
+        self.timeout = timeout
+        self.max_idle = max_idle
+
+        self.headers = {
+            "Authorization": f"PVEAPIToken={token_id}={token_secret}",
+            "Accept": "application/json",
+            "Connection": "keep-alive",
+        }
+
+        self.ssl_context: Optional[ssl.SSLContext] = None
+        if self.scheme == "https":
+            self.ssl_context = ssl.create_default_context()
+            if not verify_ssl:
+                self.ssl_context.check_hostname = False
+                self.ssl_context.verify_mode = ssl.CERT_NONE
+
+        self._lock = threading.Lock()
+        self._idle: List[http.client.HTTPConnection] = []
+        # Bumped by close(), so connections in use at that time are not pooled
+        self._generation = 0
+
+    def _acquire(self) -> Tuple[http.client.HTTPConnection, int]:
+        """Take an idle pooled connection, or open a new one."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), self._generation
+            generation = self._generation
+
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout, context=self.ssl_context
+            )
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn, generation
+
+    def _release(self, conn: http.client.HTTPConnection, generation: int) -> None:
+        """Return a healthy connection to the pool (or close it if the pool is full)."""
+        with self._lock:
+            if generation == self._generation and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        """Close all pooled connections (connections in use are closed when released)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._generation += 1
+        for conn in idle:
+            conn.close()
+
+    def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Send an API request.
+
+        Args:
+            method: HTTP method (GET, POST, PUT, DELETE)
+            path: API path below /api2/json, e.g. /cluster/resources
+            params: Query (GET/DELETE) or form (POST/PUT) parameters
+
+        Returns:
+            The 'data' member of the JSON response
+
+        Raises:
+            ProxmoxAPIError: On HTTP errors or connection failures
+        """
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        url = "/api2/json" + path
+        body = None
+        headers = dict(self.headers)
+
+        if method in ("GET", "DELETE"):
+            if params:
+                url += "?" + urlencode(params)
+        else:
+            body = urlencode(params)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+        # A pooled connection may have been closed by the server; retry a GET
+        # once. Other methods are not retried: the server may have acted on a
+        # request whose response was lost (e.g. a timed-out create or start).
+        attempts = 2 if method == "GET" else 1
+        for attempt in range(attempts):
+            conn, generation = self._acquire()
+            try:
+                conn.request(method, url, body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+            except (http.client.HTTPException, ConnectionError, OSError) as e:
+                conn.close()
+                if attempt == attempts - 1:
+                    raise ProxmoxAPIError(f"{method} {path} failed: {e}")
+                continue
+
+            self._release(conn, generation)
+            break
+
+        if response.status >= 400:
+            message = response.reason
+            try:
+                errors = json.loads(payload).get("errors")
+                if errors:
+                    message = f"{message}: {errors}"
+            except (ValueError, AttributeError):
+                pass
+            raise ProxmoxAPIError(f"{method} {path} returned {response.status} {message}", response.status)
+
+        try:
+            return json.loads(payload).get("data")
+        except ValueError as e:
+            raise ProxmoxAPIError(f"Invalid JSON from {path}: {e}")
+
+    def get(self, path: str, **params: Any) -> Any:
+        """Send a GET request (see request())."""
+        return self.request("GET", path, params)
+
+    def post(self, path: str, **params: Any) -> Any:
+        """Send a POST request (see request())."""
+        return self.request("POST", path, params)
+
+    def delete(self, path: str, **params: Any) -> Any:
+        """Send a DELETE request (see request())."""
+        return self.request("DELETE", path, params)
+
+    # Cluster-wide queries
+
+    def cluster_resources(self, resource_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get all cluster resources in one request.
+
+        Args:
+            resource_type: Optional filter (vm, node, storage)
+
+        Returns:
+            List of resource dictionaries (same shape as pvesh output)
+        """
+        return self.get("/cluster/resources", type=resource_type) or []
+
+    def next_vmid(self) -> int:
+        """Get the next free VMID from the cluster."""
+        return int(self.get("/cluster/nextid"))
+
+    # VM operations (return task UPIDs where Proxmox runs a task)
+
+    def vm_status(self, node: str, vmid: int) -> Dict[str, Any]:
+        """Get the current status of a VM."""
+        return self.get(f"/nodes/{quote(node)}/qemu/{int(vmid)}/status/current")
+
+    def create_vm(self, node: str, vmid: int, **config: Any) -> str:
+        """Create a VM with qm-style config options (name, memory, net0, ...)."""
+        return self.post(f"/nodes/{quote(node)}/qemu", vmid=int(vmid), **config)
+
+    def clone_vm(self, node: str, vmid: int, newid: int, **options: Any) -> str:
+        """Clone a VM or template (options: name, full, storage, target)."""
+        return self.post(f"/nodes/{quote(node)}/qemu/{int(vmid)}/clone", newid=int(newid), **options)
+
+    def start_vm(self, node: str, vmid: int) -> str:
+        """Start a VM."""
+        return self.post(f"/nodes/{quote(node)}/qemu/{int(vmid)}/status/start")
+
+    def stop_vm(self, node: str, vmid: int) -> str:
+        """Stop a VM immediately."""
+        return self.post(f"/nodes/{quote(node)}/qemu/{int(vmid)}/status/stop")
+
+    def destroy_vm(self, node: str, vmid: int, purge: bool = True) -> str:
+        """Destroy a VM and (by default) remove it from backup jobs and HA."""
+        return self.delete(f"/nodes/{quote(node)}/qemu/{int(vmid)}", purge=int(purge))
+
+    # Tasks
+
+    def task_status(self, node: str, upid: str) -> Dict[str, Any]:
+        """Get the status of a task (status is 'running' or 'stopped')."""
+        return self.get(f"/nodes/{quote(node)}/tasks/{quote(upid, safe='')}/status")
+
+    def task_log(self, node: str, upid: str, start: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Read task log lines from an offset.
+
+        Returns:
+            List of {'n': line number, 't': text} dictionaries
+        """
+        return self.get(
+            f"/nodes/{quote(node)}/tasks/{quote(upid, safe='')}/log", start=start, limit=limit
+        ) or []
+
+    def wait_for_task(
+        self,
+        node: str,
+        upid: str,
+        timeout: float = 600.0,
+        interval: float = 1.0,
+    ) -> Dict[str, Any]:
+        """
+        Poll a task until it stops.
+
+        Returns:
+            Final task status (exitstatus is 'OK' on success)
+
+        Raises:
+            ProxmoxAPIError: If the task does not finish within the timeout
+        """
+        deadline = time.monotonic() + timeout
+
+        while True:
+            status = self.task_status(node, upid)
+            if status.get("status") == "stopped":
+                return status
+            if time.monotonic() >= deadline:
+                raise ProxmoxAPIError(f"Task {upid} did not finish within {timeout:.0f}s")
+            time.sleep(interval)
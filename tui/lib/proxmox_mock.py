@@ -0,0 +1,319 @@
+"""Proxmox Mock - Local in-memory Proxmox VE API server for development and testing.
+
+Run standalone to point the TUI at a fake cluster:
+
+    python -m lib.proxmox_mock --port 8006 --vms 20
+
+then set proxmox_api.url to http://127.0.0.1:8006 in ~/.homelab-deploy.conf.
+"""
+
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+
+DEFAULT_TOKEN = "root@pam!kapnode=00000000-0000-0000-0000-000000000000"
+
+
+class MockCluster:
+    """In-memory cluster state: Proxmox nodes, VMs and finished tasks."""
+
+    def __init__(self, nodes: Tuple[str, ...] = ("kapmox",), vms: int = 0):
+        self.lock = threading.Lock()
+        self.nodes = list(nodes)
+        self.vms: Dict[int, Dict[str, Any]] = {}
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self.task_counter = itertools.count(1)
+
+        for index in range(vms):
+            vmid = 100 + index
+            self.vms[vmid] = self._vm(self.nodes[index % len(self.nodes)], vmid, f"kapnode{index + 1}")
+            self.vms[vmid]["status"] = "running"
+
+    @staticmethod
+    def _vm(node: str, vmid: int, name: str, memory: int = 4096) -> Dict[str, Any]:
+        return {
+            "id": f"qemu/{vmid}",
+            "type": "qemu",
+            "node": node,
+            "vmid": vmid,
+            "name": name,
+            "status": "stopped",
+            "cpu": 0.05,
+            "mem": 1 << 30,
+            "maxmem": memory << 20,
+            "disk": 0,
+            "maxdisk": 32 << 30,
+            "template": 0,
+        }
+
+    def resources(self, resource_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self.lock:
+            result = []
+            if resource_type in (None, "node"):
+                for node in self.nodes:
+                    result.append({
+                        "id": f"node/{node}",
+                        "type": "node",
+                        "node": node,
+                        "status": "online",
+                        "cpu": 0.1,
+                        "mem": 8 << 30,
+                        "maxmem": 64 << 30,
+                        "disk": 20 << 30,
+                        "maxdisk": 500 << 30,
+                    })
+            if resource_type in (None, "vm"):
+                result.extend(dict(vm) for vm in self.vms.values())
+            return result
+
+    def add_task(self, node: str, task_type: str, vmid: Any, log: List[str], ok: bool = True) -> str:
+        """Record a finished task and return its UPID."""
+        with self.lock:
+            number = next(self.task_counter)
+            started = int(time.time())
+            upid = f"UPID:{node}:{number:08X}:00000000:{started:08X}:{task_type}:{vmid}:root@pam:"
+            self.tasks[upid] = {
+                "upid": upid,
+                "node": node,
+                "type": task_type,
+                "id": str(vmid),
+                "user": "root@pam",
+                "starttime": started,
+                "status": "stopped",
+                "exitstatus": "OK" if ok else "command failed",
+                "log": log + ["TASK OK" if ok else "TASK ERROR: command failed"],
+            }
+            return upid
+
+
+class MockProxmoxHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the subset of /api2/json used by the TUI."""
+
+    protocol_version = "HTTP/1.1"
+
+    ROUTES = [
+        ("GET", r"/cluster/resources", "get_resources"),
+        ("GET", r"/cluster/nextid", "get_nextid"),
+        ("GET", r"/nodes/(?P<node>[^/]+)/qemu/(?P<vmid>\d+)/status/current", "get_vm_status"),
+        ("POST", r"/nodes/(?P<node>[^/]+)/qemu", "create_vm"),
+        ("POST", r"/nodes/(?P<node>[^/]+)/qemu/(?P<vmid>\d+)/clone", "clone_vm"),
+        ("POST", r"/nodes/(?P<node>[^/]+)/qemu/(?P<vmid>\d+)/status/(?P<action>start|stop)", "set_vm_state"),
+        ("DELETE", r"/nodes/(?P<node>[^/]+)/qemu/(?P<vmid>\d+)", "destroy_vm"),
+        ("GET", r"/nodes/(?P<node>[^/]+)/tasks/(?P<upid>[^/]+)/status", "get_task_status"),
+        ("GET", r"/nodes/(?P<node>[^/]+)/tasks/(?P<upid>[^/]+)/log", "get_task_log"),
+    ]
+
+    @property
+    def cluster(self) -> MockCluster:
+        return self.server.cluster
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, data: Any = None, errors: Optional[Dict[str, str]] = None) -> None:
+        body = {"data": data}
+        if errors:
+            body["errors"] = errors
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _dispatch(self, method: str) -> None:
+        self.server.request_count += 1
+        parts = urlsplit(self.path)
+        params = dict(parse_qsl(parts.query))
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            params.update(parse_qsl(self.rfile.read(length).decode()))
+
+        if self.headers.get("Authorization") != f"PVEAPIToken={self.server.token}":
+            self._send(401, errors={"auth": "invalid token"})
+            return
+
+        if not parts.path.startswith("/api2/json/"):
+            self._send(404)
+            return
+        path = parts.path[len("/api2/json"):]
+
+        for route_method, pattern, handler in self.ROUTES:
+            match = re.fullmatch(pattern, path)
+            if route_method == method and match:
+                args = {key: unquote(value) for key, value in match.groupdict().items()}
+                getattr(self, handler)(params, **args)
+                return
+
+        self._send(501, errors={"path": f"{method} {path} not implemented"})
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    # Handlers
+
+    def get_resources(self, params: Dict[str, str]) -> None:
+        self._send(200, self.cluster.resources(params.get("type")))
+
+    def get_nextid(self, params: Dict[str, str]) -> None:
+        with self.cluster.lock:
+            vmid = max(self.cluster.vms, default=99) + 1
+        self._send(200, str(vmid))
+
+    def _find_vm(self, node: str, vmid: str) -> Optional[Dict[str, Any]]:
+        vm = self.cluster.vms.get(int(vmid))
+        if vm is None or vm["node"] != node:
+            self._send(500, errors={"vmid": f"VM {vmid} does not exist on {node}"})
+            return None
+        return vm
+
+    def get_vm_status(self, params: Dict[str, str], node: str, vmid: str) -> None:
+        vm = self._find_vm(node, vmid)
+        if vm is not None:
+            self._send(200, {**vm, "qmpstatus": vm["status"]})
+
+    def create_vm(self, params: Dict[str, str], node: str) -> None:
+        vmid = int(params.get("vmid", 0))
+        with self.cluster.lock:
+            if vmid in self.cluster.vms:
+                self._send(500, errors={"vmid": f"VM {vmid} already exists"})
+                return
+            self.cluster.vms[vmid] = MockCluster._vm(
+                node, vmid, params.get("name", f"VM{vmid}"), int(params.get("memory", 2048))
+            )
+        self._send(200, self.cluster.add_task(node, "qmcreate", vmid, [f"create VM {vmid}"]))
+
+    def clone_vm(self, params: Dict[str, str], node: str, vmid: str) -> None:
+        source = self._find_vm(node, vmid)
+        if source is None:
+            return
+        newid = int(params.get("newid", 0))
+        target = params.get("target", node)
+        with self.cluster.lock:
+            clone = MockCluster._vm(target, newid, params.get("name", f"Copy-of-VM-{source['name']}"))
+            clone["maxmem"] = source["maxmem"]
+            self.cluster.vms[newid] = clone
+        log = [f"create full clone of drive scsi0 (local-lvm:vm-{vmid}-disk-0)"]
+        log += [f"transferred {n * 3.2:.1f} GiB of 32.0 GiB ({n * 10:.2f}%)" for n in range(1, 11)]
+        self._send(200, self.cluster.add_task(node, "qmclone", vmid, log))
+
+    def set_vm_state(self, params: Dict[str, str], node: str, vmid: str, action: str) -> None:
+        vm = self._find_vm(node, vmid)
+        if vm is None:
+            return
+        with self.cluster.lock:
+            vm["status"] = "running" if action == "start" else "stopped"
+        self._send(200, self.cluster.add_task(node, f"qm{action}", vmid, []))
+
+    def destroy_vm(self, params: Dict[str, str], node: str, vmid: str) -> None:
+        if self._find_vm(node, vmid) is None:
+            return
+        with self.cluster.lock:
+            del self.cluster.vms[int(vmid)]
+        self._send(200, self.cluster.add_task(node, "qmdestroy", vmid, []))
+
+    def _find_task(self, upid: str) -> Optional[Dict[str, Any]]:
+        task = self.cluster.tasks.get(upid)
+        if task is None:
+            self._send(500, errors={"upid": "no such task"})
+        return task
+
+    def get_task_status(self, params: Dict[str, str], node: str, upid: str) -> None:
+        task = self._find_task(upid)
+        if task is not None:
+            self._send(200, {key: value for key, value in task.items() if key != "log"})
+
+    def get_task_log(self, params: Dict[str, str], node: str, upid: str) -> None:
+        task = self._find_task(upid)
+        if task is None:
+            return
+        start = int(params.get("start", 0))
+        limit = int(params.get("limit", 50))
+        lines = task["log"][start:start + limit]
+        self._send(200, [{"n": start + index + 1, "t": text} for index, text in enumerate(lines)])
+
+
+class MockProxmoxServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server backed by a MockCluster.
+
+    Plain HTTP with keep-alive, so ProxmoxAPI pooling can be exercised
+    without certificates. request_count counts requests, connection_count
+    accepted connections.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        token: str = DEFAULT_TOKEN,
+        cluster: Optional[MockCluster] = None,
+        verbose: bool = False,
+    ):
+        super().__init__(("127.0.0.1", port), MockProxmoxHandler)
+        self.token = token
+        self.cluster = cluster or MockCluster()
+        self.verbose = verbose
+        self.request_count = 0
+        self.connection_count = 0
+        self.thread: Optional[threading.Thread] = None
+
+    def get_request(self):
+        request = super().get_request()
+        self.connection_count += 1
+        return request
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> None:
+        """Serve requests in a background thread."""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a mock Proxmox VE API server")
+    parser.add_argument("--port", type=int, default=8006, help="Port to listen on")
+    parser.add_argument("--nodes", default="kapmox", help="Comma-separated Proxmox node names")
+    parser.add_argument("--vms", type=int, default=5, help="Number of running VMs to create")
+    parser.add_argument("--token", default=DEFAULT_TOKEN, help="Accepted token as ID=SECRET")
+    args = parser.parse_args()
+
+    cluster = MockCluster(tuple(args.nodes.split(",")), args.vms)
+    server = MockProxmoxServer(args.port, args.token, cluster, verbose=True)
+    token_id, token_secret = args.token.split("=", 1)
+    print(f"Mock Proxmox API on {server.url} (token_id={token_id}, token_secret={token_secret})")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
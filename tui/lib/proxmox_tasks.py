@@ -0,0 +1,214 @@
+"""Proxmox Tasks - Follow Proxmox task logs (UPIDs) incrementally."""
+
+import json
+import re
+import shlex
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from .ssh_manager import SSHManager
+
+if TYPE_CHECKING:
+    from .proxmox_api import ProxmoxAPI
+
+
+# UPID:node:pid:pstart:starttime:type:id:user:
+UPID_PATTERN = re.compile(
+    r"UPID:(?P<node>[^:\s]+):(?P<pid>[0-9A-Fa-f]{8}):(?P<pstart>[0-9A-Fa-f]{8,9}):"
+    r"(?P<starttime>[0-9A-Fa-f]{8}):(?P<type>[^:\s]*):(?P<id>[^:\s]*):(?P<user>[^:\s]+):"
+)
+
+# qemu-img progress as logged by Proxmox, e.g. "transferred 1.2 GiB of 3.5 GiB (34.29%)"
+TRANSFER_PATTERN = re.compile(
+    r"transferred:?\s+(?P<done>[\d.]+)\s*(?P<done_unit>[KMGT]i?B|B)?\s+of\s+"
+    r"(?P<total>[\d.]+)\s*(?P<total_unit>[KMGT]i?B|B)?\s+\((?P<percent>[\d.]+)%\)"
+)
+
+UNIT_SIZES = {
+    None: 1, "B": 1,
+    "KB": 1000, "MB": 1000 ** 2, "GB": 1000 ** 3, "TB": 1000 ** 4,
+    "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3, "TiB": 1024 ** 4,
+}
+
+# Separates the log and status JSON in the combined SSH poll
+STATUS_SEPARATOR = "--KAPNODE-TASK-STATUS--"
+
+
+def parse_upid(text: str) -> Optional[Dict[str, str]]:
+    """
+    Find a UPID in a line of output.
+
+    Args:
+        text: Line that may contain a UPID
+
+    Returns:
+        Dictionary with upid, node, type and id, or None
+    """
+    match = UPID_PATTERN.search(text)
+    if not match:
+        return None
+    return {
+        "upid": match.group(0),
+        "node": match.group("node"),
+        "type": match.group("type"),
+        "id": match.group("id"),
+    }
+
+
+def parse_transfer(line: str) -> Optional[Tuple[float, int, int]]:
+    """
+    Extract transfer progress from a task log line.
+
+    Returns:
+        Tuple of (percent, bytes done, bytes total), or None
+    """
+    match = TRANSFER_PATTERN.search(line)
+    if not match:
+        return None
+    done = float(match.group("done")) * UNIT_SIZES.get(match.group("done_unit"), 1)
+    total = float(match.group("total")) * UNIT_SIZES.get(match.group("total_unit"), 1)
+    return float(match.group("percent")), int(done), int(total)
+
+
+class TaskTailer:
+    """
+    Follow a running Proxmox task by reading its log from the last offset.
+
+    Each poll fetches only new log lines plus the task status: one HTTP request
+    pair with the API client, or one command on the pooled SSH connection.
+    """
+
+    def __init__(
+        self,
+        ssh_manager: Optional[SSHManager] = None,
+        api: Optional["ProxmoxAPI"] = None,
+        interval: float = 1.0,
+        page_size: int = 500,
+        timeout: float = 3600.0,
+    ):
+        """
+        Initialize task tailer.
+
+        Args:
+            ssh_manager: SSH manager used when no API client is given
+            api: Proxmox API client (preferred when set)
+            interval: Seconds between polls while the task runs
+            page_size: Maximum log lines fetched per poll
+            timeout: Give up following after this many seconds
+        """
+        self.ssh_manager = ssh_manager or SSHManager()
+        self.api = api
+        self.interval = interval
+        self.page_size = page_size
+        self.timeout = timeout
+
+        # Final status of the last followed task ('OK' on success)
+        self.exitstatus: Optional[str] = None
+
+    def poll(
+        self,
+        node: str,
+        upid: str,
+        offset: int,
+        host: str,
+        user: str,
+        key: Optional[Path] = None,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Read new log lines and the current status of a task.
+
+        Args:
+            node: Proxmox node running the task
+            upid: Task UPID
+            offset: Number of log lines already read
+            host: Proxmox host for SSH polling
+            user: SSH user
+            key: SSH private key
+
+        Returns:
+            Tuple of (log entries {'n', 't'}, status dictionary)
+
+        Raises:
+            RuntimeError: If the task cannot be queried
+        """
+        if self.api is not None:
+            lines = self.api.task_log(node, upid, start=offset, limit=self.page_size)
+            return lines, self.api.task_status(node, upid)
+
+        base = f"/nodes/{shlex.quote(node)}/tasks/{shlex.quote(upid)}"
+        command = (
+            f"pvesh get {base}/log --start {int(offset)} --limit {int(self.page_size)} --output-format json"
+            f" && echo {STATUS_SEPARATOR}"
+            f" && pvesh get {base}/status --output-format json"
+        )
+
+        stdout, stderr, exit_code = self.ssh_manager.execute_command(host, user, command, key)
+        if exit_code != 0 or STATUS_SEPARATOR not in stdout:
+            raise RuntimeError(stderr.strip() or f"pvesh exited with {exit_code}")
+
+        log_json, status_json = stdout.split(STATUS_SEPARATOR, 1)
+        try:
+            return json.loads(log_json), json.loads(status_json)
+        except ValueError as e:
+            raise RuntimeError(f"Invalid pvesh output: {e}")
+
+    def follow(
+        self,
+        upid: str,
+        host: str,
+        user: str,
+        key: Optional[Path] = None,
+    ) -> Iterator[str]:
+        """
+        Yield task log lines as they are written until the task stops.
+
+        Args:
+            upid: Task UPID (the node is taken from it)
+            host: Proxmox host for SSH polling
+            user: SSH user
+            key: SSH private key
+
+        Yields:
+            Task log lines (the last one is 'TASK OK' or 'TASK ERROR: ...')
+        """
+        info = parse_upid(upid)
+        if info is None:
+            yield f"ERROR: Not a Proxmox task ID: {upid}"
+            return
+
+        self.exitstatus = None
+        offset = 0
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            try:
+                lines, status = self.poll(info["node"], info["upid"], offset, host, user, key)
+            except Exception as e:
+                yield f"WARNING: Could not follow task {info['upid']}: {e}"
+                return
+
+            for entry in lines:
+                # Skips the 'no content' placeholder (n=0) of an empty log
+                number = int(entry.get("n", 0))
+                if number <= offset:
+                    continue
+                offset = number
+                yield str(entry.get("t", ""))
+
+            # Keep reading without waiting while a full page came back
+            if len(lines) >= self.page_size:
+                continue
+
+            if status.get("status") == "stopped":
+                # Lines written between the log and status reads come next poll
+                if self.exitstatus is not None:
+                    return
+                self.exitstatus = status.get("exitstatus") or "unknown"
+                continue
+
+            if time.monotonic() >= deadline:
+                yield f"WARNING: Stopped following task {info['upid']} after {self.timeout:.0f}s"
+                return
+
+            time.sleep(self.interval)
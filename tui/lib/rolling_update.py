@@ -0,0 +1,385 @@
+"""Rolling Update - Patch cluster nodes in batches with k3s drain and health gates."""
+
+import queue
+import shlex
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .cluster_join import JoinOrchestrator
+from .ssh_manager import SSHManager
+
+
+UPGRADE_COMMANDS = [
+    "sudo apt-get update",
+    "sudo DEBIAN_FRONTEND=noninteractive apt-get -o Dpkg::Options::=--force-confold upgrade -y",
+    "sudo apt-get autoremove -y",
+]
+
+# Inventory groups holding k3s nodes, with the node type each implies
+GROUP_NODE_TYPES = {
+    "k3s_workers": "k3s-worker",
+    "backup_nodes": "backup",
+    "k3s_masters": "k3s-master",
+}
+
+REBOOT_CHECK_COMMAND = "test -f /var/run/reboot-required && echo yes || echo no"
+BOOT_ID_COMMAND = "cat /proc/sys/kernel/random/boot_id"
+
+
+def select_nodes(
+    nodes: List[Dict[str, Any]],
+    hostnames: Optional[List[str]] = None,
+    location: Optional[str] = None,
+    types: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Pick k3s cluster nodes from inventory nodes.
+
+    Args:
+        nodes: Nodes from InventoryManager.list_nodes()
+        hostnames: Only these hostnames (default: all)
+        location: Only nodes at this location (case-insensitive)
+        types: Node types to include (default: k3s-worker and backup)
+
+    Returns:
+        Matching nodes, each with node_type filled in from its group if missing
+    """
+    types = set(types or ["k3s-worker", "backup"])
+    selected = []
+
+    for node in nodes:
+        group = node.get("group")
+        if group not in GROUP_NODE_TYPES:
+            continue
+        node_type = node.get("node_type") or GROUP_NODE_TYPES[group]
+        if node_type not in types:
+            continue
+        if hostnames and node["hostname"] not in hostnames:
+            continue
+        if location and str(node.get("location", "")).lower() != location.lower():
+            continue
+        selected.append({**node, "node_type": node_type})
+
+    return selected
+
+
+def plan_batches(
+    nodes: List[Dict[str, Any]],
+    batch_size: int = 2,
+    max_per_site: int = 1,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Split nodes into update batches.
+
+    Each batch holds at most batch_size nodes and at most max_per_site nodes
+    from any one location, so every site keeps most of its capacity while a
+    batch is drained. Sites are interleaved so no site is left for last.
+
+    Args:
+        nodes: Inventory node dictionaries (hostname, location)
+        batch_size: Maximum nodes updated at the same time
+        max_per_site: Maximum nodes per location in one batch
+
+    Returns:
+        List of batches in update order
+    """
+    batch_size = max(int(batch_size), 1)
+    max_per_site = max(int(max_per_site), 1)
+
+    # Round-robin across sites: every site's first node, then every second...
+    by_site = sorted(nodes, key=lambda node: (str(node.get("location", "")), node["hostname"]))
+    site_counts: Dict[str, int] = {}
+    rank: Dict[str, int] = {}
+    for node in by_site:
+        site = str(node.get("location", ""))
+        rank[node["hostname"]] = site_counts.get(site, 0)
+        site_counts[site] = rank[node["hostname"]] + 1
+
+    pending = sorted(
+        by_site,
+        key=lambda node: (rank[node["hostname"]], str(node.get("location", "")), node["hostname"]),
+    )
+    batches: List[List[Dict[str, Any]]] = []
+
+    while pending:
+        batch: List[Dict[str, Any]] = []
+        per_site: Dict[str, int] = {}
+        remaining = []
+
+        for node in pending:
+            site = str(node.get("location", ""))
+            if len(batch) < batch_size and per_site.get(site, 0) < max_per_site:
+                batch.append(node)
+                per_site[site] = per_site.get(site, 0) + 1
+            else:
+                remaining.append(node)
+
+        batches.append(batch)
+        pending = remaining
+
+    return batches
+
+
+class RollingUpdater:
+    """
+    Upgrade nodes batch by batch: drain, upgrade, reboot if needed, wait
+    for Ready, uncordon.
+
+    Cluster operations run on the k3s master through a JoinOrchestrator;
+    nodes in a batch are updated in parallel over pooled SSH connections.
+    The run stops before the next batch once the share of failed nodes
+    exceeds the failure threshold.
+    """
+
+    def __init__(
+        self,
+        orchestrator: JoinOrchestrator,
+        ssh_manager: Optional[SSHManager] = None,
+        key: Optional[Path] = None,
+        batch_size: int = 2,
+        max_per_site: int = 1,
+        failure_threshold: float = 0.25,
+        drain_timeout: int = 300,
+        ready_timeout: float = 600.0,
+        poll_interval: float = 10.0,
+    ):
+        """
+        Initialize rolling updater.
+
+        Args:
+            orchestrator: Runs kubectl on the k3s master
+            ssh_manager: SSH manager instance (default: the orchestrator's)
+            key: SSH private key for the nodes
+            batch_size: Nodes updated in parallel
+            max_per_site: Nodes per location taken down at the same time
+            failure_threshold: Abort when failed/processed exceeds this ratio
+            drain_timeout: Seconds kubectl drain may take per node
+            ready_timeout: Seconds to wait for a node to come back Ready
+            poll_interval: Seconds between reachability/readiness checks
+        """
+        self.orchestrator = orchestrator
+        self.ssh_manager = ssh_manager or orchestrator.ssh_manager
+        self.key = key
+        self.batch_size = batch_size
+        self.max_per_site = max_per_site
+        self.failure_threshold = failure_threshold
+        self.drain_timeout = int(drain_timeout)
+        self.ready_timeout = ready_timeout
+        self.poll_interval = poll_interval
+
+        # Per-node results of the last run, keyed by hostname
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.aborted = False
+
+    def _target(self, node: Dict[str, Any]):
+        key = node.get("ssh_key")
+        return (
+            node.get("ansible_host") or node["hostname"],
+            node.get("ansible_user", "ubuntu"),
+            Path(key).expanduser() if key else self.key,
+        )
+
+    def _boot_id(self, node: Dict[str, Any]) -> Optional[str]:
+        host, user, key = self._target(node)
+        stdout, stderr, exit_code = self.ssh_manager.execute_command(host, user, BOOT_ID_COMMAND, key)
+        return stdout.strip() if exit_code == 0 and stdout.strip() else None
+
+    def _wait_for_reboot(self, node: Dict[str, Any], old_boot_id: Optional[str], deadline: float) -> bool:
+        """Wait until the node answers over SSH with a new boot ID."""
+        host, user, key = self._target(node)
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            self.ssh_manager.discard_client(host, user, key)
+            boot_id = self._boot_id(node)
+            if boot_id and boot_id != old_boot_id:
+                return True
+        return False
+
+    def _wait_for_ready(self, hostname: str, deadline: float) -> bool:
+        while time.monotonic() < deadline:
+            try:
+                if self.orchestrator.get_cluster_nodes().get(hostname, {}).get("ready"):
+                    return True
+            except Exception:
+                pass
+            time.sleep(self.poll_interval)
+        return False
+
+    def update_node(
+        self,
+        node: Dict[str, Any],
+        in_cluster: bool,
+        log: Callable[[str], None],
+    ) -> Dict[str, Any]:
+        """
+        Update a single node.
+
+        Args:
+            node: Inventory node dictionary
+            in_cluster: Whether the node is registered in k3s (drain/uncordon)
+            log: Callback for progress lines
+
+        Returns:
+            Result dictionary (ok, rebooted, detail, duration)
+        """
+        hostname = node["hostname"]
+        name = shlex.quote(hostname)
+        host, user, key = self._target(node)
+        started = time.monotonic()
+        result = {"ok": False, "rebooted": False, "detail": "", "duration": 0.0}
+
+        def finish(ok: bool, detail: str) -> Dict[str, Any]:
+            result.update(ok=ok, detail=detail, duration=time.monotonic() - started)
+            log(f"{hostname}: {'✓' if ok else '✗'} {detail}")
+            return result
+
+        if in_cluster:
+            log(f"{hostname}: draining")
+            try:
+                self.orchestrator.run_kubectl(
+                    f"drain {name} --ignore-daemonsets --delete-emptydir-data "
+                    f"--timeout={self.drain_timeout}s"
+                )
+            except Exception as e:
+                # Leave the node schedulable again rather than half-drained
+                try:
+                    self.orchestrator.run_kubectl(f"uncordon {name}")
+                except Exception:
+                    pass
+                return finish(False, f"drain failed: {e}")
+
+        log(f"{hostname}: upgrading packages")
+        steps = self.ssh_manager.run_script(host, user, UPGRADE_COMMANDS + [REBOOT_CHECK_COMMAND], key)
+        failed = [step for step in steps if step["exit_code"] != 0]
+        if failed or len(steps) != len(UPGRADE_COMMANDS) + 1:
+            step = failed[0] if failed else steps[-1]
+            detail = step["output"].strip().splitlines()[-1:] or [f"exit {step['exit_code']}"]
+            # Stays cordoned so workloads do not land on a broken node
+            return finish(False, f"'{step['command']}' failed: {detail[0]}")
+
+        deadline = time.monotonic() + self.ready_timeout
+
+        if steps[-1]["output"].strip().endswith("yes"):
+            log(f"{hostname}: rebooting")
+            old_boot_id = self._boot_id(node)
+            self.ssh_manager.execute_command(host, user, "sudo systemctl reboot", key)
+            result["rebooted"] = True
+            if not self._wait_for_reboot(node, old_boot_id, deadline):
+                return finish(False, "did not come back after reboot")
+
+        if in_cluster:
+            log(f"{hostname}: waiting for Ready")
+            if not self._wait_for_ready(hostname, deadline):
+                return finish(False, "not Ready after update (left cordoned)")
+            try:
+                self.orchestrator.run_kubectl(f"uncordon {name}")
+            except Exception as e:
+                return finish(False, f"uncordon failed: {e}")
+
+        return finish(True, "updated" + (" and rebooted" if result["rebooted"] else ""))
+
+    def runs_kubectl(self, node: Dict[str, Any]) -> bool:
+        """Whether a node is the master the orchestrator runs kubectl on."""
+        return self.orchestrator.master_host in (
+            node["hostname"], node.get("ansible_host"), node.get("tailscale_name")
+        )
+
+    def updatable(self, nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop the master kubectl runs on from a node list.
+
+        Draining and rebooting it would cut off the update that depends on it.
+        """
+        return [node for node in nodes if not self.runs_kubectl(node)]
+
+    def run(self, nodes: List[Dict[str, Any]]) -> Iterator[str]:
+        """
+        Update nodes batch by batch (never the master kubectl runs on).
+
+        Args:
+            nodes: Inventory node dictionaries to update
+
+        Yields:
+            Progress lines (results are collected in self.results)
+        """
+        self.results = {}
+        self.aborted = False
+
+        for node in nodes:
+            if self.runs_kubectl(node):
+                yield f"Skipping {node['hostname']}: kubectl runs on it"
+        nodes = self.updatable(nodes)
+        batches = plan_batches(nodes, self.batch_size, self.max_per_site)
+
+        try:
+            cluster = self.orchestrator.get_cluster_nodes()
+        except Exception as e:
+            yield f"ERROR: Could not list cluster nodes on {self.orchestrator.master_host}: {e}"
+            self.aborted = True
+            return
+
+        yield f"Updating {len(nodes)} nodes in {len(batches)} batches"
+
+        lines: "queue.Queue[Optional[str]]" = queue.Queue()
+
+        for number, batch in enumerate(batches, 1):
+            yield f"Batch {number}/{len(batches)}: {', '.join(node['hostname'] for node in batch)}"
+
+            def run_batch(batch=batch) -> None:
+                with ThreadPoolExecutor(max_workers=len(batch)) as pool:
+                    futures = {
+                        node["hostname"]: pool.submit(
+                            self.update_node, node, node["hostname"] in cluster, lines.put
+                        )
+                        for node in batch
+                    }
+                for hostname, future in futures.items():
+                    try:
+                        self.results[hostname] = future.result()
+                    except Exception as e:
+                        self.results[hostname] = {
+                            "ok": False, "rebooted": False, "detail": str(e), "duration": 0.0,
+                        }
+                lines.put(None)
+
+            worker = threading.Thread(target=run_batch, daemon=True)
+            worker.start()
+            while True:
+                line = lines.get()
+                if line is None:
+                    break
+                yield line
+            worker.join()
+
+            failed = sum(1 for result in self.results.values() if not result["ok"])
+            ratio = failed / len(self.results)
+            if failed and ratio > self.failure_threshold and number < len(batches):
+                self.aborted = True
+                yield (
+                    f"ERROR: Aborting: {failed}/{len(self.results)} nodes failed "
+                    f"({ratio:.0%} > {self.failure_threshold:.0%} threshold)"
+                )
+                break
+
+        yield from self.summary()
+
+    def summary(self) -> List[str]:
+        """
+        Summarize the last run.
+
+        Returns:
+            List of lines, one per processed node plus a total
+        """
+        lines = []
+        for hostname in sorted(self.results):
+            result = self.results[hostname]
+            mark = "✓" if result["ok"] else "✗"
+            lines.append(f"{mark} {hostname}: {result['detail']} ({result['duration']:.0f}s)")
+
+        succeeded = sum(1 for result in self.results.values() if result["ok"])
+        status = " (aborted)" if self.aborted else ""
+        lines.append(f"{succeeded}/{len(self.results)} nodes updated{status}")
+        return lines
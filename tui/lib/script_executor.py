@@ -1,23 +1,35 @@
 """Script Executor - Execute deployment scripts with live output streaming."""
 
 from pathlib import Path
-from typing import Dict, Iterator, Tuple, Optional
+from typing import Dict, Iterator, Tuple, Optional, TYPE_CHECKING
 import re
 import shlex
 from .ssh_manager import SSHManager
+from .proxmox_tasks import TaskTailer, parse_transfer, parse_upid
+from .metrics import metrics
+from .tracing import tracer
+
+if TYPE_CHECKING:
+    from .proxmox_api import ProxmoxAPI
 
 
 class ScriptExecutor:
     """Execute deployment scripts on remote hosts."""
 
-    def __init__(self, ssh_manager: Optional[SSHManager] = None):
+    def __init__(
+        self,
+        ssh_manager: Optional[SSHManager] = None,
+        api: Optional["ProxmoxAPI"] = None,
+    ):
         """
         Initialize script executor.
 
         Args:
             ssh_manager: SSH manager instance (creates new one if None)
+            api: Proxmox API client for following tasks (SSH is used if None)
         """
         self.ssh_manager = ssh_manager or SSHManager()
+        self.api = api
 
     def prepare_deployment(self, params: Dict[str, any]) -> str:
         """
@@ -80,6 +92,20 @@ class ScriptExecutor:
         if "k3s_token" in params and params["k3s_token"]:
             cmd_parts.extend(["--k3s-token", shlex.quote(str(params['k3s_token']))])
 
+        # Pre-baked image (skips first-boot package installation)
+        if params.get("golden_image"):
+            cmd_parts.extend(["--golden-image", shlex.quote(str(params['golden_image']))])
+
+        # Site-local caches
+        if params.get("apt_proxy"):
+            cmd_parts.extend(["--apt-proxy", shlex.quote(str(params['apt_proxy']))])
+        if params.get("k3s_mirror"):
+            cmd_parts.extend(["--k3s-mirror", shlex.quote(str(params['k3s_mirror']))])
+
+        # Cloud-init rendered locally and uploaded before running the script
+        if params.get("snippets_uploaded"):
+            cmd_parts.append("--snippets-uploaded")
+
         # Auto-confirm
         cmd_parts.append("--yes")
 
@@ -135,44 +161,71 @@ class ScriptExecutor:
         Yields:
             Lines of output from command execution
         """
-        try:
-            import paramiko
-
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        # Spans the remote runtime, including time the consumer spends per line
+        span = tracer.span("executor.deployment", host=host)
+        lines = received = 0
 
-            connect_kwargs = {
-                "hostname": host,
-                "username": user,
-                "timeout": 30,
-            }
-
-            if key:
-                connect_kwargs["key_filename"] = str(key)
-                connect_kwargs["look_for_keys"] = False
-                connect_kwargs["allow_agent"] = False
-
-            client.connect(**connect_kwargs)
+        try:
+            # Reuse the pooled connection that copy_script_to_host opened
+            client = self.ssh_manager.get_client(host, user, key)
 
             # Execute command with pty for real-time output
             stdin, stdout, stderr = client.exec_command(command, get_pty=True)
 
-            # Stream output line by line
+            # Stream output line by line; the script announces long-running
+            # Proxmox tasks by UPID and stays quiet while they run, so follow
+            # the task log in the meantime (further output stays buffered)
             for line in stdout:
-                yield line.rstrip('\n\r')
+                received += len(line)
+                line = line.rstrip('\n\r')
+                lines += 1
+                yield line
+
+                task = parse_upid(line)
+                if task:
+                    yield from self.follow_task(task["upid"], host, user, key)
 
             # Also get any stderr output
             stderr_lines = stderr.read().decode()
+            received += len(stderr_lines)
             if stderr_lines:
                 for line in stderr_lines.split('\n'):
                     if line.strip():
                         yield f"STDERR: {line}"
 
-            client.close()
-
         except Exception as e:
+            self.ssh_manager.discard_client(host, user, key)
+            span.tag(error=str(e))
             yield f"ERROR: {str(e)}"
 
+        finally:
+            span.tag(lines=lines)
+            span.finish()
+            metrics.ssh_bytes.inc(received, direction="received")
+
+    def follow_task(
+        self,
+        upid: str,
+        host: str,
+        user: str,
+        key: Optional[Path] = None
+    ) -> Iterator[str]:
+        """
+        Stream the log of a Proxmox task until it finishes.
+
+        Args:
+            upid: Task UPID
+            host: Proxmox hostname (for SSH polling)
+            user: Username
+            key: SSH private key path
+
+        Yields:
+            New task log lines
+        """
+        tailer = TaskTailer(self.ssh_manager, api=self.api)
+        with tracer.span("executor.follow_task", upid=upid, host=host):
+            yield from tailer.follow(upid, host, user, key)
+
     def parse_output(self, line: str) -> Dict[str, any]:
         """
         Parse deployment output line for progress and errors.
@@ -187,7 +240,9 @@ class ScriptExecutor:
             "type": "info",
             "message": line,
             "progress": None,
-            "stage": None
+            "stage": None,
+            "bytes_done": None,
+            "bytes_total": None
         }
 
         # Detect errors
@@ -206,6 +261,7 @@ class ScriptExecutor:
         stage_patterns = [
             (r"Creating VM", "Creating VM"),
             (r"Downloading.*image", "Downloading Image"),
+            (r"Importing.*image", "Importing Disk"),
             (r"Configuring.*cloud-init", "Configuring Cloud-Init"),
             (r"Starting VM", "Starting VM"),
             (r"Waiting for.*boot", "Waiting for Boot"),
@@ -219,10 +275,15 @@ class ScriptExecutor:
                 result["stage"] = stage_name
                 break
 
-        # Extract progress percentages
-        progress_match = re.search(r'(\d+)%', line)
-        if progress_match:
-            result["progress"] = int(progress_match.group(1))
+        # Extract progress percentages (with byte counts from task logs)
+        transfer = parse_transfer(line)
+        if transfer:
+            percent, result["bytes_done"], result["bytes_total"] = transfer
+            result["progress"] = int(percent)
+        else:
+            progress_match = re.search(r'(\d+)(?:\.\d+)?%', line)
+            if progress_match:
+                result["progress"] = int(progress_match.group(1))
 
         return result
 
@@ -0,0 +1,290 @@
+"""Service Registry - Application-wide manager instances and change notifications."""
+
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .config_manager import ConfigManager
+    from .dialer import Dialer
+    from .file_watcher import FileWatcher
+    from .inventory import InventoryManager
+    from .preflight import PreflightChecker
+    from .proxmox_api import ProxmoxAPI
+    from .script_executor import ScriptExecutor
+    from .ssh_manager import SSHManager
+
+
+# Topics published when the underlying data changes
+INVENTORY_CHANGED = "inventory"
+CONFIG_CHANGED = "config"
+
+
+class ServiceRegistry:
+    """
+    Shared managers owned by the application.
+
+    Each manager is created and loaded on first access only, so screens that
+    never touch SSH do not import paramiko, the inventory YAML is parsed once
+    per process, and every screen sees the same pooled SSH connections.
+    Screens subscribe to topics to refresh only when data actually changes;
+    inventory events carry a node diff so screens can patch affected rows.
+    """
+
+    def __init__(
+        self,
+        inventory_path: Optional[Path] = None,
+        config_path: Optional[Path] = None,
+    ):
+        """
+        Initialize service registry.
+
+        Args:
+            inventory_path: Inventory file (default: ~/.homelab/inventory.yml)
+            config_path: Config file (default: ~/.homelab-deploy.conf)
+        """
+        self.inventory_path = inventory_path
+        self.config_path = config_path
+
+        self._lock = threading.RLock()
+        self._config: Optional["ConfigManager"] = None
+        self._inventory: Optional["InventoryManager"] = None
+        self._ssh_manager: Optional["SSHManager"] = None
+        self._executor: Optional["ScriptExecutor"] = None
+        self._watcher: Optional["FileWatcher"] = None
+        self._proxmox_api: Optional["ProxmoxAPI"] = None
+        self._preflight: Optional["PreflightChecker"] = None
+
+        self._subscribers: Dict[str, List[Callable[[Any], None]]] = {}
+        self.dispatcher: Optional[Callable[[Callable[[], None]], None]] = None
+
+    @property
+    def config(self) -> "ConfigManager":
+        """Get the shared, loaded configuration manager."""
+        with self._lock:
+            if self._config is None:
+                from .config_manager import ConfigManager
+                self._config = ConfigManager(self.config_path)
+                self._config.load_config()
+                self._config.add_listener(lambda: self.publish(CONFIG_CHANGED))
+            return self._config
+
+    @property
+    def inventory(self) -> "InventoryManager":
+        """Get the shared, loaded inventory manager."""
+        with self._lock:
+            if self._inventory is None:
+                from .inventory import InventoryManager
+                self._inventory = InventoryManager(self.inventory_path)
+                self._inventory.load_inventory()
+                self._inventory.add_listener(lambda diff: self.publish(INVENTORY_CHANGED, diff))
+            return self._inventory
+
+    @property
+    def ssh_manager(self) -> "SSHManager":
+        """Get the shared SSH manager (owns the connection pool)."""
+        with self._lock:
+            if self._ssh_manager is None:
+                from .known_hosts import KnownHostsStore
+                from .ssh_manager import SSHManager
+                policy = self.config.get_preference("host_key_policy", "accept-new")
+                self._ssh_manager = SSHManager(
+                    KnownHostsStore(policy=policy),
+                    use_agent=bool(self.config.get_preference("ssh_use_agent", False)),
+                    dialer=self._new_dialer(),
+                )
+            return self._ssh_manager
+
+    def _new_dialer(self) -> Optional["Dialer"]:
+        """Create the address-racing dialer from the dialer config block."""
+        settings = self.config.get_preference("dialer", {}) or {}
+        if not settings.get("enabled", True):
+            return None
+
+        from .dialer import Dialer
+        dialer = Dialer(
+            lambda: self.inventory.list_nodes(),
+            stagger=settings.get("stagger", 0.25),
+            ttl=settings.get("ttl", 300),
+        )
+        # Node addresses are re-read after the inventory changes
+        self.subscribe(INVENTORY_CHANGED, lambda diff: dialer.reset())
+        return dialer
+
+    @property
+    def executor(self) -> "ScriptExecutor":
+        """Get the shared script executor (uses the shared SSH manager and API client)."""
+        with self._lock:
+            if self._executor is None:
+                from .script_executor import ScriptExecutor
+                self._executor = ScriptExecutor(self.ssh_manager)
+            self._executor.api = self.proxmox_api
+            return self._executor
+
+    @property
+    def preflight(self) -> "PreflightChecker":
+        """Get the shared preflight checker (its result cache is shared by all screens)."""
+        with self._lock:
+            if self._preflight is None:
+                from .preflight import PreflightChecker
+                config = self.config
+                settings = config.get_preference("preflight", {}) or {}
+                key = config.get_preference("ssh_key", "~/.ssh/homelab_rsa")
+                self._preflight = PreflightChecker(
+                    self.inventory,
+                    self.ssh_manager,
+                    fallback_host={
+                        "hostname": config.get_preference("proxmox_host", "kapmox"),
+                        "ansible_user": config.get_preference("proxmox_user", "root"),
+                        "ssh_key": key,
+                    },
+                    default_key=Path(key).expanduser() if key else None,
+                    connect_timeout=settings.get("connect_timeout", 2),
+                    ssh_timeout=settings.get("ssh_timeout", 5),
+                    ttl=settings.get("ttl", 60),
+                    max_workers=settings.get("max_workers", 16),
+                )
+            return self._preflight
+
+    @property
+    def proxmox_api(self) -> Optional["ProxmoxAPI"]:
+        """
+        Get the shared Proxmox API client.
+
+        Returns:
+            Client built from the proxmox_api config block, or None when the
+            API is disabled or no token is configured (callers fall back to SSH)
+        """
+        settings = self.config.get_preference("proxmox_api", {}) or {}
+        if not settings.get("enabled") or not settings.get("token_id"):
+            return None
+
+        with self._lock:
+            if self._proxmox_api is None:
+                from .proxmox_api import ProxmoxAPI
+                self._proxmox_api = ProxmoxAPI(
+                    settings.get("url") or f"https://{self.config.get_preference('proxmox_host', 'kapmox')}:8006",
+                    settings["token_id"],
+                    settings.get("token_secret", ""),
+                    verify_ssl=settings.get("verify_ssl", True),
+                    timeout=settings.get("timeout", 10),
+                )
+            return self._proxmox_api
+
+    def subscribe(self, topic: str, callback: Callable[[Any], None]) -> None:
+        """
+        Register a callback for a topic.
+
+        Args:
+            topic: Topic name (INVENTORY_CHANGED, CONFIG_CHANGED)
+            callback: Called with the published payload on the UI thread
+        """
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(callback)
+
+    def unsubscribe(self, topic: str, callback: Callable[[Any], None]) -> None:
+        """
+        Remove a previously registered callback.
+
+        Args:
+            topic: Topic name
+            callback: Callback passed to subscribe()
+        """
+        with self._lock:
+            callbacks = self._subscribers.get(topic, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def publish(self, topic: str, payload: Any = None) -> None:
+        """
+        Notify all subscribers of a topic.
+
+        Callbacks are routed through the dispatcher (set by the app) so they
+        run on the UI thread even when the change happened in a worker.
+
+        Args:
+            topic: Topic name
+            payload: Optional data passed to each callback
+        """
+        with self._lock:
+            callbacks = list(self._subscribers.get(topic, []))
+
+        if not callbacks:
+            return
+
+        def deliver() -> None:
+            for callback in callbacks:
+                try:
+                    callback(payload)
+                except Exception as e:
+                    print(f"Error in {topic} subscriber: {e}")
+
+        if self.dispatcher:
+            self.dispatcher(deliver)
+        else:
+            deliver()
+
+    def start_watching(self, debounce: float = 0.5, poll_interval: float = 2.0) -> None:
+        """
+        Reload the inventory and config when they are edited outside the TUI.
+
+        Each burst of writes triggers one reload; reloads publish only when
+        something changed, so the TUI's own saves are not reported twice.
+
+        Args:
+            debounce: Seconds of quiet before reloading a changed file
+            poll_interval: Seconds between checks when inotify is unavailable
+        """
+        from .config_manager import DEFAULT_CONFIG_PATH
+        from .file_watcher import FileWatcher
+        from .inventory import DEFAULT_INVENTORY_PATH
+
+        with self._lock:
+            if self._watcher is not None:
+                return
+
+            self._watcher = FileWatcher(
+                [
+                    self.inventory_path or DEFAULT_INVENTORY_PATH,
+                    self.config_path or DEFAULT_CONFIG_PATH,
+                ],
+                self._on_file_changed,
+                debounce=debounce,
+                poll_interval=poll_interval,
+            )
+            self._watcher.start()
+
+    def _on_file_changed(self, path: Path) -> None:
+        """Reload whichever manager owns the changed file (watcher thread)."""
+        with self._lock:
+            watcher, inventory, config = self._watcher, self._inventory, self._config
+
+        if watcher is None:
+            return
+
+        # Not under the lock: listeners block until the UI thread handles them.
+        # Managers not created yet will read the new file on first access.
+        inventory_file, config_file = watcher.paths
+        if path == inventory_file and inventory is not None:
+            inventory.load_inventory()
+        elif path == config_file and config is not None:
+            config.load_config()
+            # Rebuild the API client on next access in case credentials changed
+            with self._lock:
+                api, self._proxmox_api = self._proxmox_api, None
+            if api is not None:
+                api.close()
+
+    def close(self) -> None:
+        """Release pooled resources (file watcher, SSH and API connections)."""
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+
+        if watcher is not None:
+            watcher.stop()
+
+        with self._lock:
+            if self._ssh_manager is not None:
+                self._ssh_manager.close_all()
+            if self._proxmox_api is not None:
+                self._proxmox_api.close()
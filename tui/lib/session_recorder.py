@@ -0,0 +1,201 @@
+"""Session Recorder - Record deployment output streams and replay them.
+
+A session file is gzip-compressed JSON Lines. The first line is a header
+({"version", "started", "meta"}); every following line is one output line:
+
+    {"t": 12.345, "src": "stdout", "off": 18231, "stage": "Importing Disk", "line": "..."}
+
+t is seconds since the session started, off the byte offset of the line in
+the recorded stream and stage the deployment stage active at that point.
+"""
+
+import gzip
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+DEFAULT_SESSIONS_DIR = Path.home() / ".homelab" / "sessions"
+
+FORMAT_VERSION = 1
+
+# Keys never written to a session header
+SECRET_KEYS = {"tailscale_key", "k3s_token", "password", "token_secret"}
+
+
+def _open(path: Path, mode: str):
+    """Open a session file, compressed unless it ends in .jsonl."""
+    if path.suffix == ".jsonl":
+        return open(path, mode + "t", encoding="utf-8")
+    return gzip.open(path, mode + "t", encoding="utf-8")
+
+
+class SessionRecorder:
+    """
+    Append timestamped output lines to a session file.
+
+    Lines are buffered and written in batches; record() only formats and
+    queues a line, so it is cheap enough to call for every line of output.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        meta: Optional[Dict[str, Any]] = None,
+        flush_every: int = 200,
+    ):
+        """
+        Initialize session recorder.
+
+        Args:
+            path: Session file (.jsonl.gz, or .jsonl for uncompressed)
+            meta: Session details stored in the header (secrets are dropped)
+            flush_every: Lines buffered before writing
+        """
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.offset = 0
+        self.count = 0
+        self._buffer: List[str] = []
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = _open(self.path, "w")
+
+        header = {
+            "version": FORMAT_VERSION,
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "meta": {key: value for key, value in (meta or {}).items() if key not in SECRET_KEYS},
+        }
+        self._file.write(json.dumps(header, default=str) + "\n")
+
+    @classmethod
+    def for_deployment(cls, params: Dict[str, Any], sessions_dir: Optional[Path] = None) -> "SessionRecorder":
+        """
+        Create a recorder named after a deployment ('<hostname>-<timestamp>.jsonl.gz').
+
+        Args:
+            params: Deployment parameters (stored in the header without secrets)
+            sessions_dir: Directory for session files (default: ~/.homelab/sessions)
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        name = f"{params.get('name', 'session')}-{timestamp}.jsonl.gz"
+        return cls((sessions_dir or DEFAULT_SESSIONS_DIR) / name, params)
+
+    def record(self, line: str, source: str = "stdout", stage: Optional[str] = None) -> None:
+        """
+        Record one output line.
+
+        Args:
+            line: Output line (without newline)
+            source: Stream the line came from (stdout, stderr, task, ui)
+            stage: Deployment stage active when the line arrived
+        """
+        entry = json.dumps({
+            "t": round(time.monotonic() - self.started, 3),
+            "src": source,
+            "off": self.offset,
+            "stage": stage,
+            "line": line,
+        }, ensure_ascii=False)
+
+        with self.lock:
+            self.offset += len(line.encode("utf-8", "replace")) + 1
+            self.count += 1
+            self._buffer.append(entry)
+            if len(self._buffer) >= self.flush_every:
+                self._flush()
+
+    def _flush(self) -> None:
+        """Write buffered lines (caller holds the lock)."""
+        if self._buffer and not self._file.closed:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer = []
+
+    def close(self) -> None:
+        """Write remaining lines and close the file."""
+        with self.lock:
+            self._flush()
+            self._file.close()
+
+
+def load_session(path: Path) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Read a session file.
+
+    Args:
+        path: Session file written by SessionRecorder
+
+    Returns:
+        Tuple of (header, list of line records)
+
+    Raises:
+        ValueError: If the file is not a session file
+        OSError: If it cannot be read
+    """
+    path = Path(path)
+    with _open(path, "r") as f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            raise ValueError(f"Not a session file: {path}")
+        if not isinstance(header, dict) or "version" not in header:
+            raise ValueError(f"Not a session file: {path}")
+
+        records = []
+        for text in f:
+            text = text.strip()
+            if not text:
+                continue
+            try:
+                records.append(json.loads(text))
+            except ValueError:
+                # A session cut off mid-write ends with a partial line
+                break
+
+    return header, records
+
+
+def replay_session(
+    records: Iterable[Dict[str, Any]],
+    speed: Optional[float] = 1.0,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield session records with their original timing.
+
+    Args:
+        records: Line records from load_session()
+        speed: Playback speed (1.0 = original, 4.0 = four times faster,
+            None or 0 = as fast as possible)
+
+    Yields:
+        The records, each when its (scaled) timestamp is reached
+    """
+    if not speed:
+        yield from records
+        return
+
+    started = time.monotonic()
+    for record in records:
+        delay = started + float(record.get("t", 0.0)) / speed - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        yield record
+
+
+def list_sessions(sessions_dir: Optional[Path] = None) -> List[Path]:
+    """
+    List recorded sessions, newest first.
+
+    Args:
+        sessions_dir: Directory to search (default: ~/.homelab/sessions)
+    """
+    directory = sessions_dir or DEFAULT_SESSIONS_DIR
+    if not directory.exists():
+        return []
+    files = [path for path in directory.iterdir() if path.name.endswith((".jsonl", ".jsonl.gz"))]
+    return sorted(files, key=lambda path: path.stat().st_mtime, reverse=True)
@@ -0,0 +1,162 @@
+"""SSH Keys - Process-wide cache of parsed private keys and key detection."""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+# paramiko is imported on first use to keep it off the TUI startup path
+if TYPE_CHECKING:
+    import paramiko
+
+
+# Environment variable holding the passphrase for encrypted keys
+PASSPHRASE_ENV = "KAPNODE_SSH_PASSPHRASE"
+
+# Key file names tried by detect(), in priority order
+KEY_PRIORITIES = [
+    "homelab_rsa",
+    "homelab_ed25519",
+    "id_ed25519",
+    "id_rsa",
+]
+
+# Enough to see the PEM/OpenSSH header line without reading the whole key
+HEADER_BYTES = 64
+
+Stat = Optional[Tuple[int, int]]
+
+
+def _stat(path: Path) -> Stat:
+    """Get (mtime_ns, size) of a file, or None if it is not a regular file."""
+    try:
+        result = path.stat()
+    except OSError:
+        return None
+    if not os.path.isfile(path):
+        return None
+    return result.st_mtime_ns, result.st_size
+
+
+class KeyCache:
+    """
+    Parse each private key once per process.
+
+    Entries are keyed by path and invalidated when the file's mtime or size
+    changes, so a regenerated key is picked up without restarting.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._keys: Dict[str, Tuple[Stat, "paramiko.PKey"]] = {}
+        self._passphrases: Dict[str, str] = {}
+        self._detected: Optional[Tuple[Tuple[Stat, ...], Optional[Path]]] = None
+        self._agent_keys: Optional[List["paramiko.AgentKey"]] = None
+
+    def set_passphrase(self, path: Path, passphrase: str) -> None:
+        """
+        Remember the passphrase of an encrypted key for this process.
+
+        Args:
+            path: Private key path
+            passphrase: Key passphrase
+        """
+        with self.lock:
+            self._passphrases[str(Path(path).expanduser())] = passphrase
+            self._keys.pop(str(Path(path).expanduser()), None)
+
+    def load(self, path: Path) -> "paramiko.PKey":
+        """
+        Get the parsed private key at a path.
+
+        Encrypted keys use the passphrase from set_passphrase() or the
+        KAPNODE_SSH_PASSPHRASE environment variable.
+
+        Args:
+            path: Private key path
+
+        Returns:
+            Parsed key
+
+        Raises:
+            paramiko.PasswordRequiredException: Encrypted key without passphrase
+            paramiko.SSHException, OSError: Unreadable or invalid key
+        """
+        import paramiko
+
+        path = Path(path).expanduser()
+        name = str(path)
+        stat = _stat(path)
+
+        with self.lock:
+            cached = self._keys.get(name)
+            if cached is not None and cached[0] == stat:
+                return cached[1]
+            passphrase = self._passphrases.get(name) or os.environ.get(PASSPHRASE_ENV) or None
+
+        # Parsed outside the lock; a duplicate parse on a race is harmless
+        key = paramiko.PKey.from_path(path, passphrase=passphrase.encode() if passphrase else None)
+
+        with self.lock:
+            self._keys[name] = (stat, key)
+
+        return key
+
+    def agent_keys(self) -> List["paramiko.AgentKey"]:
+        """
+        Get the keys offered by the running SSH agent (queried once).
+
+        Returns:
+            List of agent keys (empty if no agent is running)
+        """
+        with self.lock:
+            if self._agent_keys is None:
+                import paramiko
+                try:
+                    self._agent_keys = list(paramiko.Agent().get_keys())
+                except Exception:
+                    self._agent_keys = []
+            return self._agent_keys
+
+    def detect(self, ssh_dir: Optional[Path] = None) -> Optional[Path]:
+        """
+        Find the first private key in KEY_PRIORITIES order.
+
+        The result is memoized until one of the candidate files changes;
+        only each file's header is read.
+
+        Args:
+            ssh_dir: Directory to search (default: ~/.ssh)
+
+        Returns:
+            Path to the key, or None if no candidate is a private key
+        """
+        ssh_dir = ssh_dir or Path.home() / ".ssh"
+        candidates = [ssh_dir / name for name in KEY_PRIORITIES]
+        stats = tuple(_stat(path) for path in candidates)
+
+        with self.lock:
+            if self._detected is not None and self._detected[0] == (str(ssh_dir),) + stats:
+                return self._detected[1]
+
+        found = None
+        for path, stat in zip(candidates, stats):
+            if stat is None:
+                continue
+            try:
+                with open(path, "rb") as f:
+                    header = f.read(HEADER_BYTES)
+            except OSError:
+                continue
+            if b"PRIVATE KEY" in header:
+                found = path
+                break
+
+        with self.lock:
+            self._detected = ((str(ssh_dir),) + stats, found)
+
+        return found
+
+
+# Shared by all SSHManager instances in the process
+key_cache = KeyCache()
@@ -1,47 +1,229 @@
 """SSH Manager - Handle SSH connections, key detection, and remote command execution."""
 
+import io
 import os
+import shlex
 import subprocess
+import threading
+import time
+import uuid
 from pathlib import Path
-from typing import Optional, Tuple
-import paramiko
-from paramiko.ssh_exception import SSHException, AuthenticationException
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .dialer import Dialer
+from .known_hosts import KnownHostsStore
+from .metrics import metrics
+from .ssh_keys import KeyCache, key_cache
+from .tracing import tracer
+
+# paramiko is imported on first use to keep it off the TUI startup path
+if TYPE_CHECKING:
+    import paramiko
 
 
 class SSHManager:
     """Manage SSH connections and operations."""
 
-    def __init__(self):
-        self.ssh_client: Optional[paramiko.SSHClient] = None
+    def __init__(
+        self,
+        known_hosts: Optional[KnownHostsStore] = None,
+        use_agent: bool = False,
+        keys: Optional[KeyCache] = None,
+        dialer: Optional[Dialer] = None,
+    ):
+        """
+        Initialize SSH manager.
+
+        Args:
+            known_hosts: Host-key store used to verify servers
+                (default: ~/.homelab/known_hosts, trust on first use)
+            use_agent: Also offer keys from a running SSH agent
+            keys: Private key cache (default: shared per process)
+            dialer: Races a node's Tailscale and LAN addresses when
+                connecting (default: connect to the given host only)
+        """
+        self.ssh_client: Optional["paramiko.SSHClient"] = None
+        self.known_hosts = known_hosts or KnownHostsStore()
+        self.use_agent = use_agent
+        self.keys = keys or key_cache
+        self.dialer = dialer
+
+        # Connected clients keyed by (host, port, user, key path)
+        self.pool: Dict[Tuple[str, int, str, str], "paramiko.SSHClient"] = {}
+        self.pool_lock = threading.Lock()
+
+    def _new_client(self, host: str, port: int = 22) -> "paramiko.SSHClient":
+        """Create a client that verifies the host against the known-hosts store."""
+        import paramiko
+
+        client = paramiko.SSHClient()
+        self.known_hosts.configure_client(client, host, port)
+        return client
+
+    def _auth_kwargs(self, key: Optional[Path]) -> Dict[str, Any]:
+        """
+        Get paramiko connect() arguments for key authentication.
+
+        The key is parsed once per process through the key cache instead of
+        on every connect. An encrypted key without a passphrase falls back to
+        the agent when agent use is enabled.
+        """
+        import paramiko
+
+        kwargs: Dict[str, Any] = {"look_for_keys": False, "allow_agent": self.use_agent}
+        if key:
+            try:
+                kwargs["pkey"] = self.keys.load(key)
+            except paramiko.PasswordRequiredException:
+                if not self.use_agent:
+                    raise
+        return kwargs
+
+    def _connect(
+        self,
+        host: str,
+        user: str,
+        key: Optional[Path] = None,
+        port: int = 22,
+        timeout: float = 30,
+    ) -> "paramiko.SSHClient":
+        """
+        Open a new SSH connection.
+
+        Args:
+            host: Hostname or IP address
+            user: Username for SSH connection
+            key: Path to SSH private key (optional)
+            port: SSH port (default 22)
+            timeout: Timeout in seconds for each of TCP connect, SSH banner
+                and authentication
+
+        Returns:
+            Connected paramiko client
+        """
+        client = self._new_client(host, port)
+
+        connect_kwargs = {
+            "hostname": host,
+            "port": port,
+            "username": user,
+            "timeout": timeout,
+            "banner_timeout": timeout,
+            "auth_timeout": timeout,
+        }
+
+        started = time.perf_counter()
+        with tracer.span("ssh.connect", host=host, user=user, port=port):
+            try:
+                if key or self.use_agent:
+                    connect_kwargs.update(self._auth_kwargs(key))
+
+                # Keep hostname for host-key checks; the socket may use another address
+                if self.dialer is not None and len(self.dialer.candidates(host)) > 1:
+                    connect_kwargs["sock"] = self.dialer.connect(host, port, timeout)
+
+                client.connect(**connect_kwargs)
+            except Exception:
+                metrics.ssh_connect_failures.inc()
+                raise
+
+        metrics.ssh_connect_seconds.observe(time.perf_counter() - started)
+        return client
+
+    def get_client(
+        self,
+        host: str,
+        user: str,
+        key: Optional[Path] = None,
+        port: int = 22,
+        timeout: float = 30,
+    ) -> "paramiko.SSHClient":
+        """
+        Get a pooled connection, reconnecting if the cached one has dropped.
+
+        Pooled clients stay open until close_all(); callers must not close them.
+
+        Args:
+            host: Hostname or IP address
+            user: Username for SSH connection
+            key: Path to SSH private key (optional)
+            port: SSH port (default 22)
+            timeout: Timeout in seconds when a new connection is needed
+
+        Returns:
+            Connected paramiko client
+        """
+        pool_key = (host, port, user, str(key) if key else "")
+
+        with self.pool_lock:
+            client = self.pool.get(pool_key)
+
+        if client is not None:
+            transport = client.get_transport()
+            if transport is not None and transport.is_active():
+                metrics.ssh_pool_hits.inc()
+                return client
+            self.discard_client(host, user, key, port)
+
+        metrics.ssh_pool_misses.inc()
+        client = self._connect(host, user, key, port, timeout)
+
+        with self.pool_lock:
+            existing = self.pool.setdefault(pool_key, client)
+
+        # Another thread connected first; keep a single connection per target
+        if existing is not client:
+            client.close()
+
+        return existing
+
+    def discard_client(
+        self,
+        host: str,
+        user: str,
+        key: Optional[Path] = None,
+        port: int = 22,
+    ) -> None:
+        """
+        Close and forget a pooled connection (e.g. after an error).
+
+        Args:
+            host: Hostname or IP address
+            user: Username for SSH connection
+            key: Path to SSH private key (optional)
+            port: SSH port (default 22)
+        """
+        with self.pool_lock:
+            client = self.pool.pop((host, port, user, str(key) if key else ""), None)
+
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    def close_all(self) -> None:
+        """Close all pooled connections."""
+        with self.pool_lock:
+            clients = list(self.pool.values())
+            self.pool.clear()
+
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
 
     def detect_ssh_key(self) -> Optional[Path]:
         """
         Auto-detect SSH keys in priority order.
 
+        Memoized until one of the candidate key files changes.
+
         Returns:
             Path to SSH key if found, None otherwise
         """
-        ssh_dir = Path.home() / ".ssh"
-        key_priorities = [
-            "homelab_rsa",
-            "homelab_ed25519",
-            "id_ed25519",
-            "id_rsa",
-        ]
-
-        for key_name in key_priorities:
-            key_path = ssh_dir / key_name
-            if key_path.exists() and key_path.is_file():
-                # Check if it's a valid private key
-                try:
-                    with open(key_path, 'r') as f:
-                        content = f.read()
-                        if "PRIVATE KEY" in content:
-                            return key_path
-                except Exception:
-                    continue
-
-        return None
+        return self.keys.detect()
 
     def generate_ssh_key(self, path: Path, key_type: str = "ed25519") -> bool:
         """
@@ -91,17 +273,14 @@ class SSHManager:
             True if connection successful, False otherwise
         """
         try:
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            client = self._new_client(host, port)
 
             client.connect(
                 hostname=host,
                 port=port,
                 username=user,
-                key_filename=str(key),
                 timeout=10,
-                look_for_keys=False,
-                allow_agent=False,
+                **self._auth_kwargs(key),
             )
 
             # Test with a simple command
@@ -111,7 +290,7 @@ class SSHManager:
             client.close()
             return result == "test"
 
-        except (SSHException, AuthenticationException, Exception) as e:
+        except Exception as e:
             print(f"Connection test failed: {e}")
             return False
 
@@ -144,8 +323,7 @@ class SSHManager:
             ]
 
             # For security, we'll use paramiko instead of sshpass
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            client = self._new_client(host)
 
             client.connect(
                 hostname=host,
@@ -166,11 +344,15 @@ class SSHManager:
                 "chmod 600 ~/.ssh/authorized_keys",
             ]
 
-            for cmd in commands:
-                stdin, stdout, stderr = client.exec_command(cmd)
-                stdout.read()  # Wait for completion
-
+            results = self._run_script(client, commands)
             client.close()
+
+            failed = [result for result in results if result["exit_code"] != 0]
+            if failed or len(results) != len(commands):
+                step = failed[0] if failed else {"command": "?", "output": "session ended early"}
+                print(f"Error setting up SSH key: '{step['command']}' failed: {step['output'].strip()}")
+                return False
+
             return True
 
         except Exception as e:
@@ -198,36 +380,140 @@ class SSHManager:
         Returns:
             Tuple of (stdout, stderr, exit_code)
         """
-        try:
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        with tracer.span("ssh.exec", host=host, command=command[:80]) as span:
+            try:
+                client = self.get_client(host, user, key, port)
 
-            connect_kwargs = {
-                "hostname": host,
-                "port": port,
-                "username": user,
-                "timeout": 30,
-            }
+                stdin, stdout, stderr = client.exec_command(command)
 
-            if key:
-                connect_kwargs["key_filename"] = str(key)
-                connect_kwargs["look_for_keys"] = False
-                connect_kwargs["allow_agent"] = False
+                stdout_data = stdout.read().decode()
+                stderr_data = stderr.read().decode()
+                exit_code = stdout.channel.recv_exit_status()
 
-            client.connect(**connect_kwargs)
+                received = len(stdout_data) + len(stderr_data)
+                metrics.ssh_bytes.inc(received, direction="received")
+                span.tag(exit_code=exit_code, bytes=received)
+                return stdout_data, stderr_data, exit_code
 
-            stdin, stdout, stderr = client.exec_command(command)
+            except Exception as e:
+                self.discard_client(host, user, key, port)
+                span.tag(error=str(e))
+                return "", str(e), 1
 
-            stdout_data = stdout.read().decode()
-            stderr_data = stderr.read().decode()
-            exit_code = stdout.channel.recv_exit_status()
+    def _run_script(
+        self,
+        client: "paramiko.SSHClient",
+        commands: List[str],
+        stop_on_error: bool = True,
+        on_output: Optional[Callable[[int, str], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Run commands in one remote shell on an open client (see run_script)."""
+        # Unique per run so command output cannot fake a step boundary
+        marker = f"__KAPNODE_STEP_{uuid.uuid4().hex}__"
+
+        lines = ["exec 2>&1"]
+        for index, command in enumerate(commands):
+            lines.append(f"{command}\n__rc=$?; printf '%s:{index}:%d\\n' {marker} $__rc")
+            if stop_on_error:
+                lines.append("[ $__rc -eq 0 ] || exit $__rc")
+
+        # Passed as an argument rather than on stdin, so commands that read
+        # stdin cannot swallow the rest of the script
+        script = "\n".join(lines)
+        stdin, stdout, stderr = client.exec_command(f"bash -c {shlex.quote(script)}")
+        stdin.channel.shutdown_write()
+
+        results: List[Dict[str, Any]] = []
+        output: List[str] = []
+        started = time.monotonic()
+        received = 0
+
+        for raw_line in stdout:
+            received += len(raw_line)
+            line = raw_line.rstrip("\n\r")
+            if marker not in line:
+                output.append(line)
+                if on_output:
+                    on_output(len(results), line)
+                continue
+
+            # Output without a trailing newline shares the marker's line
+            before, _, status = line.partition(marker)
+            if before:
+                output.append(before)
+                if on_output:
+                    on_output(len(results), before)
+
+            finished = time.monotonic()
+            index = len(results)
+            results.append({
+                "command": commands[index],
+                "exit_code": int(status.rsplit(":", 1)[-1] or 1),
+                "output": "\n".join(output),
+                "duration": finished - started,
+            })
+            output = []
+            started = finished
+
+        exit_status = stdout.channel.recv_exit_status()
+        metrics.ssh_bytes.inc(received, direction="received")
+
+        # The shell died mid-step (e.g. the command called exit)
+        stopped = stop_on_error and results and results[-1]["exit_code"] != 0
+        if len(results) < len(commands) and not stopped:
+            results.append({
+                "command": commands[len(results)],
+                "exit_code": exit_status or 1,
+                "output": "\n".join(output),
+                "duration": time.monotonic() - started,
+            })
+
+        return results
+
+    def run_script(
+        self,
+        host: str,
+        user: str,
+        commands: List[str],
+        key: Optional[Path] = None,
+        port: int = 22,
+        stop_on_error: bool = True,
+        on_output: Optional[Callable[[int, str], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run several commands in a single remote shell session.
 
-            client.close()
+        The commands are sent as one script over one channel, with an exit
+        marker after each step, so a multi-step action costs one round trip
+        instead of one per command. stderr is merged into stdout.
+
+        Args:
+            host: Hostname or IP address
+            user: Username for SSH connection
+            commands: Shell commands, run in order
+            key: Path to SSH private key (optional)
+            port: SSH port (default 22)
+            stop_on_error: Skip remaining commands after the first failure
+            on_output: Called with (step index, line) as output arrives
 
-            return stdout_data, stderr_data, exit_code
+        Returns:
+            List of step results (command, exit_code, output, duration in
+            seconds) for the steps that ran; a failed connection is reported
+            as a single failed step
+        """
+        try:
+            client = self.get_client(host, user, key, port)
+            with tracer.span("ssh.script", host=host, steps=len(commands)):
+                return self._run_script(client, commands, stop_on_error, on_output)
 
         except Exception as e:
-            return "", str(e), 1
+            self.discard_client(host, user, key, port)
+            return [{
+                "command": commands[0] if commands else "",
+                "exit_code": 1,
+                "output": str(e),
+                "duration": 0.0,
+            }]
 
     def scp_file(
         self,
@@ -253,33 +539,65 @@ class SSHManager:
             True if successful, False otherwise
         """
         try:
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            client = self.get_client(host, user, key, port)
 
-            connect_kwargs = {
-                "hostname": host,
-                "port": port,
-                "username": user,
-                "timeout": 30,
-            }
+            # Use SFTP for file transfer
+            with tracer.span("ssh.sftp_upload", host=host, files=1, path=remote_path):
+                sftp = client.open_sftp()
+                attributes = sftp.put(str(local_path), remote_path)
+                sftp.close()
 
-            if key:
-                connect_kwargs["key_filename"] = str(key)
-                connect_kwargs["look_for_keys"] = False
-                connect_kwargs["allow_agent"] = False
+            metrics.ssh_bytes.inc(attributes.st_size or 0, direction="sent")
 
-            client.connect(**connect_kwargs)
+            return True
 
-            # Use SFTP for file transfer
-            sftp = client.open_sftp()
-            sftp.put(str(local_path), remote_path)
-            sftp.close()
+        except Exception as e:
+            self.discard_client(host, user, key, port)
+            print(f"Error copying file: {e}")
+            return False
+
+    def upload_files(
+        self,
+        files: Dict[str, str],
+        host: str,
+        user: str,
+        key: Optional[Path] = None,
+        port: int = 22,
+        mode: int = 0o644,
+    ) -> bool:
+        """
+        Write several in-memory files to a remote host in one SFTP session.
+
+        Args:
+            files: Dictionary of remote path -> file content
+            host: Hostname or IP address
+            user: Username for SSH connection
+            key: Path to SSH private key (optional)
+            port: SSH port (default 22)
+            mode: Permissions for the written files
+
+        Returns:
+            True if all files were written, False otherwise
+        """
+        try:
+            client = self.get_client(host, user, key, port)
+
+            with tracer.span("ssh.sftp_upload", host=host, files=len(files)):
+                sftp = client.open_sftp()
+                try:
+                    for remote_path, content in files.items():
+                        data = content.encode()
+                        sftp.putfo(io.BytesIO(data), remote_path)
+                        sftp.chmod(remote_path, mode)
+                        metrics.ssh_bytes.inc(len(data), direction="sent")
+                finally:
+                    sftp.close()
 
-            client.close()
             return True
 
         except Exception as e:
-            print(f"Error copying file: {e}")
+            self.discard_client(host, user, key, port)
+            print(f"Error uploading files: {e}")
             return False
 
     def get_public_key(self, private_key_path: Path) -> Optional[str]:
@@ -301,4 +619,9 @@ class SSHManager:
             except Exception:
                 pass
 
-        return None
+        # Derive it from the (cached) private key when the .pub file is missing
+        try:
+            pkey = self.keys.load(private_key_path)
+            return f"{pkey.get_name()} {pkey.get_base64()}"
+        except Exception:
+            return None
@@ -0,0 +1,316 @@
+"""Storage - Provision Longhorn and backup disks on many nodes in parallel."""
+
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .ssh_manager import SSHManager
+from .tracing import tracer
+
+
+STORAGE_SCRIPT = Path(__file__).parent.parent.parent / "scripts" / "post-install-storage.sh"
+REMOTE_STORAGE_SCRIPT = "/tmp/post-install-storage.sh"
+
+# One call lists every block device with its children, sizes in bytes
+LSBLK_COMMAND = "lsblk -J -b -o NAME,PATH,TYPE,SIZE,FSTYPE,LABEL,MOUNTPOINT"
+
+# Storage role -> (script option, mount point), in disk assignment order
+ROLES = {
+    "longhorn": ("--longhorn-disk", "/var/lib/longhorn"),
+    "backup": ("--backup-disk", "/var/lib/backups"),
+}
+
+# Printed by post-install-storage.sh when it finishes
+COMPLETE_MARKER = "Storage configuration complete!"
+
+
+def _devices(lsblk: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Walk all block devices of lsblk -J output, children included."""
+    pending = list(lsblk.get("blockdevices", []))
+    while pending:
+        device = pending.pop(0)
+        yield device
+        pending.extend(device.get("children") or [])
+
+
+def available_disks(lsblk: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Find unused disks in lsblk -J -b output.
+
+    A disk is unused if it is not mounted and has no filesystem signature
+    and no partitions (so the root disk is never picked). zram devices and
+    empty drives are skipped. Same rules as post-install-storage.sh.
+
+    Returns:
+        List of dictionaries with path and size (bytes), in lsblk order
+    """
+    disks = []
+    for device in lsblk.get("blockdevices", []):
+        size = int(device.get("size") or 0)
+        if device.get("type") != "disk" or device["name"].startswith("zram") or not size:
+            continue
+        if device.get("mountpoint") or device.get("fstype") or device.get("children"):
+            continue
+        disks.append({"path": device.get("path") or f"/dev/{device['name']}", "size": size})
+    return disks
+
+
+def mounted_roles(lsblk: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Find storage roles that are already set up.
+
+    Returns:
+        Dictionary of role -> device mounted on the role's mount point
+    """
+    mounts = {mount_point: role for role, (_, mount_point) in ROLES.items()}
+    return {
+        mounts[device["mountpoint"]]: device.get("path") or f"/dev/{device['name']}"
+        for device in _devices(lsblk)
+        if device.get("mountpoint") in mounts
+    }
+
+
+def plan_disks(lsblk: Dict[str, Any], roles: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Assign unused disks to the storage roles not yet mounted.
+
+    Args:
+        lsblk: Parsed lsblk -J -b output
+        roles: Wanted roles (see ROLES)
+
+    Returns:
+        Dictionary of role -> disk (path and size), or None if no disk is left
+    """
+    mounted = mounted_roles(lsblk)
+    disks = available_disks(lsblk)
+    plan: Dict[str, Optional[Dict[str, Any]]] = {}
+    for role in ROLES:
+        if role in roles and role not in mounted:
+            plan[role] = disks.pop(0) if disks else None
+    return plan
+
+
+def node_roles(node: Dict[str, Any]) -> List[str]:
+    """
+    Get the storage roles an inventory node should have.
+
+    Longhorn if resources.longhorn_gb is set, backup for backup nodes or
+    if resources.backup_gb is set.
+    """
+    resources = node.get("resources") or {}
+    roles = []
+    if int(resources.get("longhorn_gb") or 0) > 0:
+        roles.append("longhorn")
+    if node.get("node_type") == "backup" or int(resources.get("backup_gb") or 0) > 0:
+        roles.append("backup")
+    return roles
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "K", "M", "G", "T"):
+        if size < 1024 or unit == "T":
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return str(size)
+
+
+class StorageProvisioner:
+    """Partition, format and mount Longhorn/backup disks over SSH."""
+
+    def __init__(
+        self,
+        ssh_manager: Optional[SSHManager] = None,
+        key: Optional[Path] = None,
+        max_workers: int = 8,
+    ):
+        """
+        Initialize storage provisioner.
+
+        Args:
+            ssh_manager: SSH manager instance (creates new one if None)
+            key: SSH private key for nodes without ssh_key in the inventory
+            max_workers: Nodes provisioned at once
+        """
+        self.ssh_manager = ssh_manager or SSHManager()
+        self.key = key
+        self.max_workers = max_workers
+
+        # Per-node results of the last run, keyed by hostname
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def _target(self, node: Dict[str, Any]):
+        key = node.get("ssh_key")
+        return (
+            node.get("ansible_host") or node["hostname"],
+            node.get("ansible_user", "ubuntu"),
+            Path(key).expanduser() if key else self.key,
+            int(node.get("ansible_port", 22)),
+        )
+
+    def discover(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        List a node's block devices.
+
+        Returns:
+            Parsed lsblk -J -b output
+
+        Raises:
+            RuntimeError: If lsblk fails or its output is not JSON
+        """
+        host, user, key, port = self._target(node)
+        stdout, stderr, exit_code = self.ssh_manager.execute_command(host, user, LSBLK_COMMAND, key, port)
+        if exit_code != 0:
+            raise RuntimeError(f"lsblk failed: {stderr.strip() or stdout.strip()}")
+        try:
+            return json.loads(stdout)
+        except ValueError as e:
+            raise RuntimeError(f"unexpected lsblk output: {e}")
+
+    def provision_node(
+        self,
+        node: Dict[str, Any],
+        roles: Optional[List[str]] = None,
+        dry_run: bool = False,
+        emit: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Set up the storage roles of one node.
+
+        Disks are picked locally from a single lsblk call, then
+        post-install-storage.sh is copied over and run with those disks.
+
+        Args:
+            node: Inventory node dictionary
+            roles: Roles to set up (default: from the inventory, see node_roles)
+            dry_run: Only report which disks would be used
+            emit: Called with progress lines
+
+        Returns:
+            Dictionary with ok, detail, plan (role -> disk path) and duration
+        """
+        hostname = node["hostname"]
+        emit = emit or (lambda line: None)
+        roles = node_roles(node) if roles is None else roles
+        started = time.monotonic()
+
+        def result(ok: bool, detail: str, plan: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+            return {
+                "ok": ok,
+                "detail": detail,
+                "plan": {role: disk["path"] if disk else None for role, disk in (plan or {}).items()},
+                "duration": time.monotonic() - started,
+            }
+
+        if not roles:
+            return result(True, "no storage roles")
+
+        with tracer.span("storage.provision", host=hostname, roles=",".join(roles)) as span:
+            try:
+                plan = plan_disks(self.discover(node), roles)
+            except Exception as e:
+                return result(False, str(e))
+
+            if not plan:
+                return result(True, "already configured")
+
+            missing = [role for role, disk in plan.items() if disk is None]
+            assigned = {role: disk for role, disk in plan.items() if disk is not None}
+            for role, disk in assigned.items():
+                emit(f"{hostname}: {role} -> {disk['path']} ({_format_size(disk['size'])})")
+            span.tag(disks=len(assigned))
+
+            if dry_run or not assigned:
+                if missing:
+                    return result(False, f"no free disk for {', '.join(missing)}", plan)
+                return result(True, "dry run", plan)
+
+            host, user, key, port = self._target(node)
+            if not self.ssh_manager.scp_file(STORAGE_SCRIPT, REMOTE_STORAGE_SCRIPT, host, user, key, port):
+                return result(False, "failed to copy post-install-storage.sh", plan)
+
+            cmd_parts = ["bash", REMOTE_STORAGE_SCRIPT]
+            if user != "root":
+                cmd_parts.insert(0, "sudo")
+            for role, disk in assigned.items():
+                cmd_parts.extend([ROLES[role][0], disk["path"]])
+
+            stdout, stderr, exit_code = self.ssh_manager.execute_command(host, user, " ".join(cmd_parts), key, port)
+            if exit_code != 0 or COMPLETE_MARKER not in stdout:
+                output = (stdout + stderr).strip().splitlines()
+                return result(False, f"exit {exit_code}: {output[-1] if output else 'no output'}", plan)
+
+        if missing:
+            return result(False, f"no free disk for {', '.join(missing)}", plan)
+        return result(True, "configured " + ", ".join(assigned), plan)
+
+    def run(
+        self,
+        nodes: List[Dict[str, Any]],
+        roles: Optional[List[str]] = None,
+        dry_run: bool = False,
+    ) -> Iterator[str]:
+        """
+        Provision storage on many nodes in parallel.
+
+        Args:
+            nodes: Inventory node dictionaries
+            roles: Roles for every node (default: per node from the inventory)
+            dry_run: Only report which disks would be used
+
+        Yields:
+            Progress lines (results are collected in self.results)
+        """
+        self.results = {}
+        if not nodes:
+            return
+
+        yield f"Provisioning storage on {len(nodes)} nodes"
+        lines: "queue.Queue[Optional[str]]" = queue.Queue()
+
+        def provision(node: Dict[str, Any]) -> None:
+            try:
+                outcome = self.provision_node(node, roles, dry_run, lines.put)
+            except Exception as e:
+                outcome = {"ok": False, "detail": str(e), "plan": {}, "duration": 0.0}
+            self.results[node["hostname"]] = outcome
+            mark = "✓" if outcome["ok"] else "ERROR:"
+            lines.put(f"{mark} {node['hostname']}: {outcome['detail']}")
+
+        def provision_all() -> None:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(nodes))) as pool:
+                list(pool.map(provision, nodes))
+            lines.put(None)
+
+        worker = threading.Thread(target=provision_all, daemon=True)
+        worker.start()
+        while True:
+            line = lines.get()
+            if line is None:
+                break
+            yield line
+        worker.join()
+
+        yield from self.summary()
+
+    def summary(self) -> List[str]:
+        """
+        Summarize the last run.
+
+        Returns:
+            List of lines, one per processed node plus a total
+        """
+        lines = []
+        for hostname in sorted(self.results):
+            result = self.results[hostname]
+            mark = "✓" if result["ok"] else "✗"
+            disks = ", ".join(f"{role}={path or '-'}" for role, path in result["plan"].items())
+            disks = f" [{disks}]" if disks else ""
+            lines.append(f"{mark} {hostname}: {result['detail']}{disks} ({result['duration']:.0f}s)")
+
+        succeeded = sum(1 for result in self.results.values() if result["ok"])
+        lines.append(f"{succeeded}/{len(self.results)} nodes provisioned")
+        return lines
@@ -0,0 +1,371 @@
+"""Synthetic Data - Generate realistic inventories and deployment output offline.
+
+Inventories and output streams are deterministic for a given seed, so
+screens and lib classes can be load-tested at fleet scale without a cluster:
+
+    python -m lib.synthetic inventory --nodes 1000 --locations 4 -o /tmp/inventory.yml
+    python -m lib.synthetic stream --rate 200 --apt-lines 500
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+DEFAULT_LOCATIONS = ["brooklyn", "manhattan", "forest_hills", "queens", "bronx", "staten_island"]
+
+# ANSI colors as printed by deploy-ubuntu-vm.sh over a pty
+RED = "\033[0;31m"
+GREEN = "\033[0;32m"
+YELLOW = "\033[1;33m"
+NC = "\033[0m"
+
+CLOUD_IMAGE = "ubuntu-24.04-server-cloudimg-amd64.img"
+
+APT_PACKAGES = [
+    "libc-bin", "libc6", "openssl", "libssl3t64", "systemd", "udev", "libsystemd0",
+    "linux-firmware", "linux-image-6.8.0-52-generic", "python3.12", "curl", "libcurl4t64",
+    "openssh-server", "openssh-client", "tzdata", "snapd", "cloud-init", "tailscale",
+    "containerd", "iptables", "nftables", "qemu-guest-agent", "vim-common", "git",
+]
+
+
+def generate_inventory(
+    nodes: int = 100,
+    locations: int = 3,
+    masters: int = 1,
+    backup_every: int = 10,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Generate an Ansible inventory in the layout InventoryManager writes.
+
+    Nodes are spread round-robin over locations, each location gets one
+    Proxmox host, and every backup_every-th node is a backup node.
+
+    Args:
+        nodes: Number of k3s workers and backup nodes
+        locations: Number of locations (names beyond DEFAULT_LOCATIONS are 'siteN')
+        masters: Number of k3s masters (placed in the first location)
+        backup_every: Make every Nth node a backup node (0 for none)
+        seed: Random seed
+
+    Returns:
+        Inventory dictionary
+    """
+    rng = random.Random(seed)
+    names = [
+        DEFAULT_LOCATIONS[index] if index < len(DEFAULT_LOCATIONS) else f"site{index + 1}"
+        for index in range(max(int(locations), 1))
+    ]
+    networks = {name: 86 + index for index, name in enumerate(names)}
+    deployed = datetime(2025, 11, 1, 10, 0, 0)
+
+    groups: Dict[str, Dict[str, Any]] = {
+        "proxmox_hosts": {"hosts": {}},
+        "k3s_masters": {"hosts": {}},
+        "k3s_workers": {"hosts": {}},
+        "backup_nodes": {"hosts": {}},
+    }
+
+    for index, location in enumerate(names):
+        groups["proxmox_hosts"]["hosts"][f"pve-{location.replace('_', '-')}"] = {
+            "ansible_host": f"192.168.{networks[location]}.100",
+            "ansible_user": "root",
+            "location": location,
+            "ssh_key": "~/.ssh/homelab_rsa",
+        }
+
+    def node(index: int, location: str, vmid: int, node_type: str, resources: Dict[str, int]) -> Dict[str, Any]:
+        return {
+            "ansible_host": f"100.{64 + index // 65536 % 64}.{index // 256 % 256}.{index % 256}",
+            "initial_ip": f"192.168.{networks[location]}.{rng.randint(10, 250)}",
+            "vmid": vmid,
+            "location": location,
+            "deployed": (deployed + timedelta(minutes=7 * index)).isoformat() + "Z",
+            "node_type": node_type,
+            "resources": resources,
+        }
+
+    for index in range(int(masters)):
+        hostname = "minikapserver" if index == 0 else f"minikapserver{index + 1}"
+        data = node(index + 1, names[0], 100 + index, "k3s-master", {"cores": 8, "ram_gb": 32, "disk_gb": 500})
+        data["tailscale_name"] = hostname
+        groups["k3s_masters"]["hosts"][hostname] = data
+
+    for index in range(int(nodes)):
+        location = names[index % len(names)]
+        backup = bool(backup_every) and index % backup_every == backup_every - 1
+        hostname = f"kapnode{index + 1}"
+        if backup:
+            resources = {"cores": 2, "ram_gb": 4, "disk_gb": 100, "backup_gb": rng.choice([2048, 4096, 8192])}
+        else:
+            resources = {
+                "cores": rng.choice([2, 4, 8]),
+                "ram_gb": rng.choice([8, 16, 32]),
+                "disk_gb": 200,
+                "longhorn_gb": rng.choice([0, 1024, 2048]),
+            }
+        data = node(int(masters) + index + 1, location, 200 + index, "backup" if backup else "k3s-worker", resources)
+        data["tailscale_name"] = hostname
+        groups["backup_nodes" if backup else "k3s_workers"]["hosts"][hostname] = data
+
+    return {"all": {"children": groups}}
+
+
+def generate_apt_output(packages: int = 50, seed: int = 0) -> List[str]:
+    """
+    Generate 'apt-get update && apt-get upgrade' output.
+
+    Args:
+        packages: Number of upgraded packages
+        seed: Random seed
+
+    Returns:
+        Output lines
+    """
+    rng = random.Random(seed)
+    lines = [
+        "Hit:1 http://archive.ubuntu.com/ubuntu noble InRelease",
+        "Get:2 http://archive.ubuntu.com/ubuntu noble-updates InRelease [126 kB]",
+        "Get:3 http://security.ubuntu.com/ubuntu noble-security InRelease [126 kB]",
+        "Get:4 https://pkgs.tailscale.com/stable/ubuntu noble InRelease",
+        "Fetched 1,024 kB in 1s (842 kB/s)",
+        "Reading package lists...",
+        "Building dependency tree...",
+        "Reading state information...",
+        "Calculating upgrade...",
+        "The following packages will be upgraded:",
+    ]
+    chosen = [APT_PACKAGES[index % len(APT_PACKAGES)] for index in range(packages)]
+    for start in range(0, len(chosen), 6):
+        lines.append("  " + " ".join(chosen[start:start + 6]))
+    lines.append(f"{packages} upgraded, 0 newly installed, 0 to remove and 0 not upgraded.")
+
+    for index, package in enumerate(chosen, 1):
+        version = f"{rng.randint(1, 9)}.{rng.randint(0, 40)}-{rng.randint(0, 9)}ubuntu{rng.randint(1, 9)}"
+        lines.append(
+            f"Get:{index + 4} http://archive.ubuntu.com/ubuntu noble-updates/main amd64 {package} amd64 "
+            f"{version} [{rng.randint(10, 9000)} kB]"
+        )
+    for package in chosen:
+        lines.append(f"Preparing to unpack .../{package}_amd64.deb ...")
+        lines.append(f"Unpacking {package} ... over (previous) ...")
+    for package in chosen:
+        lines.append(f"Setting up {package} ...")
+    lines.append("Processing triggers for man-db (2.12.0-4build2) ...")
+    lines.append("Processing triggers for libc-bin (2.39-0ubuntu8.4) ...")
+    return lines
+
+
+def generate_deployment_output(
+    name: str = "kapnode1",
+    vmid: int = 205,
+    ip: str = "192.168.86.205",
+    image_mb: int = 583,
+    disk_gib: float = 3.5,
+    progress_lines: int = 100,
+    apt_lines: int = 0,
+    golden_image: bool = False,
+    fail_stage: Optional[str] = None,
+    color: bool = True,
+    seed: int = 0,
+) -> List[str]:
+    """
+    Generate the output LogViewerScreen sees for one deployment.
+
+    Follows deploy-ubuntu-vm.sh: parameter summary, image download
+    (wget progress), VM creation, cloud-init, the followed import task log
+    (qemu-img transfer progress) and the closing instructions.
+
+    Args:
+        name: VM hostname
+        vmid: VM ID
+        ip: VM IP address
+        image_mb: Cloud image size for the download progress
+        disk_gib: Imported disk size for the transfer progress
+        progress_lines: Lines each for the download and the import progress
+        apt_lines: Extra apt noise (e.g. a proxy warm-up) after the download
+        golden_image: Use a pre-built image (no download)
+        fail_stage: 'download' or 'import' to end with that error
+        color: Include the script's ANSI colors
+        seed: Random seed
+
+    Returns:
+        Output lines
+    """
+    rng = random.Random(seed)
+
+    def c(code: str, text: str) -> str:
+        return f"{code}{text}{NC}" if color else text
+
+    lines = [
+        c(GREEN, "========================================"),
+        c(GREEN, "Proxmox Ubuntu 24.04 VM Deployment"),
+        c(GREEN, "========================================"),
+        "",
+        f"VM Name:         {name}",
+        f"VMID:            {vmid}",
+        f"IP Address:      {ip}",
+        f"Gateway:         {ip.rsplit('.', 1)[0]}.1",
+        f"DNS Servers:     {ip.rsplit('.', 1)[0]}.1,8.8.8.8",
+        "Memory:          16GB",
+        "CPU Cores:       4",
+        "Disk Size:       200GB",
+        "Storage Pool:    local-lvm",
+        "Node Type:       k3s-worker",
+        f"Image:           {'kapnode-golden.img' if golden_image else 'Ubuntu 24.04 cloud image'}",
+        "",
+        c(YELLOW, f"Creating VM {vmid}..."),
+    ]
+
+    if golden_image:
+        lines.append(c(GREEN, "Using golden image kapnode-golden.img"))
+    else:
+        lines.append(c(YELLOW, "Downloading Ubuntu 24.04 cloud image..."))
+        steps = max(int(progress_lines), 1)
+        for step in range(1, steps + 1):
+            percent = step * 100 // steps
+            done = image_mb * step / steps
+            speed = rng.uniform(20.0, 95.0)
+            eta = max(int((image_mb - done) / speed), 0)
+            bar = "=" * (percent // 5) + (">" if percent < 100 else "=")
+            lines.append(
+                f"{CLOUD_IMAGE} {percent:3d}%[{bar:<21}] {done:6.1f}M  {speed:.1f}MB/s    eta {eta}s"
+            )
+            if fail_stage == "download" and percent >= 40:
+                lines.append(c(RED, "Error: Failed to download Ubuntu image"))
+                return lines
+        if apt_lines:
+            lines.extend(generate_apt_output(max(apt_lines // 4, 1), seed)[:apt_lines])
+
+    lines.append(c(YELLOW, "Creating VM configuration..."))
+    lines.append(c(YELLOW, "Configuring cloud-init..."))
+    lines.append(f"update VM {vmid}: -cicustom user=local:snippets/user-data-{vmid}.yaml,"
+                 f"meta=local:snippets/meta-data-{vmid}.yaml,network=local:snippets/network-config-{vmid}.yaml")
+    lines.append(c(YELLOW, "Importing Ubuntu cloud image..."))
+
+    started = 0x67000000 + vmid
+    upid = f"UPID:kapmox:{0x1F000 + vmid:08X}:{0x2A000 + vmid:08X}:{started:08X}:qmconfig:{vmid}:root@pam:"
+    lines.append(f"TASK_UPID={upid}")
+    lines.append(f"update VM {vmid}: -scsi0 local-lvm:0,import-from=/var/lib/vz/template/iso/{CLOUD_IMAGE},format=raw")
+    lines.append(f"  Logical volume \"vm-{vmid}-disk-1\" created.")
+    lines.append(f"transferred 0.0 B of {disk_gib:.1f} GiB (0.00%)")
+
+    total = disk_gib * 1024 ** 3
+    steps = max(int(progress_lines), 1)
+    for step in range(1, steps + 1):
+        done = total * step / steps
+        unit, scale = ("GiB", 1024 ** 3) if done >= 1024 ** 3 else ("MiB", 1024 ** 2)
+        lines.append(f"transferred {done / scale:.1f} {unit} of {disk_gib:.1f} GiB ({100 * step / steps:.2f}%)")
+        if fail_stage == "import" and step * 2 >= steps:
+            lines.append("TASK ERROR: storage 'local-lvm' does not exist")
+            lines.append(c(RED, "Error: Failed to import Ubuntu image"))
+            return lines
+
+    lines.append(f"scsi0: successfully created disk 'local-lvm:vm-{vmid}-disk-1,size={disk_gib:g}G'")
+    lines.append("TASK OK")
+    lines.extend([
+        c(GREEN, "VM created successfully!"),
+        "",
+        c(GREEN, "Next steps:"),
+        f"1. Start the VM: qm start {vmid}",
+        "2. Wait for cloud-init to complete (~2-3 minutes)",
+        f"3. Monitor boot: qm terminal {vmid} (Ctrl+O to exit)",
+        f"4. SSH into the VM: ssh ubuntu@{ip}",
+        "",
+        c(YELLOW, f"To start the VM now, run: qm start {vmid}"),
+    ])
+    return lines
+
+
+def replay(lines: Iterable[str], rate: Optional[float] = None) -> Iterator[str]:
+    """
+    Yield lines at a fixed rate.
+
+    Pacing uses absolute deadlines, so slow consumers do not accumulate drift;
+    a consumer that falls behind gets the backlog as a burst.
+
+    Args:
+        lines: Lines to replay
+        rate: Lines per second (None or 0 for as fast as possible)
+
+    Yields:
+        The lines
+    """
+    if not rate:
+        yield from lines
+        return
+
+    interval = 1.0 / rate
+    deadline = time.monotonic()
+    for line in lines:
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        yield line
+        deadline += interval
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic inventories and deployment output")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    inventory = commands.add_parser("inventory", help="Write an Ansible inventory")
+    inventory.add_argument("--nodes", type=int, default=100, help="Workers and backup nodes")
+    inventory.add_argument("--locations", type=int, default=3, help="Number of locations")
+    inventory.add_argument("--masters", type=int, default=1, help="Number of k3s masters")
+    inventory.add_argument("--backup-every", type=int, default=10, help="Every Nth node is a backup node")
+    inventory.add_argument("--seed", type=int, default=0)
+    inventory.add_argument("-o", "--output", help="Output file (default: stdout)")
+
+    stream = commands.add_parser("stream", help="Print deployment output at a line rate")
+    stream.add_argument("--rate", type=float, default=0, help="Lines per second (default: unpaced)")
+    stream.add_argument("--count", type=int, default=1, help="Number of deployments back to back")
+    stream.add_argument("--progress-lines", type=int, default=100, help="Download/import progress lines")
+    stream.add_argument("--apt-lines", type=int, default=0, help="Extra apt output lines")
+    stream.add_argument("--golden-image", action="store_true", help="Skip the image download")
+    stream.add_argument("--fail", choices=["download", "import"], help="End with an error in this stage")
+    stream.add_argument("--no-color", action="store_true", help="Strip ANSI colors")
+    stream.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    if args.command == "inventory":
+        import yaml
+
+        data = generate_inventory(args.nodes, args.locations, args.masters, args.backup_every, args.seed)
+        text = yaml.safe_dump(data, default_flow_style=False, sort_keys=False, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text)
+        else:
+            sys.stdout.write(text)
+        return
+
+    def lines() -> Iterator[str]:
+        for index in range(args.count):
+            yield from generate_deployment_output(
+                name=f"kapnode{index + 1}",
+                vmid=205 + index,
+                ip=f"192.168.86.{(205 + index) % 250 + 1}",
+                progress_lines=args.progress_lines,
+                apt_lines=args.apt_lines,
+                golden_image=args.golden_image,
+                fail_stage=args.fail,
+                color=not args.no_color,
+                seed=args.seed + index,
+            )
+
+    try:
+        for line in replay(lines(), args.rate):
+            print(line, flush=bool(args.rate))
+    except (BrokenPipeError, KeyboardInterrupt):
+        pass
+
+
+if __name__ == "__main__":
+    main()
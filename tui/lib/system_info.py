@@ -0,0 +1,495 @@
+"""System Info - Parallel, structured system-information snapshots over SSH.
+
+Replaces running scripts/homelab-info-collector.sh by hand on every box.
+Each host gets one POSIX shell probe over the pooled SSH connection; the
+probe runs every section's commands and prints each section's output with a
+checksum. Output is parsed into JSON-friendly data here, so hosts need no
+Python or jq (commands with native JSON output such as lsblk -J, ip -j and
+tailscale --json are used where available).
+
+Snapshots are stored per host and time:
+
+    ~/.homelab/system-info/<host>/<YYYYmmddTHHMMSS>.json
+
+Incremental refreshes send the checksums of the previous snapshot to the
+probe, which then prints only sections whose output changed; unchanged
+sections are carried over.
+"""
+
+import json
+import os
+import re
+import shlex
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .ssh_manager import SSHManager
+from .tracing import tracer
+
+
+DEFAULT_SNAPSHOT_DIR = Path.home() / ".homelab" / "system-info"
+
+FORMAT_VERSION = 1
+
+# Section name -> shell commands (stderr is discarded)
+SECTIONS: Dict[str, str] = {
+    "system": (
+        "hostname; uname -srm; "
+        "(. /etc/os-release 2>/dev/null && echo \"$PRETTY_NAME\") || cat /etc/debian_version; "
+        "uptime -s"
+    ),
+    "cpu": "lscpu",
+    "memory": "grep -E '^(MemTotal|MemAvailable|SwapTotal|SwapFree):' /proc/meminfo",
+    "disks": "lsblk -J -b -o NAME,SIZE,TYPE,FSTYPE,MOUNTPOINT,MODEL",
+    "filesystems": "df -P -B1 -x tmpfs -x devtmpfs -x overlay -x squashfs",
+    "network": "ip -j addr show",
+    "routes": "ip -j route show",
+    "dns": "grep -E '^(nameserver|search)' /etc/resolv.conf",
+    "listening": "ss -H -tuln",
+    "tailscale": "tailscale status --json --peers=false",
+    "docker": "docker ps -a --format '{{json .}}'",
+    "docker_images": "docker images --format '{{json .}}'",
+    "services": "systemctl list-units --type=service --state=running --no-legend --plain",
+    "packages": (
+        "dpkg-query -W -f='${Package} ${Version}\\n' "
+        "| grep -E '^(docker|containerd|nginx|apache2|mysql|mariadb|postgresql|redis|git|k3s|tailscale|pve-manager)'"
+    ),
+    "proxmox": (
+        "[ -d /etc/pve ] && pvesh get /version --output-format json && echo && "
+        "pvesh get /cluster/resources --type vm --output-format json"
+    ),
+    "zfs": "zpool list -H -p -o name,size,alloc,free,health",
+    "lvm": "lvs --reportformat json -o lv_name,vg_name,lv_size,data_percent --units b",
+    "sshd": "grep -E '^(Port|PermitRootLogin|PasswordAuthentication|PubkeyAuthentication) ' /etc/ssh/sshd_config",
+}
+
+
+def build_probe(sections: Iterable[str], marker: str, known: Optional[Dict[str, str]] = None) -> str:
+    """
+    Build one shell script that collects several sections.
+
+    Each section prints '<marker> <name> <checksum>' followed by its output,
+    or only the header if the checksum matches the known one.
+
+    Args:
+        sections: Section names from SECTIONS
+        marker: Unique line prefix separating sections
+        known: Checksums from the previous snapshot (section -> checksum)
+    """
+    known = known or {}
+    lines = ["export LC_ALL=C PATH=\"$PATH:/usr/sbin:/sbin\""]
+    for name in sections:
+        lines.append(
+            f"out=$( {{ {SECTIONS[name]} ; }} 2>/dev/null ); "
+            "sum=$(printf '%s' \"$out\" | cksum | cut -d' ' -f1); "
+            f"echo \"{marker} {name} $sum\"; "
+            f"[ \"$sum\" = {shlex.quote(known.get(name, '-'))} ] || printf '%s\\n' \"$out\""
+        )
+    return "\n".join(lines)
+
+
+def parse_probe(output: str, marker: str) -> Dict[str, Tuple[str, Optional[str]]]:
+    """
+    Split probe output into sections.
+
+    Returns:
+        Dictionary of section -> (checksum, raw output or None if unchanged)
+    """
+    sections: Dict[str, Tuple[str, Optional[str]]] = {}
+    name = checksum = None
+    body: List[str] = []
+    unchanged = True
+
+    def finish() -> None:
+        if name is not None:
+            sections[name] = (checksum, None if unchanged else "\n".join(body))
+
+    for line in output.splitlines():
+        if line.startswith(marker + " "):
+            finish()
+            _, name, checksum = (line.split(" ", 2) + ["", ""])[:3]
+            body, unchanged = [], True
+        elif name is not None:
+            body.append(line)
+            unchanged = False
+
+    finish()
+    return sections
+
+
+def _json(text: str) -> Any:
+    try:
+        return json.loads(text) if text.strip() else None
+    except ValueError:
+        return None
+
+
+def _key_values(text: str, separator: str = ":") -> Dict[str, str]:
+    result = {}
+    for line in text.splitlines():
+        key, found, value = line.partition(separator)
+        if found:
+            result[key.strip()] = value.strip()
+    return result
+
+
+def _parse_system(text: str) -> Dict[str, Any]:
+    lines = text.splitlines() + ["", "", "", ""]
+    # Boot time rather than uptime keeps the section unchanged between runs
+    return {"hostname": lines[0], "kernel": lines[1], "os": lines[2], "booted": lines[3]}
+
+
+def _parse_cpu(text: str) -> Dict[str, Any]:
+    fields = _key_values(text)
+    wanted = ("Architecture", "Model name", "CPU(s)", "Thread(s) per core", "Core(s) per socket",
+              "Socket(s)", "Virtualization", "Hypervisor vendor")
+    return {key: fields[key] for key in wanted if key in fields}
+
+
+def _parse_memory(text: str) -> Dict[str, int]:
+    return {
+        key: int(value.split()[0]) * 1024
+        for key, value in _key_values(text).items() if value.split() and value.split()[0].isdigit()
+    }
+
+
+def _parse_filesystems(text: str) -> List[Dict[str, Any]]:
+    filesystems = []
+    for line in text.splitlines()[1:]:
+        parts = line.split()
+        if len(parts) >= 6 and parts[1].isdigit():
+            filesystems.append({
+                "device": parts[0], "size": int(parts[1]), "used": int(parts[2]),
+                "available": int(parts[3]), "mount": " ".join(parts[5:]),
+            })
+    return filesystems
+
+
+def _parse_network(text: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "ifname": interface.get("ifname"),
+            "state": interface.get("operstate"),
+            "mac": interface.get("address"),
+            "addresses": [f"{a.get('local')}/{a.get('prefixlen')}" for a in interface.get("addr_info", [])],
+        }
+        for interface in _json(text) or [] if interface.get("ifname") != "lo"
+    ]
+
+
+def _parse_dns(text: str) -> Dict[str, List[str]]:
+    dns: Dict[str, List[str]] = {"nameservers": [], "search": []}
+    for line in text.splitlines():
+        parts = line.split()
+        if parts and parts[0] == "nameserver":
+            dns["nameservers"].extend(parts[1:2])
+        elif parts and parts[0] == "search":
+            dns["search"].extend(parts[1:])
+    return dns
+
+
+def _parse_listening(text: str) -> List[str]:
+    sockets = set()
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) >= 5:
+            sockets.add(f"{parts[0]} {parts[4]}")
+    return sorted(sockets)
+
+
+def _parse_tailscale(text: str) -> Optional[Dict[str, Any]]:
+    status = _json(text)
+    if not isinstance(status, dict):
+        return None
+    node = status.get("Self") or {}
+    return {
+        "state": status.get("BackendState"),
+        "dns_name": node.get("DNSName"),
+        "ips": node.get("TailscaleIPs", []),
+        "online": node.get("Online"),
+        "version": status.get("Version"),
+    }
+
+
+def _parse_json_lines(fields: Tuple[str, ...]) -> Callable[[str], List[Dict[str, Any]]]:
+    def parse(text: str) -> List[Dict[str, Any]]:
+        items = [_json(line) for line in text.splitlines()]
+        return [{field: item.get(field) for field in fields} for item in items if isinstance(item, dict)]
+    return parse
+
+
+def _parse_services(text: str) -> List[str]:
+    return sorted(line.split()[0] for line in text.splitlines() if line.split())
+
+
+def _parse_packages(text: str) -> Dict[str, str]:
+    return dict(line.split(" ", 1) for line in text.splitlines() if " " in line)
+
+
+def _parse_proxmox(text: str) -> Optional[Dict[str, Any]]:
+    version, _, resources = text.partition("\n")
+    version = _json(version)
+    if not version:
+        return None
+    return {
+        "version": version.get("version"),
+        "vms": sorted(
+            (
+                {key: vm.get(key) for key in ("vmid", "name", "node", "status", "maxmem", "maxdisk")}
+                for vm in _json(resources) or []
+            ),
+            key=lambda vm: vm.get("vmid") or 0,
+        ),
+    }
+
+
+def _parse_zfs(text: str) -> List[Dict[str, Any]]:
+    pools = []
+    for line in text.splitlines():
+        parts = line.split("\t")
+        if len(parts) == 5:
+            pools.append({"name": parts[0], "size": int(parts[1]), "alloc": int(parts[2]),
+                          "free": int(parts[3]), "health": parts[4]})
+    return pools
+
+
+def _parse_lvm(text: str) -> List[Dict[str, Any]]:
+    report = _json(text) or {}
+    volumes = []
+    for entry in report.get("report", []):
+        volumes.extend(entry.get("lv", []))
+    return volumes
+
+
+# Section name -> parser of its raw output (empty output parses to None)
+PARSERS: Dict[str, Callable[[str], Any]] = {
+    "system": _parse_system,
+    "cpu": _parse_cpu,
+    "memory": _parse_memory,
+    "disks": lambda text: (_json(text) or {}).get("blockdevices"),
+    "filesystems": _parse_filesystems,
+    "network": _parse_network,
+    "routes": lambda text: _json(text),
+    "dns": _parse_dns,
+    "listening": _parse_listening,
+    "tailscale": _parse_tailscale,
+    "docker": _parse_json_lines(("Names", "Image", "State", "Status", "Ports")),
+    "docker_images": _parse_json_lines(("Repository", "Tag", "Size", "CreatedAt")),
+    "services": _parse_services,
+    "packages": _parse_packages,
+    "proxmox": _parse_proxmox,
+    "zfs": _parse_zfs,
+    "lvm": _parse_lvm,
+    "sshd": lambda text: _key_values(text, " "),
+}
+
+
+def flatten(value: Any, prefix: str = "") -> Dict[str, Any]:
+    """Flatten nested data into {'path.to[0].field': value} for diffing."""
+    if isinstance(value, dict):
+        items: Dict[str, Any] = {}
+        for key, item in value.items():
+            items.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+        return items or {prefix: {}}
+    if isinstance(value, list):
+        items = {}
+        for index, item in enumerate(value):
+            items.update(flatten(item, f"{prefix}[{index}]"))
+        return items or {prefix: []}
+    return {prefix: value}
+
+
+def diff_snapshots(old: Dict[str, Any], new: Dict[str, Any]) -> List[Tuple[str, Any, Any]]:
+    """
+    Compare the sections of two snapshots.
+
+    Returns:
+        List of (path, old value, new value), sorted by path; a missing
+        value is None
+    """
+    before = flatten(old.get("sections", {}))
+    after = flatten(new.get("sections", {}))
+    return [
+        (path, before.get(path), after.get(path))
+        for path in sorted(set(before) | set(after))
+        if before.get(path) != after.get(path)
+    ]
+
+
+class SnapshotStore:
+    """Timestamped JSON snapshots per host."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        """
+        Initialize snapshot store.
+
+        Args:
+            directory: Root directory (default: ~/.homelab/system-info)
+        """
+        self.directory = Path(directory) if directory else DEFAULT_SNAPSHOT_DIR
+
+    def save(self, snapshot: Dict[str, Any]) -> Path:
+        """Write a snapshot (atomically) and return its path."""
+        stamp = datetime.fromisoformat(snapshot["collected"]).strftime("%Y%m%dT%H%M%S")
+        path = self.directory / snapshot["host"] / f"{stamp}.json"
+        write_snapshot(path, snapshot)
+        return path
+
+    def list(self, host: str) -> List[Path]:
+        """List a host's snapshots, oldest first."""
+        directory = self.directory / host
+        return sorted(directory.glob("*.json")) if directory.is_dir() else []
+
+    def hosts(self) -> List[str]:
+        """List hosts with snapshots."""
+        if not self.directory.is_dir():
+            return []
+        return sorted(path.name for path in self.directory.iterdir() if path.is_dir())
+
+    def latest(self, host: str) -> Optional[Dict[str, Any]]:
+        """Load a host's most recent snapshot, if any."""
+        snapshots = self.list(host)
+        return load_snapshot(snapshots[-1]) if snapshots else None
+
+
+def load_snapshot(path: Path) -> Dict[str, Any]:
+    """Read a snapshot file."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_snapshot(path: Path, snapshot: Dict[str, Any]) -> None:
+    """Write a snapshot as sorted, indented JSON (stable for git diffs)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    with open(temp_path, "w") as f:
+        json.dump(snapshot, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(temp_path, path)
+
+
+class SystemInfoCollector:
+    """Collect structured snapshots from many hosts in parallel."""
+
+    def __init__(
+        self,
+        ssh_manager: Optional[SSHManager] = None,
+        store: Optional[SnapshotStore] = None,
+        max_workers: int = 16,
+    ):
+        """
+        Initialize system info collector.
+
+        Args:
+            ssh_manager: SSH manager instance (creates new one if None)
+            store: Snapshot store (default: ~/.homelab/system-info)
+            max_workers: Hosts probed at once
+        """
+        self.ssh_manager = ssh_manager or SSHManager()
+        self.store = store or SnapshotStore()
+        self.max_workers = max_workers
+
+    def collect(
+        self,
+        target: Dict[str, Any],
+        sections: Optional[List[str]] = None,
+        incremental: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Probe one host and save a snapshot.
+
+        Args:
+            target: Dictionary with name, address, user, key and port
+                (key and port optional)
+            sections: Sections to probe (default: all); others are copied
+                from the previous snapshot
+            incremental: Skip sections unchanged since the previous snapshot
+
+        Returns:
+            Snapshot dictionary (host, address, collected, duration,
+            sections, checksums, changed, error and path)
+        """
+        name = target["name"]
+        previous = self.store.latest(name) or {}
+        wanted = [section for section in (sections or SECTIONS) if section in SECTIONS]
+        known = previous.get("checksums", {}) if incremental else {}
+
+        snapshot = {
+            "version": FORMAT_VERSION,
+            "host": name,
+            "address": target["address"],
+            "collected": datetime.now().isoformat(timespec="seconds"),
+            "sections": dict(previous.get("sections", {})),
+            "checksums": dict(previous.get("checksums", {})),
+            "changed": [],
+            "error": None,
+        }
+
+        marker = f"__KAPNODE_INFO_{uuid.uuid4().hex}__"
+        started = time.monotonic()
+
+        with tracer.span("system_info.collect", host=name, sections=len(wanted)) as span:
+            stdout, stderr, exit_code = self.ssh_manager.execute_command(
+                target["address"],
+                target.get("user", "root"),
+                f"sh -c {shlex.quote(build_probe(wanted, marker, known))}",
+                key=target.get("key"),
+                port=target.get("port", 22),
+            )
+            results = parse_probe(stdout, marker)
+
+            if not results:
+                snapshot["error"] = stderr.strip() or f"probe exited with {exit_code}"
+            for section, (checksum, output) in results.items():
+                snapshot["checksums"][section] = checksum
+                if output is not None or section not in snapshot["sections"]:
+                    snapshot["sections"][section] = PARSERS[section](output or "") if (output or "").strip() else None
+                    snapshot["changed"].append(section)
+            span.tag(changed=len(snapshot["changed"]), bytes=len(stdout))
+
+        snapshot["duration"] = round(time.monotonic() - started, 3)
+        if not snapshot["error"]:
+            snapshot["path"] = str(self.store.save(snapshot))
+        return snapshot
+
+    def collect_all(
+        self,
+        targets: List[Dict[str, Any]],
+        sections: Optional[List[str]] = None,
+        incremental: bool = True,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Probe many hosts in parallel.
+
+        Args:
+            targets: Target dictionaries (see collect())
+            sections: Sections to probe (default: all)
+            incremental: Skip sections unchanged since the previous snapshot
+            on_result: Called with each snapshot as its host finishes
+
+        Returns:
+            Dictionary of host name -> snapshot
+        """
+        def collect_one(target: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+            snapshot = self.collect(target, sections, incremental)
+            if on_result:
+                on_result(snapshot)
+            return target["name"], snapshot
+
+        if not targets:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(targets))) as pool:
+            return dict(pool.map(collect_one, targets))
+
+
+def parse_host_argument(value: str, default_user: str = "root") -> Dict[str, Any]:
+    """Turn 'user@host' or 'host' into a collector target."""
+    user, _, address = value.rpartition("@")
+    return {"name": re.sub(r"[^\w.-]+", "_", address), "address": address, "user": user or default_user}
@@ -0,0 +1,187 @@
+"""Table Filter - Incremental text filtering for large node tables."""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Seconds to wait after the last keystroke before filtering
+FILTER_DEBOUNCE = 0.15
+
+
+class TableFilter:
+    """
+    Filter table rows by substring against a precomputed lowercase index.
+
+    Rows are registered once with their search text and facet values
+    (e.g. location). Each call to filter() returns only the rows to add and
+    remove relative to the previous result, so the caller can patch its
+    DataTable instead of rebuilding it. When a query narrows the previous one
+    (the old query is contained in the new one and no facet was relaxed), only
+    the previously visible rows are scanned.
+    """
+
+    def __init__(self):
+        self.index: Dict[str, str] = {}
+        self.facets: Dict[str, Dict[str, Any]] = {}
+        self.order: List[str] = []
+        self.positions: Dict[str, int] = {}
+
+        self.query: Optional[str] = None
+        self.active_facets: Dict[str, Any] = {}
+        self.visible: Set[str] = set()
+
+    def load(self, rows: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """
+        Replace the indexed rows.
+
+        The visible set is kept so the next filter() returns a delta against
+        what is currently displayed.
+
+        Args:
+            rows: Iterable of (key, search_text, facets) in display order
+        """
+        self.index = {}
+        self.facets = {}
+        self.order = []
+
+        for key, text, facets in rows:
+            self.index[key] = text.lower()
+            self.facets[key] = facets or {}
+            self.order.append(key)
+
+        self.positions = {key: i for i, key in enumerate(self.order)}
+        # Rows may have changed, so the next query must rescan
+        self.query = None
+
+    def set_order(self, keys: List[str]) -> None:
+        """
+        Set the display order of rows.
+
+        Args:
+            keys: All row keys in the desired order
+        """
+        self.order = list(keys)
+        self.positions = {key: i for i, key in enumerate(self.order)}
+
+    def position(self, key: str) -> int:
+        """
+        Get the display position of a row (for DataTable.sort key functions).
+
+        Args:
+            key: Row key
+
+        Returns:
+            Index in the current order
+        """
+        return self.positions.get(key, len(self.positions))
+
+    def _matches(self, key: str, query: str, facets: Dict[str, Any]) -> bool:
+        """Check a single row against a lowercase query and facet values."""
+        if query and query not in self.index[key]:
+            return False
+
+        row_facets = self.facets[key]
+        for name, value in facets.items():
+            if row_facets.get(name) != value:
+                return False
+
+        return True
+
+    def _narrows(self, query: str, facets: Dict[str, Any]) -> bool:
+        """Check whether the new filter can only hide rows that are visible now."""
+        if self.query is None or self.query not in query:
+            return False
+
+        # Every previous facet must still be applied with the same value
+        for name, value in self.active_facets.items():
+            if facets.get(name) != value:
+                return False
+
+        return True
+
+    def filter(self, query: str = "", **facets: Any) -> Tuple[List[str], List[str]]:
+        """
+        Apply a filter and compute the change against the previous result.
+
+        Args:
+            query: Case-insensitive substring to search for
+            **facets: Exact-match facet values (None values are ignored)
+
+        Returns:
+            Tuple of (keys to add in display order, keys to remove)
+        """
+        query = query.strip().lower()
+        facets = {name: value for name, value in facets.items() if value is not None}
+
+        candidates = self.visible if self._narrows(query, facets) else self.order
+        matched = {
+            key for key in candidates
+            if key in self.index and self._matches(key, query, facets)
+        }
+
+        added = sorted(matched - self.visible, key=self.position)
+        removed = [key for key in self.visible if key not in matched]
+
+        self.query = query
+        self.active_facets = facets
+        self.visible = matched
+
+        return added, removed
+
+    def update(
+        self,
+        rows: Iterable[Tuple[str, str, Dict[str, Any]]],
+        removed: Iterable[str] = (),
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Re-index individual rows and re-check only those against the active filter.
+
+        New keys are appended to the display order; call set_order() afterwards
+        if they belong elsewhere.
+
+        Args:
+            rows: Iterable of (key, search_text, facets) for added or changed rows
+            removed: Keys of rows that no longer exist
+
+        Returns:
+            Tuple of (keys to add in display order, keys to remove)
+        """
+        to_add: List[str] = []
+        to_remove: List[str] = []
+
+        removed = [key for key in removed if key in self.index]
+        for key in removed:
+            del self.index[key]
+            del self.facets[key]
+            if key in self.visible:
+                self.visible.discard(key)
+                to_remove.append(key)
+
+        if removed:
+            self.set_order([key for key in self.order if key in self.index])
+
+        for key, text, facets in rows:
+            self.index[key] = text.lower()
+            self.facets[key] = facets or {}
+            if key not in self.positions:
+                self.positions[key] = len(self.order)
+                self.order.append(key)
+
+            # Rows not yet filtered are picked up by the next filter() call
+            if self.query is None:
+                continue
+
+            if self._matches(key, self.query, self.active_facets):
+                if key not in self.visible:
+                    self.visible.add(key)
+                    to_add.append(key)
+            elif key in self.visible:
+                self.visible.discard(key)
+                to_remove.append(key)
+
+        return sorted(to_add, key=self.position), to_remove
+
+    def reset(self) -> None:
+        """Forget the visible set (e.g. after the table was cleared)."""
+        self.query = None
+        self.active_facets = {}
+        self.visible = set()
@@ -0,0 +1,280 @@
+"""Tracing - Lightweight nested spans with Chrome trace and OTLP JSON export.
+
+Instrumented code calls the module-level tracer:
+
+    from .tracing import tracer
+
+    with tracer.span("ssh.connect", host=host) as span:
+        ...
+        span.tag(auth="publickey")
+
+Tracing is off by default; span() then returns a shared no-op object, so
+instrumentation costs one attribute check per call. Finished spans go to a
+ring buffer and can be exported for chrome://tracing / Perfetto or as
+OTLP/JSON for an OpenTelemetry collector.
+"""
+
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+DEFAULT_CAPACITY = 10000
+SERVICE_NAME = "kapnode-deploy"
+
+
+class Span:
+    """A timed operation with tags; finished spans are kept by the tracer."""
+
+    __slots__ = ("tracer", "name", "tags", "span_id", "parent_id", "trace_id", "thread_id", "start", "end")
+
+    def __init__(self, tracer: "Tracer", name: str, tags: Dict[str, Any], parent: Optional["Span"]):
+        self.tracer = tracer
+        self.name = name
+        self.tags = tags
+        self.span_id = next(tracer._ids)
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else self.span_id
+        self.thread_id = threading.get_ident()
+        self.start = time.monotonic_ns()
+        self.end: Optional[int] = None
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds (up to now if still open)."""
+        return ((self.end or time.monotonic_ns()) - self.start) / 1e9
+
+    def tag(self, **tags: Any) -> "Span":
+        """Add or update tags."""
+        self.tags.update(tags)
+        return self
+
+    def finish(self) -> None:
+        """End the span (idempotent)."""
+        if self.end is None:
+            self.end = time.monotonic_ns()
+            self.tracer._finish(self)
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.tags["error"] = f"{exc_type.__name__}: {exc}"
+        self.finish()
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled."""
+
+    __slots__ = ()
+    duration = 0.0
+
+    def tag(self, **tags: Any) -> "_NoopSpan":
+        return self
+
+    def finish(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Collect spans in a bounded ring buffer.
+
+    Each thread has its own stack of open spans; a new span's parent is the
+    innermost open span of its thread. Spans may finish out of order or on
+    another thread (e.g. a span held open across a generator's yields).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.enabled = False
+        self.spans: Deque[Span] = deque(maxlen=capacity)
+        self._ids = itertools.count(1)
+        # Open spans per thread ID, innermost last
+        self._stacks: Dict[int, List[Span]] = {}
+        # Converts monotonic span times to wall-clock for OTLP
+        self._wall_offset = time.time_ns() - time.monotonic_ns()
+
+    def enable(self, capacity: Optional[int] = None) -> None:
+        """Start recording spans (optionally resizing the buffer)."""
+        if capacity and capacity != self.spans.maxlen:
+            self.spans = deque(self.spans, maxlen=capacity)
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording spans (finished spans are kept)."""
+        self.enabled = False
+
+    def clear(self) -> None:
+        """Drop all finished spans."""
+        self.spans.clear()
+
+    def span(self, name: str, **tags: Any):
+        """
+        Start a span; use as a context manager or call finish().
+
+        Args:
+            name: Operation name (dotted, e.g. 'ssh.connect')
+            **tags: Attributes such as host, vmid or stage
+
+        Returns:
+            Span, or a no-op stand-in when tracing is disabled
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+
+        stack = self._stacks.setdefault(threading.get_ident(), [])
+        span = Span(self, name, tags, stack[-1] if stack else None)
+        stack.append(span)
+        return span
+
+    def _finish(self, span: Span) -> None:
+        stack = self._stacks.get(span.thread_id)
+        if stack:
+            if stack[-1] is span:
+                stack.pop()
+            elif span in stack:
+                stack.remove(span)
+            if not stack:
+                self._stacks.pop(span.thread_id, None)
+        self.spans.append(span)
+
+    def traced(self, name: Optional[str] = None, **tags: Any) -> Callable:
+        """
+        Decorator that wraps every call of a function in a span.
+
+        Args:
+            name: Span name (default: the function's qualified name)
+            **tags: Static tags
+        """
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(span_name, **tags):
+                    return func(*args, **kwargs)
+
+            return wrapper
+        return decorator
+
+    def finished(self) -> List[Span]:
+        """Get a snapshot of the finished spans, oldest first."""
+        return list(self.spans)
+
+    def export_chrome(self, path: Path) -> int:
+        """
+        Write spans as a Chrome trace-event file (chrome://tracing, Perfetto).
+
+        Returns:
+            Number of spans written
+        """
+        spans = self.finished()
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "cat": span.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": span.start / 1000,
+                "dur": (span.end - span.start) / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {key: _attribute(value) for key, value in span.tags.items()},
+            }
+            for span in spans
+        ]
+        _write_json(path, {"traceEvents": events, "displayTimeUnit": "ms"})
+        return len(events)
+
+    def export_otlp(self, path: Path) -> int:
+        """
+        Write spans as OTLP/JSON (an ExportTraceServiceRequest).
+
+        Returns:
+            Number of spans written
+        """
+        spans = self.finished()
+        run = os.getpid()
+
+        def otlp_span(span: Span) -> Dict[str, Any]:
+            data = {
+                "traceId": f"{run:016x}{span.trace_id:016x}",
+                "spanId": f"{span.span_id:016x}",
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start + self._wall_offset),
+                "endTimeUnixNano": str(span.end + self._wall_offset),
+                "attributes": [
+                    {"key": key, "value": _otlp_value(value)} for key, value in span.tags.items()
+                ],
+            }
+            if span.parent_id:
+                data["parentSpanId"] = f"{span.parent_id:016x}"
+            if "error" in span.tags:
+                data["status"] = {"code": 2, "message": str(span.tags["error"])}
+            return data
+
+        _write_json(path, {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": SERVICE_NAME}},
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "kapnode.tracing"},
+                    "spans": [otlp_span(span) for span in spans],
+                }],
+            }],
+        })
+        return len(spans)
+
+    def export(self, path: Path) -> int:
+        """Export to a file, as OTLP if the name contains 'otlp', else Chrome trace format."""
+        if "otlp" in Path(path).name.lower():
+            return self.export_otlp(path)
+        return self.export_chrome(path)
+
+
+def _attribute(value: Any) -> Any:
+    return value if isinstance(value, (str, int, float, bool)) or value is None else str(value)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> None:
+    """Write JSON atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(temp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+# Process-wide tracer used by all instrumented code
+tracer = Tracer()
@@ -5,4 +5,7 @@ __all__ = [
     "deploy_screen",
     "update_screen",
     "history_screen",
+    "cluster_status",
+    "preflight_screen",
+    "profile_screen",
 ]
@@ -0,0 +1,230 @@
+"""Cluster Status Screen - Live fleet dashboard."""
+
+from typing import Dict, Optional
+
+from textual.app import ComposeResult
+from textual.containers import Container, Horizontal
+from textual.screen import Screen
+from textual.timer import Timer
+from textual.widgets import Header, Footer, Button, Static, DataTable
+from textual import on, work
+from rich.text import Text
+
+from lib.services import INVENTORY_CHANGED
+from lib.fleet_status import FleetPoller, FLEET_COLUMNS
+from lib.profiler import profiler
+from lib.tracing import tracer
+
+
+STATUS_STYLES = {
+    "running": "green",
+    "online": "green",
+    "stopped": "red",
+    "offline": "red",
+    "missing": "yellow",
+    "unknown": "dim",
+}
+
+
+class ClusterStatusScreen(Screen):
+    """Live dashboard of all inventory nodes."""
+
+    BINDINGS = [
+        ("escape", "back", "Back"),
+        ("r", "refresh", "Refresh"),
+    ]
+
+    CSS = """
+    ClusterStatusScreen {
+        layout: vertical;
+    }
+
+    #status-container {
+        width: 100%;
+        height: 100%;
+        padding: 1 2;
+    }
+
+    .section {
+        border: solid $primary;
+        margin: 1 0;
+        padding: 1 2;
+    }
+
+    .section-title {
+        text-style: bold;
+        color: $accent;
+        margin-bottom: 1;
+    }
+
+    #fleet-table {
+        height: 1fr;
+        border: solid $primary;
+    }
+
+    #poll-status {
+        height: 3;
+        padding: 1 2;
+        color: $text-muted;
+    }
+
+    #button-container {
+        height: 5;
+        align: center middle;
+        margin: 1 0;
+    }
+
+    #button-container Button {
+        margin: 0 2;
+    }
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.config = self.app.services.config
+        self.inventory = self.app.services.inventory
+
+        key = self.config.get_preference("ssh_key", "~/.ssh/homelab_rsa")
+        self.poller = FleetPoller(
+            self.inventory,
+            self.app.services.ssh_manager,
+            interval=self.config.get_preference("dashboard.poll_interval", 15),
+            jitter=self.config.get_preference("dashboard.poll_jitter", 0.2),
+            fallback_host={
+                "hostname": self.config.get_preference("proxmox_host", "kapmox"),
+                "ansible_host": self.config.get_preference("proxmox_host", "kapmox"),
+                "ansible_user": self.config.get_preference("proxmox_user", "root"),
+                "ssh_key": key,
+            },
+            api=self.app.services.proxmox_api,
+        )
+
+        # Last rendered values, used to update only the cells that changed
+        self.rows: Dict[str, Dict[str, str]] = {}
+        self.poll_timer: Optional[Timer] = None
+
+    def compose(self) -> ComposeResult:
+        """Create child widgets for cluster status screen."""
+        yield Header()
+
+        with Container(id="status-container"):
+            with Container(classes="section"):
+                yield Static("Cluster Status", classes="section-title")
+                yield Static("Live VM status from all Proxmox hosts")
+
+            yield DataTable(id="fleet-table", cursor_type="row")
+            yield Static("Waiting for first poll...", id="poll-status")
+
+            with Horizontal(id="button-container"):
+                yield Button("Refresh", id="btn-refresh", variant="primary")
+                yield Button("Back", id="btn-back", variant="error")
+
+        yield Footer()
+
+    def on_mount(self) -> None:
+        """Initialize the table and start polling."""
+        table = self.query_one("#fleet-table", DataTable)
+
+        for key, label in FLEET_COLUMNS:
+            table.add_column(label, key=key)
+
+        # Show inventory immediately; the first poll fills in live values
+        self._apply_rows(self.poller.build_rows([], unreachable=True), {})
+        self.poll_fleet()
+
+        self.app.services.subscribe(INVENTORY_CHANGED, self._on_inventory_changed)
+
+    def on_unmount(self) -> None:
+        """Stop polling and listening for inventory changes."""
+        self.app.services.unsubscribe(INVENTORY_CHANGED, self._on_inventory_changed)
+        self.workers.cancel_group(self, "fleet-poll")
+        if self.poll_timer is not None:
+            self.poll_timer.stop()
+            self.poll_timer = None
+
+    def _on_inventory_changed(self, payload=None) -> None:
+        """Re-match the last poll results against the changed inventory."""
+        rows = self.poller.build_rows(
+            self.poller.last_resources,
+            unreachable=not self.poller.last_resources,
+        )
+        self._apply_rows(rows, {})
+
+    def _render_cell(self, column: str, value: str):
+        """Render a cell value, colouring the status column."""
+        if column == "status":
+            return Text(value, style=STATUS_STYLES.get(value, ""))
+        return value
+
+    @tracer.traced("cluster.apply_rows")
+    @profiler.profiled("ClusterStatusScreen._apply_rows")
+    def _apply_rows(self, rows: Dict[str, Dict[str, str]], errors: Dict[str, str]) -> None:
+        """Patch the table so that only changed cells are touched."""
+        table = self.query_one("#fleet-table", DataTable)
+
+        for hostname in list(self.rows):
+            if hostname not in rows:
+                table.remove_row(hostname)
+                del self.rows[hostname]
+
+        for hostname, row in rows.items():
+            previous = self.rows.get(hostname)
+
+            if previous is None:
+                table.add_row(
+                    *(self._render_cell(key, row[key]) for key, _ in FLEET_COLUMNS),
+                    key=hostname
+                )
+            else:
+                for key, _ in FLEET_COLUMNS:
+                    if previous.get(key) != row[key]:
+                        table.update_cell(hostname, key, self._render_cell(key, row[key]))
+
+            self.rows[hostname] = row
+
+        self.query_one(".section-title", Static).update(f"Cluster Status ({len(rows)} nodes)")
+
+        if errors:
+            message = Text()
+            for host, error in errors.items():
+                message.append(f"⚠ {host}: {error}\n", style="yellow")
+            self.query_one("#poll-status", Static).update(message)
+
+    @work(thread=True, exclusive=True, group="fleet-poll")
+    @profiler.profiled("ClusterStatusScreen.poll_fleet")
+    def poll_fleet(self) -> None:
+        """Poll all Proxmox hosts in a background thread."""
+        with tracer.span("cluster.poll", api=self.poller.api is not None):
+            rows, errors = self.poller.poll()
+        self.app.call_from_thread(self._on_poll_complete, rows, errors)
+
+    def _on_poll_complete(self, rows: Dict[str, Dict[str, str]], errors: Dict[str, str]) -> None:
+        """Apply poll results and schedule the next poll."""
+        # A poll that was running when the screen was closed
+        if not self.is_attached:
+            return
+
+        self._apply_rows(rows, errors)
+
+        if not errors:
+            from datetime import datetime
+            self.query_one("#poll-status", Static).update(
+                f"Last updated {datetime.now().strftime('%H:%M:%S')}"
+            )
+
+        if self.poll_timer is not None:
+            self.poll_timer.stop()
+        self.poll_timer = self.set_timer(self.poller.next_delay(), self.poll_fleet)
+
+    @on(Button.Pressed, "#btn-refresh")
+    def action_refresh(self) -> None:
+        """Poll immediately."""
+        if self.poll_timer is not None:
+            self.poll_timer.stop()
+            self.poll_timer = None
+        self.poll_fleet()
+
+    @on(Button.Pressed, "#btn-back")
+    def action_back(self) -> None:
+        """Go back to main menu."""
+        self.app.pop_screen()
@@ -8,11 +8,10 @@ from textual.widgets import Header, Footer, Button, Input, Static, Label, Select
 from textual import on, work
 from rich.text import Text
 
-from ..lib.ssh_manager import SSHManager
-from ..lib.inventory import InventoryManager
-from ..lib.config_manager import ConfigManager
-from ..lib.script_executor import ScriptExecutor
-from ..lib.validators import Validators
+from lib.validators import Validators
+from lib.cache_proxy import cache_urls, MIRROR_PORT
+from lib.preflight import FAIL
+from .preflight_screen import badge_line
 
 
 class DeployScreen(Screen):
@@ -82,13 +81,11 @@ class DeployScreen(Screen):
 
     def __init__(self):
         super().__init__()
-        self.ssh_manager = SSHManager()
-        self.inventory = InventoryManager()
-        self.config = ConfigManager()
-        self.executor = ScriptExecutor(self.ssh_manager)
-
-        self.config.load_config()
-        self.inventory.load_inventory()
+        self.ssh_manager = self.app.services.ssh_manager
+        self.inventory = self.app.services.inventory
+        self.config = self.app.services.config
+        self.executor = self.app.services.executor
+        self.preflight = self.app.services.preflight
 
     def compose(self) -> ComposeResult:
         """Create child widgets for deploy screen."""
@@ -122,8 +119,19 @@ class DeployScreen(Screen):
                         id="input-ssh-key",
                         classes="field-input"
                     )
+                with Horizontal(classes="form-field"):
+                    yield Label("Base Image:", classes="field-label")
+                    yield Select(
+                        options=self._image_options(),
+                        value=self._selected_image(),
+                        allow_blank=False,
+                        id="select-image",
+                        classes="field-input"
+                    )
                 yield Static("", id="ssh-status")
-                yield Button("Test Connection", id="btn-test-ssh")
+                with Horizontal(classes="form-field"):
+                    yield Button("Test Connection", id="btn-test-ssh")
+                    yield Button("Build Golden Image", id="btn-build-image")
 
             # Section 2: VM Configuration
             with Container(classes="section"):
@@ -268,6 +276,12 @@ class DeployScreen(Screen):
 
         yield Footer()
 
+    def on_mount(self) -> None:
+        """Check the default Proxmox host in the background (cached results show at once)."""
+        key_path = Path(self.query_one("#input-ssh-key", Input).value).expanduser()
+        if key_path.exists():
+            self._start_preflight(force=False)
+
     @on(Select.Changed, "#select-location")
     def on_location_change(self, event: Select.Changed) -> None:
         """Update network defaults when location changes."""
@@ -277,6 +291,59 @@ class DeployScreen(Screen):
         self.query_one("#input-gateway", Input).value = defaults.get("gateway", "")
         self.query_one("#input-dns", Input).value = defaults.get("dns", "")
 
+    def _image_options(self) -> list:
+        """Get base image choices: the stock cloud image and the last golden image."""
+        options = [("Ubuntu 24.04 cloud image (installs packages on first boot)", "")]
+
+        image = self.config.get_preference("golden_image.image", "")
+        if image:
+            options.append((f"Golden image {image}", image))
+
+        return options
+
+    def _selected_image(self) -> str:
+        """Get the image selected by default."""
+        if self.config.get_preference("golden_image.enabled", False):
+            return self.config.get_preference("golden_image.image", "")
+        return ""
+
+    @on(Button.Pressed, "#btn-build-image")
+    def build_golden_image(self) -> None:
+        """Build (or confirm) the golden image on the Proxmox host."""
+        from components.log_viewer import TaskLogScreen
+        from lib.image_builder import ImageBuilder
+
+        host = self.query_one("#input-host", Input).value
+        user = self.query_one("#input-user", Input).value
+        key_path = Path(self.query_one("#input-ssh-key", Input).value).expanduser()
+        builder = ImageBuilder(self.executor)
+
+        def build():
+            return builder.build(
+                host,
+                user,
+                key_path,
+                packages=self.config.get_preference("golden_image.packages", ""),
+                k3s_version=self.config.get_preference("golden_image.k3s_version", ""),
+            )
+
+        def complete():
+            if not builder.image_name:
+                return False, "Golden image build failed"
+
+            self.config.set_preference("golden_image.image", builder.image_name)
+            self.config.set_preference("golden_image.enabled", True)
+            self.app.call_from_thread(self._refresh_image_options)
+            return True, f"Golden image ready: {builder.image_name}"
+
+        self.app.push_screen(TaskLogScreen("Golden image build", build, complete))
+
+    def _refresh_image_options(self) -> None:
+        """Offer the newly built golden image."""
+        select = self.query_one("#select-image", Select)
+        select.set_options(self._image_options())
+        select.value = self._selected_image()
+
     @on(Button.Pressed, "#btn-test-ssh")
     def test_ssh_connection(self) -> None:
         """Test SSH connection to Proxmox host."""
@@ -290,11 +357,43 @@ class DeployScreen(Screen):
             status_widget.update(Text("❌ SSH key not found", style="bold red"))
             return
 
-        # Test connection
-        if self.ssh_manager.test_connection(host, user, key_path):
-            status_widget.update(Text("✓ Connection successful", style="bold green"))
+        status_widget.update(Text(f"… Checking {user}@{host}", style="dim"))
+        self._start_preflight(force=True)
+
+    def _preflight_args(self) -> tuple:
+        """Get the preflight target, VMID and IP from the form (None if not valid yet)."""
+        target = self.preflight.make_target(
+            self.query_one("#input-host", Input).value,
+            self.query_one("#input-user", Input).value,
+            Path(self.query_one("#input-ssh-key", Input).value).expanduser(),
+        )
+
+        vmid = self.query_one("#input-vmid", Input).value
+        vmid = int(vmid) if vmid.isdigit() and Validators.validate_vmid(int(vmid))[0] else None
+        ip = self.query_one("#input-ip", Input).value
+        ip = ip if ip and Validators.validate_ip(ip)[0] else None
+
+        return target, vmid, ip
+
+    def _start_preflight(self, force: bool) -> None:
+        """Check the Proxmox host, VMID and IP in a background thread."""
+        target, vmid, ip = self._preflight_args()
+        self.run_preflight(target, vmid, ip, force)
+
+    @work(thread=True, exclusive=True, group="preflight")
+    def run_preflight(self, target: dict, vmid, ip, force: bool) -> None:
+        """Run the preflight checks for the Proxmox host (worker thread)."""
+        results = self.preflight.run([target], vmid, ip, force=force)[target["name"]]
+        self.app.call_from_thread(self._show_preflight, results)
+
+    def _show_preflight(self, results: dict) -> None:
+        """Show the preflight badges below the connection fields."""
+        if results["ssh"]["status"] == "ok":
+            status = Text("✓ Connection successful   ", style="bold green")
         else:
-            status_widget.update(Text("❌ Connection failed", style="bold red"))
+            status = Text("❌ Connection failed   ", style="bold red")
+        status.append_text(badge_line(results))
+        self.query_one("#ssh-status", Static).update(status)
 
     @on(Button.Pressed, "#btn-validate")
     def validate_deployment(self) -> None:
@@ -303,6 +402,24 @@ class DeployScreen(Screen):
 
         valid, errors = Validators.validate_all_deployment_params(params)
 
+        # Render cloud-init now so template problems show up before deploying
+        if valid:
+            from lib.cloud_init import CloudInitRenderer, CloudInitError
+
+            try:
+                CloudInitRenderer().render(params)
+            except (CloudInitError, KeyError) as e:
+                valid, errors = False, [f"Cloud-init: {e}"]
+
+        # Conflicts found by a recent preflight of this host, VMID and IP
+        if valid:
+            results = self.preflight.cached(*self._preflight_args()) or {}
+            errors = [
+                f"{check.upper()}: {results[check]['detail']}"
+                for check in ("vmid", "ip") if results.get(check, {}).get("status") == FAIL
+            ]
+            valid = not errors
+
         summary_widget = self.query_one("#validation-summary", Static)
         deploy_button = self.query_one("#btn-deploy", Button)
 
@@ -314,6 +431,8 @@ class DeployScreen(Screen):
             summary.append(f"IP: {params['ip']}\n")
             summary.append(f"Location: {params['location']}\n")
             summary.append(f"Resources: {params['cores']} cores, {params['memory']} GB RAM, {params['disk_size']} GB disk\n")
+            if params.get("apt_proxy"):
+                summary.append(f"Cache Proxy: {params['apt_proxy']}\n")
 
             summary_widget.update(summary)
             deploy_button.disabled = False
@@ -333,7 +452,7 @@ class DeployScreen(Screen):
         params = self._collect_parameters()
 
         # Switch to log viewer screen
-        from ..components.log_viewer import LogViewerScreen
+        from components.log_viewer import LogViewerScreen
 
         await self.app.push_screen(LogViewerScreen(params, self))
 
@@ -344,7 +463,11 @@ class DeployScreen(Screen):
 
     def _collect_parameters(self) -> dict:
         """Collect all parameters from form inputs."""
-        return {
+        location_defaults = self.config.get_location_defaults(
+            self.query_one("#select-location", Select).value
+        )
+
+        params = {
             "name": self.query_one("#input-hostname", Input).value,
             "vmid": int(self.query_one("#input-vmid", Input).value or 0),
             "ip": self.query_one("#input-ip", Input).value,
@@ -364,10 +487,19 @@ class DeployScreen(Screen):
                 Path(self.query_one("#input-ssh-key", Input).value).expanduser()
             ),
             "storage": self.config.get_preference("defaults.storage", "local-lvm"),
-            "network": self.config.get_location_defaults(
-                self.query_one("#select-location", Select).value
-            ).get("network", "192.168.86.0/24"),
+            "network": location_defaults.get("network", "192.168.86.0/24"),
             "proxmox_host": self.query_one("#input-host", Input).value,
             "proxmox_user": self.query_one("#input-user", Input).value,
             "ssh_key_path": self.query_one("#input-ssh-key", Input).value,
+            "golden_image": self.query_one("#select-image", Select).value,
         }
+
+        # Point cloud-init at the site-local cache, if this location has one
+        cache_host = location_defaults.get("cache_proxy")
+        if cache_host:
+            params.update(cache_urls(
+                cache_host,
+                location_defaults.get("cache_mirror_port", MIRROR_PORT),
+            ))
+
+        return params
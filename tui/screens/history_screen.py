@@ -7,8 +7,10 @@ from textual.widgets import Header, Footer, Button, Static, DataTable, Input, Se
 from textual import on
 from rich.text import Text
 
-from ..lib.config_manager import ConfigManager
-from ..lib.inventory import InventoryManager
+from lib.profiler import profiler
+from lib.services import INVENTORY_CHANGED
+from lib.table_filter import TableFilter, FILTER_DEBOUNCE
+from lib.tracing import tracer
 
 
 class HistoryScreen(Screen):
@@ -78,16 +80,18 @@ class HistoryScreen(Screen):
 
     def __init__(self):
         super().__init__()
-        self.config = ConfigManager()
-        self.inventory = InventoryManager()
-
-        self.config.load_config()
-        self.inventory.load_inventory()
+        self.config = self.app.services.config
+        self.inventory = self.app.services.inventory
 
         self.selected_deployment = None
         self.sort_by = "date"
         self.sort_reverse = True
 
+        self.row_filter = TableFilter()
+        self.filter_timer = None
+        self.nodes = {}
+        self.row_cells = {}
+
     def compose(self) -> ComposeResult:
         """Create child widgets for history screen."""
         yield Header()
@@ -138,7 +142,7 @@ class HistoryScreen(Screen):
         table = self.query_one("#history-table", DataTable)
 
         # Add columns
-        table.add_columns(
+        columns = table.add_columns(
             "Hostname",
             "VMID",
             "Location",
@@ -146,30 +150,101 @@ class HistoryScreen(Screen):
             "Tailscale",
             "Deployed"
         )
+        self.column_keys = columns
+        self.hostname_column = columns[0]
 
         # Load history
-        self._refresh_table()
+        self._load_rows()
+        self._apply_filter()
+
+        self.app.services.subscribe(INVENTORY_CHANGED, self._on_inventory_changed)
 
-    def _refresh_table(self, filter_text: str = "", location_filter: str = "all") -> None:
-        """Refresh the history table with inventory data."""
+    def on_unmount(self) -> None:
+        """Stop listening for inventory changes."""
+        self.app.services.unsubscribe(INVENTORY_CHANGED, self._on_inventory_changed)
+
+    def _on_inventory_changed(self, payload=None) -> None:
+        """Patch the rows affected by an inventory change."""
         table = self.query_one("#history-table", DataTable)
-        table.clear()
 
-        # Get all nodes from inventory
-        nodes = self.inventory.list_nodes()
+        if not payload:
+            # No diff available, so rebuild the table from scratch
+            table.clear()
+            self.row_filter.reset()
+            self._load_rows()
+            self._apply_filter()
+            return
 
-        # Apply location filter
-        if location_filter != "all":
-            nodes = [n for n in nodes if n.get("location") == location_filter]
+        for hostname in payload["removed"]:
+            self.nodes.pop(hostname, None)
+            self.row_cells.pop(hostname, None)
+
+        updated = []
+        for hostname in payload["added"] + payload["changed"]:
+            node = self.inventory.get_node(hostname)
+            if node is None:
+                continue
+            self.nodes[hostname] = node
+            self.row_cells[hostname] = self._build_cells(node)
+            updated.append((hostname, hostname, {"location": node.get("location")}))
+
+        visible_before = set(self.row_filter.visible)
+        added, removed = self.row_filter.update(updated, payload["removed"])
+        self.row_filter.set_order(self._sorted_hostnames())
+
+        for hostname in removed:
+            table.remove_row(hostname)
+
+        for hostname in payload["changed"]:
+            if hostname in visible_before and hostname in self.row_filter.visible:
+                for column, value in zip(self.column_keys, self.row_cells[hostname]):
+                    table.update_cell(hostname, column, value)
+
+        for hostname in added:
+            table.add_row(*self.row_cells[hostname], key=hostname)
+
+        if added or payload["changed"]:
+            table.sort(self.hostname_column, key=self.row_filter.position)
+
+        self._update_stats(len(self.row_filter.visible))
+
+    def _build_cells(self, node: dict) -> tuple:
+        """Build the table cells for one node."""
+        deployed_date = node.get("deployed", "")
+        if deployed_date:
+            deployed_date = str(deployed_date)[:10]  # Just date part
+
+        return (
+            node.get("hostname", ""),
+            str(node.get("vmid", "")),
+            node.get("location", ""),
+            node.get("ansible_host", ""),
+            node.get("tailscale_name", "N/A"),
+            deployed_date,
+        )
+
+    @tracer.traced("history.load_rows")
+    @profiler.profiled("HistoryScreen._load_rows")
+    def _load_rows(self) -> None:
+        """Build the row cache and search index from the inventory."""
+        self.nodes = {node.get("hostname", ""): node for node in self.inventory.list_nodes()}
+        self.row_cells = {
+            hostname: self._build_cells(node) for hostname, node in self.nodes.items()
+        }
+
+        self.row_filter.load(
+            (hostname, hostname, {"location": node.get("location")})
+            for hostname, node in self.nodes.items()
+        )
+        self.row_filter.set_order(self._sorted_hostnames())
 
-        # Apply hostname filter
-        if filter_text:
-            nodes = [n for n in nodes if filter_text.lower() in n.get("hostname", "").lower()]
+    def _sorted_hostnames(self) -> list:
+        """Get all hostnames in the current sort order."""
+        nodes = list(self.nodes.values())
 
-        # Sort nodes
         sort_key = self.sort_by
         if sort_key == "date":
-            nodes.sort(key=lambda x: x.get("deployed", ""), reverse=self.sort_reverse)
+            nodes.sort(key=lambda x: str(x.get("deployed", "")), reverse=self.sort_reverse)
         elif sort_key == "hostname":
             nodes.sort(key=lambda x: x.get("hostname", ""))
         elif sort_key == "vmid":
@@ -177,25 +252,40 @@ class HistoryScreen(Screen):
         elif sort_key == "location":
             nodes.sort(key=lambda x: x.get("location", ""))
 
-        # Populate table
-        for node in nodes:
-            hostname = node.get("hostname", "")
-            deployed_date = node.get("deployed", "")
-            if deployed_date:
-                deployed_date = deployed_date[:10]  # Just date part
-
-            table.add_row(
-                hostname,
-                str(node.get("vmid", "")),
-                node.get("location", ""),
-                node.get("ansible_host", ""),
-                node.get("tailscale_name", "N/A"),
-                deployed_date,
-                key=hostname
-            )
+        return [node.get("hostname", "") for node in nodes]
+
+    @tracer.traced("history.apply_filter")
+    @profiler.profiled("HistoryScreen._apply_filter")
+    def _apply_filter(self) -> None:
+        """Apply the current filter inputs, adding and removing only changed rows."""
+        self.filter_timer = None
+        table = self.query_one("#history-table", DataTable)
+
+        filter_text = self.query_one("#input-filter", Input).value
+        location = self.query_one("#select-location-filter", Select).value
+        added, removed = self.row_filter.filter(
+            filter_text,
+            location=None if location in ("all", Select.BLANK) else location,
+        )
+
+        for hostname in removed:
+            table.remove_row(hostname)
+
+        for hostname in added:
+            table.add_row(*self.row_cells[hostname], key=hostname)
+
+        if added:
+            # New rows are appended at the bottom; restore the sort order
+            table.sort(self.hostname_column, key=self.row_filter.position)
 
         # Update stats
-        self._update_stats(len(nodes))
+        self._update_stats(len(self.row_filter.visible))
+
+    def _schedule_filter(self) -> None:
+        """Debounce filtering so fast typing triggers a single table update."""
+        if self.filter_timer is not None:
+            self.filter_timer.stop()
+        self.filter_timer = self.set_timer(FILTER_DEBOUNCE, self._apply_filter)
 
     def _update_stats(self, count: int) -> None:
         """Update statistics in the section header."""
@@ -205,22 +295,21 @@ class HistoryScreen(Screen):
     @on(Input.Changed, "#input-filter")
     def on_filter_change(self, event: Input.Changed) -> None:
         """Filter table when search input changes."""
-        location = self.query_one("#select-location-filter", Select).value
-        self._refresh_table(event.value, location)
+        self._schedule_filter()
 
     @on(Select.Changed, "#select-location-filter")
     def on_location_filter_change(self, event: Select.Changed) -> None:
         """Filter by location."""
-        filter_text = self.query_one("#input-filter", Input).value
-        self._refresh_table(filter_text, event.value)
+        self._schedule_filter()
 
     @on(Select.Changed, "#select-sort")
     def on_sort_change(self, event: Select.Changed) -> None:
         """Change sort order."""
         self.sort_by = event.value
-        filter_text = self.query_one("#input-filter", Input).value
-        location = self.query_one("#select-location-filter", Select).value
-        self._refresh_table(filter_text, location)
+        self.row_filter.set_order(self._sorted_hostnames())
+
+        table = self.query_one("#history-table", DataTable)
+        table.sort(self.hostname_column, key=self.row_filter.position)
 
     @on(DataTable.RowSelected)
     def on_row_selected(self, event: DataTable.RowSelected) -> None:
@@ -275,10 +364,8 @@ class HistoryScreen(Screen):
     @on(Button.Pressed, "#btn-refresh")
     def action_refresh(self) -> None:
         """Refresh the history data."""
+        # Reloading notifies _on_inventory_changed only if the file changed
         self.inventory.load_inventory()
-        filter_text = self.query_one("#input-filter", Input).value
-        location = self.query_one("#select-location-filter", Select).value
-        self._refresh_table(filter_text, location)
 
     @on(Button.Pressed, "#btn-export")
     def export_csv(self) -> None:
@@ -4,7 +4,7 @@ from textual.app import ComposeResult
 from textual.containers import Container, VerticalScroll
 from textual.screen import Screen
 from textual.widgets import Header, Footer, Button, Static
-from textual import on
+from textual import on, work
 
 
 class MainMenu(Screen):
@@ -15,6 +15,8 @@ class MainMenu(Screen):
         ("d", "deploy", "Deploy"),
         ("u", "update", "Update"),
         ("h", "history", "History"),
+        ("s", "status", "Status"),
+        ("p", "preflight", "Preflight"),
     ]
 
     CSS = """
@@ -60,12 +62,23 @@ class MainMenu(Screen):
             yield Button("Deploy New Node", id="btn-deploy", variant="primary")
             yield Button("Update Existing Node", id="btn-update")
             yield Button("View Deployment History", id="btn-history")
-            yield Button("Cluster Status (Coming Soon)", id="btn-status", disabled=True)
+            yield Button("Cluster Status", id="btn-status")
+            yield Button("Preflight Checks", id="btn-preflight")
             yield Button("Quit", id="btn-quit", variant="error")
-            yield Static(self._get_status_text(), id="status")
+            yield Static("Git status: checking...", id="status")
 
         yield Footer()
 
+    def on_mount(self) -> None:
+        """Load git status without blocking the first frame."""
+        self.load_status()
+
+    @work(thread=True, exclusive=True, group="git-status")
+    def load_status(self) -> None:
+        """Run the git status commands in a background thread."""
+        text = self._get_status_text()
+        self.app.call_from_thread(self.query_one("#status", Static).update, text)
+
     def _get_status_text(self) -> str:
         """Get current git branch and sync status."""
         import subprocess
@@ -112,6 +125,18 @@ class MainMenu(Screen):
         from .history_screen import HistoryScreen
         self.app.push_screen(HistoryScreen())
 
+    @on(Button.Pressed, "#btn-status")
+    def action_status(self) -> None:
+        """Navigate to cluster status screen."""
+        from .cluster_status import ClusterStatusScreen
+        self.app.push_screen(ClusterStatusScreen())
+
+    @on(Button.Pressed, "#btn-preflight")
+    def action_preflight(self) -> None:
+        """Navigate to preflight checks screen."""
+        from .preflight_screen import PreflightScreen
+        self.app.push_screen(PreflightScreen())
+
     @on(Button.Pressed, "#btn-quit")
     def action_quit(self) -> None:
         """Quit the application."""
@@ -0,0 +1,193 @@
+"""Preflight Screen - Live connectivity badges for all hosts and nodes."""
+
+from typing import Any, Dict
+
+from textual.app import ComposeResult
+from textual.containers import Container, Horizontal
+from textual.screen import Screen
+from textual.widgets import Header, Footer, Button, Static, DataTable
+from textual import on, work
+from rich.text import Text
+
+from lib.preflight import PREFLIGHT_CHECKS, OK, WARN, FAIL, SKIPPED
+
+
+BADGES = {
+    OK: ("✓", "green"),
+    WARN: ("!", "yellow"),
+    FAIL: ("✗", "bold red"),
+    SKIPPED: ("-", "dim"),
+}
+
+
+def badge(result: Dict[str, Any]) -> Text:
+    """Render a check result as a one-character badge."""
+    symbol, style = BADGES.get(result["status"], ("?", "dim"))
+    return Text(symbol, style=style)
+
+
+def badge_line(results: Dict[str, Dict[str, Any]]) -> Text:
+    """Render all check results as labelled badges on one line."""
+    text = Text()
+    for check, label in PREFLIGHT_CHECKS:
+        result = results.get(check)
+        if result is None or result["status"] == SKIPPED:
+            continue
+        text.append_text(badge(result))
+        text.append(f" {label}")
+        if result["status"] != OK and result["detail"]:
+            text.append(f" ({result['detail']})", style="dim")
+        text.append("   ")
+    return text
+
+
+class PreflightScreen(Screen):
+    """Check every Proxmox host and inventory node in parallel."""
+
+    BINDINGS = [
+        ("escape", "back", "Back"),
+        ("r", "refresh", "Re-check"),
+    ]
+
+    CSS = """
+    PreflightScreen {
+        layout: vertical;
+    }
+
+    #preflight-container {
+        width: 100%;
+        height: 100%;
+        padding: 1 2;
+    }
+
+    .section {
+        border: solid $primary;
+        margin: 1 0;
+        padding: 1 2;
+    }
+
+    .section-title {
+        text-style: bold;
+        color: $accent;
+        margin-bottom: 1;
+    }
+
+    #preflight-table {
+        height: 1fr;
+        border: solid $primary;
+    }
+
+    #preflight-detail {
+        height: 5;
+        padding: 1 2;
+        color: $text-muted;
+    }
+
+    #button-container {
+        height: 5;
+        align: center middle;
+        margin: 1 0;
+    }
+
+    #button-container Button {
+        margin: 0 2;
+    }
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.checker = self.app.services.preflight
+        self.results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def compose(self) -> ComposeResult:
+        """Create child widgets for the preflight screen."""
+        yield Header()
+
+        with Container(id="preflight-container"):
+            with Container(classes="section"):
+                yield Static("Preflight Checks", classes="section-title")
+                yield Static("TCP, SSH, Tailscale and free VMID/IP checks for every host, run in parallel")
+
+            yield DataTable(id="preflight-table", cursor_type="row")
+            yield Static("Select a row for details", id="preflight-detail")
+
+            with Horizontal(id="button-container"):
+                yield Button("Re-check", id="btn-refresh", variant="primary")
+                yield Button("Back", id="btn-back", variant="error")
+
+        yield Footer()
+
+    def on_mount(self) -> None:
+        """Set up the table and check all targets (cached results show at once)."""
+        table = self.query_one("#preflight-table", DataTable)
+        self.check_columns = {}
+        table.add_column("Host", key="name")
+        table.add_column("Location", key="location")
+        table.add_column("Address", key="address")
+        for check, label in PREFLIGHT_CHECKS:
+            self.check_columns[check] = table.add_column(label, key=check)
+
+        self.run_checks(force=False)
+
+    @work(thread=True, exclusive=True, group="preflight")
+    def run_checks(self, force: bool) -> None:
+        """Run the checks in a background thread, updating rows as hosts finish."""
+        targets = self.checker.get_targets()
+        self.app.call_from_thread(self._show_targets, targets)
+
+        def on_result(target, results):
+            self.app.call_from_thread(self._show_result, target["name"], results)
+
+        self.checker.run(targets, force=force, on_result=on_result)
+        self.app.call_from_thread(self._finished, len(targets))
+
+    def _show_targets(self, targets: list) -> None:
+        """Add a pending row per target."""
+        table = self.query_one("#preflight-table", DataTable)
+        table.clear()
+        self.results = {}
+        pending = Text("…", style="dim")
+        for target in targets:
+            role = "Proxmox" if target["proxmox"] else target["location"]
+            table.add_row(
+                target["name"], role, target["address"],
+                *[pending for _ in PREFLIGHT_CHECKS],
+                key=target["name"],
+            )
+        self.query_one("#preflight-detail", Static).update(f"Checking {len(targets)} hosts...")
+
+    def _show_result(self, name: str, results: Dict[str, Dict[str, Any]]) -> None:
+        """Update the badges of one row."""
+        self.results[name] = results
+        table = self.query_one("#preflight-table", DataTable)
+        for check, _ in PREFLIGHT_CHECKS:
+            table.update_cell(name, self.check_columns[check], badge(results[check]))
+
+    def _finished(self, count: int) -> None:
+        """Summarise the pass."""
+        failed = sum(
+            1 for results in self.results.values()
+            if any(result["status"] == FAIL for result in results.values())
+        )
+        summary = Text(f"{count} hosts checked, ")
+        summary.append(f"{failed} failing", style="bold red" if failed else "green")
+        self.query_one("#preflight-detail", Static).update(summary)
+
+    @on(DataTable.RowSelected, "#preflight-table")
+    def on_row_selected(self, event: DataTable.RowSelected) -> None:
+        """Show the details of a host's checks."""
+        results = self.results.get(event.row_key.value)
+        if results:
+            text = Text(f"{event.row_key.value}: ", style="bold")
+            text.append_text(badge_line(results))
+            self.query_one("#preflight-detail", Static).update(text)
+
+    @on(Button.Pressed, "#btn-refresh")
+    def action_refresh(self) -> None:
+        """Re-check every host, ignoring cached results."""
+        self.run_checks(force=True)
+
+    @on(Button.Pressed, "#btn-back")
+    def action_back(self) -> None:
+        """Go back to main menu."""
+        self.app.pop_screen()
@@ -0,0 +1,159 @@
+"""Profile Screen - Top functions from the built-in profiler."""
+
+from textual.app import ComposeResult
+from textual.containers import Container, Horizontal
+from textual.screen import Screen
+from textual.widgets import Header, Footer, Button, Static, DataTable, Select
+from textual import on
+
+from lib.profiler import profiler
+
+
+ALL_SECTIONS = "all"
+
+
+class ProfileScreen(Screen):
+    """Show the functions with the most cumulative time per profiled section."""
+
+    BINDINGS = [
+        ("escape", "back", "Back"),
+        ("r", "refresh", "Refresh"),
+    ]
+
+    CSS = """
+    ProfileScreen {
+        layout: vertical;
+    }
+
+    #profile-container {
+        width: 100%;
+        height: 100%;
+        padding: 1 2;
+    }
+
+    .section {
+        border: solid $primary;
+        margin: 1 0;
+        padding: 1 2;
+    }
+
+    .section-title {
+        text-style: bold;
+        color: $accent;
+        margin-bottom: 1;
+    }
+
+    #select-section {
+        width: 50%;
+        margin: 0 0 1 0;
+    }
+
+    #profile-table {
+        height: 1fr;
+        border: solid $primary;
+    }
+
+    #profile-status {
+        height: 3;
+        padding: 1 2;
+        color: $text-muted;
+    }
+
+    #button-container {
+        height: 5;
+        align: center middle;
+        margin: 1 0;
+    }
+
+    #button-container Button {
+        margin: 0 2;
+    }
+    """
+
+    def compose(self) -> ComposeResult:
+        """Create child widgets for the profile screen."""
+        yield Header()
+
+        with Container(id="profile-container"):
+            with Container(classes="section"):
+                yield Static("Profile", classes="section-title")
+                yield Static(f"Top functions by cumulative time ({profiler.mode or 'stopped'} mode)")
+
+            yield Select(
+                options=[("All Sections", ALL_SECTIONS)],
+                value=ALL_SECTIONS,
+                allow_blank=False,
+                id="select-section"
+            )
+            yield DataTable(id="profile-table", cursor_type="row")
+            yield Static("", id="profile-status")
+
+            with Horizontal(id="button-container"):
+                yield Button("Refresh", id="btn-refresh", variant="primary")
+                yield Button("Save", id="btn-save")
+                yield Button("Back", id="btn-back", variant="error")
+
+        yield Footer()
+
+    def on_mount(self) -> None:
+        """Set up the table and show the current profile."""
+        table = self.query_one("#profile-table", DataTable)
+        table.add_columns("Cumulative", "Own", "Calls", "Section", "Function")
+        self.action_refresh()
+
+    @on(Button.Pressed, "#btn-refresh")
+    def action_refresh(self) -> None:
+        """Reload the section list and the table."""
+        select = self.query_one("#select-section", Select)
+        current = select.value
+        sections = profiler.sections()
+        select.set_options([("All Sections", ALL_SECTIONS)] + [(name, name) for name in sections])
+        select.value = current if current in sections else ALL_SECTIONS
+        self._load_table()
+
+    @on(Select.Changed, "#select-section")
+    def on_section_change(self, event: Select.Changed) -> None:
+        """Show another section."""
+        self._load_table()
+
+    def _load_table(self) -> None:
+        """Fill the table with the top functions of the selected section."""
+        section = self.query_one("#select-section", Select).value
+        rows = profiler.top(None if section in (ALL_SECTIONS, Select.BLANK) else section, limit=50)
+
+        table = self.query_one("#profile-table", DataTable)
+        table.clear()
+        for row in rows:
+            table.add_row(
+                f"{row['cumulative'] * 1000:.1f} ms",
+                f"{row['own'] * 1000:.1f} ms",
+                "-" if row["calls"] is None else str(row["calls"]),
+                row["section"],
+                row["function"],
+            )
+
+        if profiler.enabled or rows:
+            calls = sum(profiler.calls.values())
+            status = f"{len(profiler.sections())} sections, {calls} profiled calls"
+        else:
+            status = "Profiling is off. Start with: python deploy_node.py --profile [cprofile|sample]"
+        self.query_one("#profile-status", Static).update(status)
+
+    @on(Button.Pressed, "#btn-save")
+    def save_profiles(self) -> None:
+        """Write the profiles collected so far."""
+        try:
+            paths = profiler.write()
+        except OSError as e:
+            self.notify(f"Could not write profiles: {e}", severity="error")
+            return
+
+        if paths:
+            self.notify(f"Wrote {len(paths)} files to {paths[0].parent}", severity="information")
+        else:
+            self.notify("Nothing profiled yet", severity="warning")
+
+    @on(Button.Pressed, "#btn-back")
+    def action_back(self) -> None:
+        """Go back to the previous screen."""
+        self.app.pop_screen()
@@ -4,13 +4,12 @@ from pathlib import Path
 from textual.app import ComposeResult
 from textual.containers import Container, Vertical, Horizontal
 from textual.screen import Screen
-from textual.widgets import Header, Footer, Button, Static, DataTable, Input
-from textual import on
+from textual.widgets import Header, Footer, Button, Static, DataTable, Input, Select
+from textual import on, work
 from rich.text import Text
 
-from ..lib.inventory import InventoryManager
-from ..lib.config_manager import ConfigManager
-from ..lib.ssh_manager import SSHManager
+from lib.profiler import profiler
+from lib.services import INVENTORY_CHANGED
 
 
 class UpdateScreen(Screen):
@@ -49,10 +48,15 @@ class UpdateScreen(Screen):
     }
 
     #filter-container Input {
-        width: 50%;
+        width: 40%;
         margin: 0 2;
     }
 
+    #filter-container Select {
+        width: 25%;
+        margin: 0 1;
+    }
+
     #nodes-table {
         height: 1fr;
         border: solid $primary;
@@ -71,12 +75,9 @@ class UpdateScreen(Screen):
 
     def __init__(self):
         super().__init__()
-        self.inventory = InventoryManager()
-        self.config = ConfigManager()
-        self.ssh_manager = SSHManager()
-
-        self.inventory.load_inventory()
-        self.config.load_config()
+        self.inventory = self.app.services.inventory
+        self.config = self.app.services.config
+        self.ssh_manager = self.app.services.ssh_manager
 
         self.selected_node = None
 
@@ -91,13 +92,24 @@ class UpdateScreen(Screen):
 
             with Horizontal(id="filter-container"):
                 yield Input(placeholder="Filter by hostname...", id="input-filter")
+                yield Select(
+                    [(location, location) for location in self.inventory.get_locations()],
+                    prompt="All locations",
+                    id="select-location",
+                )
+                yield Select(
+                    [("K3s Worker", "k3s-worker"), ("Backup", "backup"), ("K3s Master", "k3s-master")],
+                    prompt="All types",
+                    id="select-type",
+                )
 
             yield DataTable(id="nodes-table", cursor_type="row")
 
             with Horizontal(id="button-container"):
                 yield Button("Connect to Node", id="btn-connect", variant="primary", disabled=True)
                 yield Button("Update Packages", id="btn-update-packages", disabled=True)
-                yield Button("Reconfigure Storage", id="btn-storage", disabled=True)
+                yield Button("Provision Storage", id="btn-storage")
+                yield Button("Rolling Update", id="btn-rolling-update", variant="warning")
                 yield Button("Back", id="btn-back", variant="error")
 
             yield Static("", id="status-message")
@@ -114,12 +126,29 @@ class UpdateScreen(Screen):
         # Load nodes
         self._refresh_table()
 
+        self.app.services.subscribe(INVENTORY_CHANGED, self._on_inventory_changed)
+
+    def on_unmount(self) -> None:
+        """Stop listening for inventory changes."""
+        self.app.services.unsubscribe(INVENTORY_CHANGED, self._on_inventory_changed)
+
+    def _on_inventory_changed(self, payload=None) -> None:
+        """Refresh the table after the shared inventory changed."""
+        self._refresh_table(self.query_one("#input-filter", Input).value)
+
+    def _select_value(self, selector: str):
+        """Get a filter Select's value (None when blank)."""
+        value = self.query_one(selector, Select).value
+        return None if value is Select.BLANK else value
+
     def _refresh_table(self, filter_text: str = "") -> None:
         """Refresh the nodes table with inventory data."""
         table = self.query_one("#nodes-table", DataTable)
         table.clear()
 
         nodes = self.inventory.list_nodes()
+        location = self._select_value("#select-location")
+        node_type = self._select_value("#select-type")
 
         for node in nodes:
             hostname = node.get("hostname", "")
@@ -127,6 +156,10 @@ class UpdateScreen(Screen):
             # Apply filter
             if filter_text and filter_text.lower() not in hostname.lower():
                 continue
+            if location and node.get("location") != location:
+                continue
+            if node_type and node.get("node_type") != node_type:
+                continue
 
             table.add_row(
                 hostname,
@@ -143,6 +176,12 @@ class UpdateScreen(Screen):
         """Filter table when search input changes."""
         self._refresh_table(event.value)
 
+    @on(Select.Changed, "#select-location")
+    @on(Select.Changed, "#select-type")
+    def on_select_filter_change(self, event: Select.Changed) -> None:
+        """Filter table when the location or type selection changes."""
+        self._refresh_table(self.query_one("#input-filter", Input).value)
+
     @on(DataTable.RowSelected)
     def on_row_selected(self, event: DataTable.RowSelected) -> None:
         """Handle row selection in the table."""
@@ -154,7 +193,6 @@ class UpdateScreen(Screen):
         # Enable action buttons
         self.query_one("#btn-connect", Button).disabled = False
         self.query_one("#btn-update-packages", Button).disabled = False
-        self.query_one("#btn-storage", Button).disabled = False
 
         # Update status message
         if self.selected_node:
@@ -188,60 +226,197 @@ class UpdateScreen(Screen):
             return
 
         hostname = self.selected_node.get("hostname")
-        ip = self.selected_node.get("ansible_host")
+        self.query_one("#status-message", Static).update(
+            Text(f"Updating packages on {hostname}...", style="yellow")
+        )
+        self._run_package_update(dict(self.selected_node))
+
+    @work(thread=True, exclusive=True, group="update-packages")
+    @profiler.profiled("UpdateScreen._run_package_update")
+    def _run_package_update(self, node: dict) -> None:
+        """Run all update steps in one SSH session (worker thread)."""
+        hostname = node.get("hostname")
+        ip = node.get("ansible_host")
         ssh_key = Path(self.config.get_preference("ssh_key", "~/.ssh/homelab_rsa")).expanduser()
-
         status_widget = self.query_one("#status-message", Static)
-        status_widget.update(Text(f"Updating packages on {hostname}...", style="yellow"))
 
-        # Execute update command
         commands = [
             "sudo apt update",
             "sudo apt upgrade -y",
             "sudo apt autoremove -y"
         ]
 
-        try:
-            for cmd in commands:
-                stdout, stderr, exit_code = self.ssh_manager.execute_command(
-                    host=ip,
-                    user="ubuntu",
-                    command=cmd,
-                    key=ssh_key
-                )
+        def show_output(step: int, line: str) -> None:
+            if line.strip():
+                self.app.call_from_thread(status_widget.update, Text(
+                    f"Updating packages on {hostname} ({step + 1}/{len(commands)}: {commands[step]})\n{line[-200:]}",
+                    style="yellow"
+                ))
+
+        results = self.ssh_manager.run_script(
+            host=ip,
+            user="ubuntu",
+            commands=commands,
+            key=ssh_key,
+            on_output=show_output
+        )
+
+        failed = [result for result in results if result["exit_code"] != 0]
+        if failed or len(results) != len(commands):
+            step = failed[0] if failed else results[-1]
+            self.app.call_from_thread(status_widget.update, Text(
+                f"Error executing '{step['command']}' (exit {step['exit_code']}):\n{step['output'][-1000:]}",
+                style="bold red"
+            ))
+            return
 
-                if exit_code != 0:
-                    status_widget.update(Text(
-                        f"Error executing '{cmd}':\n{stderr}",
-                        style="bold red"
-                    ))
-                    return
+        timings = ", ".join(
+            f"{result['command'].replace('sudo ', '')}: {result['duration']:.0f}s" for result in results
+        )
+        self.app.call_from_thread(status_widget.update, Text(
+            f"✓ Successfully updated packages on {hostname} ({timings})",
+            style="bold green"
+        ))
+
+    @on(Button.Pressed, "#btn-rolling-update")
+    def start_rolling_update(self) -> None:
+        """Update all nodes currently shown in the table, batch by batch, after confirmation."""
+        from components.confirm_dialog import ConfirmScreen
+        from components.log_viewer import TaskLogScreen
+        from lib.cluster_join import JoinOrchestrator
+        from lib.rolling_update import RollingUpdater, plan_batches, select_nodes
+
+        # Masters are only updated when explicitly filtered for
+        table = self.query_one("#nodes-table", DataTable)
+        shown = [row_key.value for row_key in table.rows]
+        include_masters = self._select_value("#select-type") == "k3s-master"
+        nodes = select_nodes(
+            self.inventory.list_nodes(),
+            hostnames=shown,
+            types=["k3s-master"] if include_masters else ["k3s-worker", "backup"],
+        )
 
-            status_widget.update(Text(
-                f"✓ Successfully updated packages on {hostname}",
-                style="bold green"
-            ))
+        ssh_key = Path(self.config.get_preference("ssh_key", "~/.ssh/homelab_rsa")).expanduser()
+        settings = self.config.get_preference("rolling_update", {}) or {}
+        orchestrator = JoinOrchestrator.from_config(self.config, self.inventory, self.ssh_manager, key=ssh_key)
+        updater = RollingUpdater(
+            orchestrator,
+            key=ssh_key,
+            batch_size=settings.get("batch_size", 2),
+            max_per_site=settings.get("max_per_site", 1),
+            failure_threshold=settings.get("failure_threshold", 0.25),
+            drain_timeout=settings.get("drain_timeout", 300),
+            ready_timeout=settings.get("ready_timeout", 600),
+        )
+        nodes = updater.updatable(nodes)
 
-        except Exception as e:
-            status_widget.update(Text(
-                f"Error updating packages: {str(e)}",
-                style="bold red"
+        status_widget = self.query_one("#status-message", Static)
+        if not nodes:
+            status_widget.update(Text("No cluster nodes shown to update", style="bold red"))
+            return
+
+        def complete():
+            succeeded = sum(1 for result in updater.results.values() if result["ok"])
+            ok = not updater.aborted and succeeded == len(nodes)
+            return ok, f"{succeeded}/{len(nodes)} nodes updated" + (" (aborted)" if updater.aborted else "")
+
+        def start(confirmed: bool) -> None:
+            if not confirmed:
+                status_widget.update(Text("Rolling update cancelled", style="yellow"))
+                return
+            self.app.push_screen(TaskLogScreen(
+                f"Rolling update of {len(nodes)} nodes",
+                lambda: updater.run(nodes),
+                complete,
             ))
 
+        batches = plan_batches(nodes, updater.batch_size, updater.max_per_site)
+        lines = [
+            f"Batch {number}: {', '.join(node['hostname'] for node in batch)}"
+            for number, batch in enumerate(batches, 1)
+        ]
+        lines.append(f"kubectl runs on {orchestrator.master_host}")
+        self.app.push_screen(
+            ConfirmScreen(
+                f"Drain, upgrade and reboot {len(nodes)} nodes in {len(batches)} batches?",
+                lines,
+                confirm_label="Start Update",
+            ),
+            start,
+        )
+
     @on(Button.Pressed, "#btn-storage")
     def reconfigure_storage(self) -> None:
-        """Reconfigure storage on selected node."""
-        if not self.selected_node:
+        """Plan Longhorn/backup disks on the nodes shown in the table, then confirm."""
+        from lib.rolling_update import select_nodes
+
+        # Same default types as the provision-storage command
+        table = self.query_one("#nodes-table", DataTable)
+        shown = [row_key.value for row_key in table.rows]
+        nodes = select_nodes(self.inventory.list_nodes(), hostnames=shown)
+
+        if not nodes:
+            self.query_one("#status-message", Static).update(
+                Text("No cluster nodes shown to provision", style="bold red")
+            )
             return
 
-        hostname = self.selected_node.get("hostname")
+        self.query_one("#status-message", Static).update(
+            Text(f"Checking disks on {len(nodes)} nodes...", style="yellow")
+        )
+        self._plan_storage(nodes)
 
-        status = Text()
-        status.append(f"Storage reconfiguration for {hostname}\n", style="yellow")
-        status.append("\nThis feature requires the post-install-storage.sh script.\n")
-        status.append("Run manually: ssh ubuntu@{hostname} 'sudo ./post-install-storage.sh'\n", style="dim")
+    @work(thread=True, exclusive=True, group="storage-plan")
+    def _plan_storage(self, nodes: list) -> None:
+        """Dry-run storage provisioning to find the disks each node would use (worker thread)."""
+        from lib.storage import StorageProvisioner
 
-        self.query_one("#status-message", Static).update(status)
+        ssh_key = Path(self.config.get_preference("ssh_key", "~/.ssh/homelab_rsa")).expanduser()
+        provisioner = StorageProvisioner(self.ssh_manager, key=ssh_key)
+        list(provisioner.run(nodes, dry_run=True))
+        self.app.call_from_thread(self._confirm_storage, nodes, provisioner)
+
+    def _confirm_storage(self, nodes: list, provisioner) -> None:
+        """Show the dry-run plan and provision the nodes once confirmed."""
+        from components.confirm_dialog import ConfirmScreen
+        from components.log_viewer import TaskLogScreen
+
+        if not self.is_attached:
+            return
+
+        status_widget = self.query_one("#status-message", Static)
+        plan = provisioner.summary()[:-1]
+        pending = [
+            node for node in nodes
+            if any(provisioner.results.get(node["hostname"], {}).get("plan", {}).values())
+        ]
+        if not pending:
+            status_widget.update(Text("No free disks to provision:\n" + "\n".join(plan), style="yellow"))
+            return
+
+        def complete():
+            succeeded = sum(1 for result in provisioner.results.values() if result["ok"])
+            return succeeded == len(pending), f"{succeeded}/{len(pending)} nodes provisioned"
+
+        def start(confirmed: bool) -> None:
+            if not confirmed:
+                status_widget.update(Text("Storage provisioning cancelled", style="yellow"))
+                return
+            status_widget.update("")
+            self.app.push_screen(TaskLogScreen(
+                f"Storage provisioning on {len(pending)} nodes",
+                lambda: provisioner.run(pending),
+                complete,
+            ))
+
+        self.app.push_screen(
+            ConfirmScreen(
+                f"Partition, format and mount disks on {len(pending)} nodes?",
+                plan,
+                confirm_label="Provision",
+            ),
+            start,
+        )
 
     @on(Button.Pressed, "#btn-back")
     def action_back(self) -> None:
@@ -0,0 +1,84 @@
+"""Smoke tests that run the TUI headless, the way deploy_node.py starts it."""
+
+import asyncio
+
+import pytest
+
+from textual.widgets import RichLog
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """Run the app against an empty ~/.homelab."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return tmp_path
+
+
+def run_app(app, check, size=(160, 60)):
+    async def run():
+        async with app.run_test(size=size) as pilot:
+            await pilot.pause()
+            await check(app, pilot)
+
+    asyncio.run(run())
+
+
+def test_replay_session(home):
+    from deploy_node import KapnodeDeployApp
+    from lib.session_recorder import SessionRecorder
+
+    session = home / "kapnode9.jsonl"
+    recorder = SessionRecorder(session, {"name": "kapnode9", "vmid": 209})
+    recorder.record("Creating VM 209...", stage="create")
+    recorder.record("VM 209 started")
+    recorder.close()
+
+    async def check(app, pilot):
+        for _ in range(50):
+            if "Replay finished" in str(app.screen.query_one("#status-bar").renderable):
+                break
+            await pilot.pause(0.05)
+
+        assert type(app.screen).__name__ == "LogViewerScreen"
+        assert app.screen.log_lines == ["Creating VM 209...", "VM 209 started"]
+        assert len(app.screen.query_one("#log-display", RichLog).lines) > 2
+
+    run_app(KapnodeDeployApp(replay=session, replay_speed=0), check)
+
+
+@pytest.mark.parametrize("button, screen", [
+    ("#btn-deploy", "DeployScreen"),
+    ("#btn-update", "UpdateScreen"),
+    ("#btn-history", "HistoryScreen"),
+    ("#btn-status", "ClusterStatusScreen"),
+    ("#btn-preflight", "PreflightScreen"),
+])
+def test_open_screen_from_menu(home, button, screen):
+    from deploy_node import KapnodeDeployApp
+
+    async def check(app, pilot):
+        app.screen.query_one(button).press()
+        await pilot.pause()
+        assert type(app.screen).__name__ == screen
+
+        await pilot.press("escape")
+        await pilot.pause()
+        assert type(app.screen).__name__ == "MainMenu"
+
+    run_app(KapnodeDeployApp(), check)
+
+
+def test_open_profile_panel(home):
+    from deploy_node import KapnodeDeployApp
+    from lib.profiler import profiler
+
+    profiler.start("cprofile", output_dir=home / "profiles")
+    try:
+        async def check(app, pilot):
+            await pilot.press("f9")
+            await pilot.pause()
+            assert type(app.screen).__name__ == "ProfileScreen"
+
+        run_app(KapnodeDeployApp(), check)
+    finally:
+        profiler.stop()
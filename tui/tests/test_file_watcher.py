@@ -0,0 +1,65 @@
+"""Tests for the file watcher's inotify handling of missing directories."""
+
+import threading
+import time
+
+import pytest
+
+from lib.file_watcher import FileWatcher, _load_inotify
+
+
+pytestmark = pytest.mark.skipif(_load_inotify() is None, reason="inotify not available")
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_inventory_dir_created_under_watched_home(tmp_path):
+    # Default layout: ~/.homelab/inventory.yml (missing dir) and
+    # ~/.homelab-deploy.conf, whose parent is the missing dir's fallback watch
+    inventory = tmp_path / ".homelab" / "inventory.yml"
+    config = tmp_path / ".homelab-deploy.conf"
+    changed = []
+    lock = threading.Lock()
+
+    def callback(path):
+        with lock:
+            changed.append(path)
+
+    watcher = FileWatcher([inventory, config], callback, debounce=0.1)
+    watcher.start()
+    try:
+        assert watcher.mode == "inotify"
+        assert set(watcher._watches.values()) == {tmp_path}
+
+        inventory.parent.mkdir()
+        assert wait_for(lambda: inventory.parent in watcher._watches.values())
+
+        inventory.write_text("all: {}\n")
+        assert wait_for(lambda: inventory in changed)
+
+        with lock:
+            changed.clear()
+        inventory.write_text("all:\n  children: {}\n")
+        config.write_text("{}\n")
+        assert wait_for(lambda: inventory in changed and config in changed)
+    finally:
+        watcher.stop()
+
+
+def test_unrelated_directory_does_not_rescan(tmp_path):
+    inventory = tmp_path / ".homelab" / "inventory.yml"
+    watcher = FileWatcher([inventory], lambda path: None, debounce=0.1)
+    watcher.start()
+    try:
+        (tmp_path / "other").mkdir()
+        time.sleep(0.3)
+        assert set(watcher._watches.values()) == {tmp_path}
+    finally:
+        watcher.stop()
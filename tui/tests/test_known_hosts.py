@@ -0,0 +1,51 @@
+"""Tests for the known hosts store with several key types per host."""
+
+import paramiko
+import pytest
+
+from lib.known_hosts import KnownHostsStore
+
+
+@pytest.fixture(scope="module")
+def host_keys():
+    return {
+        "rsa": paramiko.RSAKey.generate(1024),
+        "ecdsa": paramiko.ECDSAKey.generate(),
+    }
+
+
+def reload(store):
+    return KnownHostsStore(store.path)
+
+
+def test_add_second_key_type_persists(tmp_path, host_keys):
+    store = KnownHostsStore(tmp_path / "known_hosts")
+    store.add(["h1", "10.0.0.1"], host_keys["ecdsa"])
+    store.add(["h1"], host_keys["rsa"])
+
+    pinned = reload(store).lookup("h1")
+    assert set(pinned) == {host_keys["ecdsa"].get_name(), host_keys["rsa"].get_name()}
+    assert set(reload(store).lookup("10.0.0.1")) == {host_keys["ecdsa"].get_name()}
+
+
+def test_add_replaces_changed_key(tmp_path, host_keys):
+    store = KnownHostsStore(tmp_path / "known_hosts")
+    store.add(["h1"], host_keys["rsa"])
+    replacement = paramiko.RSAKey.generate(1024)
+    store.add(["h1"], replacement)
+
+    pinned = reload(store).lookup("h1")
+    assert pinned[replacement.get_name()].asbytes() == replacement.asbytes()
+    assert len((tmp_path / "known_hosts").read_text().splitlines()) == 1
+
+
+def test_remove_forgets_every_key_type(tmp_path, host_keys):
+    store = KnownHostsStore(tmp_path / "known_hosts")
+    store.add(["h1"], host_keys["ecdsa"])
+    store.add(["h1"], host_keys["rsa"])
+    store.add(["h2"], host_keys["rsa"])
+
+    assert store.remove(["h1", "missing"]) == 1
+    assert store.lookup("h1") == {}
+    assert reload(store).lookup("h1") == {}
+    assert set(reload(store).lookup("h2")) == {host_keys["rsa"].get_name()}
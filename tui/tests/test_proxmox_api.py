@@ -0,0 +1,108 @@
+"""Tests for the Proxmox API client's connection pool, against MockProxmoxServer."""
+
+import threading
+import time
+
+import pytest
+
+from lib.proxmox_api import ProxmoxAPI, ProxmoxAPIError
+from lib.proxmox_mock import DEFAULT_TOKEN, MockCluster, MockProxmoxServer
+
+
+class SlowCluster(MockCluster):
+    """Cluster whose tasks take longer than the client timeout to start."""
+
+    delay = 0.5
+
+    def add_task(self, *args, **kwargs):
+        time.sleep(self.delay)
+        return super().add_task(*args, **kwargs)
+
+
+def make_api(server, timeout=5.0):
+    token_id, token_secret = DEFAULT_TOKEN.split("=", 1)
+    return ProxmoxAPI(server.url, token_id, token_secret, timeout=timeout)
+
+
+@pytest.fixture
+def server():
+    server = MockProxmoxServer(cluster=MockCluster(vms=3))
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_connection_reused_across_threads(server):
+    api = make_api(server)
+
+    # Each poll runs in a fresh worker thread, like the dashboard's
+    for _ in range(5):
+        thread = threading.Thread(target=api.cluster_resources)
+        thread.start()
+        thread.join()
+
+    assert server.request_count == 5
+    assert server.connection_count == 1
+    api.close()
+
+
+def test_close_drains_pool(server):
+    api = make_api(server)
+    barrier = threading.Barrier(3)
+
+    def poll():
+        barrier.wait()
+        api.cluster_resources()
+
+    threads = [threading.Thread(target=poll) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert api._idle
+    pooled = list(api._idle)
+    api.close()
+
+    assert api._idle == []
+    assert all(conn.sock is None for conn in pooled)
+
+
+def test_close_discards_connections_in_use(server):
+    api = make_api(server)
+    conn, generation = api._acquire()
+    api.close()
+    api._release(conn, generation)
+
+    assert api._idle == []
+
+
+def test_get_retried_on_stale_connection(server):
+    api = make_api(server)
+    api.cluster_resources()
+
+    # Simulate the server having dropped the idle keep-alive connection
+    api._idle[0].sock.close()
+    assert len(api.cluster_resources("vm")) == 3
+    assert server.connection_count == 2
+    api.close()
+
+
+def test_post_not_resent_after_timeout():
+    cluster = SlowCluster(vms=1)
+    server = MockProxmoxServer(cluster=cluster)
+    server.start()
+    try:
+        api = make_api(server, timeout=0.2)
+        vmid = next(iter(cluster.vms))
+        node = cluster.vms[vmid]["node"]
+
+        with pytest.raises(ProxmoxAPIError):
+            api.start_vm(node, vmid)
+        time.sleep(cluster.delay * 2)
+
+        assert server.request_count == 1
+        assert [task["type"] for task in cluster.tasks.values()] == ["qmstart"]
+        api.close()
+    finally:
+        server.stop()
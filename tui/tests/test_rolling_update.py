@@ -0,0 +1,40 @@
+"""Tests for rolling update node selection."""
+
+from types import SimpleNamespace
+
+from lib.rolling_update import RollingUpdater, select_nodes
+
+
+NODES = [
+    {"hostname": "minikapserver", "group": "k3s_masters", "ansible_host": "100.64.1.10", "location": "brooklyn"},
+    {"hostname": "kapmaster2", "group": "k3s_masters", "ansible_host": "100.64.1.11", "location": "queens"},
+    {"hostname": "kapnode1", "group": "k3s_workers", "ansible_host": "100.64.1.20", "location": "brooklyn"},
+]
+
+
+def make_updater(master_host):
+    orchestrator = SimpleNamespace(master_host=master_host, ssh_manager=None, get_cluster_nodes=lambda: {})
+    updater = RollingUpdater(orchestrator)
+    updated = []
+
+    def update_node(node, in_cluster, emit):
+        updated.append(node["hostname"])
+        return {"ok": True, "rebooted": False, "detail": "updated", "duration": 0.0}
+
+    updater.update_node = update_node
+    return updater, updated
+
+
+def test_select_nodes_leaves_masters_out_by_default():
+    assert [node["hostname"] for node in select_nodes(NODES)] == ["kapnode1"]
+
+
+def test_run_never_updates_kubectl_master():
+    updater, updated = make_updater("100.64.1.10")
+    masters = select_nodes(NODES, types=["k3s-master"])
+
+    lines = list(updater.run(masters))
+
+    assert updated == ["kapmaster2"]
+    assert "Skipping minikapserver: kubectl runs on it" in lines
+    assert [node["hostname"] for node in updater.updatable(masters)] == ["kapmaster2"]
@@ -0,0 +1,26 @@
+"""Tests for the service registry's config reload."""
+
+import json
+
+from lib.services import ServiceRegistry
+
+
+def test_config_reload_closes_api_client(tmp_path):
+    config_path = tmp_path / "deploy.conf"
+    config_path.write_text(json.dumps({
+        "proxmox_api": {"enabled": True, "url": "http://127.0.0.1:1", "token_id": "root@pam!kapnode"},
+    }))
+    services = ServiceRegistry(inventory_path=tmp_path / "inventory.yml", config_path=config_path)
+    try:
+        api = services.proxmox_api
+        closed = []
+        api.close = lambda: closed.append(True)
+
+        services._watcher = type("Watcher", (), {"paths": [tmp_path / "inventory.yml", config_path]})()
+        services._on_file_changed(config_path)
+
+        assert closed == [True]
+        assert services.proxmox_api is not api
+    finally:
+        services._watcher = None
+        services.close()